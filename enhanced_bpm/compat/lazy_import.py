@@ -0,0 +1,45 @@
+"""
+Lazy import helper
+
+This module defers importing heavy optional dependencies (NumPy, pandas)
+until one of their attributes is first used, so the web app, the CLI and
+worker processes start without paying for libraries a request or command
+may never need.
+"""
+
+import importlib.util
+import sys
+
+
+def lazy_module(name):
+    """
+    Return a module that is only executed on first attribute access.
+
+    If the module is already imported, or cannot be found, this behaves like
+    a regular import (the latter raising ImportError right away).
+
+    Args:
+        name: Fully qualified module name
+
+    Returns:
+        The (lazily loaded) module
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name):
+    """Check whether a module has been imported and actually executed."""
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
@@ -19,18 +19,14 @@ warnings.filterwarnings("ignore", message="numpy.ufunc size changed")
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 warnings.filterwarnings("ignore", category=ImportWarning)
 
-# Check if NumPy is available
-numpy_available = importlib.util.find_spec("numpy") is not None
+# Check if NumPy is available (a lazily imported NumPy is already in sys.modules,
+# and find_spec would load it by reading its __spec__)
+numpy_available = "numpy" in sys.modules or importlib.util.find_spec("numpy") is not None
 
-# If NumPy is available, import it
+# If NumPy is available, import it on first use (see get_numpy) to keep start-up fast
 if numpy_available:
-    try:
-        import numpy as np
-        NUMPY_VERSION = np.__version__
-        HAS_NUMPY = True
-    except ImportError:
-        HAS_NUMPY = False
-        NUMPY_VERSION = None
+    HAS_NUMPY = True
+    NUMPY_VERSION = None
 else:
     HAS_NUMPY = False
     NUMPY_VERSION = None
@@ -159,8 +155,14 @@ else:
 
 def get_numpy():
     """Get the NumPy module (real or minimal compatibility layer)."""
+    global HAS_NUMPY, NUMPY_VERSION
     if HAS_NUMPY:
-        import numpy as np
+        try:
+            import numpy as np
+        except ImportError:
+            HAS_NUMPY = False
+            raise
+        NUMPY_VERSION = np.__version__
         return np
     else:
         return np
@@ -171,6 +173,8 @@ def is_numpy_available():
 
 def get_numpy_version():
     """Get the NumPy version if available."""
+    if HAS_NUMPY and NUMPY_VERSION is None:
+        get_numpy()
     return NUMPY_VERSION
 
 def check_numpy_compatibility():
@@ -1,7 +1,8 @@
 """
 Enhanced BPM Analysis System - Main Application
 
-This script runs the enhanced BPM analysis system with interactive querying capabilities.
+This script runs the enhanced BPM analysis system with interactive querying capabilities,
+or as a headless batch runner writing analysis results as JSON lines.
 """
 
 import os
@@ -14,6 +15,13 @@ from typing import Dict, List, Any, Optional, Tuple
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from enhanced_bpm.models.bpm_analyzer import BPMAnalyzer
 
+# The command line parser, the batch runner and the stores attached to the
+# analyzer are imported by the functions that use them, so an interactive
+# session starts without them
+
+# Analyzer of a batch worker process, created once per worker
+_batch_analyzer = None
+
 def print_header(title: str) -> None:
     """Print a formatted header."""
     print("\n" + "=" * 80)
@@ -351,14 +359,202 @@ def interactive_mode(analyzer: BPMAnalyzer) -> None:
         # Pause before showing the menu again
         input("\nPress Enter to continue...")
 
+def create_analyzer(data_dir: str, conformance_results: Optional[str] = None,
+                    kpi_store: Optional[str] = None) -> BPMAnalyzer:
+    """
+    Create an analyzer with the results saved by the web app attached.
+    
+    Args:
+        data_dir: Directory containing the BPM and industry data files
+        conformance_results: Conformance results file written by the web app
+            (ignored if it does not exist)
+        kpi_store: KPI store directory of the web app, whose latest values and
+            anomalies are reported (ignored if it does not exist)
+        
+    Returns:
+        The analyzer
+    """
+    analyzer = BPMAnalyzer(data_dir=data_dir)
+    if conformance_results:
+        from enhanced_bpm.models.conformance import load_results as load_conformance_results
+        analyzer.set_conformance_results(load_conformance_results(conformance_results))
+    if kpi_store and os.path.isdir(kpi_store):
+        from enhanced_bpm.models.kpi_anomaly import monitor_store
+        from enhanced_bpm.models.kpi_store import KPIStore, kpi_catalog
+        store = KPIStore(kpi_store)
+        analyzer.set_kpi_store(store)
+        analyzer.set_anomaly_monitor(monitor_store(store, kpi_catalog(analyzer.bpm_principles)))
+    return analyzer
+
+def _init_batch_worker(data_dir: str, conformance_results: Optional[str] = None,
+                       kpi_store: Optional[str] = None) -> None:
+    """Create the analyzer of a batch worker process."""
+    global _batch_analyzer
+    _batch_analyzer = create_analyzer(data_dir, conformance_results, kpi_store)
+
+def _timed_record(industry: str, kind: str, name: str, func) -> Dict[str, Any]:
+    """Run one analysis and wrap its result (or error) in a batch record."""
+    start = time.perf_counter()
+    record = {"industry": industry, "type": kind, "name": name}
+    try:
+        record["result"] = func()
+    except Exception as e:
+        record["error"] = str(e)
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+def run_batch_industry(industry: str, questions: List[str], frameworks: List[str]) -> List[Dict[str, Any]]:
+    """
+    Run the requested frameworks and questions for one industry.
+    
+    Args:
+        industry: The industry to analyze
+        questions: Questions to answer
+        frameworks: Analysis sections (see BUNDLE_SECTIONS) to run
+        
+    Returns:
+        List of result records
+    """
+    from enhanced_bpm.models.analysis_cache import BUNDLE_SECTIONS
+    analyzer = _batch_analyzer
+    if not analyzer.set_current_industry(industry):
+        return [{"industry": industry, "type": "industry", "name": industry,
+                 "error": f"Industry '{industry}' not found"}]
+    
+    records = []
+    for framework in frameworks:
+        method = getattr(analyzer, BUNDLE_SECTIONS[framework])
+        records.append(_timed_record(industry, "framework", framework, method))
+    for question in questions:
+        records.append(_timed_record(industry, "question", question,
+                                     lambda: analyzer.answer_question(question)))
+    return records
+
+def run_batch(data_dir: str, industries: List[str], questions: List[str], frameworks: List[str],
+              output, workers: int = 1, conformance_results: Optional[str] = None,
+              kpi_store: Optional[str] = None) -> int:
+    """
+    Run frameworks and questions over many industries and write JSON lines.
+    
+    Industries are distributed over a pool of worker processes, each with
+    its own analyzer; records are written in industry order as soon as an
+    industry is done.
+    
+    Args:
+        data_dir: Directory containing the BPM and industry data files
+        industries: Industries to analyze
+        questions: Questions to answer for every industry
+        frameworks: Analysis sections to run for every industry
+        output: Text stream the JSON lines are written to
+        workers: Number of worker processes (1 runs in the current process)
+        conformance_results: Conformance results file attached to the analyzers
+        kpi_store: KPI store directory attached to the analyzers
+        
+    Returns:
+        Number of records written
+    """
+    from enhanced_bpm.models.analysis_cache import BUNDLE_SECTIONS
+    unknown = [f for f in frameworks if f not in BUNDLE_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown frameworks: {', '.join(unknown)}")
+    
+    workers = max(min(workers, len(industries)), 1)
+    written = 0
+    
+    if workers == 1:
+        _init_batch_worker(data_dir, conformance_results, kpi_store)
+        results = (run_batch_industry(industry, questions, frameworks) for industry in industries)
+        written = _write_records(results, output)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(data_dir, conformance_results, kpi_store)) as executor:
+            results = executor.map(run_batch_industry, industries,
+                                   [questions] * len(industries), [frameworks] * len(industries))
+            written = _write_records(results, output)
+    
+    return written
+
+def _write_records(results, output) -> int:
+    """Write batches of records as JSON lines."""
+    written = 0
+    for records in results:
+        for record in records:
+            output.write(json.dumps(record) + "\n")
+            written += 1
+        output.flush()
+    return written
+
+def parse_args(argv: Optional[List[str]] = None) -> "argparse.Namespace":
+    """Parse the command line arguments."""
+    import argparse
+    from enhanced_bpm.models.analysis_cache import BUNDLE_SECTIONS
+    parser = argparse.ArgumentParser(description="Enhanced BPM Analysis System")
+    parser.add_argument("--batch", action="store_true",
+                        help="run headless and write results as JSON lines instead of prompting")
+    parser.add_argument("--industry", action="append", dest="industries",
+                        help="industry to analyze (repeatable, default: all available)")
+    parser.add_argument("--question", action="append", dest="questions", default=[],
+                        help="question to answer for every industry (repeatable)")
+    parser.add_argument("--questions-file",
+                        help="file with one question per line")
+    parser.add_argument("--framework", action="append", dest="frameworks",
+                        choices=sorted(BUNDLE_SECTIONS),
+                        help="analysis to run for every industry (repeatable, default: all)")
+    parser.add_argument("--output", default="-",
+                        help="JSON lines output file (default: standard output)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes")
+    parser.add_argument("--data-dir",
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"),
+                        help="directory containing the BPM and industry data files")
+    parser.add_argument("--conformance-results", default="conformance_results.json",
+                        help="conformance results saved by the web app, used to answer deviation questions")
+    parser.add_argument("--kpi-store", default="kpi_store",
+                        help="KPI store of the web app, used to report latest KPI values and anomalies")
+    return parser.parse_args(argv)
+
+def batch_mode(args: "argparse.Namespace") -> None:
+    """
+    Run the analyzer headless as configured on the command line.
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    questions = list(args.questions)
+    if args.questions_file:
+        with open(args.questions_file, "r", encoding="utf-8") as f:
+            questions.extend(line.strip() for line in f if line.strip())
+    
+    industries = args.industries or BPMAnalyzer(data_dir=args.data_dir).load_available_industries()
+    from enhanced_bpm.models.analysis_cache import BUNDLE_SECTIONS
+    frameworks = args.frameworks or list(BUNDLE_SECTIONS)
+    
+    start = time.perf_counter()
+    if args.output == "-":
+        written = run_batch(args.data_dir, industries, questions, frameworks, sys.stdout, args.workers,
+                            args.conformance_results, args.kpi_store)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            written = run_batch(args.data_dir, industries, questions, frameworks, output, args.workers,
+                                args.conformance_results, args.kpi_store)
+    
+    print(f"Wrote {written} records for {len(industries)} industries in "
+          f"{time.perf_counter() - start:.2f}s", file=sys.stderr)
+
 def main() -> None:
     """Main function to run the BPM analysis system."""
+    args = parse_args()
+    if args.batch:
+        batch_mode(args)
+        return
+    
     # Create data directory if it doesn't exist
-    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    data_dir = args.data_dir
     os.makedirs(data_dir, exist_ok=True)
     
     # Initialize the BPM analyzer
-    analyzer = BPMAnalyzer(data_dir=data_dir)
+    analyzer = create_analyzer(data_dir, args.conformance_results, args.kpi_store)
     
     # Check if we have the required data files
     required_files = [
@@ -0,0 +1,243 @@
+"""
+Analysis Cache - Precomputed industry analysis bundles for the web views.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, List, Any, Optional, Callable, Set
+
+from .bpm_analyzer import BPMAnalyzer
+
+# Bundle sections and the BPMAnalyzer method that produces each of them
+BUNDLE_SECTIONS = {
+    "industry_overview": "get_industry_overview",
+    "competitive_landscape": "get_competitive_landscape",
+    "porter_five_forces": "analyze_porter_five_forces",
+    "value_chain": "analyze_value_chain",
+    "balanced_scorecard": "analyze_balanced_scorecard",
+    "business_processes": "get_business_process_analysis",
+    "optimization_recommendations": "get_process_optimization_recommendations",
+}
+
+# Document sections each bundle section is computed from (industry sections, and
+# the principles frameworks some analyses quote)
+BUNDLE_DEPENDENCIES = {
+    "industry_overview": {"industry_name", "industry_overview"},
+    "competitive_landscape": {"competitive_landscape"},
+    "porter_five_forces": {"porter_five_forces_analysis", "frameworks"},
+    "value_chain": {"value_chain_analysis", "frameworks"},
+    "balanced_scorecard": {"balanced_scorecard_analysis", "frameworks"},
+    "business_processes": {"business_process_analysis"},
+    "optimization_recommendations": {"process_optimization_recommendations"},
+}
+
+
+def industry_file_name(industry_name: str) -> str:
+    """Return the data file name used for an industry."""
+    return f"{industry_name.lower().replace(' ', '_')}_industry.json"
+
+
+def compute_data_version(data_dir: str, industry_name: str) -> str:
+    """
+    Compute a version tag for the data an industry bundle is built from.
+
+    The tag changes whenever the BPM principles file or the industry file
+    is modified, which is what invalidates a cached bundle.
+
+    Args:
+        data_dir: Directory containing the BPM and industry data files
+        industry_name: Name of the industry
+
+    Returns:
+        Short hexadecimal version tag
+    """
+    digest = hashlib.sha1()
+    for filename in ("bpm_principles.json", industry_file_name(industry_name)):
+        try:
+            stat = os.stat(os.path.join(data_dir, filename))
+            digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+        except OSError:
+            digest.update(f"{filename}:missing;".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def build_analysis_bundle(analyzer: BPMAnalyzer, industry_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Run every analysis for an industry and collect the results in one bundle.
+
+    Args:
+        analyzer: The BPM analyzer instance
+        industry_name: Name of the industry to analyze
+
+    Returns:
+        Dictionary with one entry per bundle section, or None if the
+        industry is not available
+    """
+    if not analyzer.set_current_industry(industry_name):
+        return None
+
+    bundle = {"industry_name": analyzer.current_industry}
+    for section, method_name in BUNDLE_SECTIONS.items():
+        bundle[section] = getattr(analyzer, method_name)()
+
+    return bundle
+
+
+class AnalysisBundleCache:
+    """
+    Cache of analysis bundles keyed by industry and data version.
+
+    Bundles are kept in memory and, when a cache directory is given, also
+    written to disk so that every worker process serving the web app shares
+    the bundle built by the first one.
+    """
+
+    def __init__(self, data_dir: str, cache_dir: Optional[str] = None,
+                 analyzer_factory: Optional[Callable[[str], BPMAnalyzer]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            data_dir: Directory containing the BPM and industry data files
+            cache_dir: Optional directory for bundles shared between processes
+            analyzer_factory: Callable creating an analyzer for a data directory
+        """
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self.analyzer_factory = analyzer_factory or (lambda path: BPMAnalyzer(data_dir=path))
+        self._bundles = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.refreshes = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def available_industries(self) -> List[str]:
+        """
+        List the industries that have a data file.
+
+        Returns:
+            Sorted list of industry names
+        """
+        try:
+            files = os.listdir(self.data_dir)
+        except OSError:
+            return []
+        return sorted(f.replace("_industry.json", "").replace("_", " ")
+                      for f in files if f.endswith("_industry.json"))
+
+    def get(self, industry_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the analysis bundle for an industry, building it if needed.
+
+        Args:
+            industry_name: Name of the industry
+
+        Returns:
+            The analysis bundle, or None if the industry is not available
+        """
+        key = industry_name.lower().replace(" ", "_")
+        version = compute_data_version(self.data_dir, industry_name)
+
+        cached = self._bundles.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with self._lock:
+            # Another thread may have built the bundle while we waited
+            cached = self._bundles.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            bundle = self._read_shared(key, version)
+            if bundle is None:
+                bundle = build_analysis_bundle(self.analyzer_factory(self.data_dir), industry_name)
+                if bundle is None:
+                    return None
+                self.builds += 1
+                self._write_shared(key, version, bundle)
+
+            self._bundles[key] = (version, bundle)
+            return bundle
+
+    def refresh(self, industry_name: str, changed_sections: Set[str]) -> Optional[List[str]]:
+        """
+        Update a cached bundle after some sections of its data changed.
+
+        Only the bundle sections computed from the changed data sections
+        are recomputed; the others are carried over from the cached bundle
+        of the previous data version. Without a cached bundle the whole
+        bundle is built on the next get.
+
+        Args:
+            industry_name: Name of the industry
+            changed_sections: Document sections that changed
+
+        Returns:
+            Names of the recomputed bundle sections, or None if there was no
+            bundle to update
+        """
+        key = industry_name.lower().replace(" ", "_")
+        with self._lock:
+            cached = self._bundles.pop(key, None)
+            if cached is None:
+                return None
+
+            analyzer = self.analyzer_factory(self.data_dir)
+            if not analyzer.set_current_industry(industry_name):
+                return None
+
+            bundle = dict(cached[1], industry_name=analyzer.current_industry)
+            rebuilt = [section for section, dependencies in BUNDLE_DEPENDENCIES.items()
+                       if dependencies & changed_sections]
+            for section in rebuilt:
+                bundle[section] = getattr(analyzer, BUNDLE_SECTIONS[section])()
+
+            version = compute_data_version(self.data_dir, industry_name)
+            self.refreshes += 1
+            self._write_shared(key, version, bundle)
+            self._bundles[key] = (version, bundle)
+            return rebuilt
+
+    def invalidate(self, industry_name: Optional[str] = None) -> None:
+        """
+        Drop cached bundles from memory.
+
+        Args:
+            industry_name: Industry to drop, or None to drop every bundle
+        """
+        with self._lock:
+            if industry_name is None:
+                self._bundles.clear()
+            else:
+                self._bundles.pop(industry_name.lower().replace(" ", "_"), None)
+
+    def _shared_path(self, key: str, version: str) -> str:
+        """Return the path of a bundle in the shared cache directory."""
+        return os.path.join(self.cache_dir, f"{key}-{version}.json")
+
+    def _read_shared(self, key: str, version: str) -> Optional[Dict[str, Any]]:
+        """Read a bundle written by another process, if there is one."""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._shared_path(key, version), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_shared(self, key: str, version: str, bundle: Dict[str, Any]) -> None:
+        """Atomically write a bundle to the shared cache directory."""
+        if not self.cache_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(bundle, f)
+            os.replace(tmp_path, self._shared_path(key, version))
+        except OSError as e:
+            print(f"Error writing analysis bundle for {key}: {str(e)}")
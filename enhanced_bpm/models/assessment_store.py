@@ -0,0 +1,262 @@
+"""
+Assessment Store - SQLite persistence for scored maturity assessments.
+"""
+
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+# Aggregate scopes maintained on every insert
+SCOPE_ALL = "all"
+SCOPE_ORGANIZATION = "organization"
+SCOPE_INDUSTRY = "industry"
+
+# Pseudo-dimension holding the overall maturity score
+OVERALL = "overall"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    organization TEXT NOT NULL,
+    industry TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    overall_score REAL NOT NULL,
+    level INTEGER,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_organization ON assessments (organization, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_industry ON assessments (industry, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_submitted_at ON assessments (submitted_at);
+CREATE TABLE IF NOT EXISTS assessment_aggregates (
+    scope TEXT NOT NULL,
+    scope_key TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    PRIMARY KEY (scope, scope_key, dimension)
+);
+"""
+
+
+def welford_update(count: int, mean: float, m2: float, value: float) -> Tuple[int, float, float]:
+    """
+    Add one observation to running statistics (Welford's algorithm).
+
+    Args:
+        count: Number of observations so far
+        mean: Running mean
+        m2: Running sum of squared deviations from the mean
+        value: New observation
+
+    Returns:
+        Updated (count, mean, m2)
+    """
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    m2 += delta * (value - mean)
+    return count, mean, m2
+
+
+def summarize(count: int, mean: float, m2: float) -> Dict[str, float]:
+    """Turn running statistics into count, mean, variance and std."""
+    variance = m2 / (count - 1) if count > 1 else 0.0
+    return {
+        "count": count,
+        "mean": round(mean, 4),
+        "variance": round(variance, 4),
+        "std": round(variance ** 0.5, 4)
+    }
+
+
+class AssessmentStore:
+    """
+    Embedded store for scored maturity assessments.
+
+    Every insert also updates running aggregates (count, mean and variance
+    via Welford's algorithm) per dimension for the whole store, the
+    organization and the industry, so dashboards read them with a primary
+    key lookup instead of scanning the stored assessments.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        Open (and if needed create) the store.
+
+        Args:
+            db_path: Path of the SQLite database file, or ":memory:"
+        """
+        self.db_path = db_path
+        # Transactions are started explicitly (see _transaction)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Run a write transaction, taking the database write lock before anything is read."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def add(self, result: Dict[str, Any], organization: str, industry: str,
+            submitted_at: Optional[float] = None) -> int:
+        """
+        Store one scored assessment.
+
+        Args:
+            result: Scored assessment as returned by MaturityScoringEngine
+            organization: Organization that submitted the assessment
+            industry: Industry of the organization
+            submitted_at: Submission time as a UNIX timestamp (defaults to now)
+
+        Returns:
+            Id of the stored assessment
+        """
+        return self.add_many([result], organization, industry, submitted_at)[0]
+
+    def add_many(self, results: Sequence[Dict[str, Any]], organization: str, industry: str,
+                 submitted_at: Optional[float] = None) -> List[int]:
+        """
+        Store a batch of scored assessments in one transaction.
+
+        Args:
+            results: Scored assessments as returned by MaturityScoringEngine
+            organization: Organization that submitted the assessments
+            industry: Industry of the organization
+            submitted_at: Submission time as a UNIX timestamp (defaults to now)
+
+        Returns:
+            Ids of the stored assessments
+        """
+        if submitted_at is None:
+            submitted_at = time.time()
+
+        scopes = [(SCOPE_ALL, ""), (SCOPE_ORGANIZATION, organization), (SCOPE_INDUSTRY, industry)]
+        ids = []
+
+        # The aggregates are read inside the write transaction, so a concurrent
+        # writer (another process) cannot update them in between
+        with self._transaction():
+            running = self._load_aggregates(scopes)
+
+            for result in results:
+                cursor = self._conn.execute(
+                    "INSERT INTO assessments (organization, industry, submitted_at, overall_score, level, result) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (organization, industry, submitted_at, result["overall_score"],
+                     result.get("level"), json.dumps(result)))
+                ids.append(cursor.lastrowid)
+
+                # Unanswered dimensions (and unanswered assessments) score 0.0 and are left out of the means
+                answered = result.get("answered_by_dimension", {})
+                values = {dimension: value for dimension, value in result.get("dimension_scores", {}).items()
+                          if answered.get(dimension, 1) > 0}
+                if result.get("answered_questions", 1) > 0:
+                    values[OVERALL] = result["overall_score"]
+                for scope in scopes:
+                    for dimension, value in values.items():
+                        key = scope + (dimension,)
+                        running[key] = welford_update(*running.get(key, (0, 0.0, 0.0)), float(value))
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO assessment_aggregates (scope, scope_key, dimension, count, mean, m2) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [key + stats for key, stats in running.items()])
+
+        return ids
+
+    def _load_aggregates(self, scopes: List[Tuple[str, str]]) -> Dict[Tuple[str, str, str], Tuple[int, float, float]]:
+        """Load the current aggregates for the given scopes."""
+        running = {}
+        for scope, scope_key in scopes:
+            rows = self._conn.execute(
+                "SELECT dimension, count, mean, m2 FROM assessment_aggregates WHERE scope = ? AND scope_key = ?",
+                (scope, scope_key))
+            for row in rows:
+                running[(scope, scope_key, row["dimension"])] = (row["count"], row["mean"], row["m2"])
+        return running
+
+    def aggregates(self, organization: Optional[str] = None,
+                   industry: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Read the running aggregates for the store, an organization or an industry.
+
+        Args:
+            organization: Organization to read aggregates for
+            industry: Industry to read aggregates for (ignored if an
+                organization is given)
+
+        Returns:
+            Statistics per dimension, including the ``overall`` score
+        """
+        if organization is not None:
+            scope, scope_key = SCOPE_ORGANIZATION, organization
+        elif industry is not None:
+            scope, scope_key = SCOPE_INDUSTRY, industry
+        else:
+            scope, scope_key = SCOPE_ALL, ""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dimension, count, mean, m2 FROM assessment_aggregates WHERE scope = ? AND scope_key = ?",
+                (scope, scope_key)).fetchall()
+
+        return {row["dimension"]: summarize(row["count"], row["mean"], row["m2"]) for row in rows}
+
+    def list_assessments(self, organization: Optional[str] = None, industry: Optional[str] = None,
+                         since: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        List stored assessments, newest first.
+
+        Args:
+            organization: Only return assessments of this organization
+            industry: Only return assessments of this industry
+            since: Only return assessments submitted at or after this time
+            limit: Maximum number of assessments to return
+
+        Returns:
+            List of stored assessments
+        """
+        clauses, params = [], []
+        if organization is not None:
+            clauses.append("organization = ?")
+            params.append(organization)
+        if industry is not None:
+            clauses.append("industry = ?")
+            params.append(industry)
+        if since is not None:
+            clauses.append("submitted_at >= ?")
+            params.append(since)
+
+        query = "SELECT id, organization, industry, submitted_at, result FROM assessments"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY submitted_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        return [{
+            "id": row["id"],
+            "organization": row["organization"],
+            "industry": row["industry"],
+            "submitted_at": row["submitted_at"],
+            "result": json.loads(row["result"])
+        } for row in rows]
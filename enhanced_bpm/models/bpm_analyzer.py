@@ -5,8 +5,37 @@ BPM Analyzer - Core analysis engine for Business Process Management insights.
 import json
 import os
 import re
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
+
+from .kpi_anomaly import AnomalyMonitor
+from .kpi_store import KPIStore, metric_key
+from .snippets import Passage
+from .spelling import SpellingIndex, collect_words, words
+
+# The schema validation (with the spreadsheet ingestion it shares) and the
+# semantic index are imported when an industry is first loaded or searched,
+# so the CLI starts without them
+if TYPE_CHECKING:
+    from .semantic_index import SemanticIndex
+
+# Weight of intent keywords in the spelling vocabulary, so a misspelled
+# word is corrected to an intent keyword before an equally close data word
+INTENT_KEYWORD_WEIGHT = 1000
+
+# Result categories of the industry sections (as named by search_across_data)
+INDUSTRY_CATEGORIES = {
+    "industry_overview": "industry_overview",
+    "competitive_landscape": "competitive_landscape",
+    "value_chain_analysis": "value_chain",
+    "business_process_analysis": "business_processes",
+    "porter_five_forces_analysis": "porter_five_forces",
+    "balanced_scorecard_analysis": "balanced_scorecard",
+    "process_optimization_recommendations": "recommendations"
+}
+
+# Leaves returned by the semantic fallback of answer_question
+SEMANTIC_RESULTS = 6
 
 class BPMAnalyzer:
     """
@@ -26,6 +55,14 @@ class BPMAnalyzer:
         self.industry_data = {}
         self.load_available_industries()
         self.current_industry = None
+        self.conformance_results = None
+        self.kpi_store = None
+        self.anomaly_monitor = None
+        self.spelling_index = None
+        self._intent_words = set()
+        self._spelling_industries = set()
+        self.semantic_indexes = {}
+        self.search_passages = {}
         
     def load_available_industries(self) -> List[str]:
         """
@@ -57,17 +94,59 @@ class BPMAnalyzer:
         """
         normalized_name = industry_name.lower().replace(" ", "_")
         file_path = f"{normalized_name}_industry.json"
-        
-        if normalized_name in [k.lower().replace(" ", "_") for k in self.industry_data.keys()]:
-            # Load the industry data if not already loaded
+        industry_name = self._industry_key(industry_name)
+
+        if industry_name is not None:
+            # Load and validate the industry data if not already loaded
             if self.industry_data[industry_name] is None:
-                self.industry_data[industry_name] = self._load_json(file_path)
+                from .document_schema import SchemaError, validate_document
+                try:
+                    data, _ = validate_document(self._load_json(file_path), "industry")
+                except SchemaError as e:
+                    print(f"Invalid industry data in {file_path}: {str(e)}")
+                    return False
+                self.industry_data[industry_name] = data
             
             self.current_industry = industry_name
             return True
         
         return False
     
+    def invalidate_industry(self, industry_name: str) -> bool:
+        """
+        Drop the loaded data of an industry whose file changed.
+        
+        Its semantic index and search passages are rebuilt on next use, and
+        the spelling vocabulary is rebuilt without its old words. The current
+        industry is reloaded at once.
+        
+        Args:
+            industry_name: Name of the industry
+            
+        Returns:
+            True if the industry is known (and, if current, reloaded)
+        """
+        industry_name = self._industry_key(industry_name)
+        if industry_name is None:
+            return False
+        
+        self.industry_data[industry_name] = None
+        self.semantic_indexes.pop(industry_name, None)
+        self.search_passages.pop(industry_name, None)
+        if industry_name in self._spelling_industries:
+            self.spelling_index = None
+            self._spelling_industries.clear()
+        
+        if self.current_industry == industry_name:
+            return self.set_current_industry(industry_name)
+        return True
+    
+    def _industry_key(self, industry_name: str) -> Optional[str]:
+        """Map a requested industry name onto the key used in industry_data."""
+        normalized_name = industry_name.lower().replace(" ", "_")
+        return next((k for k in self.industry_data.keys()
+                     if k.lower().replace(" ", "_") == normalized_name), None)
+    
     def get_industry_overview(self) -> Dict[str, Any]:
         """
         Get a comprehensive overview of the current industry.
@@ -155,6 +234,13 @@ class BPMAnalyzer:
                 "maturity_assessment": bsc[perspective]["process_maturity_assessment"]
             }
             
+            # Attach the latest recorded values of the perspective's metrics
+            if self.kpi_store is not None:
+                result["perspectives"][perspective]["current_values"] = {
+                    m["metric"]: self.kpi_store.latest(metric_key(m["metric"]))
+                    for m in bsc[perspective]["key_metrics"]
+                }
+            
         return result
     
     def get_process_optimization_recommendations(self) -> Dict[str, List[Dict[str, Any]]]:
@@ -288,65 +374,51 @@ class BPMAnalyzer:
             query: Search query string
             
         Returns:
-            Dictionary containing search results by category
+            Dictionary containing search results by category, each with
+            its path, context, a snippet of the matching text and the
+            highlight spans of the query in the snippet
         """
         if not self.current_industry or not self.industry_data[self.current_industry]:
             return {"error": "No industry selected or data not available"}
         
         query = query.lower()
-        results = {
-            "industry_overview": [],
-            "competitive_landscape": [],
-            "value_chain": [],
-            "business_processes": [],
-            "porter_five_forces": [],
-            "balanced_scorecard": [],
-            "recommendations": []
-        }
-        
-        # Helper function to search in nested dictionaries
-        def search_dict(d, path="", results_list=None):
-            if results_list is None:
-                results_list = []
-                
-            if isinstance(d, dict):
-                for k, v in d.items():
-                    new_path = f"{path}.{k}" if path else k
-                    if isinstance(v, (dict, list)):
-                        search_dict(v, new_path, results_list)
-                    elif isinstance(v, str) and query in v.lower():
-                        results_list.append({
-                            "path": new_path,
-                            "content": v,
-                            "context": k
-                        })
-            elif isinstance(d, list):
-                for i, item in enumerate(d):
-                    new_path = f"{path}[{i}]"
-                    if isinstance(item, (dict, list)):
-                        search_dict(item, new_path, results_list)
-                    elif isinstance(item, str) and query in item.lower():
-                        results_list.append({
-                            "path": new_path,
-                            "content": item,
-                            "context": "List item"
-                        })
-            
-            return results_list
-        
-        # Search in each section
-        industry_data = self.industry_data[self.current_industry]
+        results = {}
+        for category, path, context, passage in self._search_passages():
+            spans = passage.find(query)
+            if spans:
+                results.setdefault(category, []).append(dict(path=path, context=context, **passage.snippet(spans)))
+        return results
+    
+    def _search_passages(self) -> List[Tuple[str, str, str, Passage]]:
+        """
+        Get the searchable strings of the current industry, building them on first use.
         
-        results["industry_overview"] = search_dict(industry_data["industry_overview"])
-        results["competitive_landscape"] = search_dict(industry_data["competitive_landscape"])
-        results["value_chain"] = search_dict(industry_data["value_chain_analysis"])
-        results["business_processes"] = search_dict(industry_data["business_process_analysis"])
-        results["porter_five_forces"] = search_dict(industry_data["porter_five_forces_analysis"])
-        results["balanced_scorecard"] = search_dict(industry_data["balanced_scorecard_analysis"])
-        results["recommendations"] = search_dict(industry_data["process_optimization_recommendations"])
+        Returns:
+            List of (category, path, context, passage) in document order;
+            paths are relative to the section and the context is the key of
+            the string, or "List item" for list elements
+        """
+        passages = self.search_passages.get(self.current_industry)
+        if passages is not None:
+            return passages
+        
+        def walk(value, path, context):
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    yield from walk(item, f"{path}.{key}" if path else key, key)
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    yield from walk(item, f"{path}[{i}]", "List item")
+            elif isinstance(value, str) and path:
+                yield path, context, Passage(value)
         
-        # Filter out empty result categories
-        return {k: v for k, v in results.items() if v}
+        industry_data = self.industry_data[self.current_industry]
+        passages = self.search_passages[self.current_industry] = [
+            (category, path, context, passage)
+            for section, category in INDUSTRY_CATEGORIES.items()
+            for path, context, passage in walk(industry_data[section], "", None)
+        ]
+        return passages
     
     def answer_question(self, question: str) -> str:
         """
@@ -376,6 +448,12 @@ class BPMAnalyzer:
             (r"challenges|difficulties|problems|obstacles", self._answer_challenges),
             (r"drivers|growth factors|what drives|catalysts", self._answer_drivers),
             
+            # Current KPI anomalies
+            (r"anomal|unusual|outlier|spike|abnormal|alerts?\b", self._answer_kpi_anomalies),
+            
+            # Conformance of event logs to the reference process
+            (r"deviat|conformance|conform to|fitness|non-compliant", self._answer_conformance),
+            
             # Porter's Five Forces
             (r"porter|five forces|competitive forces|industry rivalry", self._answer_porter),
             (r"threat of new entrants|new entrants|barriers to entry", 
@@ -417,7 +495,7 @@ class BPMAnalyzer:
             (r"bpm principles|core principles|process management principles", self._answer_bpm_principles),
             
             # BPM methodologies
-            (r"methodologies|six sigma|lean|business process reengineering|bpr|tqm", 
+            (r"methodologies|six sigma|lean|reengineering|bpr|tqm", 
              self._answer_bpm_methodologies),
             
             # Technology enablers
@@ -438,9 +516,21 @@ class BPMAnalyzer:
             if re.search(pattern, question_lower):
                 return answer_func()
         
-        # If no pattern matches, perform a general search
+        # Correct misspelled intent keywords and try again (only words missing
+        # from the vocabulary are corrected, and only to a keyword of one of the
+        # patterns; the search below keeps the question as it was asked)
+        routed_question, corrections = self._spelling(patterns).correct(question_lower, self._intent_words)
+        if corrections:
+            for pattern, answer_func in patterns:
+                if re.search(pattern, routed_question):
+                    return answer_func()
+        
+        # If no pattern matches, perform a general search, falling back to
+        # the passages closest in meaning when no text contains the question
         search_results = self.search_across_data(question_lower)
-        if search_results and not isinstance(search_results, dict) or not search_results.get("error"):
+        if not search_results:
+            search_results = self.semantic_search(question_lower)
+        if search_results:
             # Compile relevant information from search results
             answer = f"Based on my analysis of the {self.current_industry} industry, here's what I found about '{question}':\n\n"
             
@@ -449,7 +539,7 @@ class BPMAnalyzer:
                     category_name = category.replace("_", " ").title()
                     answer += f"From {category_name}:\n"
                     for result in results[:3]:  # Limit to top 3 results per category
-                        answer += f"- {result['content']}\n"
+                        answer += f"- {result['snippet']}\n"
                     answer += "\n"
             
             return answer
@@ -459,6 +549,155 @@ class BPMAnalyzer:
                 f"for the {self.current_industry} industry. Please try asking in a different way or "
                 f"ask about another aspect of the industry.")
     
+    def semantic_index(self) -> Optional["SemanticIndex"]:
+        """
+        Get the semantic index of the current industry, building it on first use.
+        
+        The index covers the text leaves of the industry data and of the BPM
+        principles.
+        
+        Returns:
+            The semantic index, or None if no industry is selected
+        """
+        if not self.current_industry or not self.industry_data[self.current_industry]:
+            return None
+        
+        index = self.semantic_indexes.get(self.current_industry)
+        if index is None:
+            from .semantic_index import SemanticIndex, iter_leaves
+            industry_data = self.industry_data[self.current_industry]
+            leaves = list(iter_leaves(industry_data, INDUSTRY_CATEGORIES))
+            leaves.extend(iter_leaves(self.bpm_principles))
+            index = self.semantic_indexes[self.current_industry] = SemanticIndex.build(leaves)
+        return index
+    
+    def semantic_search(self, query: str, k: int = SEMANTIC_RESULTS) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find the data passages closest in meaning to a query.
+        
+        Args:
+            query: Search query string
+            k: Number of passages
+            
+        Returns:
+            Dictionary of passages by category, in the format of
+            search_across_data with a similarity score added
+        """
+        index = self.semantic_index()
+        if index is None:
+            return {}
+        
+        results = {}
+        for score, leaf in index.search(query, k):
+            category = INDUSTRY_CATEGORIES.get(leaf.section, leaf.section)
+            results.setdefault(category, []).append(dict(
+                path=leaf.path,
+                context=leaf.context,
+                score=round(score, 3),
+                **Passage(leaf.text).snippet([])
+            ))
+        return results
+    
+    def _spelling(self, patterns: List[Tuple[str, Any]]) -> SpellingIndex:
+        """
+        Get the spelling index of the question vocabulary, building it on first use.
+        
+        The vocabulary holds the intent keywords and the words of the BPM
+        principles and of every loaded industry; industries loaded later are
+        added to the existing index.
+        
+        Args:
+            patterns: Question patterns whose keywords are added to the vocabulary
+            
+        Returns:
+            The spelling index
+        """
+        if self.spelling_index is None:
+            self.spelling_index = SpellingIndex()
+            for pattern, _ in patterns:
+                self._intent_words.update(words(pattern))
+            self.spelling_index.add_words(self._intent_words, INTENT_KEYWORD_WEIGHT)
+            self.spelling_index.add_words(collect_words(self.bpm_principles))
+        
+        for industry_name, data in self.industry_data.items():
+            if data is not None and industry_name not in self._spelling_industries:
+                self.spelling_index.add_words(collect_words(data))
+                self._spelling_industries.add(industry_name)
+        
+        return self.spelling_index
+    
+    def set_kpi_store(self, store: Optional[KPIStore]) -> None:
+        """
+        Attach a KPI store whose latest values are reported with the scorecard.
+        
+        Args:
+            store: KPI time-series store
+        """
+        self.kpi_store = store
+    
+    def set_anomaly_monitor(self, monitor: Optional[AnomalyMonitor]) -> None:
+        """
+        Attach the anomaly monitor whose current anomalies answer_question can cite.
+        
+        Args:
+            monitor: Streaming KPI anomaly monitor
+        """
+        self.anomaly_monitor = monitor
+    
+    def _answer_kpi_anomalies(self) -> str:
+        """Answer questions about current anomalies in the KPIs."""
+        if self.anomaly_monitor is None:
+            return "No KPI observations are being monitored, so no anomalies can be reported."
+        if self.kpi_store is not None:
+            self.anomaly_monitor.catch_up(self.kpi_store)
+        
+        anomalies = self.anomaly_monitor.current_anomalies(limit=10)
+        if not anomalies:
+            return "No anomalies have been detected in the monitored KPIs."
+        
+        answer = "Current anomalies in the monitored KPIs:\n\n"
+        for anomaly in anomalies:
+            category = f" ({anomaly['category']})" if anomaly["category"] else ""
+            observed_at = datetime.fromtimestamp(anomaly["timestamp"], timezone.utc).strftime("%Y-%m-%d %H:%M")
+            answer += f"- {anomaly['name']}{category} at {observed_at}: value {anomaly['value']:g}\n"
+            for detection in anomaly["detections"]:
+                detector = detection["detector"].replace("_", " ")
+                answer += f"  {detector}: score {detection['score']:.1f}, expected about {detection['expected']:g}\n"
+        
+        return answer
+    
+    def set_conformance_results(self, results: Optional[Dict[str, Any]]) -> None:
+        """
+        Make conformance checking results available to answer_question.
+        
+        Args:
+            results: Results as returned by ConformanceChecker.check
+        """
+        self.conformance_results = results
+    
+    def _answer_conformance(self) -> str:
+        """Answer questions about where the executed process deviates from the model."""
+        results = self.conformance_results
+        if not results:
+            return ("No conformance results are available. Upload an event log and check it "
+                    "against a reference process model first.")
+        
+        answer = (f"Conformance of {results['cases']} cases ({results['variants']} variants) "
+                  f"against the {results['model'] or 'reference'} process model:\n\n")
+        answer += f"Fitness: {results['fitness']:.1%}\n"
+        answer += f"Conforming cases: {results['conforming_cases']} ({results['conformance_rate']:.1%})\n\n"
+        
+        if not results["hotspots"]:
+            answer += "All cases follow the reference model."
+            return answer
+        
+        answer += "Main deviation hotspots:\n"
+        for hotspot in results["hotspots"]:
+            kind = hotspot["kind"].replace("_", " ")
+            answer += f"- {kind.capitalize()}: {hotspot['location']} ({hotspot['cases']} cases, {hotspot['share']:.1%})\n"
+        
+        return answer
+    
     def _answer_market_size(self) -> str:
         """Answer questions about market size and growth."""
         industry_data = self.industry_data[self.current_industry]
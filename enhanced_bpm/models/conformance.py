@@ -0,0 +1,256 @@
+"""
+Conformance - Replay of event log variants against reference process models.
+"""
+
+import json
+import os
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from .process_graph import ProcessGraph, EVENT_TYPES, GATEWAY_TYPES
+
+# Deviation kinds reported by the replay
+UNEXPECTED_START = "unexpected_start"
+UNEXPECTED_TRANSITION = "unexpected_transition"
+UNKNOWN_ACTIVITY = "unknown_activity"
+UNEXPECTED_END = "unexpected_end"
+
+
+def _is_task(node) -> bool:
+    """Return True if a node is an activity rather than an event or gateway."""
+    return node.type not in EVENT_TYPES and node.type not in GATEWAY_TYPES
+
+
+def build_footprint(model: ProcessGraph) -> Dict[str, Any]:
+    """
+    Derive the behavioural footprint of a process model.
+
+    Events and gateways are collapsed, so the footprint states which
+    activities may start and end a case and which activity may directly
+    follow another. Activities on different branches of a parallel gateway
+    may follow each other in either order.
+
+    Args:
+        model: Reference process model
+
+    Returns:
+        Dictionary with the activities, start and end activities and the
+        allowed transitions (all keyed by activity name)
+    """
+    nodes = model.nodes
+
+    def next_tasks(node_ids: List[int]) -> Tuple[Set[int], bool]:
+        """Find the activities reached through events and gateways, and whether the end is."""
+        found, reaches_end = set(), False
+        stack, seen = list(node_ids), set(node_ids)
+        while stack:
+            node = stack.pop()
+            if _is_task(nodes[node]):
+                found.add(node)
+                continue
+            successors = model.successors(node)
+            if not successors:
+                reaches_end = True
+            for target in successors:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return found, reaches_end
+
+    tasks = [node for node in nodes if _is_task(node)]
+    roots = [node.id for node in nodes
+             if node.type == "startEvent" or (not model.predecessors(node.id) and node.type not in EVENT_TYPES)]
+    start, _ = next_tasks(roots)
+
+    transitions, end = set(), set()
+    for task in tasks:
+        successors = model.successors(task.id)
+        following, reaches_end = next_tasks(successors)
+        if reaches_end or not successors:
+            end.add(task.name)
+        transitions.update((task.name, nodes[t].name) for t in following)
+
+    # Activities on different branches of a parallel split may interleave
+    for split in nodes:
+        if split.type != "parallelGateway" or len(model.successors(split.id)) < 2:
+            continue
+        branches = []
+        for branch_root in model.successors(split.id):
+            branch, stack, seen = set(), [branch_root], {branch_root}
+            while stack:
+                node = stack.pop()
+                if nodes[node].type == "parallelGateway" and len(model.predecessors(node)) > 1:
+                    continue
+                if _is_task(nodes[node]):
+                    branch.add(nodes[node].name)
+                for target in model.successors(node):
+                    if target not in seen:
+                        seen.add(target)
+                        stack.append(target)
+            branches.append(branch)
+        for i, branch in enumerate(branches):
+            for other in branches[i + 1:]:
+                transitions.update((a, b) for a in branch for b in other)
+                transitions.update((b, a) for a in branch for b in other)
+
+    return {
+        "activities": {task.name for task in tasks},
+        "start": {nodes[n].name for n in start},
+        "end": end,
+        "transitions": transitions
+    }
+
+
+def replay_trace(footprint: Dict[str, Any], trace: List[str]) -> Tuple[float, List[Tuple[str, str]]]:
+    """
+    Replay one trace against a footprint.
+
+    Every event and the end of the case is one replay step; a step fits
+    when the activity is known and may follow the previous one (or start
+    or end the case).
+
+    Args:
+        footprint: Footprint as returned by build_footprint
+        trace: Activities of the trace in order
+
+    Returns:
+        Tuple of (fitness between 0 and 1, list of (deviation kind, location))
+    """
+    activities = footprint["activities"]
+    transitions = footprint["transitions"]
+    deviations = []
+
+    previous = None
+    for position, activity in enumerate(trace):
+        if activity not in activities:
+            deviations.append((UNKNOWN_ACTIVITY, activity))
+        elif position == 0:
+            if activity not in footprint["start"]:
+                deviations.append((UNEXPECTED_START, activity))
+        elif previous in activities and (previous, activity) not in transitions:
+            deviations.append((UNEXPECTED_TRANSITION, f"{previous} -> {activity}"))
+        previous = activity
+
+    if trace and previous in activities and previous not in footprint["end"]:
+        deviations.append((UNEXPECTED_END, previous))
+
+    steps = len(trace) + 1
+    return 1.0 - len(deviations) / steps, deviations
+
+
+def _replay_chunk(footprint: Dict[str, Any], variants: List[Dict[str, Any]]) -> List[Tuple[float, List[Tuple[str, str]]]]:
+    """Replay a chunk of variants (executed in a worker process)."""
+    return [replay_trace(footprint, variant["activities"]) for variant in variants]
+
+
+class ConformanceChecker:
+    """
+    Conformance checker comparing event logs with a reference process model.
+
+    Traces are replayed once per variant and the results weighted by the
+    number of cases following the variant, so the cost depends on the number
+    of distinct behaviours rather than on the number of cases. Large variant
+    sets can be replayed in parallel worker processes.
+    """
+
+    def __init__(self, model: ProcessGraph):
+        """
+        Initialize the checker.
+
+        Args:
+            model: Reference process model
+        """
+        self.model = model
+        self.footprint = build_footprint(model)
+
+    def check(self, variants: List[Dict[str, Any]], top: int = 10,
+              workers: Optional[int] = 1) -> Dict[str, Any]:
+        """
+        Check the variants of an event log against the model.
+
+        Args:
+            variants: Variants as returned by EventLogMiner.variants
+            top: Number of deviation hotspots to report
+            workers: Number of worker processes (1 runs in the current
+                process, None uses one per CPU)
+
+        Returns:
+            Dictionary with the fitness, conforming cases, deviation hotspots
+            and the least fitting variants
+        """
+        workers = max(min(workers or os.cpu_count() or 1, len(variants)), 1)
+
+        if workers <= 1:
+            replays = _replay_chunk(self.footprint, variants)
+        else:
+            chunks = [variants[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunk_results = list(executor.map(_replay_chunk, [self.footprint] * workers, chunks))
+            # Undo the round-robin split so replays line up with the variants
+            replays = [None] * len(variants)
+            for i, results in enumerate(chunk_results):
+                replays[i::workers] = results
+
+        cases = sum(variant["count"] for variant in variants)
+        weighted_fitness = 0.0
+        conforming = 0
+        hotspots = Counter()
+        kinds = Counter()
+        for variant, (fitness, deviations) in zip(variants, replays):
+            count = variant["count"]
+            weighted_fitness += fitness * count
+            if not deviations:
+                conforming += count
+            for deviation in set(deviations):
+                hotspots[deviation] += count
+                kinds[deviation[0]] += count
+
+        worst = sorted(range(len(variants)), key=lambda i: (replays[i][0], -variants[i]["count"]))
+        return {
+            "model": self.model.name,
+            "cases": cases,
+            "variants": len(variants),
+            "fitness": round(weighted_fitness / cases, 4) if cases else 1.0,
+            "conforming_cases": conforming,
+            "conformance_rate": round(conforming / cases, 4) if cases else 1.0,
+            "deviation_kinds": dict(kinds.most_common()),
+            "hotspots": [{"kind": kind, "location": location, "cases": count,
+                          "share": round(count / cases, 4)}
+                         for (kind, location), count in hotspots.most_common(top)],
+            "least_fitting_variants": [dict(variants[i], fitness=round(replays[i][0], 4),
+                                            deviations=[f"{k}: {l}" for k, l in replays[i][1]])
+                                       for i in worst[:top] if replays[i][1]]
+        }
+
+
+def save_results(path: str, results: Dict[str, Any]) -> None:
+    """
+    Atomically write conformance results, so other processes can answer questions about them.
+
+    Args:
+        path: Results file
+        results: Results as returned by ConformanceChecker.check
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+    os.replace(tmp_path, path)
+
+
+def load_results(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the conformance results written by save_results.
+
+    Args:
+        path: Results file
+
+    Returns:
+        The results, or None if none were saved (or the file is unreadable)
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,227 @@
+"""
+Document Patch - JSON Patch and JSON Merge Patch for stored documents.
+"""
+
+import copy
+from typing import Dict, List, Any, Set, Tuple
+
+JSON_PATCH = "application/json-patch+json"
+MERGE_PATCH = "application/merge-patch+json"
+
+
+class PatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied."""
+
+
+class PatchConflict(PatchError):
+    """Raised when a JSON Patch "test" operation fails."""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """
+    Split a JSON Pointer (RFC 6901) into its reference tokens.
+
+    Args:
+        pointer: Pointer such as "/methodologies/0/name"
+
+    Returns:
+        List of unescaped tokens (empty for the whole document)
+
+    Raises:
+        PatchError: If the pointer does not start with "/"
+    """
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+class _Workspace:
+    """
+    Copy-on-write view of a document being patched.
+
+    The top-level object is copied once; a section is deep-copied the
+    first time an operation writes into it, so untouched sections are
+    shared with the original document.
+    """
+
+    def __init__(self, document: Dict[str, Any]):
+        self.document = dict(document)
+        self.copied = set()
+        self.touched = set()
+
+    def _section(self, section: str, write: bool) -> None:
+        """Make a private copy of a section before it is written."""
+        if write and section not in self.copied and section in self.document:
+            self.document[section] = copy.deepcopy(self.document[section])
+            self.copied.add(section)
+
+    def resolve(self, tokens: List[str], write: bool = False) -> Tuple[Any, str]:
+        """Return the container holding the target of a pointer and the target's key."""
+        if write:
+            self.touched.add(tokens[0])
+            if len(tokens) == 1:
+                # The member itself is replaced or removed; its old value is never written to
+                self.copied.add(tokens[0])
+            else:
+                self._section(tokens[0], write)
+
+        parent = self.document
+        for token in tokens[:-1]:
+            parent = _child(parent, token)
+        return parent, tokens[-1]
+
+    def get(self, tokens: List[str]) -> Any:
+        """Return the value a pointer refers to."""
+        if not tokens:
+            return self.document
+        parent, key = self.resolve(tokens)
+        return _child(parent, key)
+
+
+def _index(container: List[Any], token: str, allow_end: bool = False) -> int:
+    """Convert an array reference token to an index."""
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _child(container: Any, token: str) -> Any:
+    """Return the member or element of a container named by a reference token."""
+    if isinstance(container, dict):
+        if token not in container:
+            raise PatchError(f"Path not found: {token!r}")
+        return container[token]
+    if isinstance(container, list):
+        return container[_index(container, token)]
+    raise PatchError(f"Cannot index into a {type(container).__name__} with {token!r}")
+
+
+def _add(parent: Any, key: str, value: Any) -> None:
+    """Add a value to an object member or insert it into an array."""
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, key, allow_end=True), value)
+    else:
+        raise PatchError(f"Cannot add to a {type(parent).__name__}")
+
+
+def _remove(parent: Any, key: str) -> Any:
+    """Remove and return an object member or array element."""
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise PatchError(f"Path not found: {key!r}")
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, key))
+    raise PatchError(f"Cannot remove from a {type(parent).__name__}")
+
+
+def apply_json_patch(document: Dict[str, Any], operations: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Set[str]]:
+    """
+    Apply a JSON Patch (RFC 6902) without modifying the original document.
+
+    Args:
+        document: The stored document (a JSON object)
+        operations: List of add, remove, replace, move, copy and test operations
+
+    Returns:
+        Tuple of (patched document, names of the top-level sections written to)
+
+    Raises:
+        PatchConflict: If a test operation fails
+        PatchError: If the patch is malformed or refers to missing paths
+    """
+    if not isinstance(operations, list):
+        raise PatchError("A JSON Patch must be a list of operations")
+
+    workspace = _Workspace(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise PatchError(f"Invalid operation: {operation!r}")
+        op = operation["op"]
+        tokens = parse_pointer(operation["path"])
+        if not tokens and op != "test":
+            # Replacing the document as a whole is an upload, not a patch
+            raise PatchError("Operations must target a path inside the document")
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise PatchError(f"Operation {op!r} requires a value")
+
+        if op == "test":
+            if workspace.get(tokens) != operation["value"]:
+                raise PatchConflict(f"Test failed at {operation['path']}")
+        elif op == "add":
+            parent, key = workspace.resolve(tokens, write=True)
+            _add(parent, key, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            parent, key = workspace.resolve(tokens, write=True)
+            _remove(parent, key)
+        elif op == "replace":
+            parent, key = workspace.resolve(tokens, write=True)
+            _remove(parent, key)
+            _add(parent, key, copy.deepcopy(operation["value"]))
+        elif op in ("move", "copy"):
+            source = parse_pointer(operation.get("from", ""))
+            if not source:
+                raise PatchError(f"Operation {op!r} requires a 'from' path inside the document")
+            if op == "move":
+                if tokens[:len(source)] == source and len(tokens) > len(source):
+                    raise PatchError("Cannot move a value into itself")
+                parent, key = workspace.resolve(source, write=True)
+                value = _remove(parent, key)
+                if len(source) == 1:
+                    # Whole sections are still shared with the original document
+                    value = copy.deepcopy(value)
+            else:
+                value = copy.deepcopy(workspace.get(source))
+            parent, key = workspace.resolve(tokens, write=True)
+            _add(parent, key, value)
+        else:
+            raise PatchError(f"Unknown operation: {op!r}")
+
+    return workspace.document, workspace.touched
+
+
+def _merge(target: Any, patch: Any) -> Any:
+    """Merge a patch into a value, returning a new value (RFC 7396)."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = _merge(result.get(key), value)
+    return result
+
+
+def apply_merge_patch(document: Dict[str, Any], patch: Dict[str, Any]) -> Tuple[Dict[str, Any], Set[str]]:
+    """
+    Apply a JSON Merge Patch (RFC 7396) without modifying the original document.
+
+    Args:
+        document: The stored document (a JSON object)
+        patch: Object of section changes (null removes a member)
+
+    Returns:
+        Tuple of (patched document, names of the top-level sections written to)
+
+    Raises:
+        PatchError: If the patch is not a JSON object
+    """
+    if not isinstance(patch, dict):
+        raise PatchError("A merge patch for a document must be a JSON object")
+    return _merge(document, patch), set(patch)
+
+
+def changed_sections(before: Dict[str, Any], after: Dict[str, Any], touched: Set[str]) -> Set[str]:
+    """Return the touched top-level sections whose value actually changed."""
+    return {section for section in touched
+            if (section in before) != (section in after) or before.get(section) != after.get(section)}
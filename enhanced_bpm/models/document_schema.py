@@ -0,0 +1,273 @@
+"""
+Document Schema - Compiled validation of knowledge-base documents.
+"""
+
+import functools
+from typing import Dict, List, Any, Callable, NamedTuple, Optional, Tuple
+
+from .excel_ingest import coerce_list, group_metrics
+
+# Bumped whenever a schema or its normalization changes
+SCHEMA_VERSION = 1
+
+# Validation stops collecting errors after this many
+MAX_ERRORS = 20
+
+SCALAR_TYPES = (str, int, float, bool)
+
+
+def _text_list():
+    """List of text items; a single value is split into items."""
+    return {"type": "list", "items": {"type": "scalar"}, "coerce": True}
+
+
+def _item(identifier: str, texts=(), lists=(), **fields) -> Dict[str, Any]:
+    """Object with a required identifier, optional text fields and optional text lists."""
+    optional = {name: {"type": "scalar"} for name in texts}
+    optional.update({name: _text_list() for name in lists})
+    optional.update(fields)
+    return {"type": "object", "required": {identifier: {"type": "scalar"}}, "optional": optional}
+
+
+# Sections of a BPM principles document
+PRINCIPLE_SECTIONS = {
+    "core_principles": {"type": "list", "items": _item(
+        "name", texts=("description",), lists=("benefits", "implementation_strategies"))},
+    "methodologies": {"type": "list", "items": _item(
+        "name", texts=("description", "bpm_application"), lists=("key_concepts", "tools", "types_of_waste", "steps"))},
+    "frameworks": {"type": "list", "items": _item(
+        "name", texts=("description", "bpm_application"), lists=("components",))},
+    "maturity_models": {"type": "list", "items": _item(
+        "name", texts=("description", "bpm_application"),
+        levels={"type": "list", "items": {"type": "object", "optional": {
+            "level": {"type": "scalar"}, "name": {"type": "scalar"}, "description": {"type": "scalar"}}}},
+        dimensions={"type": "list", "items": _item("name", lists=("components",))})},
+    "performance_metrics": {"type": "list", "prepare": "nest_metrics", "items": {
+        "type": "object",
+        "required": {"category": {"type": "scalar"},
+                     "metrics": {"type": "list", "items": _item(
+                         "name", texts=("description", "calculation"), lists=("improvement_strategies",))}}}},
+    "implementation_best_practices": {"type": "list", "items": _item("phase", lists=("practices",))},
+    "common_challenges": {"type": "list", "items": _item(
+        "challenge", texts=("description",), lists=("mitigation_strategies",))},
+    "technology_enablers": {"type": "list", "items": _item(
+        "name", texts=("description",), lists=("capabilities", "examples"))}
+}
+
+# Sections of an industry document, as read by the BPM analyzer
+INDUSTRY_SECTIONS = {
+    "industry_name": {"type": "scalar"},
+    "industry_overview": {"type": "object", "required": {
+        "description": {"type": "scalar"},
+        "market_size": {"type": "any"},
+        "key_segments": {"type": "list"},
+        "industry_drivers": {"type": "list"},
+        "challenges": {"type": "list"}}},
+    "competitive_landscape": {"type": "map"},
+    "value_chain_analysis": {"type": "map", "values": {"type": "map"}},
+    "business_process_analysis": {"type": "map", "values": {"type": "map"}},
+    "porter_five_forces_analysis": {"type": "map", "values": {"type": "object", "required": {
+        "level": {"type": "scalar"}, "factors": {"type": "list"}, "process_implications": {"type": "list"}}}},
+    "balanced_scorecard_analysis": {"type": "map", "values": {"type": "object", "required": {
+        "key_objectives": {"type": "list"},
+        "key_metrics": {"type": "list", "items": {"type": "object", "required": {"metric": {"type": "scalar"}}}},
+        "process_maturity_assessment": {"type": "map"}}}},
+    "process_optimization_recommendations": {"type": "object", "required": {
+        "short_term_improvements": {"type": "list", "items": {"type": "map"}},
+        "medium_term_transformations": {"type": "list", "items": {"type": "map"}},
+        "long_term_strategic_innovations": {"type": "list", "items": {"type": "map"}}}}
+}
+
+# Document schemas; sections not named in a schema are accepted as they are
+SCHEMAS = {
+    "bpm_principles": {"type": "object", "optional": PRINCIPLE_SECTIONS},
+    "industry": {"type": "object", "required": INDUSTRY_SECTIONS, "optional": PRINCIPLE_SECTIONS}
+}
+
+
+class SchemaError(ValueError):
+    """Raised when a document does not match its schema."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+class DocumentLayout(NamedTuple):
+    """
+    Normalized layout of a validated document.
+
+    Attributes:
+        schema: Name of the schema the document was validated against
+        version: Schema version
+        sections: Top-level sections holding lists or objects, in document order
+    """
+    schema: str
+    version: int
+    sections: Tuple[str, ...]
+
+
+def _nest_metrics(items: List[Any]) -> List[Any]:
+    """Group flat metric rows (as converted from spreadsheets) under their categories."""
+    if items and all(isinstance(item, dict) and "metrics" not in item for item in items):
+        return group_metrics([dict(item) for item in items])
+    return items
+
+
+PREPARERS = {"nest_metrics": _nest_metrics}
+
+# Checked value: (value, JSON path, error list) -> normalized value
+Check = Callable[[Any, str, List[str]], Any]
+
+
+def _fail(errors: List[str], path: str, message: str) -> None:
+    """Record an error, up to MAX_ERRORS of them."""
+    if len(errors) < MAX_ERRORS:
+        errors.append(f"{path}: {message}")
+
+
+def compile_spec(spec: Dict[str, Any]) -> Check:
+    """
+    Compile a schema spec into a validating, normalizing function.
+
+    Specs are dictionaries with a "type" of "any", "scalar", "list"
+    (optional "items", "coerce" and "prepare"), "object" ("required" and
+    "optional" field specs; other fields are kept) or "map" (optional
+    "values" spec for every entry). The compiled function walks a value
+    once, records errors with their JSON path and returns the value with
+    lists coerced and prepared.
+
+    Args:
+        spec: Schema spec
+
+    Returns:
+        Function (value, path, errors) -> normalized value
+    """
+    kind = spec["type"]
+
+    if kind == "any":
+        return lambda value, path, errors: value
+
+    if kind == "scalar":
+        def check_scalar(value, path, errors):
+            if not isinstance(value, SCALAR_TYPES):
+                _fail(errors, path, "expected text or a number")
+            return value
+        return check_scalar
+
+    if kind == "list":
+        check_item = compile_spec(spec["items"]) if "items" in spec else None
+        coerce = spec.get("coerce", False)
+        prepare = PREPARERS[spec["prepare"]] if "prepare" in spec else None
+
+        def check_list(value, path, errors):
+            if not isinstance(value, list):
+                if coerce and (value is None or isinstance(value, SCALAR_TYPES)):
+                    value = coerce_list(value)
+                else:
+                    _fail(errors, path, "expected a list")
+                    return value
+            if prepare is not None:
+                value = prepare(value)
+            if check_item is not None:
+                for i, item in enumerate(value):
+                    normalized = check_item(item, f"{path}[{i}]", errors)
+                    if normalized is not item:
+                        value[i] = normalized
+            return value
+        return check_list
+
+    if kind == "map":
+        check_value = compile_spec(spec["values"]) if "values" in spec else None
+
+        def check_map(value, path, errors):
+            if not isinstance(value, dict):
+                _fail(errors, path, "expected an object")
+                return value
+            if check_value is not None:
+                for key, item in value.items():
+                    normalized = check_value(item, f"{path}.{key}", errors)
+                    if normalized is not item:
+                        value[key] = normalized
+            return value
+        return check_map
+
+    if kind == "object":
+        required = tuple((name, compile_spec(field)) for name, field in spec.get("required", {}).items())
+        optional = tuple((name, compile_spec(field)) for name, field in spec.get("optional", {}).items())
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                _fail(errors, path, "expected an object")
+                return value
+            for name, check in required:
+                item = value.get(name)
+                if item is None:
+                    _fail(errors, f"{path}.{name}", "is required")
+                    continue
+                normalized = check(item, f"{path}.{name}", errors)
+                if normalized is not item:
+                    value[name] = normalized
+            for name, check in optional:
+                # Missing and empty optional fields are accepted
+                item = value.get(name)
+                if item is None:
+                    continue
+                normalized = check(item, f"{path}.{name}", errors)
+                if normalized is not item:
+                    value[name] = normalized
+            return value
+        return check_object
+
+    raise ValueError(f"Unknown schema type: {kind}")
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(schema: str, version: int = SCHEMA_VERSION) -> Check:
+    """
+    Return the compiled validator of a schema, compiling it once per version.
+
+    Args:
+        schema: Schema name (a key of SCHEMAS)
+        version: Schema version the validator is cached under
+
+    Returns:
+        Compiled validator (see compile_spec)
+    """
+    return compile_spec(SCHEMAS[schema])
+
+
+def detect_schema(data: Dict[str, Any]) -> str:
+    """Pick the schema of a document: industry documents name their industry, anything else is principles-shaped."""
+    return "industry" if "industry_name" in data and "industry_overview" in data else "bpm_principles"
+
+
+def validate_document(data: Any, schema: Optional[str] = None) -> Tuple[Dict[str, Any], DocumentLayout]:
+    """
+    Validate and normalize a knowledge-base document in a single pass.
+
+    The document is normalized in place: text lists given as a single
+    value are split into lists, and flat performance metric rows are
+    nested under their categories.
+
+    Args:
+        data: Parsed JSON document
+        schema: Schema name, or None to detect it from the document
+
+    Returns:
+        Tuple of (normalized document, layout)
+
+    Raises:
+        SchemaError: If the document does not match the schema
+    """
+    if not isinstance(data, dict):
+        raise SchemaError(["$: expected a JSON object"])
+    schema = schema or detect_schema(data)
+
+    errors = []
+    data = get_validator(schema)(data, "$", errors)
+    if errors:
+        raise SchemaError(errors)
+
+    sections = tuple(section for section, value in data.items() if isinstance(value, (list, dict)))
+    return data, DocumentLayout(schema, SCHEMA_VERSION, sections)
@@ -0,0 +1,450 @@
+"""
+Excel Ingest - Streaming, schema-aware conversion of workbooks to BPM documents.
+"""
+
+import datetime
+import json
+import os
+import posixpath
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+from ..compat.lazy_import import lazy_module
+
+# Imported on first use to keep start-up fast
+xlrd = lazy_module("xlrd")
+
+# Sections of a BPM document, and other sheet names that map to them
+SECTION_ALIASES = {
+    "core_principles": ("principles", "bpm_principles"),
+    "methodologies": ("methods",),
+    "frameworks": (),
+    "maturity_models": ("maturity",),
+    "performance_metrics": ("metrics", "kpis"),
+    "implementation_best_practices": ("best_practices", "practices"),
+    "common_challenges": ("challenges",),
+    "technology_enablers": ("technologies", "technology", "enablers")
+}
+
+# Columns holding lists in the BPM schema, entered as one cell per item list
+LIST_COLUMNS = {
+    "benefits", "implementation_strategies", "key_concepts", "tools", "types_of_waste",
+    "components", "mitigation_strategies", "capabilities", "examples", "practices",
+    "improvement_strategies"
+}
+
+# List cells are split on new lines, semicolons and bullets
+LIST_SEPARATOR = re.compile(r"\s*(?:\r?\n|;|•)\s*")
+
+# Part of the conversion cache key, so workbooks converted by an older reader are converted again
+CONVERTER_VERSION = 2
+
+# Workbooks smaller than this are parsed in the current process
+PARALLEL_MIN_BYTES = 1024 * 1024
+
+# Built-in number formats that display dates or times
+DATE_FORMAT_IDS = set(range(14, 23)) | set(range(27, 37)) | {45, 46, 47} | set(range(50, 59))
+
+# Parts of a custom number format that are not date or time codes
+FORMAT_LITERALS = re.compile(r'"[^"]*"|\\.|\[(?![hms]+\])[^\]]*\]')
+
+
+def normalize_name(name: Any) -> str:
+    """Lowercase a sheet or column name and join its words with underscores."""
+    return re.sub(r"[^0-9a-z]+", "_", str(name).strip().lower()).strip("_")
+
+
+_SECTIONS = {alias: section for section, aliases in SECTION_ALIASES.items()
+             for alias in (section,) + aliases}
+
+
+def section_for_sheet(sheet_name: str) -> str:
+    """
+    Map a sheet name to the BPM section it holds.
+
+    Args:
+        sheet_name: Name of the worksheet
+
+    Returns:
+        The section name, or the sheet name itself if it is not a known section
+    """
+    return _SECTIONS.get(normalize_name(sheet_name), sheet_name)
+
+
+def coerce_list(value: Any) -> List[Any]:
+    """
+    Turn the content of a list-valued cell into a list.
+
+    Args:
+        value: Cell value (a JSON array, or items separated by new lines,
+            semicolons or bullets)
+
+    Returns:
+        List of items (empty for blank cells)
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    text = str(value).strip()
+    if text.startswith("["):
+        try:
+            items = json.loads(text)
+            if isinstance(items, list):
+                return items
+        except ValueError:
+            pass
+    return [item for item in LIST_SEPARATOR.split(text) if item]
+
+
+def _cell_value(value: Any) -> Any:
+    """Convert a cell value to a JSON-serializable value."""
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _header(row: Tuple[Any, ...]) -> List[str]:
+    """Build unique column names from a header row (named like pandas does)."""
+    names, seen = [], {}
+    for i, value in enumerate(row):
+        name = _cell_value(value)
+        name = f"Unnamed: {i}" if name is None else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _local(tag: str) -> str:
+    """Strip the namespace from an XML tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _column_index(ref: str) -> int:
+    """Convert the column letters of a cell reference (e.g. "C7") to a 0-based index."""
+    index = 0
+    for char in ref:
+        if char.isdigit():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+
+def _string_item(element) -> str:
+    """Text of a shared or inline string, joining rich text runs and leaving out phonetic hints."""
+    parts = []
+    for part in element:
+        tag = _local(part.tag)
+        if tag == "t":
+            parts.append(part.text or "")
+        elif tag == "r":
+            parts.extend(t.text or "" for t in part if _local(t.tag) == "t")
+    return "".join(parts)
+
+
+def is_date_format(code: str) -> bool:
+    """Check whether a custom number format code displays a date or time."""
+    return re.search(r"[dmyhs]", FORMAT_LITERALS.sub("", code.lower())) is not None
+
+
+class XlsxReader:
+    """
+    Minimal streaming reader of .xlsx worksheets.
+
+    Worksheet XML is parsed incrementally and each row is discarded once it
+    has been yielded, so memory use does not grow with the sheet. Cached
+    cell values are returned (formulas are not evaluated), like a
+    read-only, data-only openpyxl workbook, at a fraction of the parsing
+    cost.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Open a workbook and read its sheet list, shared strings and date styles.
+
+        Args:
+            file_path: Path of the .xlsx file
+
+        Raises:
+            zipfile.BadZipFile: If the file is not an .xlsx workbook
+            KeyError: If a required part of the workbook is missing
+        """
+        self._zip = zipfile.ZipFile(file_path)
+        self.sheets = {}
+        self.epoch = datetime.datetime(1899, 12, 30)
+
+        targets = {}
+        with self._zip.open("xl/_rels/workbook.xml.rels") as f:
+            for _, element in iterparse(f):
+                if _local(element.tag) == "Relationship":
+                    target = element.get("Target")
+                    targets[element.get("Id")] = target.lstrip("/") if target.startswith("/") \
+                        else posixpath.normpath(posixpath.join("xl", target))
+        with self._zip.open("xl/workbook.xml") as f:
+            for _, element in iterparse(f):
+                tag = _local(element.tag)
+                if tag == "sheet":
+                    rel_id = next(value for key, value in element.attrib.items() if _local(key) == "id")
+                    self.sheets[element.get("name")] = targets[rel_id]
+                elif tag == "workbookPr" and element.get("date1904") in ("1", "true"):
+                    self.epoch = datetime.datetime(1904, 1, 1)
+
+        self.shared_strings = []
+        if "xl/sharedStrings.xml" in self._zip.namelist():
+            with self._zip.open("xl/sharedStrings.xml") as f:
+                for _, element in iterparse(f):
+                    if _local(element.tag) == "si":
+                        self.shared_strings.append(_string_item(element))
+                        element.clear()
+
+        # Style indexes whose number format is a date
+        self.date_styles = set()
+        if "xl/styles.xml" in self._zip.namelist():
+            with self._zip.open("xl/styles.xml") as f:
+                custom_dates = set()
+                in_cell_xfs = False
+                style_index = 0
+                for event, element in iterparse(f, events=("start", "end")):
+                    tag = _local(element.tag)
+                    if event == "start":
+                        if tag == "cellXfs":
+                            in_cell_xfs = True
+                        continue
+                    if tag == "numFmt" and is_date_format(element.get("formatCode", "")):
+                        custom_dates.add(int(element.get("numFmtId")))
+                    elif tag == "cellXfs":
+                        in_cell_xfs = False
+                    elif tag == "xf" and in_cell_xfs:
+                        format_id = int(element.get("numFmtId", 0))
+                        if format_id in DATE_FORMAT_IDS or format_id in custom_dates:
+                            self.date_styles.add(style_index)
+                        style_index += 1
+
+    def close(self) -> None:
+        """Close the file."""
+        self._zip.close()
+
+    def _value(self, cell) -> Any:
+        """Convert a <c> element to a Python value."""
+        cell_type = cell.get("t", "n")
+        text = None
+        for child in cell:
+            tag = _local(child.tag)
+            if tag == "v":
+                text = child.text
+            elif tag == "is":
+                text = _string_item(child)
+        if text is None:
+            return None
+        if cell_type == "s":
+            return self.shared_strings[int(text)]
+        if cell_type in ("inlineStr", "str", "d"):
+            return text
+        if cell_type == "b":
+            return text == "1"
+        if cell_type == "e":
+            return None
+        number = float(text) if any(char in text for char in ".eE") else int(text)
+        if int(cell.get("s", 0)) in self.date_styles:
+            # Serial day numbers, rounded to the millisecond precision Excel keeps
+            return self.epoch + datetime.timedelta(milliseconds=round(number * 86400000))
+        return number
+
+    def rows(self, sheet_name: str):
+        """Yield the rows of a worksheet as tuples of cell values (empty cells are None)."""
+        with self._zip.open(self.sheets[sheet_name]) as f:
+            parent = None
+            for event, element in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if parent is None and _local(element.tag) == "sheetData":
+                        parent = element
+                    continue
+                if _local(element.tag) != "row":
+                    continue
+                values = []
+                for cell in element:
+                    ref = cell.get("r")
+                    if ref is not None:
+                        index = _column_index(ref)
+                        if index > len(values):
+                            values.extend([None] * (index - len(values)))
+                    values.append(self._value(cell))
+                yield tuple(values)
+                # Drop parsed rows so the tree does not grow with the sheet
+                parent.clear()
+
+
+class Workbook:
+    """
+    Read-only, streaming view of an .xlsx or .xls workbook.
+
+    Rows are read one at a time, so no sheet is held in memory as a whole.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Open a workbook.
+
+        Args:
+            file_path: Path of the .xlsx or .xls file
+        """
+        self.is_xls = os.path.splitext(file_path)[1].lower() == ".xls"
+        if self.is_xls:
+            self._book = xlrd.open_workbook(file_path, on_demand=True)
+        else:
+            self._book = XlsxReader(file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """Release the file."""
+        if self.is_xls:
+            self._book.release_resources()
+        else:
+            self._book.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """Names of the worksheets."""
+        return list(self._book.sheet_names() if self.is_xls else self._book.sheets)
+
+    def rows(self, sheet_name: str):
+        """Yield the rows of a worksheet as tuples of cell values."""
+        if not self.is_xls:
+            yield from self._book.rows(sheet_name)
+            return
+
+        sheet = self._book.sheet_by_name(sheet_name)
+        for i in range(sheet.nrows):
+            row = []
+            for cell in sheet.row(i):
+                if cell.ctype == xlrd.XL_CELL_DATE:
+                    row.append(xlrd.xldate.xldate_as_datetime(cell.value, self._book.datemode))
+                elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+                    row.append(None)
+                elif cell.ctype == xlrd.XL_CELL_NUMBER and cell.value.is_integer():
+                    row.append(int(cell.value))
+                else:
+                    row.append(cell.value)
+            yield tuple(row)
+        self._book.unload_sheet(sheet_name)
+
+
+def group_metrics(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Nest flat metric rows under their categories, as in the BPM schema.
+
+    Args:
+        records: Metric rows with a "category" column
+
+    Returns:
+        List of {"category", "metrics"} entries in order of first appearance
+    """
+    categories = {}
+    for record in records:
+        category = record.pop("category", None) or "Uncategorized"
+        categories.setdefault(category, []).append(record)
+    return [{"category": category, "metrics": metrics} for category, metrics in categories.items()]
+
+
+def parse_sheet(workbook: Workbook, sheet_name: str) -> Tuple[str, Optional[List[Dict[str, Any]]]]:
+    """
+    Parse one worksheet into records of its section.
+
+    The first non-empty row is the header. Rows are converted as they are
+    read; blank rows are skipped. In sheets that map to a BPM section,
+    columns are matched to the schema's field names and list-valued
+    columns are split into lists.
+
+    Args:
+        workbook: Open workbook
+        sheet_name: Name of the worksheet
+
+    Returns:
+        Tuple of (section name, records), with None for sheets without data
+    """
+    section = section_for_sheet(sheet_name)
+    known = section in SECTION_ALIASES
+
+    columns = None
+    list_columns = ()
+    records = []
+    for row in workbook.rows(sheet_name):
+        values = [_cell_value(value) for value in row]
+        if values.count(None) == len(values):
+            continue
+        if columns is None:
+            columns = _header(values)
+            if known:
+                columns = [normalize_name(column) for column in columns]
+                list_columns = [column for column in columns if column in LIST_COLUMNS]
+            continue
+
+        if len(values) < len(columns):
+            values.extend([None] * (len(columns) - len(values)))
+        record = dict(zip(columns, values))
+        for column in list_columns:
+            if column in record:
+                record[column] = coerce_list(record[column])
+        records.append(record)
+
+    if not records:
+        return section, None
+    if section == "performance_metrics" and "category" in columns:
+        records = group_metrics(records)
+    return section, records
+
+
+def read_sheet(file_path: str, sheet_name: str) -> Tuple[str, Optional[List[Dict[str, Any]]]]:
+    """Open a workbook and parse one of its worksheets (see parse_sheet)."""
+    with Workbook(file_path) as workbook:
+        return parse_sheet(workbook, sheet_name)
+
+
+def convert_workbook(file_path: str, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Convert a workbook to a BPM document with one section per worksheet.
+
+    Args:
+        file_path: Path of the .xlsx or .xls file
+        workers: Number of worker processes parsing sheets in parallel
+            (None picks one per sheet up to the CPU count for workbooks of
+            at least PARALLEL_MIN_BYTES; 1 parses in the current process)
+
+    Returns:
+        Dictionary of section name to records (sheets without data are
+        left out; sheets mapping to the same section are concatenated)
+    """
+    with Workbook(file_path) as workbook:
+        names = workbook.sheet_names
+        if workers is None:
+            workers = (os.cpu_count() or 1) if os.path.getsize(file_path) >= PARALLEL_MIN_BYTES else 1
+        workers = max(min(workers, len(names)), 1)
+        if workers <= 1:
+            sheets = [parse_sheet(workbook, name) for name in names]
+
+    if workers > 1:
+        # Each worker opens the workbook itself and streams only its sheet
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sheets = list(executor.map(read_sheet, [file_path] * len(names), names))
+
+    result = {}
+    for section, records in sheets:
+        if records is not None:
+            result.setdefault(section, []).extend(records)
+    return result
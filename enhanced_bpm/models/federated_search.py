@@ -0,0 +1,235 @@
+"""
+Federated Search - Ranked search across every uploaded and bundled document.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+from .workspace_store import CachedDocument, DocumentCache
+
+# Length of the substrings the shard postings are keyed by
+GRAM_SIZE = 3
+
+# Number of hits returned when no limit is given
+DEFAULT_LIMIT = 20
+
+# Shard hit: (score, tie-breaker, section, item or snippet)
+ShardHit = Tuple[float, int, str, Any]
+
+
+def grams(text: str) -> Iterable[str]:
+    """Return the distinct GRAM_SIZE-character substrings of a text."""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class DocumentShard:
+    """
+    Search shard of one document.
+
+    The shard reuses the serialized items of the document's search index
+    and adds a posting list per trigram, so a query only verifies the items
+    containing every trigram of the search term instead of scanning the
+    whole document.
+    """
+
+    __slots__ = ("name", "source", "document", "entries", "indexes", "postings")
+
+    def __init__(self, name: str, source: str, document: CachedDocument):
+        """
+        Build the shard.
+
+        Args:
+            name: File name shown with the shard's hits
+            source: Kind of file ("upload", "principles" or "industry")
+            document: The cached document
+        """
+        self.name = name
+        self.source = source
+        self.document = document
+        self.entries = [(section, item, text)
+                        for section, items in document.search_index.sections.items()
+                        for item, text in items]
+        # Position of each entry within its section
+        self.indexes = [index for items in document.search_index.sections.values() for index in range(len(items))]
+
+        postings = defaultdict(list)
+        for position, (_, _, text) in enumerate(self.entries):
+            for gram in grams(text):
+                postings[gram].append(position)
+        self.postings = dict(postings)
+
+    def candidates(self, term: str) -> Iterable[int]:
+        """Return the positions of the entries that may contain a term."""
+        if len(term) < GRAM_SIZE:
+            return range(len(self.entries))
+
+        # Intersect the shortest posting lists first
+        lists = sorted((self.postings.get(gram, ()) for gram in grams(term)), key=len)
+        matches = set(lists[0])
+        for positions in lists[1:]:
+            if not matches:
+                break
+            matches.intersection_update(positions)
+        return sorted(matches)
+
+    def search(self, term: str, sections: Optional[Iterable[str]], limit: int,
+               snippets: bool = False) -> List[ShardHit]:
+        """
+        Find the best matching items of the shard.
+
+        Items are scored by the square root of the term's occurrences per
+        character of the item (as in classic Lucene scoring), so long items
+        do not outrank short ones just by containing more text; equal
+        scores keep document order.
+
+        Args:
+            term: Lowercased search term
+            sections: Sections to search, or None for every section
+            limit: Maximum number of hits
+            snippets: Return each item with its highlighted snippet (see
+                SearchIndex.snippet), as an (item, snippet) pair
+
+        Returns:
+            Hits sorted best first
+        """
+        hits = []
+        for position in self.candidates(term):
+            section, item, text = self.entries[position]
+            if sections is not None and section not in sections:
+                continue
+            count = text.count(term)
+            if count:
+                hits.append((round(math.sqrt(count / len(text)), 6), -position, section, item))
+        hits = heapq.nlargest(limit, hits, key=lambda hit: hit[:2])
+        if snippets:
+            # Snippets are only cut for the hits that are returned
+            search_index = self.document.search_index
+            hits = [(score, tie, section, (item, search_index.snippet(section, self.indexes[-tie], term)))
+                    for score, tie, section, item in hits]
+        return hits
+
+
+class FederatedSearch:
+    """
+    Search across a changing set of documents, one shard per document.
+
+    Shards are built from the shared document cache and rebuilt only when
+    their file changes. A query searches the shards in parallel, each one
+    returning its own top hits, and the ranked shard results are merged
+    through a heap, so each hit names the file it came from.
+    """
+
+    def __init__(self, document_cache: DocumentCache,
+                 list_documents: Callable[[], Iterable[Tuple[str, str, str]]], workers: Optional[int] = None):
+        """
+        Initialize the search.
+
+        Args:
+            document_cache: Cache the documents are read through
+            list_documents: Function returning (name, source, path) for every
+                searchable document
+            workers: Number of threads searching shards (defaults to the CPU count)
+        """
+        self.document_cache = document_cache
+        self.list_documents = list_documents
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self._shards = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self.builds = 0
+
+    def shards(self) -> List[DocumentShard]:
+        """
+        Return the shards of the current documents, building changed ones.
+
+        Documents that cannot be read or do not match the schema are left out.
+
+        Returns:
+            Shards in listing order
+        """
+        shards = {}
+        for name, source, path in self.list_documents():
+            with self._lock:
+                shard = self._shards.get(path)
+            if shard is None or self.document_cache.revalidate(shard.document, path) is None:
+                try:
+                    document = self.document_cache.get(path)
+                except (OSError, ValueError):
+                    continue
+                if shard is None or shard.document is not document:
+                    shard = DocumentShard(name, source, document)
+                    self.builds += 1
+            shards[path] = shard
+
+        with self._lock:
+            # Shards of removed documents are dropped with the listing
+            self._shards = shards
+        return list(shards.values())
+
+    def search(self, search_term: str, query_type: str = 'all', limit: int = DEFAULT_LIMIT,
+               snippets: bool = False, with_items: bool = False) -> List[Dict[str, Any]]:
+        """
+        Find the best matching items across all documents.
+
+        Args:
+            search_term: Case-insensitive text to look for
+            query_type: Section to search, or 'all' for every section
+            limit: Maximum number of hits
+            snippets: Return the path, snippet and highlight spans of the
+                matching string instead of the whole item
+            with_items: Return the whole item along with the snippet
+
+        Returns:
+            Hits sorted best first, each with its file, source, section,
+            score and item (or path, snippet and highlights)
+        """
+        term = search_term.lower()
+        if not term or limit <= 0:
+            return []
+        sections = None if query_type == 'all' else {query_type}
+        shards = self.shards()
+
+        def search_shard(shard):
+            return shard.search(term, sections, limit, snippets)
+
+        if self.workers > 1 and len(shards) > 1:
+            results = list(self._pool().map(search_shard, shards))
+        else:
+            results = [search_shard(shard) for shard in shards]
+
+        # Each shard's hits are sorted, so a heap merge yields the global ranking
+        ranked = heapq.merge(
+            *[[(score, -order, position, section, item) for score, position, section, item in hits]
+              for order, hits in enumerate(results)],
+            key=lambda hit: hit[:3], reverse=True)
+
+        hits = []
+        for score, order, _, section, item in itertools.islice(ranked, limit):
+            hit = {"file": shards[-order].name, "source": shards[-order].source, "section": section, "score": score}
+            if snippets:
+                item, snippet = item
+                hit.update(snippet)
+            if not snippets or with_items:
+                hit["item"] = item
+            hits.append(hit)
+        return hits
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """Return the thread pool shards are searched in, creating it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="search")
+            return self._executor
+
+    def close(self) -> None:
+        """Stop the search threads."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
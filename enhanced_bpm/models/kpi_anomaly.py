@@ -0,0 +1,312 @@
+"""
+KPI Anomaly - Streaming anomaly and change-point detection for KPI observations.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
+
+from .kpi_store import KPIStore
+
+# Detectors reporting an anomaly
+EWMA = "ewma"
+ROBUST_Z = "robust_z"
+CHANGE_POINT = "change_point"
+
+# Scale factor turning the median absolute deviation into a standard deviation
+MAD_SCALE = 1.4826
+
+# Most recent observations of each stored metric replayed into a new monitor
+WARMUP_OBSERVATIONS = 10000
+
+
+class KPIDetector:
+    """
+    Anomaly detector for a single KPI, updated in constant time per observation.
+
+    Three detectors share one pass over the stream:
+
+    - EWMA: exponentially weighted mean and variance; flags observations
+      more than ``ewma_threshold`` standard deviations from the mean.
+    - Robust z-score: running median and median absolute deviation estimated
+      with frugal streaming updates after an exact warm-up; flags
+      observations more than ``robust_threshold`` robust deviations away.
+    - Change point: two-sided CUSUM of the standardized EWMA residuals;
+      flags a sustained shift of the level and restarts the baseline.
+
+    Residuals are clipped at the EWMA threshold before they update the
+    baselines and the CUSUM, so a single spike is reported as an outlier
+    without dragging the baseline or posing as a change point.
+    """
+
+    __slots__ = ("alpha", "ewma_threshold", "robust_threshold", "cusum_drift", "cusum_threshold",
+                 "warmup", "count", "mean", "variance", "median", "mad", "cusum_high", "cusum_low",
+                 "_warmup_values")
+
+    def __init__(self, alpha: float = 0.1, ewma_threshold: float = 3.0, robust_threshold: float = 3.5,
+                 cusum_drift: float = 0.5, cusum_threshold: float = 5.0, warmup: int = 20):
+        """
+        Initialize the detector.
+
+        Args:
+            alpha: Smoothing factor of the EWMA
+            ewma_threshold: EWMA alarm threshold in standard deviations
+            robust_threshold: Robust z-score alarm threshold
+            cusum_drift: Allowed drift per observation of the CUSUM, in standard deviations
+            cusum_threshold: CUSUM alarm threshold, in standard deviations
+            warmup: Observations used to initialize the baselines before alarms are raised
+        """
+        self.alpha = alpha
+        self.ewma_threshold = ewma_threshold
+        self.robust_threshold = robust_threshold
+        self.cusum_drift = cusum_drift
+        self.cusum_threshold = cusum_threshold
+        self.warmup = max(int(warmup), 2)
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+        self.median = 0.0
+        self.mad = 0.0
+        self.cusum_high = 0.0
+        self.cusum_low = 0.0
+        self._warmup_values: Optional[List[float]] = []
+
+    def _finish_warmup(self) -> None:
+        """Initialize the baselines exactly from the warm-up observations."""
+        values = sorted(self._warmup_values)
+        n = len(values)
+        self.mean = sum(values) / n
+        self.variance = sum((v - self.mean) ** 2 for v in values) / (n - 1)
+        self.median = (values[(n - 1) // 2] + values[n // 2]) / 2
+        deviations = sorted(abs(v - self.median) for v in values)
+        self.mad = (deviations[(n - 1) // 2] + deviations[n // 2]) / 2
+        self._warmup_values = None
+
+    def update(self, value: float) -> List[Dict[str, float]]:
+        """
+        Add an observation.
+
+        Args:
+            value: Observed KPI value
+
+        Returns:
+            List of detections (empty if the observation is normal)
+        """
+        self.count += 1
+        if self._warmup_values is not None:
+            self._warmup_values.append(value)
+            if len(self._warmup_values) == self.warmup:
+                self._finish_warmup()
+            return []
+
+        detections = []
+
+        # EWMA score against the baseline before this observation
+        std = math.sqrt(self.variance)
+        residual = value - self.mean
+        z = residual / std if std > 0 else 0.0
+        if abs(z) > self.ewma_threshold:
+            detections.append({"detector": EWMA, "score": z, "expected": self.mean})
+
+        # Robust z-score against the running median and MAD
+        robust_scale = MAD_SCALE * self.mad
+        robust_z = (value - self.median) / robust_scale if robust_scale > 0 else 0.0
+        if abs(robust_z) > self.robust_threshold:
+            detections.append({"detector": ROBUST_Z, "score": robust_z, "expected": self.median})
+
+        # CUSUM of the clipped standardized residuals
+        clipped_z = max(-self.ewma_threshold, min(self.ewma_threshold, z))
+        self.cusum_high = max(0.0, self.cusum_high + clipped_z - self.cusum_drift)
+        self.cusum_low = max(0.0, self.cusum_low - clipped_z - self.cusum_drift)
+        if self.cusum_high > self.cusum_threshold or self.cusum_low > self.cusum_threshold:
+            direction = 1.0 if self.cusum_high > self.cusum_low else -1.0
+            detections.append({"detector": CHANGE_POINT, "score": direction * max(self.cusum_high, self.cusum_low),
+                               "expected": self.mean})
+            # Restart the baselines at the new level
+            self.mean = value
+            self.median = value
+            self.cusum_high = self.cusum_low = 0.0
+            return detections
+
+        # Update the baselines (outliers move the robust estimates by one step only)
+        if clipped_z != z:
+            residual = clipped_z * std
+        increment = self.alpha * residual
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + residual * increment)
+
+        step = max(self.mad, 1e-12) * self.alpha
+        if value > self.median:
+            self.median += step
+        elif value < self.median:
+            self.median -= step
+        if abs(value - self.median) > self.mad:
+            self.mad += step
+        else:
+            self.mad = max(self.mad - step, 0.0)
+
+        return detections
+
+    def state(self) -> Dict[str, float]:
+        """Return the current baselines of the detector."""
+        return {"observations": self.count, "mean": self.mean, "std": math.sqrt(self.variance),
+                "median": self.median, "mad": self.mad, "warming_up": self._warmup_values is not None}
+
+
+class AnomalyMonitor:
+    """
+    Streaming anomaly detection across KPIs with alert callbacks.
+
+    Keeps one detector per metric and the most recent anomalies per metric,
+    and calls every registered alert handler with each new anomaly. A
+    monitor reading a KPI store (see catch_up) keeps a high-water mark per
+    metric, so it also sees the observations other processes append.
+    """
+
+    def __init__(self, catalog: Optional[Dict[str, Dict[str, str]]] = None,
+                 history: int = 100, detector_options: Optional[Dict[str, float]] = None):
+        """
+        Initialize the monitor.
+
+        Args:
+            catalog: KPI catalog (see kpi_catalog) used to label anomalies
+            history: Number of recent anomalies kept per metric
+            detector_options: Keyword arguments for every KPIDetector
+        """
+        self.catalog = catalog or {}
+        self.history = history
+        self.detector_options = detector_options or {}
+        self.detectors: Dict[str, KPIDetector] = {}
+        self.anomalies: Dict[str, deque] = {}
+        self.handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        # Per stored metric: (last timestamp read, number of observations read at that timestamp)
+        self._marks: Dict[str, Tuple[float, int]] = {}
+        self._store_lock = threading.Lock()
+
+    def add_handler(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a function called with every new anomaly."""
+        self.handlers.append(handler)
+
+    def observe_many(self, metric: str, timestamps: Sequence[float], values: Sequence[float],
+                     alert: bool = True) -> List[Dict[str, Any]]:
+        """
+        Feed observations of one metric to its detector.
+
+        Args:
+            metric: Metric key
+            timestamps: Observation times
+            values: Observed values
+            alert: Whether to call the alert handlers (disable when replaying history)
+
+        Returns:
+            List of anomalies found in the observations
+        """
+        found = []
+        info = self.catalog.get(metric, {})
+        with self._lock:
+            detector = self.detectors.get(metric)
+            if detector is None:
+                detector = self.detectors[metric] = KPIDetector(**self.detector_options)
+                self.anomalies[metric] = deque(maxlen=self.history)
+            recent = self.anomalies[metric]
+            update = detector.update
+
+            for timestamp, value in zip(timestamps, values):
+                detections = update(float(value))
+                if detections:
+                    anomaly = {
+                        "metric": metric,
+                        "name": info.get("name", metric),
+                        "category": info.get("category"),
+                        "timestamp": float(timestamp),
+                        "value": float(value),
+                        "detections": detections
+                    }
+                    recent.append(anomaly)
+                    found.append(anomaly)
+
+        if alert:
+            for anomaly in found:
+                for handler in self.handlers:
+                    handler(anomaly)
+        return found
+
+    def observe(self, metric: str, timestamp: float, value: float) -> List[Dict[str, Any]]:
+        """Feed a single observation of a metric (see observe_many)."""
+        return self.observe_many(metric, [timestamp], [value])
+
+    def catch_up(self, store: KPIStore, keys: Optional[Sequence[str]] = None, warmup: Optional[int] = None,
+                 alert: bool = False) -> List[Dict[str, Any]]:
+        """
+        Feed the observations a KPI store received since the monitor last read it.
+
+        Args:
+            store: KPI store
+            keys: Metrics to read (every registered metric by default)
+            warmup: Most recent observations replayed of a metric read for
+                the first time (all of them by default)
+            alert: Whether to call the alert handlers (observations appended
+                by other processes were already reported there)
+
+        Returns:
+            List of anomalies found in the new observations
+        """
+        found = []
+        with self._store_lock:
+            for key in (store.metric_keys() if keys is None else keys):
+                mark = self._marks.get(key)
+                timestamps, values = store.query(key, start=mark[0] if mark else None)
+                self.catalog.setdefault(key, store.metrics[key])
+                if not len(timestamps):
+                    continue
+                last = float(timestamps[-1])
+                seen_at_last = int((timestamps == last).sum())
+                if mark is not None:
+                    # Observations are appended in time order, so the ones read before come first
+                    timestamps, values = timestamps[mark[1]:], values[mark[1]:]
+                elif warmup is not None:
+                    timestamps, values = timestamps[-warmup:], values[-warmup:]
+                self._marks[key] = (last, seen_at_last)
+                found.extend(self.observe_many(key, timestamps, values, alert=alert))
+        return found
+
+    def current_anomalies(self, since: Optional[float] = None, category: Optional[str] = None,
+                          limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        List recent anomalies, newest first.
+
+        Args:
+            since: Only return anomalies at or after this time
+            category: Only return anomalies of metrics in this category
+            limit: Maximum number of anomalies to return
+
+        Returns:
+            List of anomalies
+        """
+        with self._lock:
+            anomalies = [a for recent in self.anomalies.values() for a in recent
+                         if (since is None or a["timestamp"] >= since)
+                         and (category is None or a["category"] == category)]
+        anomalies.sort(key=lambda a: -a["timestamp"])
+        return anomalies[:limit]
+
+
+def monitor_store(store: KPIStore, catalog: Optional[Dict[str, Dict[str, str]]] = None,
+                  warmup: int = WARMUP_OBSERVATIONS) -> AnomalyMonitor:
+    """
+    Create a monitor primed with the recent history of every metric in a KPI store.
+
+    Args:
+        store: KPI store
+        catalog: KPI catalog (see kpi_catalog); metrics registered in the
+            store but missing from it are labeled from the store
+        warmup: Most recent observations of each metric replayed (without alerts)
+
+    Returns:
+        The monitor (call its catch_up before reporting, to read later observations)
+    """
+    monitor = AnomalyMonitor(dict(catalog or {}))
+    monitor.catch_up(store, warmup=warmup)
+    return monitor
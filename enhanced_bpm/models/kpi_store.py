@@ -0,0 +1,468 @@
+"""
+KPI Store - Append-only columnar time-series storage for process KPIs.
+"""
+
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Without file locks the store is safe for a single process only
+    fcntl = None
+
+from ..compat.lazy_import import lazy_module
+
+# Imported on first use to keep start-up fast
+np = lazy_module("numpy")
+
+# Observations per sealed chunk file
+CHUNK_SIZE = 65536
+
+METRICS_FILE = "metrics.json"
+TAIL = "tail"
+LOCK_FILE = ".lock"
+
+AGGREGATES = ("mean", "sum", "count", "min", "max", "first", "last")
+ROLLING_AGGREGATES = ("mean", "sum", "count", "std")
+
+
+def metric_key(name: str) -> str:
+    """Turn a metric name into the key used to store it."""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def kpi_catalog(bpm_principles: Dict[str, Any],
+                balanced_scorecard: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, str]]:
+    """
+    List the KPIs defined by the BPM principles and a balanced scorecard.
+
+    Args:
+        bpm_principles: BPM principles data with ``performance_metrics``
+        balanced_scorecard: The balanced_scorecard_analysis section of an industry
+
+    Returns:
+        Dictionary of metric key to name, source and category
+    """
+    catalog = {}
+    for category in bpm_principles.get("performance_metrics", []):
+        for metric in category.get("metrics", []):
+            catalog[metric_key(metric["name"])] = {
+                "name": metric["name"],
+                "source": "performance_metrics",
+                "category": category["category"]
+            }
+    for perspective, details in (balanced_scorecard or {}).items():
+        for metric in details.get("key_metrics", []):
+            catalog[metric_key(metric["metric"])] = {
+                "name": metric["metric"],
+                "source": "balanced_scorecard",
+                "category": perspective
+            }
+    return catalog
+
+
+class KPIStore:
+    """
+    Append-only time-series store with one column pair per metric.
+
+    Each metric is stored as timestamp and value arrays split into fixed-size
+    chunks. Full chunks are sealed as .npy files that are never rewritten and
+    are read back memory-mapped; the open chunk is kept in memory and written
+    by every append. A small index of the first and last timestamp of every
+    chunk lets range queries skip chunks, and because observations are
+    appended in time order, the range within a chunk is found by binary search.
+
+    Several processes (such as web server workers) may share a store: each
+    metric directory has a lock file, held while appending, and a process
+    reloads a metric whenever another one changed it since it last did.
+    """
+
+    def __init__(self, root_dir: str, chunk_size: int = CHUNK_SIZE):
+        """
+        Open (and if needed create) a store.
+
+        Args:
+            root_dir: Directory holding the store
+            chunk_size: Observations per sealed chunk
+        """
+        self.root_dir = root_dir
+        self.chunk_size = chunk_size
+        self._lock = threading.RLock()
+        self._chunks: Dict[str, List[Tuple[float, float, str]]] = {}
+        self._tails: Dict[str, List[Any]] = {}
+        self._mmaps: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._versions: Dict[str, Optional[Tuple[int, int]]] = {}
+        os.makedirs(root_dir, exist_ok=True)
+
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+        self._load_metrics()
+
+    def _metric_dir(self, key: str) -> str:
+        """Return the directory of a metric."""
+        return os.path.join(self.root_dir, key)
+
+    @contextmanager
+    def _file_lock(self, directory: str, exclusive: bool = True) -> Iterator[None]:
+        """Hold the lock file of a directory, shared by every process using the store."""
+        fd = os.open(os.path.join(directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            # Closing the file releases the lock
+            os.close(fd)
+
+    def _load_metrics(self) -> None:
+        """Read the metric registry, opening the metrics registered since it was last read."""
+        metrics_path = os.path.join(self.root_dir, METRICS_FILE)
+        if os.path.exists(metrics_path):
+            with open(metrics_path, "r", encoding="utf-8") as f:
+                self.metrics.update(json.load(f))
+        for key in self.metrics:
+            if key not in self._tails:
+                self._open_metric(key)
+
+    def metric_keys(self) -> List[str]:
+        """Return the keys of every registered metric, including those registered by other processes."""
+        with self._lock:
+            self._load_metrics()
+            return list(self.metrics)
+
+    def has_metric(self, key: str) -> bool:
+        """Check whether a metric is registered (by this or another process)."""
+        with self._lock:
+            if key not in self.metrics:
+                self._load_metrics()
+            return key in self.metrics
+
+    def _tail_version(self, key: str) -> Optional[Tuple[int, int]]:
+        """Identify the stored open chunk of a metric (it is replaced, never rewritten, on every change)."""
+        try:
+            stat = os.stat(os.path.join(self._metric_dir(key), f"{TAIL}.ts.npy"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _sync(self, key: str) -> None:
+        """Reload a metric if another process changed it (with its lock held)."""
+        if self._tail_version(key) != self._versions.get(key):
+            self._open_metric(key)
+
+    def _open_metric(self, key: str) -> None:
+        """Load the chunk index and open chunk of a metric."""
+        directory = self._metric_dir(key)
+        os.makedirs(directory, exist_ok=True)
+        self._versions[key] = self._tail_version(key)
+
+        # Chunks are never rewritten, so the known ones are kept
+        known = {prefix: (first, last, prefix) for first, last, prefix in self._chunks.get(key, ())}
+        chunks = []
+        for name in sorted(f for f in os.listdir(directory) if f.endswith(".ts.npy") and not f.startswith(TAIL)):
+            prefix = os.path.join(directory, name[:-len(".ts.npy")])
+            if prefix not in known:
+                timestamps = np.load(f"{prefix}.ts.npy", mmap_mode="r")
+                known[prefix] = (float(timestamps[0]), float(timestamps[-1]), prefix)
+            chunks.append(known[prefix])
+        self._chunks[key] = chunks
+
+        timestamps = np.empty(self.chunk_size, dtype=np.float64)
+        values = np.empty(self.chunk_size, dtype=np.float64)
+        size = 0
+        tail_prefix = os.path.join(directory, TAIL)
+        if os.path.exists(f"{tail_prefix}.ts.npy"):
+            stored_timestamps = np.load(f"{tail_prefix}.ts.npy")
+            size = len(stored_timestamps)
+            timestamps[:size] = stored_timestamps
+            values[:size] = np.load(f"{tail_prefix}.values.npy")
+        self._tails[key] = [timestamps, values, size]
+
+    def register_metric(self, key: str, name: Optional[str] = None, category: Optional[str] = None,
+                        unit: Optional[str] = None) -> None:
+        """
+        Register a metric (appending to an unknown metric registers it too).
+
+        Args:
+            key: Metric key (lower case letters, digits and underscores)
+            name: Display name
+            category: Performance metrics category or scorecard perspective
+            unit: Unit of the values
+        """
+        if not re.fullmatch(r"[a-z0-9_]+", key):
+            raise ValueError(f"Invalid metric key '{key}'")
+
+        with self._lock:
+            if key in self.metrics:
+                return
+            with self._file_lock(self.root_dir):
+                # Metrics registered by other processes are kept
+                self._load_metrics()
+                if key in self.metrics:
+                    return
+                self.metrics[key] = {"name": name or key.replace("_", " ").title(),
+                                     "category": category, "unit": unit}
+                self._open_metric(key)
+                self._write_metrics()
+
+    def _write_metrics(self) -> None:
+        """Persist the metric registry (with the registry lock held)."""
+        path = os.path.join(self.root_dir, METRICS_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.metrics, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def last_timestamp(self, key: str) -> Optional[float]:
+        """Return the time of the latest observation of a metric."""
+        with self._lock, self._file_lock(self._metric_dir(key), exclusive=False):
+            self._sync(key)
+            return self._last_timestamp(key)
+
+    def _last_timestamp(self, key: str) -> Optional[float]:
+        """Return the time of the latest observation of a metric, as last loaded."""
+        timestamps, _, size = self._tails[key]
+        if size:
+            return float(timestamps[size - 1])
+        return self._chunks[key][-1][1] if self._chunks[key] else None
+
+    def append(self, key: str, timestamps: Sequence[float], values: Sequence[float]) -> int:
+        """
+        Append observations to a metric.
+
+        Args:
+            key: Metric key
+            timestamps: Observation times as UNIX timestamps, in ascending order
+            values: Observed values
+
+        Returns:
+            Number of observations appended
+
+        Raises:
+            ValueError: If the observations are not in time order or malformed
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if timestamps.ndim != 1 or timestamps.shape != values.shape:
+            raise ValueError("timestamps and values must be one-dimensional and of equal length")
+        if len(timestamps) == 0:
+            return 0
+        if np.any(np.diff(timestamps) < 0):
+            raise ValueError("Observations must be in ascending time order")
+
+        if key not in self.metrics:
+            self.register_metric(key)
+
+        with self._lock, self._file_lock(self._metric_dir(key)):
+            # Observations other processes appended are loaded first, so chunks are numbered after theirs
+            self._sync(key)
+            last = self._last_timestamp(key)
+            if last is not None and timestamps[0] < last:
+                raise ValueError(f"Observations for '{key}' must not predate {last}")
+
+            tail = self._tails[key]
+            position = 0
+            while position < len(timestamps):
+                take = min(self.chunk_size - tail[2], len(timestamps) - position)
+                tail[0][tail[2]:tail[2] + take] = timestamps[position:position + take]
+                tail[1][tail[2]:tail[2] + take] = values[position:position + take]
+                tail[2] += take
+                position += take
+                if tail[2] == self.chunk_size:
+                    self._seal(key)
+            if tail[2]:
+                self._write_tail(key)
+
+        return len(timestamps)
+
+    def _seal(self, key: str) -> None:
+        """Write the full open chunk of a metric as an immutable chunk file."""
+        timestamps, values, size = self._tails[key]
+        prefix = os.path.join(self._metric_dir(key), f"{len(self._chunks[key]):08d}")
+        np.save(f"{prefix}.values.npy", values[:size])
+        np.save(f"{prefix}.ts.npy", timestamps[:size])
+        self._chunks[key].append((float(timestamps[0]), float(timestamps[size - 1]), prefix))
+        self._tails[key][2] = 0
+        self._write_tail(key)
+
+    def _write_tail(self, key: str) -> None:
+        """Persist the open chunk of a metric."""
+        timestamps, values, size = self._tails[key]
+        prefix = os.path.join(self._metric_dir(key), TAIL)
+        # The timestamps are replaced last, as their file identifies the version (see _sync)
+        for suffix, column in (("values", values), ("ts", timestamps)):
+            tmp_path = f"{prefix}.tmp.{suffix}.npy"
+            np.save(tmp_path, column[:size])
+            os.replace(tmp_path, f"{prefix}.{suffix}.npy")
+        self._versions[key] = self._tail_version(key)
+
+    def flush(self) -> None:
+        """
+        Persist the open chunks of all metrics.
+
+        Appends are written before they return, so that other processes
+        sharing the store see them; there is nothing left to write.
+        """
+
+    def _chunk_arrays(self, prefix: str) -> "Tuple[np.ndarray, np.ndarray]":
+        """Memory-map a sealed chunk."""
+        arrays = self._mmaps.get(prefix)
+        if arrays is None:
+            arrays = (np.load(f"{prefix}.ts.npy", mmap_mode="r"), np.load(f"{prefix}.values.npy", mmap_mode="r"))
+            self._mmaps[prefix] = arrays
+        return arrays
+
+    def query(self, key: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> "Tuple[np.ndarray, np.ndarray]":
+        """
+        Read the observations of a metric in a time range.
+
+        Args:
+            key: Metric key
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+
+        Returns:
+            Tuple of (timestamps, values) arrays
+
+        Raises:
+            KeyError: If the metric is unknown
+        """
+        if not self.has_metric(key):
+            raise KeyError(f"Unknown metric '{key}'")
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+
+        with self._lock, self._file_lock(self._metric_dir(key), exclusive=False):
+            self._sync(key)
+            pieces = [self._chunk_arrays(prefix) for first, last, prefix in self._chunks[key]
+                      if last >= start and first <= end]
+            tail_timestamps, tail_values, size = self._tails[key]
+            if size:
+                pieces.append((tail_timestamps[:size].copy(), tail_values[:size].copy()))
+
+        selected_timestamps, selected_values = [], []
+        for timestamps, values in pieces:
+            low = np.searchsorted(timestamps, start, side="left")
+            high = np.searchsorted(timestamps, end, side="right")
+            selected_timestamps.append(timestamps[low:high])
+            selected_values.append(values[low:high])
+
+        if not selected_timestamps:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(selected_timestamps), np.concatenate(selected_values)
+
+    def latest(self, key: str) -> Optional[Dict[str, float]]:
+        """Return the latest observation of a metric."""
+        if not self.has_metric(key):
+            return None
+        with self._lock:
+            last = self.last_timestamp(key)
+        if last is None:
+            return None
+        _, values = self.query(key, start=last)
+        return {"timestamp": last, "value": float(values[-1])}
+
+    def downsample(self, key: str, interval: float, aggregate: str = "mean",
+                   start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, List[float]]:
+        """
+        Aggregate the observations of a metric into fixed time buckets.
+
+        Buckets are aligned to multiples of the interval since the UNIX epoch
+        and empty buckets are omitted.
+
+        Args:
+            key: Metric key
+            interval: Bucket width in seconds
+            aggregate: One of mean, sum, count, min, max, first or last
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+
+        Returns:
+            Dictionary with bucket start times, aggregated values and counts
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate '{aggregate}'")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+
+        timestamps, values = self.query(key, start, end)
+        if len(timestamps) == 0:
+            return {"timestamps": [], "values": [], "counts": []}
+
+        buckets = np.floor_divide(timestamps, interval)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        counts = np.diff(np.append(starts, len(values)))
+
+        if aggregate == "mean":
+            result = np.add.reduceat(values, starts) / counts
+        elif aggregate == "sum":
+            result = np.add.reduceat(values, starts)
+        elif aggregate == "count":
+            result = counts.astype(np.float64)
+        elif aggregate == "min":
+            result = np.minimum.reduceat(values, starts)
+        elif aggregate == "max":
+            result = np.maximum.reduceat(values, starts)
+        elif aggregate == "first":
+            result = values[starts]
+        else:
+            result = values[np.append(starts[1:], len(values)) - 1]
+
+        return {
+            "timestamps": (buckets[starts] * interval).tolist(),
+            "values": result.tolist(),
+            "counts": counts.tolist()
+        }
+
+    def rolling(self, key: str, window: float, aggregate: str = "mean",
+                start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, List[float]]:
+        """
+        Compute a trailing time-window aggregate at every observation.
+
+        The window of an observation covers the observations in
+        (timestamp - window, timestamp]. Windows are evaluated with cumulative
+        sums, so the cost is linear in the number of observations.
+
+        Args:
+            key: Metric key
+            window: Window length in seconds
+            aggregate: One of mean, sum, count or std
+            start: Earliest timestamp to report
+            end: Latest timestamp to report
+
+        Returns:
+            Dictionary with the observation times and the window aggregates
+        """
+        if aggregate not in ROLLING_AGGREGATES:
+            raise ValueError(f"Unsupported rolling aggregate '{aggregate}'")
+        if window <= 0:
+            raise ValueError("window must be positive")
+
+        # Read enough history for the first window to be complete
+        timestamps, values = self.query(key, None if start is None else start - window, end)
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+
+        sums = np.concatenate(([0.0], np.cumsum(values)))
+        squares = np.concatenate(([0.0], np.cumsum(values * values)))
+        right = np.arange(first, len(timestamps)) + 1
+        left = np.searchsorted(timestamps, timestamps[first:] - window, side="right")
+        counts = right - left
+        window_sums = sums[right] - sums[left]
+
+        if aggregate == "mean":
+            result = window_sums / counts
+        elif aggregate == "sum":
+            result = window_sums
+        elif aggregate == "count":
+            result = counts.astype(np.float64)
+        else:
+            means = window_sums / counts
+            variance = (squares[right] - squares[left] - counts * means * means) / np.maximum(counts - 1, 1)
+            result = np.sqrt(np.maximum(variance, 0.0))
+
+        return {"timestamps": timestamps[first:].tolist(), "values": result.tolist()}
@@ -0,0 +1,338 @@
+"""
+Maturity Scoring - Server-side scoring engine for BPM maturity assessments.
+"""
+
+import re
+from typing import Dict, List, Any, Optional, Sequence
+
+from ..compat.lazy_import import lazy_module
+
+# Imported on first use to keep start-up fast
+np = lazy_module("numpy")
+
+# Percentiles reported in batch benchmarks
+BENCHMARK_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Display settings cycled over the assessment dimensions
+DIMENSION_COLORS = ["primary", "success", "info", "warning", "danger"]
+DIMENSION_ICONS = ["diagram-3", "people", "person-badge", "hdd-network", "speedometer2",
+                   "flag", "lightbulb", "mortarboard", "bank"]
+
+
+def _slugify(text: str) -> str:
+    """Turn a display name into an identifier."""
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+class MaturityScoringEngine:
+    """
+    Scores maturity assessment submissions against the maturity models
+    defined in the BPM principles data.
+
+    Questions are taken from the components of a dimensional maturity model
+    (such as PEMM) and answered on the scale of a staged maturity model
+    (such as CMMI). Submissions are scored in batches as a single matrix.
+    """
+
+    def __init__(self, bpm_principles: Dict[str, Any],
+                 dimension_model: Optional[str] = None,
+                 level_model: Optional[str] = None,
+                 weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize the scoring engine.
+
+        Args:
+            bpm_principles: Parsed BPM principles data
+            dimension_model: Name of the maturity model providing dimensions
+                (defaults to the first model that has dimensions)
+            level_model: Name of the maturity model providing the level scale
+                (defaults to the first model with named levels)
+            weights: Optional weight per dimension id; by default every
+                answered question counts equally, as in the browser scoring
+        """
+        models = bpm_principles.get("maturity_models", [])
+
+        dim_source = self._find_model(models, dimension_model,
+                                      lambda m: "dimensions" in m)
+        level_source = self._find_model(models, level_model,
+                                        lambda m: m.get("levels") and "name" in m["levels"][0])
+        if dim_source is None or level_source is None:
+            raise ValueError("BPM principles data has no usable maturity models")
+
+        self.dimension_model_name = dim_source["name"]
+        self.level_model_name = level_source["name"]
+        self.levels = sorted(level_source["levels"], key=lambda level: level["level"])
+        self.min_score = self.levels[0]["level"]
+        self.max_score = self.levels[-1]["level"]
+
+        # Flatten the dimension components into question columns
+        self.dimensions = []
+        self.columns = {}
+        column_dims = []
+        for dim_index, dimension in enumerate(dim_source["dimensions"]):
+            dim_id = _slugify(dimension["name"])
+            questions = []
+            for component in dimension["components"]:
+                title, _, detail = component.partition(":")
+                question_id = _slugify(title)
+                self.columns[(dim_id, question_id)] = len(column_dims)
+                column_dims.append(dim_index)
+                questions.append({"id": question_id, "name": title.strip(),
+                                  "detail": detail.strip()})
+            self.dimensions.append({"id": dim_id, "name": dimension["name"],
+                                    "questions": questions})
+
+        # Membership matrix mapping question columns onto dimensions
+        self.membership = np.zeros((len(column_dims), len(self.dimensions)))
+        self.membership[np.arange(len(column_dims)), column_dims] = 1.0
+
+        self.weights = None
+        if weights:
+            self.weights = np.array([float(weights.get(d["id"], 0.0)) for d in self.dimensions])
+
+    @staticmethod
+    def _find_model(models: List[Dict[str, Any]], name: Optional[str], predicate) -> Optional[Dict[str, Any]]:
+        """Find a maturity model by name, or the first one matching predicate."""
+        for model in models:
+            if name is not None:
+                if model["name"] == name:
+                    return model
+            elif predicate(model):
+                return model
+        return None
+
+    def assessment_model(self) -> Dict[str, Any]:
+        """
+        Build the questionnaire rendered by the maturity assessment page.
+
+        Returns:
+            Dictionary with the dimensions, their questions and answer options
+        """
+        options = [{"title": level["name"], "description": level["description"]}
+                   for level in self.levels]
+
+        dimensions = []
+        for index, dimension in enumerate(self.dimensions):
+            dimensions.append({
+                "id": dimension["id"],
+                "name": dimension["name"],
+                "description": f"Assessment of {dimension['name'].lower()} "
+                               f"based on the {self.dimension_model_name}.",
+                "color": DIMENSION_COLORS[index % len(DIMENSION_COLORS)],
+                "icon": DIMENSION_ICONS[index % len(DIMENSION_ICONS)],
+                "questions": [{
+                    "id": question["id"],
+                    "text": f"How mature is your organization in {question['name'].lower()}?",
+                    "description": f"Consider {question['detail']}." if question["detail"] else "",
+                    "options": options
+                } for question in dimension["questions"]]
+            })
+
+        return {
+            "name": self.dimension_model_name,
+            "scale": self.level_model_name,
+            "dimensions": dimensions,
+            "total_questions": len(self.columns)
+        }
+
+    def response_matrix(self, submissions: Sequence[Dict[str, Any]]) -> "np.ndarray":
+        """
+        Convert submissions into a response matrix.
+
+        Each submission holds a ``responses`` mapping of dimension id to a
+        mapping of question id to the selected level. Unanswered questions
+        and values outside the level scale are stored as NaN.
+
+        Args:
+            submissions: Assessment submissions
+
+        Returns:
+            Array of shape (submissions, questions)
+
+        Raises:
+            ValueError: If the responses or the answers of a dimension are not mappings
+        """
+        matrix = np.full((len(submissions), len(self.columns)), np.nan)
+        columns = self.columns
+
+        for row, submission in enumerate(submissions):
+            responses = submission.get("responses", {})
+            if not isinstance(responses, dict):
+                raise ValueError("'responses' must map dimension ids to answers")
+            for dim_id, answers in responses.items():
+                if not isinstance(answers, dict):
+                    raise ValueError(f"Answers of dimension '{dim_id}' must map question ids to levels")
+                for question_id, value in answers.items():
+                    column = columns.get((dim_id, question_id))
+                    if column is not None:
+                        try:
+                            matrix[row, column] = float(value)
+                        except (TypeError, ValueError):
+                            continue
+
+        matrix[(matrix < self.min_score) | (matrix > self.max_score)] = np.nan
+        return matrix
+
+    def score_matrix(self, matrix: "np.ndarray") -> "Dict[str, np.ndarray]":
+        """
+        Score a response matrix.
+
+        Args:
+            matrix: Array of shape (submissions, questions)
+
+        Returns:
+            Dictionary with ``dimension_scores`` and ``answered`` arrays of
+            shape (submissions, dimensions) and an ``overall`` array
+        """
+        answered_mask = ~np.isnan(matrix)
+        totals = np.where(answered_mask, matrix, 0.0) @ self.membership
+        answered = answered_mask.astype(float) @ self.membership
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dimension_scores = np.where(answered > 0, totals / answered, 0.0)
+
+            if self.weights is None:
+                # Every answered question carries the same weight
+                overall_weights = answered
+            else:
+                overall_weights = (answered > 0) * self.weights
+
+            weight_sums = overall_weights.sum(axis=1)
+            overall = np.where(weight_sums > 0,
+                               (dimension_scores * overall_weights).sum(axis=1) / weight_sums,
+                               0.0)
+
+        return {"dimension_scores": dimension_scores, "answered": answered, "overall": overall}
+
+    def level_for_score(self, score: float) -> Dict[str, Any]:
+        """
+        Map an overall score onto the maturity level scale.
+
+        Args:
+            score: Overall maturity score
+
+        Returns:
+            The matching level from the level model
+        """
+        level_number = int(np.floor(score + 0.5))
+        level_number = min(max(level_number, self.min_score), self.max_score)
+        return next(level for level in self.levels if level["level"] == level_number)
+
+    def roadmap(self, dimension_scores: Dict[str, float], phase_size: int = 2) -> List[Dict[str, Any]]:
+        """
+        Build an improvement roadmap, lowest scoring dimensions first.
+
+        Args:
+            dimension_scores: Score per dimension id
+            phase_size: Number of dimensions addressed per phase
+
+        Returns:
+            List of roadmap phases
+        """
+        ordered = sorted(self.dimensions, key=lambda d: dimension_scores.get(d["id"], 0.0))
+        phases = []
+
+        for start in range(0, len(ordered), phase_size):
+            focus = []
+            for dimension in ordered[start:start + phase_size]:
+                score = dimension_scores.get(dimension["id"], 0.0)
+                target = self.level_for_score(min(score + 1, self.max_score))
+                focus.append({
+                    "dimension": dimension["name"],
+                    "current_score": round(score, 1),
+                    "target_level": target["name"],
+                    "target_description": target["description"],
+                    "actions": [f"Improve {q['name'].lower()}" + (f" ({q['detail']})" if q["detail"] else "")
+                                for q in dimension["questions"]]
+                })
+            phases.append({"phase": len(phases) + 1, "focus": focus})
+
+        return phases
+
+    def score_submission(self, submission: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score a single assessment submission.
+
+        Args:
+            submission: Assessment submission
+
+        Returns:
+            Dictionary with the overall score, level, dimension scores and roadmap
+        """
+        return self.score_batch([submission], include_roadmap=True)["results"][0]
+
+    def score_batch(self, submissions: Sequence[Dict[str, Any]],
+                    include_roadmap: bool = False) -> Dict[str, Any]:
+        """
+        Score a batch of assessment submissions and benchmark them.
+
+        Args:
+            submissions: Assessment submissions
+            include_roadmap: Whether to build a roadmap for every submission
+
+        Returns:
+            Dictionary with per-submission ``results`` and batch ``benchmarks``
+        """
+        matrix = self.response_matrix(submissions)
+        scores = self.score_matrix(matrix)
+        dimension_scores = scores["dimension_scores"]
+        overall = scores["overall"]
+
+        # Percentile rank of each overall score within the batch
+        ranked = np.sort(overall)
+        if len(overall):
+            percentile_ranks = np.searchsorted(ranked, overall, side="right") / len(overall) * 100
+        else:
+            percentile_ranks = overall
+
+        dim_ids = [d["id"] for d in self.dimensions]
+        results = []
+        for row, submission in enumerate(submissions):
+            by_dimension = {dim_id: float(dimension_scores[row, col])
+                            for col, dim_id in enumerate(dim_ids)}
+            level = self.level_for_score(overall[row])
+            result = {
+                "id": submission.get("id", row),
+                "overall_score": round(float(overall[row]), 2),
+                "level": level["level"],
+                "level_name": level["name"],
+                "dimension_scores": {k: round(v, 2) for k, v in by_dimension.items()},
+                "answered_questions": int(scores["answered"][row].sum()),
+                "answered_by_dimension": {dim_id: int(scores["answered"][row, col])
+                                          for col, dim_id in enumerate(dim_ids)},
+                "percentile_rank": round(float(percentile_ranks[row]), 1)
+            }
+            if include_roadmap:
+                result["roadmap"] = self.roadmap(by_dimension)
+            results.append(result)
+
+        return {"results": results, "benchmarks": self.benchmarks(dimension_scores, overall)}
+
+    def benchmarks(self, dimension_scores: "np.ndarray", overall: "np.ndarray") -> Dict[str, Any]:
+        """
+        Compute percentile benchmarks for a scored batch.
+
+        Args:
+            dimension_scores: Array of shape (submissions, dimensions)
+            overall: Array of overall scores
+
+        Returns:
+            Dictionary with percentiles of the overall and dimension scores
+        """
+        if len(overall) == 0:
+            return {"count": 0, "overall": {}, "dimensions": {}}
+
+        labels = [f"p{p}" for p in BENCHMARK_PERCENTILES]
+        overall_pct = np.percentile(overall, BENCHMARK_PERCENTILES)
+        dim_pct = np.percentile(dimension_scores, BENCHMARK_PERCENTILES, axis=0)
+
+        return {
+            "count": int(len(overall)),
+            "overall": dict(zip(labels, np.round(overall_pct, 2).tolist()),
+                            mean=round(float(overall.mean()), 2)),
+            "dimensions": {
+                dim["id"]: dict(zip(labels, np.round(dim_pct[:, col], 2).tolist()),
+                                mean=round(float(dimension_scores[:, col].mean()), 2))
+                for col, dim in enumerate(self.dimensions)
+            }
+        }
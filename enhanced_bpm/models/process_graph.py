@@ -0,0 +1,433 @@
+"""
+Process Graph - Compact process model graphs with critical path, bottleneck and cycle analysis.
+"""
+
+import heapq
+from typing import Dict, List, Any, Optional, Tuple
+
+from ..compat.lazy_import import lazy_module
+
+# Imported on first use to keep start-up fast
+np = lazy_module("numpy")
+
+# BPMN element types treated as zero-duration control flow
+EVENT_TYPES = ("startEvent", "endEvent", "intermediateEvent")
+GATEWAY_TYPES = ("exclusiveGateway", "parallelGateway", "inclusiveGateway", "eventBasedGateway")
+
+
+class ProcessNode:
+    """A single activity, event or gateway of a process model."""
+
+    __slots__ = ("id", "key", "name", "type", "duration", "capacity")
+
+    def __init__(self, node_id: int, key: str, name: str, node_type: str = "task",
+                 duration: float = 0.0, capacity: int = 1):
+        self.id = node_id
+        self.key = key
+        self.name = name
+        self.type = node_type
+        self.duration = duration
+        self.capacity = capacity
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the node as a dictionary."""
+        return {"id": self.key, "name": self.name, "type": self.type,
+                "duration": self.duration, "capacity": self.capacity}
+
+
+class ProcessGraph:
+    """
+    Directed process model with integer node ids.
+
+    Nodes are stored in a list indexed by id and edges in compressed
+    adjacency arrays (offsets into a flat target array, for both directions),
+    which keeps models with hundreds of thousands of activities small and
+    lets the analyses run as simple loops over integers.
+    """
+
+    def __init__(self, name: str = ""):
+        """
+        Initialize an empty process graph.
+
+        Args:
+            name: Name of the process model
+        """
+        self.name = name
+        self.nodes: List[ProcessNode] = []
+        self.node_ids: Dict[str, int] = {}
+        self._sources: List[int] = []
+        self._targets: List[int] = []
+        self._adjacency = None
+
+    def add_node(self, key: str, name: Optional[str] = None, node_type: str = "task",
+                 duration: float = 0.0, capacity: int = 1) -> int:
+        """
+        Add a node to the graph.
+
+        Args:
+            key: Unique identifier of the node in the source model
+            name: Display name (defaults to the key)
+            node_type: BPMN element type
+            duration: Expected duration of the activity
+            capacity: Number of parallel resources performing the activity
+
+        Returns:
+            Integer id of the node
+        """
+        if key in self.node_ids:
+            raise ValueError(f"Duplicate node id '{key}'")
+        node_id = len(self.nodes)
+        self.nodes.append(ProcessNode(node_id, key, name or key, node_type,
+                                      float(duration), max(int(capacity), 1)))
+        self.node_ids[key] = node_id
+        self._adjacency = None
+        return node_id
+
+    def add_edge(self, source: str, target: str) -> None:
+        """
+        Add a sequence flow between two nodes.
+
+        Args:
+            source: Key of the source node
+            target: Key of the target node
+        """
+        if source not in self.node_ids or target not in self.node_ids:
+            raise ValueError(f"Sequence flow {source} -> {target} references an unknown node")
+        self._sources.append(self.node_ids[source])
+        self._targets.append(self.node_ids[target])
+        self._adjacency = None
+
+    @property
+    def edge_count(self) -> int:
+        """Number of sequence flows."""
+        return len(self._sources)
+
+    def _build_adjacency(self) -> Tuple[List[int], List[int], List[int], List[int]]:
+        """Build (and cache) the forward and reverse adjacency arrays."""
+        if self._adjacency is None:
+            n = len(self.nodes)
+            sources = np.asarray(self._sources, dtype=np.int64)
+            targets = np.asarray(self._targets, dtype=np.int64)
+
+            order = np.argsort(sources, kind="stable")
+            out_offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=n), out=out_offsets[1:])
+
+            reverse = np.argsort(targets, kind="stable")
+            in_offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(targets, minlength=n), out=in_offsets[1:])
+
+            self._adjacency = (out_offsets.tolist(), targets[order].tolist(),
+                               in_offsets.tolist(), sources[reverse].tolist())
+        return self._adjacency
+
+    def successors(self, node_id: int) -> List[int]:
+        """Return the ids of the nodes following a node."""
+        out_offsets, out_targets, _, _ = self._build_adjacency()
+        return out_targets[out_offsets[node_id]:out_offsets[node_id + 1]]
+
+    def predecessors(self, node_id: int) -> List[int]:
+        """Return the ids of the nodes preceding a node."""
+        _, _, in_offsets, in_sources = self._build_adjacency()
+        return in_sources[in_offsets[node_id]:in_offsets[node_id + 1]]
+
+    def topological_order(self) -> Optional[List[int]]:
+        """
+        Order the nodes so every flow goes forward (Kahn's algorithm).
+
+        Returns:
+            List of node ids, or None if the model contains a cycle
+        """
+        out_offsets, out_targets, in_offsets, _ = self._build_adjacency()
+        n = len(self.nodes)
+        in_degree = [in_offsets[i + 1] - in_offsets[i] for i in range(n)]
+
+        order = [i for i in range(n) if in_degree[i] == 0]
+        position = 0
+        while position < len(order):
+            node = order[position]
+            position += 1
+            for target in out_targets[out_offsets[node]:out_offsets[node + 1]]:
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    order.append(target)
+
+        return order if len(order) == n else None
+
+    def find_cycles(self) -> List[List[str]]:
+        """
+        Find the cycles (loops) of the model.
+
+        Uses an iterative version of Tarjan's strongly connected components
+        algorithm, so deep models do not hit the recursion limit.
+
+        Returns:
+            List of cycles, each given as the keys of the nodes involved
+        """
+        out_offsets, out_targets, _, _ = self._build_adjacency()
+        n = len(self.nodes)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack = []
+        cycles = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, out_offsets[root])]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while work:
+                node, edge = work[-1]
+                if edge < out_offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    target = out_targets[edge]
+                    if index[target] == -1:
+                        index[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, out_offsets[target]))
+                    elif on_stack[target]:
+                        low[node] = min(low[node], index[target])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    is_self_loop = node in out_targets[out_offsets[node]:out_offsets[node + 1]]
+                    if len(component) > 1 or is_self_loop:
+                        cycles.append([self.nodes[m].key for m in reversed(component)])
+
+        return cycles
+
+    def schedule(self) -> Dict[str, List[float]]:
+        """
+        Compute the critical path method schedule.
+
+        Returns:
+            Dictionary with earliest and latest start times and slack per node id
+
+        Raises:
+            ValueError: If the model contains a cycle
+        """
+        order = self.topological_order()
+        if order is None:
+            raise ValueError("Process model contains cycles; remove loops before scheduling")
+
+        out_offsets, out_targets, in_offsets, in_sources = self._build_adjacency()
+        durations = [node.duration for node in self.nodes]
+        n = len(self.nodes)
+
+        earliest = [0.0] * n
+        for node in order:
+            finish = earliest[node] + durations[node]
+            for target in out_targets[out_offsets[node]:out_offsets[node + 1]]:
+                if finish > earliest[target]:
+                    earliest[target] = finish
+
+        makespan = max((earliest[i] + durations[i] for i in range(n)), default=0.0)
+        latest = [makespan - durations[i] for i in range(n)]
+        for node in reversed(order):
+            start = latest[node]
+            for source in in_sources[in_offsets[node]:in_offsets[node + 1]]:
+                candidate = start - durations[source]
+                if candidate < latest[source]:
+                    latest[source] = candidate
+
+        slack = [latest[i] - earliest[i] for i in range(n)]
+        return {"earliest_start": earliest, "latest_start": latest, "slack": slack,
+                "makespan": makespan}
+
+    def critical_path(self, schedule: Optional[Dict[str, List[float]]] = None) -> Dict[str, Any]:
+        """
+        Find the longest (critical) path through the model.
+
+        Args:
+            schedule: Precomputed schedule (see schedule)
+
+        Returns:
+            Dictionary with the path length and the keys of the nodes on it
+        """
+        schedule = schedule or self.schedule()
+        out_offsets, out_targets, _, _ = self._build_adjacency()
+        earliest, slack = schedule["earliest_start"], schedule["slack"]
+        tolerance = 1e-9 * max(schedule["makespan"], 1.0)
+
+        critical = [i for i in range(len(self.nodes))
+                    if abs(slack[i]) <= tolerance and earliest[i] <= tolerance]
+        path = []
+        node = critical[0] if critical else None
+        while node is not None:
+            path.append(node)
+            finish = earliest[node] + self.nodes[node].duration
+            node = next((t for t in out_targets[out_offsets[node]:out_offsets[node + 1]]
+                         if abs(slack[t]) <= tolerance and abs(earliest[t] - finish) <= tolerance), None)
+
+        return {"length": schedule["makespan"], "path": [self.nodes[i].key for i in path]}
+
+    def bottlenecks(self, top: int = 5, schedule: Optional[Dict[str, List[float]]] = None) -> List[Dict[str, Any]]:
+        """
+        Rank the activities that constrain the process most.
+
+        Activities without slack delay the whole process one-for-one, so
+        they are ranked first; ties are broken by duration per resource and
+        by the number of incoming flows they have to absorb.
+
+        Args:
+            top: Number of bottlenecks to return
+            schedule: Precomputed schedule (see schedule)
+
+        Returns:
+            List of bottleneck activities
+        """
+        schedule = schedule or self.schedule()
+        _, _, in_offsets, _ = self._build_adjacency()
+        slack = schedule["slack"]
+
+        candidates = []
+        for node in self.nodes:
+            if node.type in EVENT_TYPES or node.type in GATEWAY_TYPES or node.duration <= 0:
+                continue
+            fan_in = in_offsets[node.id + 1] - in_offsets[node.id]
+            load = node.duration / node.capacity
+            candidates.append((slack[node.id] > 1e-9, -load, -fan_in, node.id))
+
+        return [{
+            "id": self.nodes[node_id].key,
+            "name": self.nodes[node_id].name,
+            "duration": self.nodes[node_id].duration,
+            "capacity": self.nodes[node_id].capacity,
+            "slack": slack[node_id],
+            "critical": not has_slack,
+            "incoming_flows": -negative_fan_in
+        } for has_slack, _, negative_fan_in, node_id in heapq.nsmallest(top, candidates)]
+
+    def analyze(self, top: int = 5) -> Dict[str, Any]:
+        """
+        Run every analysis on the model.
+
+        Args:
+            top: Number of bottlenecks to report
+
+        Returns:
+            Dictionary with the model size, cycles, critical path and bottlenecks
+        """
+        result = {
+            "name": self.name,
+            "nodes": len(self.nodes),
+            "flows": self.edge_count,
+            "cycles": [],
+            "critical_path": None,
+            "bottlenecks": []
+        }
+        # Only look for the cycles when the topological sort fails
+        try:
+            schedule = self.schedule()
+        except ValueError:
+            result["cycles"] = self.find_cycles()
+            return result
+
+        result["critical_path"] = self.critical_path(schedule)
+        result["bottlenecks"] = self.bottlenecks(top, schedule)
+        return result
+
+    @classmethod
+    def from_bpmn(cls, document: Dict[str, Any]) -> "ProcessGraph":
+        """
+        Import a BPMN-like JSON process model.
+
+        The document lists its elements under ``flowElements`` (or
+        ``activities``/``nodes``) with ``id``, ``name``, ``type``, ``duration``
+        and ``capacity``, and its sequence flows under ``sequenceFlows`` (or
+        ``flows``) with ``sourceRef``/``targetRef`` (or ``source``/``target``).
+
+        Args:
+            document: Parsed process model
+
+        Returns:
+            The process graph
+
+        Raises:
+            ValueError: If the document is malformed
+        """
+        process = document.get("process", document)
+        elements = process.get("flowElements") or process.get("activities") or process.get("nodes") or []
+        flows = process.get("sequenceFlows") or process.get("flows") or []
+
+        graph = cls(process.get("name", ""))
+        for element in elements:
+            if "id" not in element:
+                raise ValueError("Every flow element needs an 'id'")
+            graph.add_node(str(element["id"]), element.get("name"), element.get("type", "task"),
+                           element.get("duration", 0.0), element.get("capacity", 1))
+        for flow in flows:
+            graph.add_edge(str(flow.get("sourceRef", flow.get("source"))),
+                           str(flow.get("targetRef", flow.get("target"))))
+        return graph
+
+    @classmethod
+    def from_value_chain(cls, value_chain: Dict[str, Any], name: str = "Value Chain",
+                         default_duration: float = 1.0) -> "ProcessGraph":
+        """
+        Seed a sequential process model from value chain activities.
+
+        Every value chain activity becomes a stage; activities that list
+        their processes (such as ``manufacturing_processes``) contribute one
+        task per process, the others a single task.
+
+        Args:
+            value_chain: The activities of a value chain analysis
+            name: Name of the process model
+            default_duration: Duration assigned to every task
+
+        Returns:
+            The process graph
+        """
+        graph = cls(name)
+        graph.add_node("start", "Start", "startEvent")
+        previous = "start"
+
+        for activity, details in value_chain.items():
+            tasks = []
+            if isinstance(details, dict):
+                for key, value in details.items():
+                    if key.endswith("processes") and isinstance(value, list):
+                        tasks.extend(item.get("process") or item.get("name")
+                                     for item in value if isinstance(item, dict))
+            if not tasks:
+                tasks = [activity.replace("_", " ").title()]
+
+            for position, task in enumerate(tasks):
+                key = f"{activity}.{position}"
+                graph.add_node(key, task, "task", default_duration)
+                graph.add_edge(previous, key)
+                previous = key
+
+        graph.add_node("end", "End", "endEvent")
+        graph.add_edge(previous, "end")
+        return graph
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the model in the BPMN-like JSON format read by from_bpmn."""
+        return {
+            "name": self.name,
+            "flowElements": [node.to_dict() for node in self.nodes],
+            "sequenceFlows": [{"sourceRef": self.nodes[s].key, "targetRef": self.nodes[t].key}
+                              for s, t in zip(self._sources, self._targets)]
+        }
@@ -0,0 +1,322 @@
+"""
+Process Mining - Streaming discovery of process behaviour from event logs.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from ..compat.lazy_import import lazy_module
+
+# Imported on first use to keep start-up fast
+pd = lazy_module("pandas")
+
+from .assessment_store import welford_update, summarize
+
+# Column names recognized when an event log does not name its columns explicitly
+CASE_COLUMNS = ("case_id", "case", "case:concept:name", "caseid", "case id")
+ACTIVITY_COLUMNS = ("activity", "concept:name", "activity_name", "event", "task")
+TIMESTAMP_COLUMNS = ("timestamp", "time:timestamp", "time", "end_time", "completed_at")
+
+# Root of the variant prefix tree
+ROOT = 0
+
+STOP_WORDS = {"and", "the", "for", "with", "from", "into", "process", "management"}
+
+
+def detect_columns(columns: Sequence[str]) -> Tuple[str, str, str]:
+    """
+    Find the case id, activity and timestamp columns of an event log.
+
+    Args:
+        columns: Column names of the log
+
+    Returns:
+        Tuple of (case column, activity column, timestamp column)
+
+    Raises:
+        ValueError: If one of the columns cannot be found
+    """
+    lookup = {str(column).strip().lower(): column for column in columns}
+    detected = []
+    for role, candidates in (("case id", CASE_COLUMNS), ("activity", ACTIVITY_COLUMNS),
+                             ("timestamp", TIMESTAMP_COLUMNS)):
+        match = next((lookup[c] for c in candidates if c in lookup), None)
+        if match is None:
+            raise ValueError(f"Event log has no {role} column")
+        detected.append(match)
+    return tuple(detected)
+
+
+def keywords(text: str) -> set:
+    """Return the significant lower-case words of a text."""
+    return {w for w in re.findall(r"[a-z]+", text.lower()) if len(w) > 3 and w not in STOP_WORDS}
+
+
+class EventLogMiner:
+    """
+    Incremental process discovery over a stream of events.
+
+    Events are fed in chunks and folded into a directly-follows graph,
+    per-activity duration statistics and variant counts. Activities are
+    interned as integers and every case keeps only its position in a prefix
+    tree of traces plus the time of its last event, so memory grows with the
+    number of cases and distinct trace prefixes rather than with the number
+    of events. Events of a case are expected in time order.
+    """
+
+    def __init__(self):
+        """Initialize an empty miner."""
+        self.activities: List[str] = []
+        self.activity_ids: Dict[str, int] = {}
+        self.activity_counts: List[int] = []
+        self.activity_stats: List[Tuple[int, float, float]] = []
+
+        # Variant prefix tree: node -> (parent, activity), (parent, activity) -> node
+        self.tree_parent: List[int] = [-1]
+        self.tree_activity: List[int] = [-1]
+        self.tree_children: Dict[Tuple[int, int], int] = {}
+
+        self.cases: Dict[Any, Tuple[int, float]] = {}
+        self.edges: Dict[Tuple[int, int], Tuple[int, float, float]] = {}
+        self.start_counts: Counter = Counter()
+        self.events = 0
+
+    def _activity_id(self, name: str) -> int:
+        """Intern an activity name."""
+        activity = self.activity_ids.get(name)
+        if activity is None:
+            activity = len(self.activities)
+            self.activities.append(name)
+            self.activity_ids[name] = activity
+            self.activity_counts.append(0)
+            self.activity_stats.append((0, 0.0, 0.0))
+        return activity
+
+    def add_events(self, case_ids: Sequence[Any], activities: Sequence[str],
+                   timestamps: Sequence[float]) -> None:
+        """
+        Fold a batch of events into the model.
+
+        Args:
+            case_ids: Case id of every event
+            activities: Activity name of every event
+            timestamps: Completion time of every event in seconds
+        """
+        cases = self.cases
+        edges = self.edges
+        children = self.tree_children
+        tree_activity = self.tree_activity
+        activity_ids = self.activity_ids
+        activity_counts = self.activity_counts
+        activity_stats = self.activity_stats
+
+        for case, name, timestamp in zip(case_ids, activities, timestamps):
+            activity = activity_ids.get(name)
+            if activity is None:
+                activity = self._activity_id(name)
+            activity_counts[activity] += 1
+
+            state = cases.get(case)
+            if state is None:
+                parent = ROOT
+                self.start_counts[activity] += 1
+            else:
+                parent, previous_time = state
+                duration = timestamp - previous_time
+                edge = (tree_activity[parent], activity)
+                edges[edge] = welford_update(*edges.get(edge, (0, 0.0, 0.0)), duration)
+                activity_stats[activity] = welford_update(*activity_stats[activity], duration)
+
+            node = children.get((parent, activity))
+            if node is None:
+                node = len(tree_activity)
+                children[(parent, activity)] = node
+                self.tree_parent.append(parent)
+                tree_activity.append(activity)
+            cases[case] = (node, timestamp)
+
+        self.events += len(case_ids)
+
+    def add_chunk(self, chunk: "pd.DataFrame", case_column: str, activity_column: str,
+                  timestamp_column: str) -> None:
+        """
+        Fold a chunk of an event log into the model.
+
+        Args:
+            chunk: Rows of the event log
+            case_column: Name of the case id column
+            activity_column: Name of the activity column
+            timestamp_column: Name of the timestamp column
+        """
+        timestamps = pd.to_datetime(chunk[timestamp_column], utc=True, errors="coerce")
+        valid = timestamps.notna() & chunk[case_column].notna() & chunk[activity_column].notna()
+        if not valid.all():
+            chunk, timestamps = chunk[valid], timestamps[valid]
+
+        seconds = timestamps.astype("int64") / 1e9
+        self.add_events(chunk[case_column].tolist(), chunk[activity_column].astype(str).tolist(),
+                        seconds.tolist())
+
+    def variant(self, node: int) -> List[str]:
+        """Return the activities of the trace ending at a prefix tree node."""
+        trace = []
+        while node != ROOT:
+            trace.append(self.activities[self.tree_activity[node]])
+            node = self.tree_parent[node]
+        trace.reverse()
+        return trace
+
+    def variants(self, max_variants: Optional[int] = None,
+                 variant_counts: Optional[Counter] = None) -> List[Dict[str, Any]]:
+        """
+        List the variants of the log, most frequent first.
+
+        Args:
+            max_variants: Number of variants to return (None returns all)
+            variant_counts: Precomputed case counts per prefix tree node
+
+        Returns:
+            List of variants with their activities and number of cases
+        """
+        if variant_counts is None:
+            variant_counts = Counter(node for node, _ in self.cases.values())
+        return [{"activities": self.variant(node), "count": count}
+                for node, count in variant_counts.most_common(max_variants)]
+
+    def bottlenecks(self, top: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank activities by the mean time spent reaching them.
+
+        The duration of an activity is the time between the previous event of
+        the case and its completion, so it includes the waiting time before
+        the activity.
+
+        Args:
+            top: Number of bottlenecks to return
+
+        Returns:
+            List of activities with their duration statistics in seconds
+        """
+        ranked = sorted((a for a in range(len(self.activities)) if self.activity_stats[a][0] > 0),
+                        key=lambda a: (-self.activity_stats[a][1], -self.activity_stats[a][0]))
+        return [dict(activity=self.activities[a], **summarize(*self.activity_stats[a]))
+                for a in ranked[:top]]
+
+    def result(self, max_variants: int = 100, top: int = 5) -> Dict[str, Any]:
+        """
+        Summarize the discovered process.
+
+        Args:
+            max_variants: Number of most frequent variants to include
+            top: Number of bottlenecks to include
+
+        Returns:
+            Dictionary with the directly-follows graph, activity statistics,
+            variants and bottlenecks
+        """
+        variant_counts = Counter(node for node, _ in self.cases.values())
+        end_counts = Counter()
+        for node, count in variant_counts.items():
+            end_counts[self.activities[self.tree_activity[node]]] += count
+
+        return {
+            "summary": {
+                "cases": len(self.cases),
+                "events": self.events,
+                "activities": len(self.activities),
+                "variants": len(variant_counts)
+            },
+            "activities": [dict(activity=name, frequency=self.activity_counts[a],
+                                duration=summarize(*self.activity_stats[a]))
+                           for a, name in enumerate(self.activities)],
+            "directly_follows": [dict(source=self.activities[s], target=self.activities[t],
+                                      frequency=stats[0], duration=summarize(*stats))
+                                 for (s, t), stats in sorted(self.edges.items(), key=lambda e: -e[1][0])],
+            "start_activities": {self.activities[a]: c for a, c in self.start_counts.most_common()},
+            "end_activities": dict(end_counts.most_common()),
+            "variants": self.variants(max_variants, variant_counts),
+            "bottlenecks": self.bottlenecks(top)
+        }
+
+
+def compare_with_challenges(bottlenecks: List[Dict[str, Any]],
+                            business_processes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Relate discovered bottlenecks to the documented process challenges.
+
+    A challenge matches a bottleneck when its name, description or process
+    implications share a significant word with the bottleneck activity;
+    matches on the challenge name rank first.
+
+    Args:
+        bottlenecks: Bottlenecks as returned by EventLogMiner.bottlenecks
+        business_processes: The business_process_analysis section of an industry
+
+    Returns:
+        List of bottlenecks with their matching challenges
+    """
+    challenges = []
+    for area_key, area in business_processes.items():
+        for challenge in area.get("key_challenges", []):
+            text = " ".join([challenge.get("challenge", ""), challenge.get("description", "")] +
+                            challenge.get("process_implications", []))
+            name = challenge.get("challenge", "")
+            challenges.append((area_key, name, keywords(name), keywords(text)))
+
+    comparison = []
+    for bottleneck in bottlenecks:
+        words = keywords(bottleneck["activity"])
+        ranked = sorted(((len(words & name_terms), len(words & terms), area_key, name, words & terms)
+                         for area_key, name, name_terms, terms in challenges if words & terms),
+                        key=lambda m: (-m[0], -m[1]))
+        matches = [{"process_area": area_key, "challenge": name, "shared_terms": sorted(shared)}
+                   for _, _, area_key, name, shared in ranked]
+        comparison.append({
+            "activity": bottleneck["activity"],
+            "mean_duration": bottleneck["mean"],
+            "documented": bool(matches),
+            "matching_challenges": matches
+        })
+    return comparison
+
+
+def mine_event_log(file_path: str, case_column: Optional[str] = None, activity_column: Optional[str] = None,
+                   timestamp_column: Optional[str] = None, chunksize: int = 100000,
+                   business_processes: Optional[Dict[str, Any]] = None,
+                   max_variants: int = 100) -> Dict[str, Any]:
+    """
+    Mine a CSV event log in chunks.
+
+    Args:
+        file_path: Path of the CSV event log
+        case_column: Name of the case id column (detected if omitted)
+        activity_column: Name of the activity column (detected if omitted)
+        timestamp_column: Name of the timestamp column (detected if omitted)
+        chunksize: Number of rows read per chunk
+        business_processes: Business process analysis to compare bottlenecks with
+        max_variants: Number of most frequent variants to include
+
+    Returns:
+        Discovered process (see EventLogMiner.result)
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    detected = detect_columns(header) if None in (case_column, activity_column, timestamp_column) else ()
+    case_column = case_column or detected[0]
+    activity_column = activity_column or detected[1]
+    timestamp_column = timestamp_column or detected[2]
+    for column in (case_column, activity_column, timestamp_column):
+        if column not in header:
+            raise ValueError(f"Event log has no column '{column}'")
+
+    miner = EventLogMiner()
+    reader = pd.read_csv(file_path, usecols=[case_column, activity_column, timestamp_column],
+                         dtype={case_column: str, activity_column: str}, chunksize=chunksize)
+    for chunk in reader:
+        miner.add_chunk(chunk, case_column, activity_column, timestamp_column)
+
+    result = miner.result(max_variants)
+    result["columns"] = {"case": case_column, "activity": activity_column, "timestamp": timestamp_column}
+    if business_processes:
+        result["challenge_comparison"] = compare_with_challenges(result["bottlenecks"], business_processes)
+    return result
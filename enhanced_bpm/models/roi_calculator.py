@@ -0,0 +1,351 @@
+"""
+ROI Calculator - Monte Carlo NPV, IRR and payback for process optimization recommendations.
+"""
+
+import math
+import random
+from typing import Dict, List, Any, Optional, Sequence
+
+from ..compat.numpy_compat import get_numpy, is_numpy_available
+
+# Year in which each recommendation timeframe incurs its cost; benefits start
+# the year after
+TIMEFRAME_START_YEAR = {
+    "short_term": 0,
+    "medium_term": 1,
+    "long_term": 2
+}
+
+# Percentiles reported for every result distribution
+REPORTED_PERCENTILES = (5, 25, 50, 75, 95)
+
+SUPPORTED_DISTRIBUTIONS = ("fixed", "uniform", "triangular", "normal")
+
+# Search interval and iterations of the IRR bisection
+IRR_LOWER_BOUND = -0.99
+IRR_UPPER_BOUND = 10.0
+IRR_ITERATIONS = 48
+
+
+def roi_items_from_recommendations(recommendations: Dict[str, List[Dict[str, Any]]],
+                                   assumptions: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Attach cost and benefit assumptions to process optimization recommendations.
+
+    Args:
+        recommendations: Recommendations as returned by
+            BPMAnalyzer.get_process_optimization_recommendations
+        assumptions: One entry per recommendation to include, naming the
+            ``recommendation`` and giving ``cost`` and ``annual_benefit``
+            distributions (and optionally ``annual_cost``)
+
+    Returns:
+        List of ROI items with their timeframe
+
+    Raises:
+        ValueError: If an assumption refers to an unknown recommendation or
+            has an invalid distribution
+    """
+    timeframes = {rec["recommendation"]: timeframe
+                  for timeframe, recs in recommendations.items() if timeframe in TIMEFRAME_START_YEAR
+                  for rec in recs}
+
+    items = []
+    for assumption in assumptions:
+        name = assumption.get("recommendation")
+        if name not in timeframes:
+            raise ValueError(f"Unknown recommendation '{name}'")
+        for key in ("cost", "annual_benefit", "annual_cost"):
+            if key in assumption:
+                validate_distribution(assumption[key])
+            elif key != "annual_cost":
+                raise ValueError(f"Recommendation '{name}' needs a '{key}' distribution")
+        items.append(dict(assumption, timeframe=timeframes[name]))
+
+    return items
+
+
+def validate_distribution(spec: Any) -> None:
+    """
+    Check a cost or benefit distribution.
+
+    A distribution is either a number or a dictionary with a ``distribution``
+    key (fixed, uniform, triangular or normal) and its parameters.
+
+    Raises:
+        ValueError: If the distribution is not supported
+    """
+    if isinstance(spec, (int, float)):
+        return
+    if not isinstance(spec, dict) or spec.get("distribution") not in SUPPORTED_DISTRIBUTIONS:
+        raise ValueError(f"Unsupported distribution: {spec!r}")
+
+    required = {
+        "fixed": ("value",),
+        "uniform": ("min", "max"),
+        "triangular": ("min", "mode", "max"),
+        "normal": ("mean", "std")
+    }[spec["distribution"]]
+    missing = [param for param in required if param not in spec]
+    if missing:
+        raise ValueError(f"Distribution {spec['distribution']} is missing {', '.join(missing)}")
+
+
+def _sample(np, spec: Any, draws: int, rng) -> Any:
+    """Draw samples from a distribution with NumPy."""
+    if isinstance(spec, (int, float)):
+        return np.full(draws, float(spec))
+    kind = spec["distribution"]
+    if kind == "fixed":
+        return np.full(draws, float(spec["value"]))
+    if kind == "uniform":
+        return rng.uniform(spec["min"], spec["max"], draws)
+    if kind == "triangular":
+        return rng.triangular(spec["min"], spec["mode"], spec["max"], draws)
+    return rng.normal(spec["mean"], spec["std"], draws)
+
+
+def _sample_python(spec: Any, rng: random.Random) -> float:
+    """Draw one sample from a distribution without NumPy."""
+    if isinstance(spec, (int, float)):
+        return float(spec)
+    kind = spec["distribution"]
+    if kind == "fixed":
+        return float(spec["value"])
+    if kind == "uniform":
+        return rng.uniform(spec["min"], spec["max"])
+    if kind == "triangular":
+        return rng.triangular(spec["min"], spec["max"], spec["mode"])
+    return rng.gauss(spec["mean"], spec["std"])
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Linearly interpolated percentile of a sorted list."""
+    position = (len(sorted_values) - 1) * percentile / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _summarize(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Summarize a result distribution, ignoring draws without a value."""
+    finite = sorted(v for v in values if not math.isnan(v))
+    if not finite:
+        return {"count": 0, "mean": None, **{f"p{p}": None for p in REPORTED_PERCENTILES}}
+    return {
+        "count": len(finite),
+        "mean": sum(finite) / len(finite),
+        **{f"p{p}": _percentile(finite, p) for p in REPORTED_PERCENTILES}
+    }
+
+
+def _summarize_array(np, values) -> Dict[str, Optional[float]]:
+    """Summarize a result distribution held in a NumPy array."""
+    finite = values[~np.isnan(values)]
+    if finite.size == 0:
+        return {"count": 0, "mean": None, **{f"p{p}": None for p in REPORTED_PERCENTILES}}
+    percentiles = np.percentile(finite, REPORTED_PERCENTILES)
+    return {
+        "count": int(finite.size),
+        "mean": float(finite.mean()),
+        **{f"p{p}": float(v) for p, v in zip(REPORTED_PERCENTILES, percentiles)}
+    }
+
+
+class ROICalculator:
+    """
+    Monte Carlo ROI engine for a portfolio of process improvements.
+
+    Each draw samples the one-off cost, yearly benefit and yearly running
+    cost of every item, builds the portfolio cash flows over the horizon and
+    computes NPV, IRR and payback period. With NumPy all draws are computed
+    as arrays; without it the same model runs draw by draw.
+    """
+
+    def __init__(self, items: Sequence[Dict[str, Any]], discount_rate: float = 0.08,
+                 horizon_years: int = 5):
+        """
+        Initialize the calculator.
+
+        Args:
+            items: ROI items (see roi_items_from_recommendations)
+            discount_rate: Yearly discount rate used for the NPV
+            horizon_years: Number of years after the first investment
+        """
+        if not items:
+            raise ValueError("ROI calculation needs at least one item")
+        if horizon_years < 1:
+            raise ValueError("horizon_years must be at least 1")
+
+        self.items = list(items)
+        self.discount_rate = float(discount_rate)
+        self.horizon_years = int(horizon_years)
+
+    def _start_year(self, item: Dict[str, Any]) -> int:
+        """Year in which an item's cost is incurred."""
+        return min(TIMEFRAME_START_YEAR.get(item.get("timeframe"), 0), self.horizon_years - 1)
+
+    def run(self, draws: int = 100000, seed: Optional[int] = None,
+            vectorized: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Run the Monte Carlo simulation.
+
+        Args:
+            draws: Number of Monte Carlo draws
+            seed: Seed for reproducible results
+            vectorized: Force the NumPy (True) or pure Python (False) path;
+                by default NumPy is used when it is available
+
+        Returns:
+            Dictionary with NPV, IRR and payback distributions
+        """
+        if draws < 1:
+            raise ValueError("draws must be positive")
+        # Without NumPy the compatibility layer cannot sample arrays
+        vectorized = is_numpy_available() if vectorized is None else vectorized and is_numpy_available()
+
+        results = self._run_vectorized(draws, seed) if vectorized else self._run_python(draws, seed)
+        results.update({
+            "draws": draws,
+            "discount_rate": self.discount_rate,
+            "horizon_years": self.horizon_years,
+            "vectorized": vectorized
+        })
+        return results
+
+    def _run_vectorized(self, draws: int, seed: Optional[int]) -> Dict[str, Any]:
+        """Compute every draw at once with NumPy arrays."""
+        np = get_numpy()
+        rng = np.random.default_rng(seed)
+        years = self.horizon_years + 1
+
+        cash_flows = np.zeros((draws, years))
+        for item in self.items:
+            start = self._start_year(item)
+            cash_flows[:, start] -= _sample(np, item["cost"], draws, rng)
+            yearly = _sample(np, item["annual_benefit"], draws, rng)
+            if "annual_cost" in item:
+                yearly = yearly - _sample(np, item["annual_cost"], draws, rng)
+            cash_flows[:, start + 1:] += yearly[:, None]
+
+        periods = np.arange(years)
+        npv = cash_flows @ (1.0 + self.discount_rate) ** -periods
+
+        # IRR by bisection on all draws at once; the NPV is evaluated with
+        # Horner's rule in the discount factor 1 / (1 + rate)
+        columns = [cash_flows[:, t].copy() for t in range(years)]
+
+        def npv_at(rates):
+            factor = 1.0 / (1.0 + rates)
+            total = columns[-1].copy()
+            for column in reversed(columns[:-1]):
+                total *= factor
+                total += column
+            return total
+
+        low = np.full(draws, IRR_LOWER_BOUND)
+        high = np.full(draws, IRR_UPPER_BOUND)
+        npv_low = npv_at(low)
+        has_irr = npv_low * npv_at(high) < 0
+        for _ in range(IRR_ITERATIONS):
+            mid = (low + high) / 2
+            npv_mid = npv_at(mid)
+            same_sign = npv_mid * npv_low > 0
+            np.copyto(low, mid, where=same_sign)
+            np.copyto(npv_low, npv_mid, where=same_sign)
+            np.copyto(high, mid, where=~same_sign)
+        irr = np.where(has_irr, (low + high) / 2, np.nan)
+
+        # Payback: the year after the cumulative cash flow was last negative,
+        # so dips caused by later investments are taken into account
+        cumulative = np.cumsum(cash_flows, axis=1)
+        recovered = cumulative >= 0
+        paid_back = recovered[:, -1]
+        last_negative = years - 1 - np.argmax(~recovered[:, ::-1], axis=1)
+        first = np.where(recovered.all(axis=1), 0, last_negative + 1)
+        rows = np.arange(draws)
+        safe_first = np.minimum(first, years - 1)
+        before = cumulative[rows, np.maximum(safe_first - 1, 0)]
+        step = cash_flows[rows, safe_first]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(step > 0, -before / step, 0.0)
+        payback = np.where(first == 0, 0.0, safe_first - 1 + fraction)
+        payback = np.where(paid_back, payback, np.nan)
+
+        return {
+            "npv": _summarize_array(np, npv),
+            "probability_positive_npv": float((npv > 0).mean()),
+            "irr": _summarize_array(np, irr),
+            "payback_years": _summarize_array(np, payback),
+            "probability_payback": float(paid_back.mean())
+        }
+
+    def _run_python(self, draws: int, seed: Optional[int]) -> Dict[str, Any]:
+        """Compute the draws one at a time without NumPy."""
+        rng = random.Random(seed)
+        years = self.horizon_years + 1
+        discount = [(1.0 + self.discount_rate) ** -t for t in range(years)]
+
+        npvs, irrs, paybacks = [], [], []
+        for _ in range(draws):
+            flows = [0.0] * years
+            for item in self.items:
+                start = self._start_year(item)
+                flows[start] -= _sample_python(item["cost"], rng)
+                yearly = _sample_python(item["annual_benefit"], rng)
+                if "annual_cost" in item:
+                    yearly -= _sample_python(item["annual_cost"], rng)
+                for t in range(start + 1, years):
+                    flows[t] += yearly
+
+            npvs.append(sum(f * d for f, d in zip(flows, discount)))
+            irrs.append(self._irr(flows))
+            paybacks.append(self._payback(flows))
+
+        paid_back = sum(1 for p in paybacks if not math.isnan(p))
+        return {
+            "npv": _summarize(npvs),
+            "probability_positive_npv": sum(1 for v in npvs if v > 0) / draws,
+            "irr": _summarize(irrs),
+            "payback_years": _summarize(paybacks),
+            "probability_payback": paid_back / draws
+        }
+
+    @staticmethod
+    def _irr(flows: List[float]) -> float:
+        """IRR of one cash flow series by bisection, or NaN if there is none."""
+        def npv_at(rate):
+            return sum(f * (1.0 + rate) ** -t for t, f in enumerate(flows))
+
+        low, high = IRR_LOWER_BOUND, IRR_UPPER_BOUND
+        npv_low = npv_at(low)
+        if npv_low * npv_at(high) >= 0:
+            return float("nan")
+        for _ in range(IRR_ITERATIONS):
+            mid = (low + high) / 2
+            npv_mid = npv_at(mid)
+            if npv_mid * npv_low > 0:
+                low, npv_low = mid, npv_mid
+            else:
+                high = mid
+        return (low + high) / 2
+
+    @staticmethod
+    def _payback(flows: List[float]) -> float:
+        """Undiscounted payback period of one cash flow series, or NaN."""
+        cumulative = []
+        total = 0.0
+        for flow in flows:
+            total += flow
+            cumulative.append(total)
+
+        if cumulative[-1] < 0:
+            return float("nan")
+        if all(value >= 0 for value in cumulative):
+            return 0.0
+
+        last_negative = max(t for t, value in enumerate(cumulative) if value < 0)
+        first = last_negative + 1
+        step = flows[first]
+        fraction = -cumulative[first - 1] / step if step > 0 else 0.0
+        return first - 1 + fraction
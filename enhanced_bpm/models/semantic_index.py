@@ -0,0 +1,594 @@
+"""
+Semantic Index - Offline vector retrieval over the leaves of BPM documents.
+"""
+
+import json
+import math
+import os
+import re
+import tempfile
+import zlib
+from typing import Dict, List, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+from ..compat.lazy_import import lazy_module
+from .vector_index import DEFAULT_NPROBE, IVFIndex, save_array
+
+# Imported on first use to keep start-up fast
+np = lazy_module("numpy")
+
+# Number of hashed term features (terms are not kept in a vocabulary)
+FEATURE_DIM = 2048
+
+# Dimensions of the latent (LSA) space leaves are compared in
+COMPONENTS = 96
+
+# Leaves vectorized or scored per block, which bounds the memory used
+BLOCK_ROWS = 16384
+
+# Leaves with a lower cosine similarity are not returned
+MIN_SCORE = 0.3
+
+# Subspace iterations used to find the latent components
+POWER_ITERATIONS = 4
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about all also an and any are as at be been by can could do does for from has have how in into is it its
+me more most my of on or our should so than that the their them there these they this to up us was we were
+what when where which who why will with would you your
+""".split())
+
+# Suffixes stripped (or replaced) by the stemmer, longest first
+SUFFIXES = (("ations", "ate"), ("ation", "ate"), ("ities", ""), ("ments", ""), ("ingly", ""), ("ness", ""),
+            ("ment", ""), ("ings", ""), ("ing", ""), ("ity", ""), ("ies", "y"), ("ers", ""), ("ed", ""),
+            ("er", ""), ("es", ""), ("ly", ""), ("s", ""))
+
+MATRIX_FILE = "vectors.npy"
+MODEL_FILE = "model.npz"
+LEAVES_FILE = "leaves.jsonl"
+ADDED_FILE = "added.jsonl"
+ANN_DIR = "ann"
+
+# Ids of added leaves have this bit set, so they never clash with row numbers
+ADDED_ID_BIT = 1 << 62
+
+
+class Leaf(NamedTuple):
+    """A text value of a document with the section, path and key it was found under."""
+    section: str
+    path: str
+    context: str
+    text: str
+    source: str = ""
+
+
+def iter_leaves(data: Dict[str, Any], sections: Optional[Iterable[str]] = None) -> Iterator[Leaf]:
+    """
+    Yield the text leaves of a document.
+
+    Args:
+        data: Parsed document
+        sections: Top-level sections to walk (all of them by default)
+
+    Yields:
+        One Leaf per string value (list items take the key of their list)
+    """
+    for section in (data if sections is None else sections):
+        value = data.get(section)
+        if not isinstance(value, (dict, list)):
+            continue
+        stack = [(value, section, section)]
+        while stack:
+            value, path, context = stack.pop()
+            if isinstance(value, dict):
+                stack.extend((item, f"{path}.{key}", key) for key, item in reversed(list(value.items())))
+            elif isinstance(value, list):
+                stack.extend((item, f"{path}[{i}]", context) for i, item in reversed(list(enumerate(value))))
+            elif isinstance(value, str) and value.strip():
+                yield Leaf(section, path, context, value)
+
+
+def stem(token: str) -> str:
+    """Strip a common English suffix so inflected forms share a feature."""
+    for suffix, replacement in SUFFIXES:
+        if suffix == "s" and token.endswith("ss"):
+            break
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)] + replacement
+            break
+    # "recycle" and "recycling" both become "recycl"
+    return token[:-1] if token.endswith("e") and len(token) > 4 else token
+
+
+def term_features(text: str) -> Dict[int, float]:
+    """
+    Hash the terms of a text into feature counts.
+
+    Each stemmed word is hashed to a feature index; a second hash bit gives
+    the sign, so collisions tend to cancel out instead of adding up.
+
+    Args:
+        text: Text to vectorize
+
+    Returns:
+        Dictionary of feature index to signed count
+    """
+    features = {}
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        digest = zlib.crc32(stem(token).encode("utf-8"))
+        index = digest % FEATURE_DIM
+        sign = 1.0 if digest & 0x80000000 else -1.0
+        features[index] = features.get(index, 0.0) + sign
+    return features
+
+
+class _TermBlock:
+    """
+    Sparse (CSR) matrix of hashed term weights for a block of texts.
+
+    Rows are texts and columns are the FEATURE_DIM hashed features; only
+    the non-zero weights are stored, so products with thin dense matrices
+    cost time proportional to the number of terms rather than FEATURE_DIM.
+    """
+
+    def __init__(self, texts: Sequence[str]):
+        indptr = [0]
+        indices = []
+        values = []
+        for text in texts:
+            for index, count in term_features(text).items():
+                if count:
+                    indices.append(index)
+                    # Sublinear term frequency
+                    values.append(math.copysign(1.0 + math.log(abs(count)), count))
+            indptr.append(len(indices))
+
+        self.size = len(texts)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float32)
+        self.rows = np.repeat(np.arange(self.size), np.diff(self.indptr))
+        self._column_order = None
+
+    def weight(self, idf: "np.ndarray") -> None:
+        """Multiply the weights by the feature IDF and scale each row to unit length."""
+        values = self.values * idf[self.indices]
+        norms = np.sqrt(np.bincount(self.rows, weights=values * values, minlength=self.size))
+        norms[norms == 0] = 1.0
+        self.values = (values / norms[self.rows]).astype(np.float32)
+
+    def dot(self, dense: "np.ndarray") -> "np.ndarray":
+        """Return block @ dense for a FEATURE_DIM x w matrix."""
+        out = np.zeros((self.size, dense.shape[1]), dtype=dense.dtype)
+        if len(self.indices):
+            starts = self.indptr[:-1]
+            filled = self.indptr[1:] > starts
+            out[filled] = np.add.reduceat(self.values[:, None] * dense[self.indices], starts[filled], axis=0)
+        return out
+
+    def tdot(self, dense: "np.ndarray") -> "np.ndarray":
+        """Return block.T @ dense for a size x w matrix."""
+        out = np.zeros((FEATURE_DIM, dense.shape[1]), dtype=dense.dtype)
+        if len(self.indices):
+            if self._column_order is None:
+                self._column_order = np.argsort(self.indices, kind="stable")
+            order = self._column_order
+            columns = self.indices[order]
+            starts = np.flatnonzero(np.concatenate([[True], columns[1:] != columns[:-1]]))
+            gathered = self.values[order, None] * dense[self.rows[order]]
+            out[columns[starts]] = np.add.reduceat(gathered, starts, axis=0)
+        return out
+
+
+def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_eigenvectors(multiply: Callable[["np.ndarray"], "np.ndarray"], size: int, count: int,
+                     seed: int = 0) -> "np.ndarray":
+    """
+    Approximate the eigenvectors of the largest eigenvalues of a symmetric matrix.
+
+    Uses randomized subspace iteration, which only needs products of the
+    matrix with a thin matrix, so the matrix itself is never formed.
+
+    Args:
+        multiply: Function returning matrix @ x for a size x w array x
+        size: Order of the matrix
+        count: Number of eigenvectors
+        seed: Seed of the random start, so builds are reproducible
+
+    Returns:
+        size x count array whose columns are the eigenvectors, largest eigenvalue first
+    """
+    width = min(size, count + 16)
+    basis = np.random.default_rng(seed).standard_normal((size, width)).astype(np.float32)
+    for _ in range(POWER_ITERATIONS):
+        basis, _ = np.linalg.qr(multiply(basis))
+    _, vectors = np.linalg.eigh(basis.T @ multiply(basis))
+    return (basis @ vectors[:, ::-1])[:, :count]
+
+
+def leaf_text(leaf: Leaf) -> str:
+    """Return the text a leaf is vectorized from (its key names the topic of short values)."""
+    return f"{leaf.context.replace('_', ' ')} {leaf.text}"
+
+
+def _write_lines(directory: str, filename: str, lines: Iterable[str]) -> int:
+    """Atomically write a text file of lines and return its size in bytes."""
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, 'wb') as f:
+        for line in lines:
+            f.write(line.encode("utf-8") + b"\n")
+        size = f.tell()
+    os.replace(tmp_path, os.path.join(directory, filename))
+    return size
+
+
+class SemanticIndex:
+    """
+    Latent semantic index of document leaves, queried by dot product.
+
+    Leaves are turned into hashed TF-IDF vectors and projected onto the main
+    components of the term co-occurrence matrix (latent semantic analysis),
+    so a question can match leaves that use related words rather than the
+    exact text. Everything is computed locally with NumPy; the vectors are
+    kept as one unit-length float32 matrix, scored block by block.
+
+    With an approximate index (see build_ann) queries only score the
+    vectors of a few IVF lists, and leaves added later are embedded with the
+    existing model and inserted without a rebuild.
+    """
+
+    def __init__(self, leaves: List[Leaf], idf: "np.ndarray", projection: "np.ndarray", matrix: "np.ndarray",
+                 ann: Optional[IVFIndex] = None, directory: Optional[str] = None):
+        """
+        Initialize the index from its parts (see build and load).
+
+        Args:
+            leaves: Indexed leaves, in matrix row order
+            idf: Inverse document frequency of each hashed feature
+            projection: FEATURE_DIM x components projection onto the latent space
+            matrix: Unit-length leaf vectors, one row per leaf
+            ann: Approximate index of the leaf vectors, if any
+            directory: Directory the index is saved to, if any
+
+        Leaves added later (see add) are kept in added by id, and their
+        sources in sources (until removed, see remove).
+        """
+        self.leaves = leaves
+        self.idf = idf
+        self.projection = projection
+        self.matrix = matrix
+        self.ann = ann
+        self.directory = directory
+        self.added = {}
+        self.sources = set()
+        self._added_leaves = set()
+        self._added_offset = 0
+
+    @classmethod
+    def build(cls, leaves: Iterable[Leaf], components: int = COMPONENTS) -> "SemanticIndex":
+        """
+        Vectorize leaves and compute the latent space.
+
+        The sparse TF-IDF term matrix X is built in blocks of BLOCK_ROWS
+        leaves. The latent components are the main eigenvectors of the
+        co-occurrence matrix X.T @ X, found by subspace iteration with
+        products X.T @ (X @ basis), so the FEATURE_DIM x FEATURE_DIM
+        co-occurrence matrix is never formed.
+
+        Args:
+            leaves: Leaves to index
+            components: Dimensions of the latent space
+
+        Returns:
+            The index
+        """
+        leaves = list(leaves)
+        blocks = [_TermBlock([leaf_text(leaf) for leaf in leaves[start:start + BLOCK_ROWS]])
+                  for start in range(0, len(leaves), BLOCK_ROWS)]
+
+        document_frequency = np.zeros(FEATURE_DIM, dtype=np.float64)
+        for block in blocks:
+            document_frequency += np.bincount(block.indices, minlength=FEATURE_DIM)
+        idf = np.log((1.0 + len(leaves)) / (1.0 + document_frequency)).astype(np.float32) + 1.0
+        for block in blocks:
+            block.weight(idf)
+
+        def cooccurrence_dot(basis):
+            return sum(block.tdot(block.dot(basis)) for block in blocks)
+
+        components = max(1, min(components, len(leaves), FEATURE_DIM))
+        projection = np.ascontiguousarray(top_eigenvectors(cooccurrence_dot, FEATURE_DIM, components),
+                                          dtype=np.float32)
+
+        matrix = np.zeros((len(leaves), components), dtype=np.float32)
+        start = 0
+        for block in blocks:
+            matrix[start:start + block.size] = _normalize(block.dot(projection))
+            start += block.size
+
+        return cls(leaves, idf, projection, matrix)
+
+    def embed(self, queries: Sequence[str]) -> "np.ndarray":
+        """
+        Project queries into the latent space.
+
+        Args:
+            queries: Query texts
+
+        Returns:
+            Unit-length query vectors, one row per query
+        """
+        block = _TermBlock(queries)
+        block.weight(self.idf)
+        return _normalize(block.dot(self.projection))
+
+    def search_batch(self, queries: Sequence[str], k: int = 5, min_score: float = MIN_SCORE,
+                     nprobe: int = DEFAULT_NPROBE) -> List[List[Tuple[float, Leaf]]]:
+        """
+        Find the leaves closest to several queries at once.
+
+        Without an approximate index all queries are scored with one matrix
+        product per block of leaves, and each block's top k candidates are
+        kept with argpartition.
+
+        Args:
+            queries: Query texts
+            k: Number of leaves per query
+            min_score: Smallest cosine similarity returned
+            nprobe: IVF lists scanned per query when there is an approximate index
+
+        Returns:
+            For each query, (score, leaf) pairs sorted best first
+        """
+        if not queries or not len(self) or k <= 0:
+            return [[] for _ in queries]
+        vectors = self.embed(queries)
+
+        if self.ann is not None:
+            best_scores, best_ids = self.ann.search(vectors, k, nprobe)
+            return [[(float(score), self.leaf(leaf_id)) for score, leaf_id in zip(scores, ids)
+                     if score >= min_score and self.leaf(leaf_id) is not None]
+                    for scores, ids in zip(best_scores, best_ids)]
+
+        vectors = vectors.T
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self.leaves), BLOCK_ROWS):
+            scores = (self.matrix[start:start + BLOCK_ROWS] @ vectors).T
+            if scores.shape[1] > k:
+                rows = np.argpartition(scores, -k, axis=1)[:, -k:]
+                scores = np.take_along_axis(scores, rows, axis=1)
+            else:
+                rows = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, rows + start], axis=1)
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            order = np.argsort(-scores, kind="stable")[:k]
+            results.append([(float(scores[i]), self.leaves[rows[i]]) for i in order if scores[i] >= min_score])
+        return results
+
+    def search(self, query: str, k: int = 5, min_score: float = MIN_SCORE,
+               nprobe: int = DEFAULT_NPROBE) -> List[Tuple[float, Leaf]]:
+        """
+        Find the leaves closest to a query.
+
+        Args:
+            query: Query text
+            k: Number of leaves
+            min_score: Smallest cosine similarity returned
+            nprobe: IVF lists scanned when there is an approximate index
+
+        Returns:
+            (score, leaf) pairs sorted best first
+        """
+        return self.search_batch([query], k, min_score, nprobe)[0]
+
+    def __len__(self) -> int:
+        return len(self.leaves) + len(self.added)
+
+    def leaf(self, leaf_id: int) -> Optional[Leaf]:
+        """Return the leaf of a matrix row or added leaf id, or None if it is unknown."""
+        if 0 <= leaf_id < len(self.leaves):
+            return self.leaves[leaf_id]
+        return self.added.get(int(leaf_id))
+
+    def build_ann(self, nlist: Optional[int] = None) -> IVFIndex:
+        """
+        Train an approximate (IVF) index over the leaf vectors.
+
+        Args:
+            nlist: Number of IVF lists (defaults to about the square root of the leaf count)
+
+        Returns:
+            The approximate index, also saved if the index has a directory
+        """
+        directory = os.path.join(self.directory, ANN_DIR) if self.directory else None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ann = IVFIndex.train(self.matrix, nlist=nlist, directory=directory)
+        return self.ann
+
+    def add(self, leaves: Iterable[Leaf]) -> int:
+        """
+        Embed and index more leaves with the existing model.
+
+        The latent space is not recomputed, so terms that only occur in the
+        new leaves do not shape it; rebuild the index once most of its text
+        comes from added leaves. With an approximate index the leaves are
+        inserted into its lists and, if the index is saved, appended to its
+        directory, where other processes pick them up with refresh().
+
+        Args:
+            leaves: Leaves to add
+
+        Returns:
+            Number of leaves added
+        """
+        leaves = list(leaves)
+        if not leaves:
+            return 0
+        vectors = np.concatenate([self.embed([leaf_text(leaf) for leaf in leaves[start:start + BLOCK_ROWS]])
+                                  for start in range(0, len(leaves), BLOCK_ROWS)]).astype(np.float32)
+
+        if self.ann is None:
+            self.matrix = np.concatenate([np.asarray(self.matrix), vectors])
+            self.leaves = self.leaves + leaves
+            return len(leaves)
+
+        ids = [int.from_bytes(os.urandom(8), "big") % ADDED_ID_BIT | ADDED_ID_BIT for _ in leaves]
+        self._append("".join(json.dumps([leaf_id, *leaf]) + "\n" for leaf_id, leaf in zip(ids, leaves)))
+        self.added.update(zip(ids, leaves))
+        self.sources.update(leaf.source for leaf in leaves)
+        self._added_leaves.update(leaves)
+        self.ann.add(vectors, np.asarray(ids, dtype=np.int64))
+        return len(leaves)
+
+    def remove(self, source: str) -> int:
+        """
+        Remove the leaves of a source, whether built or added.
+
+        With an approximate index their vectors are hidden from searches
+        (added vectors until the next save, built ones for good), and the
+        removal is appended to the index directory, where other processes
+        pick it up with refresh().
+
+        Args:
+            source: Source given to the leaves when they were added
+
+        Returns:
+            Number of leaves removed
+        """
+        self._append(json.dumps({"removed": source}) + "\n")
+        return self._forget(source)
+
+    def _forget(self, source: str) -> int:
+        """Drop the leaves of a source from memory (built leaves stay in leaves, hidden from the ann)."""
+        self.sources.discard(source)
+        if self.ann is None:
+            keep = [i for i, leaf in enumerate(self.leaves) if leaf.source != source]
+            removed = len(self.leaves) - len(keep)
+            if removed:
+                self.matrix = np.asarray(self.matrix)[keep]
+                self.leaves = [self.leaves[i] for i in keep]
+            return removed
+        ids = [leaf_id for leaf_id, leaf in self.added.items() if leaf.source == source]
+        for leaf_id in ids:
+            self._added_leaves.discard(self.added.pop(leaf_id))
+        rows = [row for row, leaf in enumerate(self.leaves) if leaf.source == source]
+        if ids or rows:
+            self.ann.remove(np.asarray(ids + rows, dtype=np.int64))
+        return len(ids) + len(rows)
+
+    def _append(self, lines: str) -> None:
+        """Append lines to the added leaves file of the index directory, if any."""
+        if not self.directory:
+            return
+        # One O_APPEND write, so lines from concurrent processes never interleave
+        fd = os.open(os.path.join(self.directory, ADDED_FILE), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def refresh(self) -> bool:
+        """
+        Load the leaves other processes added to (or removed from) the index directory.
+
+        Leaves that are already indexed, because several processes added the
+        same source at once, are skipped and their vectors removed.
+
+        Returns:
+            True if leaves were loaded or removed
+        """
+        if not self.directory:
+            return False
+        path = os.path.join(self.directory, ADDED_FILE)
+        loaded = False
+        duplicates = []
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                f.seek(self._added_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Still being written
+                        break
+                    self._added_offset += len(line)
+                    record = json.loads(line)
+                    if isinstance(record, dict):
+                        loaded = self._forget(record["removed"]) > 0 or loaded
+                        continue
+                    leaf_id, *fields = record
+                    leaf = Leaf(*fields)
+                    if leaf_id in self.added:
+                        continue
+                    if leaf in self._added_leaves:
+                        duplicates.append(leaf_id)
+                        continue
+                    self.added[leaf_id] = leaf
+                    self._added_leaves.add(leaf)
+                    self.sources.add(leaf.source)
+                    loaded = True
+        if self.ann is not None:
+            loaded = self.ann.refresh() or loaded
+            if duplicates:
+                self.ann.remove(np.asarray(duplicates, dtype=np.int64))
+        return loaded
+
+    def save(self, directory: str) -> None:
+        """
+        Write the index to a directory.
+
+        Args:
+            directory: Target directory (created if needed)
+        """
+        os.makedirs(directory, exist_ok=True)
+        # Files are replaced, not overwritten, as they may be memory-mapped
+        save_array(directory, MATRIX_FILE, np.asarray(self.matrix))
+        save_array(directory, MODEL_FILE, idf=self.idf, projection=self.projection)
+        _write_lines(directory, LEAVES_FILE, (json.dumps(leaf) for leaf in self.leaves))
+        self._added_offset = _write_lines(directory, ADDED_FILE,
+                                          (json.dumps([leaf_id, *leaf]) for leaf_id, leaf in self.added.items()))
+        if self.ann is not None:
+            self.ann.compact()
+            self.ann.save(os.path.join(directory, ANN_DIR))
+        self.directory = directory
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "SemanticIndex":
+        """
+        Read an index written by save, with the leaves added since.
+
+        Args:
+            directory: Directory the index was saved to
+            mmap: Map the leaf vectors (and the approximate index) from disk
+                instead of reading them
+
+        Returns:
+            The index
+        """
+        matrix = np.load(os.path.join(directory, MATRIX_FILE), mmap_mode="r" if mmap else None)
+        with np.load(os.path.join(directory, MODEL_FILE)) as model:
+            idf, projection = model["idf"], model["projection"]
+        with open(os.path.join(directory, LEAVES_FILE), 'r', encoding='utf-8') as f:
+            leaves = [Leaf(*json.loads(line)) for line in f]
+        ann_directory = os.path.join(directory, ANN_DIR)
+        ann = IVFIndex.load(ann_directory, mmap) if IVFIndex.exists(ann_directory) else None
+        index = cls(leaves, idf, projection, matrix, ann, directory)
+        index.refresh()
+        return index
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Check whether a directory holds a saved index."""
+        return os.path.exists(os.path.join(directory, MODEL_FILE))
@@ -0,0 +1,147 @@
+"""
+Snippets - Highlighted match windows from precomputed token offsets.
+"""
+
+import bisect
+import re
+from array import array
+from typing import Dict, List, Any, Iterator, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Longest snippet returned, in characters (longer texts are cut at word boundaries)
+SNIPPET_CHARS = 160
+
+ELLIPSIS = "…"
+
+# Character offsets (start, end) of a match
+Span = Tuple[int, int]
+
+
+def fold_case(text: str) -> str:
+    """Lowercase a text without changing its length, so offsets into one are offsets into the other."""
+    lower = text.lower()
+    if len(lower) == len(text):
+        return lower
+    # A few characters (such as "İ") lowercase to several; those are kept as they are
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class Passage:
+    """
+    A text with its lowercased form and the character offsets of its tokens.
+
+    The offsets are computed once, when a document is indexed, so a query
+    finds its matches with str.find and cuts the snippet window at word
+    boundaries by walking the offsets, without tokenizing the text again.
+    """
+
+    __slots__ = ("text", "lower", "starts", "ends")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = fold_case(text)
+        self.starts = array("l")
+        self.ends = array("l")
+        for match in TOKEN_PATTERN.finditer(text):
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+
+    def find(self, term: str) -> List[Span]:
+        """
+        Find the occurrences of a term.
+
+        Args:
+            term: Lowercased term
+
+        Returns:
+            Offsets of the non-overlapping occurrences, in text order
+        """
+        spans = []
+        if not term:
+            return spans
+        start = self.lower.find(term)
+        while start != -1:
+            spans.append((start, start + len(term)))
+            start = self.lower.find(term, start + len(term))
+        return spans
+
+    def snippet(self, spans: List[Span], max_chars: int = SNIPPET_CHARS) -> Dict[str, Any]:
+        """
+        Cut a window of the text around the first match.
+
+        The window starts with the token of the first match and grows one
+        token at a time on each side until it would exceed max_chars; cut
+        ends are marked with an ellipsis.
+
+        Args:
+            spans: Matches, as returned by find (the head of the text is
+                returned when there are none)
+            max_chars: Longest window, not counting the ellipses
+
+        Returns:
+            Dictionary with the snippet text and the [start, end] offsets
+            of the matches it shows, relative to the snippet
+        """
+        text = self.text
+        if len(text) <= max_chars:
+            return {"snippet": text, "highlights": [[start, end] for start, end in spans]}
+
+        first_start, first_end = spans[0] if spans else (0, 0)
+        starts, ends = self.starts, self.ends
+        tokens = len(starts)
+        if tokens:
+            # Tokens the first match begins and ends in
+            left = max(bisect.bisect_right(starts, first_start) - 1, 0)
+            right = min(max(bisect.bisect_left(ends, first_end), left), tokens - 1)
+            window_start = min(starts[left], first_start)
+            window_end = max(ends[right], first_end)
+            grew = True
+            while grew:
+                grew = False
+                if right + 1 < tokens and ends[right + 1] - window_start <= max_chars:
+                    right += 1
+                    window_end = ends[right]
+                    grew = True
+                if left > 0 and window_end - starts[left - 1] <= max_chars:
+                    left -= 1
+                    window_start = starts[left]
+                    grew = True
+            # Punctuation before the first token or after the last one is kept when it fits
+            if left == 0 and window_end <= max_chars:
+                window_start = 0
+            if right == tokens - 1 and len(text) - window_start <= max_chars:
+                window_end = len(text)
+        else:
+            window_start, window_end = first_start, max(first_end, first_start + max_chars)
+        window_end = min(window_end, window_start + max_chars, len(text))
+
+        prefix = ELLIPSIS if window_start > 0 else ""
+        suffix = ELLIPSIS if window_end < len(text) else ""
+        shift = len(prefix) - window_start
+        return {
+            "snippet": prefix + text[window_start:window_end] + suffix,
+            "highlights": [[max(start, window_start) + shift, min(end, window_end) + shift]
+                           for start, end in spans if start < window_end and end > window_start]
+        }
+
+
+def iter_passages(value: Any, path: str = "") -> Iterator[Tuple[str, Passage]]:
+    """
+    Yield a passage for every string in a JSON value.
+
+    Args:
+        value: JSON value
+        path: Path of the value ("key.child" for members, "key[0]" for elements)
+
+    Yields:
+        Tuples of (path, passage), in document order
+    """
+    if isinstance(value, str):
+        yield path, Passage(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from iter_passages(item, f"{path}.{key}" if path else key)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from iter_passages(item, f"{path}[{i}]")
@@ -0,0 +1,213 @@
+"""
+Spelling - Typo-tolerant word lookup with a symmetric-delete index.
+"""
+
+import re
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+# Largest edit distance a correction may have
+MAX_DISTANCE = 2
+
+# Only the first characters of a word are used for delete variants, which
+# bounds the size of the index for long words (as in SymSpell)
+PREFIX_LENGTH = 7
+
+# Words shorter than this are never corrected
+MIN_WORD_LENGTH = 4
+
+# Number of looked-up words whose result is remembered
+LOOKUP_CACHE_SIZE = 4096
+
+
+def words(text: str) -> List[str]:
+    """Split text into lowercase words."""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def collect_words(value: Any) -> Iterable[str]:
+    """Yield the words of every string and key in a JSON value."""
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            yield from words(value)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                yield from words(key)
+                stack.append(item)
+        elif isinstance(value, list):
+            stack.extend(value)
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (adjacent transpositions count as one edit).
+
+    Args:
+        a: First word
+        b: Second word
+        limit: Distances above this are not computed exactly
+
+    Returns:
+        The distance, or limit + 1 if it is larger than limit
+    """
+    # Common prefixes and suffixes do not change the distance
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if not a or not b:
+        return max(len(a), len(b))
+    previous_row = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous_row, row = previous_row, row, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], before[j - 2] + 1)
+        if min(row) > limit:
+            return limit + 1
+    return row[-1] if row[-1] <= limit else limit + 1
+
+
+def max_distance_for(word: str) -> int:
+    """Return the edit distance allowed when correcting a word of this length."""
+    return 1 if len(word) <= 5 else MAX_DISTANCE
+
+
+class SpellingIndex:
+    """
+    Symmetric-delete spelling index (the SymSpell approach).
+
+    Every vocabulary word is stored under the variants obtained by deleting
+    up to MAX_DISTANCE characters from its prefix. A lookup generates the
+    same deletes of the misspelled word, so candidates are found with a few
+    dictionary probes whatever the size of the vocabulary, and only those
+    candidates are checked with a real edit distance.
+
+    Candidates must start with the same letter as the word: typos rarely
+    change it, while valid words that only differ there ("mean" and
+    "lean") are common.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.deletes = {}
+        self._lookups = {}
+
+    def add(self, word: str, count: int = 1) -> None:
+        """
+        Add occurrences of a word to the vocabulary.
+
+        Args:
+            word: Lowercase word
+            count: Weight of the word (candidates at the same distance are ranked by it)
+        """
+        # Earlier lookups may have a different answer now
+        self._lookups.clear()
+        if word in self.counts:
+            self.counts[word] += count
+            return
+        self.counts[word] = count
+        for variant in self._deletes(word[:PREFIX_LENGTH]):
+            self.deletes.setdefault(variant, []).append(word)
+
+    def add_words(self, words: Iterable[str], count: int = 1) -> None:
+        """Add every word of an iterable to the vocabulary."""
+        for word in words:
+            self.add(word, count)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @staticmethod
+    def _deletes(word: str, distance: int = MAX_DISTANCE) -> Set[str]:
+        """Return the word and its variants with up to distance characters deleted."""
+        variants = {word}
+        frontier = [word]
+        for _ in range(distance):
+            next_frontier = []
+            for variant in frontier:
+                for i in range(len(variant)):
+                    shorter = variant[:i] + variant[i + 1:]
+                    if shorter not in variants:
+                        variants.add(shorter)
+                        next_frontier.append(shorter)
+            frontier = next_frontier
+        return variants
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        """
+        Find the closest vocabulary word.
+
+        Args:
+            word: Lowercase word
+            max_distance: Largest edit distance accepted (defaults to MAX_DISTANCE)
+
+        Returns:
+            Tuple of (word, distance) for the closest and, among equally
+            close ones, most frequent word, or None if there is none
+        """
+        limit = MAX_DISTANCE if max_distance is None else min(max_distance, MAX_DISTANCE)
+        if word in self.counts:
+            return word, 0
+        if (word, limit) in self._lookups:
+            return self._lookups[word, limit]
+
+        best = None
+        checked = set()
+        for variant in self._deletes(word[:PREFIX_LENGTH], limit):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in checked or candidate[0] != word[0] or abs(len(candidate) - len(word)) > limit:
+                    continue
+                checked.add(candidate)
+                distance = edit_distance(word, candidate, limit)
+                if distance > limit:
+                    continue
+                rank = (distance, -self.counts[candidate], candidate)
+                if best is None or rank < best:
+                    best = rank
+
+        if len(self._lookups) >= LOOKUP_CACHE_SIZE:
+            self._lookups.clear()
+        result = self._lookups[word, limit] = (best[2], best[0]) if best else None
+        return result
+
+    def correct(self, text: str, targets: Optional[Set[str]] = None) -> Tuple[str, Dict[str, str]]:
+        """
+        Correct the misspelled words of a text.
+
+        Words that are in the vocabulary, shorter than MIN_WORD_LENGTH or
+        without a close enough vocabulary word are kept as they are.
+
+        Args:
+            text: Lowercase text
+            targets: If given, only corrections to one of these words are made
+
+        Returns:
+            Tuple of (corrected text, mapping of corrected words to their corrections)
+        """
+        corrections = {}
+        for word in set(words(text)):
+            if len(word) < MIN_WORD_LENGTH or word in self.counts:
+                continue
+            match = self.lookup(word, max_distance_for(word))
+            if match is not None and (targets is None or match[0] in targets):
+                corrections[word] = match[0]
+        if not corrections:
+            return text, corrections
+        corrected = WORD_PATTERN.sub(lambda m: corrections.get(m.group(0), m.group(0)), text)
+        return corrected, corrections
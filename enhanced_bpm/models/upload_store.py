@@ -0,0 +1,580 @@
+"""
+Upload Store - Content-addressed, deduplicated storage for uploaded files.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+# Directory (inside the upload folder) holding the objects and the index
+OBJECTS_DIR = ".objects"
+INDEX_DB = "index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL,
+    item_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS object_sections (
+    digest TEXT NOT NULL,
+    section TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    PRIMARY KEY (digest, section)
+);
+CREATE INDEX IF NOT EXISTS idx_object_sections_section ON object_sections (section, digest);
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    format TEXT NOT NULL DEFAULT '',
+    converted_from TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_files_digest ON files (digest);
+CREATE INDEX IF NOT EXISTS idx_files_format ON files (format, name);
+CREATE INDEX IF NOT EXISTS idx_files_converted_from ON files (converted_from);
+CREATE TABLE IF NOT EXISTS conversions (
+    source_digest TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    artifact_digest TEXT NOT NULL,
+    PRIMARY KEY (source_digest, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_conversions_artifact ON conversions (artifact_digest);
+CREATE TABLE IF NOT EXISTS section_versions (
+    name TEXT NOT NULL,
+    section TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (name, section)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Columns added to the tables of an existing index
+MIGRATIONS = {
+    "objects": [("item_count", "INTEGER")],
+    "files": [("format", "TEXT NOT NULL DEFAULT ''"), ("converted_from", "TEXT"),
+              ("version", "INTEGER NOT NULL DEFAULT 0")],
+}
+
+
+def file_format(name: str) -> str:
+    """Return the format (lowercase extension without the dot) of a file name."""
+    return os.path.splitext(name)[1][1:].lower()
+
+
+def section_counts(data: Any) -> Dict[str, int]:
+    """
+    Count the items of each top-level section of a JSON document.
+
+    Args:
+        data: Parsed JSON document
+
+    Returns:
+        Dictionary of section name to number of items (1 for scalar values)
+    """
+    if not isinstance(data, dict):
+        return {}
+    return {str(section): len(value) if isinstance(value, (list, dict)) else 1
+            for section, value in data.items()}
+
+
+class UploadStore:
+    """
+    Content-addressed store for the files in the upload folder.
+
+    Every distinct content is stored once as an object named by the SHA-256
+    of its bytes; file names in the upload folder are hard links to those
+    objects, so code that opens ``<upload folder>/<name>`` keeps working and
+    identical uploads share disk space (and, through their inode, cache
+    entries). An SQLite index keeps the name -> object references with a
+    reference count per object, and maps (source object, conversion kind)
+    to the converted artifact so re-uploads skip conversion.
+
+    The index doubles as the catalog of uploaded files: listing, existence
+    checks and filtering by format, name prefix or section are index
+    lookups rather than directory scans. Section and item counts are
+    recorded per object, so identical uploads are described once.
+    """
+
+    def __init__(self, upload_dir: str, chunk_size: int = 1024 * 1024):
+        """
+        Open (and if needed create) the store.
+
+        Args:
+            upload_dir: The upload folder
+            chunk_size: Size of the chunks read while hashing an upload
+        """
+        self.upload_dir = upload_dir
+        self.objects_dir = os.path.join(upload_dir, OBJECTS_DIR)
+        self.chunk_size = chunk_size
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        # Transactions are explicit so that writers take the lock up front
+        self._conn = sqlite3.connect(os.path.join(self.objects_dir, INDEX_DB), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._migrate()
+            self._conn.executescript(SCHEMA)
+
+    def _migrate(self) -> None:
+        """Add the columns an index created by an earlier version is missing."""
+        for table, columns in MIGRATIONS.items():
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if not existing:
+                continue
+            for column, definition in columns:
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def close(self) -> None:
+        """Close the index."""
+        self._conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Run a write transaction that also serializes object file changes between processes."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def path(self, name: str) -> str:
+        """Return the path of a stored file name."""
+        return os.path.join(self.upload_dir, name)
+
+    def object_path(self, digest: str) -> str:
+        """Return the path of an object."""
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def digest(self, name: str) -> Optional[str]:
+        """Return the content digest a file name refers to, or None if it is unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM files WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def names(self, digest: str) -> List[str]:
+        """Return the file names referring to some content, in name order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM files WHERE digest = ? ORDER BY name", (digest,)).fetchall()
+        return [row[0] for row in rows]
+
+    def refcount(self, digest: str) -> int:
+        """Return the number of file names referring to some content."""
+        with self._lock:
+            row = self._conn.execute("SELECT refcount FROM objects WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else 0
+
+    def add(self, name: str, stream, converted_from: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Store an upload under a file name.
+
+        The stream is hashed while it is copied to a temporary file, which
+        is discarded when the content is already stored.
+
+        Args:
+            name: File name (already sanitized)
+            stream: Readable binary stream with the content
+            converted_from: Name of the upload this file was converted from
+
+        Returns:
+            Tuple of (content digest, whether the content was new)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: stream.read(self.chunk_size), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            return self._commit(name, digest.hexdigest(), size, tmp_path, converted_from)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def add_bytes(self, name: str, data: bytes, converted_from: Optional[str] = None) -> Tuple[str, bool]:
+        """Store content given as bytes under a file name (see add)."""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.link(name, digest, converted_from):
+            return digest, False
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return self._commit(name, digest, len(data), tmp_path, converted_from)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _commit(self, name: str, digest: str, size: int, tmp_path: str,
+                converted_from: Optional[str]) -> Tuple[str, bool]:
+        """Move new content into place (unless already stored) and point the name at it."""
+        with self._transaction() as conn:
+            is_new = self._store_object(conn, digest, size, tmp_path)
+            self._link(conn, name, digest, converted_from)
+        return digest, is_new
+
+    def _store_object(self, conn: sqlite3.Connection, digest: str, size: int, tmp_path: str) -> bool:
+        """Move content into the object folder unless it is already stored (in a transaction)."""
+        object_path = self.object_path(digest)
+        row = conn.execute("SELECT refcount FROM objects WHERE digest = ?", (digest,)).fetchone()
+        is_new = row is None or not os.path.exists(object_path)
+        if is_new:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(tmp_path, object_path)
+            conn.execute("INSERT OR REPLACE INTO objects (digest, size, refcount) VALUES (?, ?, ?)",
+                         (digest, size, row[0] if row else 0))
+        return is_new
+
+    def update(self, name: str, document: Any, changed_sections: Iterable[str], base_digest: str) -> Optional[str]:
+        """
+        Replace a JSON file with an edited version of its document.
+
+        Only the changed sections get a new version; the file keeps the
+        upload it was converted from.
+
+        Args:
+            name: File name
+            document: The edited document
+            changed_sections: Top-level sections that differ from the stored version
+            base_digest: Digest of the content the edit was made to
+
+        Returns:
+            Digest of the new content, or None if the file was removed or
+            replaced since base_digest was read
+        """
+        data = json.dumps(document, indent=2).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            with self._transaction() as conn:
+                row = conn.execute("SELECT digest, converted_from FROM files WHERE name = ?", (name,)).fetchone()
+                if row is None or row[0] != base_digest:
+                    return None
+                self._store_object(conn, digest, len(data), tmp_path)
+                self._link(conn, name, digest, row[1], changed_sections)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.describe(name, document)
+        return digest
+
+    def link(self, name: str, digest: str, converted_from: Optional[str] = None) -> bool:
+        """
+        Point a file name at already stored content.
+
+        Args:
+            name: File name (already sanitized)
+            digest: Content digest
+            converted_from: Name of the upload this file was converted from
+
+        Returns:
+            True if the content exists and is now referenced by the name
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT refcount FROM objects WHERE digest = ?", (digest,)).fetchone()
+            if row is None or not os.path.exists(self.object_path(digest)):
+                return False
+            self._link(conn, name, digest, converted_from)
+        return True
+
+    def _link(self, conn: sqlite3.Connection, name: str, digest: str, converted_from: Optional[str],
+              changed_sections: Optional[Iterable[str]] = None) -> None:
+        """
+        Create the name's hard link and move its reference to a new object (in a transaction).
+
+        New content changes the version of the whole file, unless the
+        sections that changed are given.
+        """
+        row = conn.execute("SELECT digest, version FROM files WHERE name = ?", (name,)).fetchone()
+        previous, version = row if row else (None, 0)
+
+        # Replace the name atomically so readers never see a missing file
+        link_path = self.path(name)
+        tmp_link = os.path.join(self.objects_dir, f"{name}.{os.getpid()}.{threading.get_ident()}.link")
+        try:
+            os.link(self.object_path(digest), tmp_link)
+        except OSError:
+            # File systems without hard links get a copy instead
+            shutil.copyfile(self.object_path(digest), tmp_link)
+        os.replace(tmp_link, link_path)
+
+        if previous != digest:
+            if previous is None or changed_sections is None:
+                version = self._next_version(conn)
+                conn.execute("DELETE FROM section_versions WHERE name = ?", (name,))
+            else:
+                section_version = self._next_version(conn)
+                conn.executemany("INSERT OR REPLACE INTO section_versions (name, section, version) VALUES (?, ?, ?)",
+                                 [(name, section, section_version) for section in changed_sections])
+
+        conn.execute("INSERT OR REPLACE INTO files (name, digest, created_at, format, converted_from, version) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+                     (name, digest, time.time(), file_format(name), converted_from, version))
+        if previous == digest:
+            return
+        conn.execute("UPDATE objects SET refcount = refcount + 1 WHERE digest = ?", (digest,))
+        if previous is not None:
+            self._release(conn, previous)
+
+    def _next_version(self, conn: sqlite3.Connection) -> int:
+        """Take the next number of the store-wide version sequence (in a transaction)."""
+        conn.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('version', 0)")
+        conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'version'")
+        return conn.execute("SELECT value FROM counters WHERE name = 'version'").fetchone()[0]
+
+    def section_versions(self, name: str) -> Optional[Dict[str, int]]:
+        """
+        Return the version of each section of a described JSON file.
+
+        Versions come from one store-wide sequence, so a section's version
+        only grows: it changes when the section is edited or the whole file
+        is replaced.
+
+        Args:
+            name: File name
+
+        Returns:
+            Dictionary of section name to version, or None if the file is unknown
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT digest, version FROM files WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            digest, version = row
+            versions = {section: version for (section,) in self._conn.execute(
+                "SELECT section FROM object_sections WHERE digest = ?", (digest,))}
+            for section, section_version in self._conn.execute(
+                    "SELECT section, version FROM section_versions WHERE name = ?", (name,)):
+                if section in versions:
+                    versions[section] = max(version, section_version)
+        return versions
+
+    def _release(self, conn: sqlite3.Connection, digest: str) -> None:
+        """Drop one reference to an object, deleting it with the last one (in a transaction)."""
+        conn.execute("UPDATE objects SET refcount = refcount - 1 WHERE digest = ?", (digest,))
+        row = conn.execute("SELECT refcount FROM objects WHERE digest = ?", (digest,)).fetchone()
+        if row is not None and row[0] <= 0:
+            conn.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            conn.execute("DELETE FROM object_sections WHERE digest = ?", (digest,))
+            conn.execute("DELETE FROM conversions WHERE source_digest = ? OR artifact_digest = ?",
+                         (digest, digest))
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.object_path(digest))
+
+    def remove(self, name: str) -> bool:
+        """
+        Delete a file name, and its content once no other name refers to it.
+
+        Files stored before the upload folder was content-addressed are
+        simply removed.
+
+        Args:
+            name: File name
+
+        Returns:
+            True if the file existed
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT digest FROM files WHERE name = ?", (name,)).fetchone()
+            existed = row is not None
+            try:
+                os.remove(self.path(name))
+                existed = True
+            except FileNotFoundError:
+                pass
+            if row is not None:
+                conn.execute("DELETE FROM files WHERE name = ?", (name,))
+                conn.execute("DELETE FROM section_versions WHERE name = ?", (name,))
+                self._release(conn, row[0])
+        return existed
+
+    def conversion(self, source_digest: str, kind: str) -> Optional[str]:
+        """
+        Look up the artifact an earlier conversion produced.
+
+        Args:
+            source_digest: Digest of the uploaded content
+            kind: Conversion kind, including any options it depends on
+
+        Returns:
+            Digest of the converted artifact, or None if it must be converted
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT artifact_digest FROM conversions WHERE source_digest = ? AND kind = ?",
+                                     (source_digest, kind)).fetchone()
+        return row[0] if row else None
+
+    def record_conversion(self, source_digest: str, kind: str, artifact_digest: str) -> None:
+        """Remember the artifact a conversion produced (both objects must be referenced)."""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO conversions (source_digest, kind, artifact_digest) "
+                         "VALUES (?, ?, ?)", (source_digest, kind, artifact_digest))
+
+    def describe(self, name: str, data: Any) -> None:
+        """
+        Record the sections and item counts of a stored JSON file.
+
+        The description belongs to the content, so it is only computed for
+        content that has not been described before.
+
+        Args:
+            name: File name
+            data: Parsed JSON content of the file
+        """
+        digest = self.digest(name)
+        if digest is None:
+            return
+        with self._lock:
+            row = self._conn.execute("SELECT item_count FROM objects WHERE digest = ?", (digest,)).fetchone()
+        if row is None or row[0] is not None:
+            return
+
+        counts = section_counts(data)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM object_sections WHERE digest = ?", (digest,))
+            conn.executemany("INSERT INTO object_sections (digest, section, item_count) VALUES (?, ?, ?)",
+                             [(digest, section, count) for section, count in counts.items()])
+            conn.execute("UPDATE objects SET item_count = ? WHERE digest = ?", (sum(counts.values()), digest))
+
+    def exists(self, name: str) -> bool:
+        """Check whether a file name is in the catalog."""
+        return self.digest(name) is not None
+
+    def _filter(self, file_format: Optional[str], section: Optional[str],
+                prefix: Optional[str]) -> Tuple[str, List[Any]]:
+        """Build the FROM/WHERE clause selecting catalog entries."""
+        clause = "FROM files f JOIN objects o ON o.digest = f.digest"
+        conditions, params = [], []
+        if section is not None:
+            clause += " JOIN object_sections s ON s.digest = f.digest AND s.section = ?"
+            params.append(section)
+        if file_format is not None:
+            conditions.append("f.format = ?")
+            params.append(file_format.lower().lstrip("."))
+        if prefix:
+            # Range condition so the name index is used
+            conditions.append("f.name >= ? AND f.name < ?")
+            params += [prefix, prefix + "\uffff"]
+        if conditions:
+            clause += " WHERE " + " AND ".join(conditions)
+        return clause, params
+
+    def list_files(self, file_format: Optional[str] = None, section: Optional[str] = None,
+                   prefix: Optional[str] = None, limit: Optional[int] = None, offset: int = 0,
+                   details: bool = False) -> List[Any]:
+        """
+        List catalog entries in name order.
+
+        Args:
+            file_format: Only files of this format (e.g. "json", "csv")
+            section: Only JSON files with this top-level section
+            prefix: Only names starting with this prefix
+            limit: Maximum number of entries, or None for all
+            offset: Number of entries to skip
+            details: Return metadata dictionaries instead of names
+
+        Returns:
+            File names, or dictionaries with name, format, size,
+            created_at, converted_from, item_count and sections
+        """
+        clause, params = self._filter(file_format, section, prefix)
+        query = f"SELECT f.name, f.format, o.size, f.created_at, f.converted_from, o.item_count, f.digest {clause} " \
+                f"ORDER BY f.name LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + [-1 if limit is None else limit, offset]).fetchall()
+        if not details:
+            return [row[0] for row in rows]
+
+        # Sections are fetched for the requested page only
+        digests = list({row[6] for row in rows})
+        sections = {}
+        with self._lock:
+            for start in range(0, len(digests), 500):
+                batch = digests[start:start + 500]
+                for digest, section, count in self._conn.execute(
+                        f"SELECT digest, section, item_count FROM object_sections "
+                        f"WHERE digest IN ({','.join('?' * len(batch))})", batch):
+                    sections.setdefault(digest, {})[section] = count
+
+        return [{"name": name, "format": fmt, "size": size, "created_at": created_at,
+                 "converted_from": converted_from, "item_count": item_count,
+                 "sections": sections.get(digest, {})}
+                for name, fmt, size, created_at, converted_from, item_count, digest in rows]
+
+    def count_files(self, file_format: Optional[str] = None, section: Optional[str] = None,
+                    prefix: Optional[str] = None) -> int:
+        """Count the catalog entries matching the filters of list_files."""
+        clause, params = self._filter(file_format, section, prefix)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) {clause}", params).fetchone()[0]
+
+    def sync(self, accept: Optional[Callable[[str], bool]] = None) -> Dict[str, int]:
+        """
+        Reconcile the catalog with the upload folder.
+
+        Files found in the folder but not in the catalog (stored before the
+        catalog existed, or copied in by hand) are moved into the store,
+        and catalog entries whose file has disappeared are dropped.
+
+        Args:
+            accept: Optional predicate selecting the file names to adopt
+
+        Returns:
+            Dictionary with the number of adopted and dropped names
+        """
+        on_disk = {name for name in os.listdir(self.upload_dir)
+                   if name != OBJECTS_DIR and os.path.isfile(self.path(name))}
+        with self._lock:
+            cataloged = {row[0] for row in self._conn.execute("SELECT name FROM files")}
+
+        adopted = 0
+        for name in sorted(on_disk - cataloged):
+            if accept is not None and not accept(name):
+                continue
+            with open(self.path(name), "rb") as f:
+                self.add(name, f)
+            if file_format(name) == "json":
+                try:
+                    with open(self.path(name), "r") as f:
+                        self.describe(name, json.load(f))
+                except ValueError:
+                    pass
+            adopted += 1
+
+        dropped = 0
+        for name in cataloged - on_disk:
+            if self.remove(name):
+                dropped += 1
+        return {"adopted": adopted, "dropped": dropped}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of names and objects and the bytes saved by deduplication."""
+        with self._lock:
+            files, referenced = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(o.size), 0) FROM files f JOIN objects o ON o.digest = f.digest"
+            ).fetchone()
+            objects, stored = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        return {"files": files, "objects": objects, "bytes_stored": stored,
+                "bytes_saved": referenced - stored}
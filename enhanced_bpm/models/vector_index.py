@@ -0,0 +1,430 @@
+"""
+Vector Index - Inverted-file (IVF) approximate nearest-neighbor search on NumPy.
+"""
+
+import os
+import tempfile
+import threading
+import uuid
+from typing import List, Optional, Tuple
+
+from ..compat.lazy_import import lazy_module
+
+# Imported on first use to keep start-up fast
+np = lazy_module("numpy")
+
+# Lists probed per query unless told otherwise
+DEFAULT_NPROBE = 16
+
+# Rows sampled to train the list centroids
+TRAIN_SAMPLE = 100000
+
+KMEANS_ITERATIONS = 12
+
+# Rows assigned or scored per block, which bounds the memory used
+BLOCK_ROWS = 65536
+
+CENTROIDS_FILE = "centroids.npy"
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.npy"
+OFFSETS_FILE = "offsets.npy"
+SEGMENT_PREFIX = "segment-"
+
+
+def default_nlist(count: int) -> int:
+    """Return the number of lists for a collection size (about the square root of it)."""
+    return int(max(1, min(4096, round(count ** 0.5))))
+
+
+def _unit(vectors: "np.ndarray") -> "np.ndarray":
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def assign(vectors: "np.ndarray", centroids: "np.ndarray") -> "np.ndarray":
+    """Return the index of the closest centroid (by dot product) of every row."""
+    lists = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        lists[start:start + BLOCK_ROWS] = np.argmax(np.asarray(vectors[start:start + BLOCK_ROWS]) @ centroids.T, axis=1)
+    return lists
+
+
+def kmeans(vectors: "np.ndarray", count: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> "np.ndarray":
+    """
+    Cluster unit-length vectors with spherical k-means.
+
+    Args:
+        vectors: Rows to cluster (a sample of them is used)
+        count: Number of clusters
+        iterations: Refinement rounds
+        seed: Seed of the sampling and initialization
+
+    Returns:
+        count x dim array of unit-length centroids
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > TRAIN_SAMPLE:
+        vectors = vectors[np.sort(rng.choice(len(vectors), TRAIN_SAMPLE, replace=False))]
+    vectors = np.asarray(vectors, dtype=np.float32)
+    count = max(1, min(count, len(vectors)))
+
+    centroids = vectors[rng.choice(len(vectors), count, replace=False)].copy()
+    for _ in range(iterations):
+        lists = assign(vectors, centroids)
+        order = np.argsort(lists, kind="stable")
+        sizes = np.bincount(lists, minlength=count)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        filled = sizes > 0
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(vectors[order], starts[filled], axis=0)
+        # Empty clusters restart from a random row
+        empty = np.flatnonzero(~filled)
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty))]
+        centroids = _unit(sums)
+    return centroids
+
+
+def _group(vectors: "np.ndarray", ids: "np.ndarray",
+           centroids: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Order rows by their list and return (vectors, ids, list offsets)."""
+    lists = assign(vectors, centroids)
+    order = np.argsort(lists, kind="stable")
+    offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lists, minlength=len(centroids)), out=offsets[1:])
+    return np.asarray(vectors, dtype=np.float32)[order], np.asarray(ids, dtype=np.int64)[order], offsets
+
+
+def save_array(directory: str, filename: str, array: Optional["np.ndarray"] = None, **arrays: "np.ndarray") -> None:
+    """
+    Atomically write an .npy file (or an .npz file when named arrays are given).
+
+    The file is replaced rather than overwritten, so processes that have the
+    old file memory-mapped keep reading consistent data.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        if arrays:
+            np.savez(f, **arrays)
+        else:
+            np.save(f, array)
+    os.replace(tmp_path, os.path.join(directory, filename))
+
+
+class IVFIndex:
+    """
+    Inverted-file index of unit-length vectors for dot-product search.
+
+    Vectors are partitioned into lists around k-means centroids and stored
+    ordered by list, so a query scores the centroids and then only the rows
+    of the nprobe closest lists: O(nlist + nprobe * n / nlist) instead of O(n).
+
+    On disk the main arrays are memory-mapped, so opening an index costs no
+    reading and a query only touches the pages of the lists it probes.
+    Vectors added later are written as small immutable segment files, which
+    other processes sharing the directory pick up with refresh(), until
+    compact() merges them into the main arrays.
+    """
+
+    def __init__(self, centroids: "np.ndarray", vectors: "np.ndarray", ids: "np.ndarray", offsets: "np.ndarray",
+                 directory: Optional[str] = None):
+        """
+        Initialize the index from its parts (see train and load).
+
+        Args:
+            centroids: nlist x dim list centroids
+            vectors: Main vectors, ordered by list
+            ids: Id of every main vector
+            offsets: Start row of every list (nlist + 1 entries)
+            directory: Directory the index is persisted to, if any
+        """
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+        self.directory = directory
+        self._segments = {}
+        self._delta = None
+        self._deleted = np.zeros(0, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def train(cls, vectors: "np.ndarray", ids: Optional["np.ndarray"] = None, nlist: Optional[int] = None,
+              directory: Optional[str] = None, seed: int = 0) -> "IVFIndex":
+        """
+        Build an index, training its lists on the vectors.
+
+        Args:
+            vectors: Unit-length vectors
+            ids: Id of every vector (defaults to the row numbers)
+            nlist: Number of lists (defaults to default_nlist)
+            directory: Directory to persist the index to
+            seed: Seed of the k-means training
+
+        Returns:
+            The index
+        """
+        ids = np.arange(len(vectors), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        centroids = kmeans(vectors, nlist or default_nlist(len(vectors)), seed=seed)
+        index = cls(centroids, *_group(vectors, ids, centroids), directory=directory)
+        if directory is not None:
+            index.save(directory)
+        return index
+
+    @property
+    def nlist(self) -> int:
+        """Number of lists."""
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        delta = self._delta
+        return len(self.ids) + (len(delta[1]) if delta is not None else 0) - len(self._deleted)
+
+    def remove(self, ids: "np.ndarray") -> None:
+        """
+        Remove vectors from the search results.
+
+        Removed vectors are skipped before the best k are chosen, so they do
+        not take the place of live ones; compact() drops them from the arrays.
+
+        Args:
+            ids: Ids of the vectors
+        """
+        with self._lock:
+            self._deleted = np.union1d(self._deleted, np.asarray(ids, dtype=np.int64))
+
+    def _live(self, scores: "np.ndarray", ids: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """Drop the removed vectors from candidate (scores, ids)."""
+        if not len(self._deleted):
+            return scores, ids
+        keep = ~np.isin(ids, self._deleted)
+        return scores[keep], ids[keep]
+
+    def add(self, vectors: "np.ndarray", ids: "np.ndarray") -> None:
+        """
+        Insert vectors without retraining the lists.
+
+        Args:
+            vectors: Unit-length vectors
+            ids: Their ids
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+        name = f"{SEGMENT_PREFIX}{uuid.uuid4().hex}.npz"
+        if self.directory is not None:
+            save_array(self.directory, name, vectors=vectors, ids=ids)
+        with self._lock:
+            self._segments[name] = (vectors, ids)
+            self._rebuild_delta()
+
+    def refresh(self) -> bool:
+        """
+        Load the segments other processes added to the index directory.
+
+        Returns:
+            True if new segments were loaded
+        """
+        if self.directory is None:
+            return False
+        names = {name for name in os.listdir(self.directory)
+                 if name.startswith(SEGMENT_PREFIX) and name.endswith(".npz")}
+        with self._lock:
+            new_names = names - set(self._segments)
+            gone = set(self._segments) - names
+            if not new_names and not gone:
+                return False
+            for name in gone:
+                # Merged into the main arrays by another process's compact()
+                del self._segments[name]
+            for name in new_names:
+                try:
+                    with np.load(os.path.join(self.directory, name)) as segment:
+                        self._segments[name] = (segment["vectors"], segment["ids"])
+                except (OSError, ValueError):
+                    continue
+            if gone:
+                self._reload_main()
+            self._rebuild_delta()
+        return True
+
+    def _rebuild_delta(self) -> None:
+        """Group the added vectors by list (with the lock held)."""
+        if not self._segments:
+            self._delta = None
+            return
+        vectors = np.concatenate([segment[0] for segment in self._segments.values()])
+        ids = np.concatenate([segment[1] for segment in self._segments.values()])
+        self._delta = _group(vectors, ids, self.centroids)
+
+    def _reload_main(self) -> None:
+        """Map the main arrays written to the directory again (with the lock held)."""
+        self.vectors = np.load(os.path.join(self.directory, VECTORS_FILE), mmap_mode="r")
+        self.ids = np.load(os.path.join(self.directory, IDS_FILE), mmap_mode="r")
+        self.offsets = np.load(os.path.join(self.directory, OFFSETS_FILE))
+
+    def search(self, queries: "np.ndarray", k: int, nprobe: int = DEFAULT_NPROBE) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Find approximate nearest neighbors by dot product.
+
+        Args:
+            queries: b x dim unit-length query vectors
+            k: Number of neighbors per query
+            nprobe: Number of lists scanned per query (more is slower and
+                more accurate; nlist gives exact search)
+
+        Returns:
+            Tuple of (b x k scores, b x k ids), best first; missing
+            neighbors have score -inf and id -1
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = max(1, min(nprobe, self.nlist))
+        probes = np.argpartition(queries @ self.centroids.T, -nprobe, axis=1)[:, -nprobe:] \
+            if nprobe < self.nlist else np.broadcast_to(np.arange(self.nlist), (len(queries), self.nlist))
+
+        parts = [(self.vectors, self.ids, self.offsets)]
+        if self._delta is not None:
+            parts.append(self._delta)
+
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, (query, lists) in enumerate(zip(queries, probes)):
+            scores, ids = [], []
+            for vectors, part_ids, offsets in parts:
+                for list_id in lists:
+                    start, end = offsets[list_id], offsets[list_id + 1]
+                    if end > start:
+                        scores.append(np.asarray(vectors[start:end]) @ query)
+                        ids.append(part_ids[start:end])
+            if scores:
+                top_scores, top_ids = self._top(*self._live(np.concatenate(scores), np.concatenate(ids)), k)
+                all_scores[row, :len(top_ids)] = top_scores
+                all_ids[row, :len(top_ids)] = top_ids
+        return all_scores, all_ids
+
+    def exact_search(self, queries: "np.ndarray", k: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Find the exact nearest neighbors by scanning every vector block by block (see search)."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        parts = [(self.vectors, self.ids)]
+        if self._delta is not None:
+            parts.append(self._delta[:2])
+
+        scores, ids = [], []
+        for vectors, part_ids in parts:
+            for start in range(0, len(part_ids), BLOCK_ROWS):
+                block = np.asarray(vectors[start:start + BLOCK_ROWS]) @ queries.T
+                block_ids = np.asarray(part_ids[start:start + BLOCK_ROWS])
+                if len(self._deleted):
+                    keep = ~np.isin(block_ids, self._deleted)
+                    block, block_ids = block[keep], block_ids[keep]
+                if len(block) > k:
+                    rows = np.argpartition(block, -k, axis=0)[-k:]
+                    scores.append(np.take_along_axis(block, rows, axis=0))
+                    ids.append(block_ids[rows])
+                else:
+                    scores.append(block)
+                    ids.append(np.broadcast_to(block_ids[:, None], block.shape))
+
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if scores:
+            scores, ids = np.concatenate(scores).T, np.concatenate(ids).T
+            for row in range(len(queries)):
+                top_scores, top_ids = self._top(scores[row], ids[row], k)
+                all_scores[row, :len(top_ids)] = top_scores
+                all_ids[row, :len(top_ids)] = top_ids
+        return all_scores, all_ids
+
+    @staticmethod
+    def _top(scores: "np.ndarray", ids: "np.ndarray", k: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Return the k best (score, id) pairs, best first."""
+        if len(scores) > k:
+            best = np.argpartition(scores, -k)[-k:]
+            scores, ids = scores[best], ids[best]
+        order = np.argsort(-scores, kind="stable")
+        return scores[order], ids[order]
+
+    def save(self, directory: Optional[str] = None) -> None:
+        """
+        Write the main arrays to a directory.
+
+        Args:
+            directory: Target directory (defaults to the index directory)
+        """
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+        save_array(directory, CENTROIDS_FILE, self.centroids)
+        save_array(directory, OFFSETS_FILE, np.asarray(self.offsets))
+        save_array(directory, IDS_FILE, np.asarray(self.ids))
+        save_array(directory, VECTORS_FILE, np.asarray(self.vectors))
+        self.directory = directory
+
+    def compact(self) -> int:
+        """
+        Merge the added vectors into the main arrays, drop the removed ones and delete the segments.
+
+        Run it while no other process is adding to the index.
+
+        Returns:
+            Number of vectors merged
+        """
+        with self._lock:
+            if self._delta is None and not len(self._deleted):
+                return 0
+            merged = list(self._segments)
+            vectors, ids = np.asarray(self.vectors), np.asarray(self.ids)
+            added = 0
+            if self._delta is not None:
+                delta_vectors, delta_ids, _ = self._delta
+                vectors, ids = np.concatenate([vectors, delta_vectors]), np.concatenate([ids, delta_ids])
+                added = len(delta_ids)
+            keep = ~np.isin(ids, self._deleted)
+            self.vectors, self.ids, self.offsets = _group(vectors[keep], ids[keep], self.centroids)
+            self._segments.clear()
+            self._delta = None
+            self._deleted = np.zeros(0, dtype=np.int64)
+            if self.directory is not None:
+                self.save()
+                for name in merged:
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except FileNotFoundError:
+                        pass
+                self._reload_main()
+        return added
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "IVFIndex":
+        """
+        Open an index saved to a directory.
+
+        Args:
+            directory: Index directory
+            mmap: Map the vectors and ids from disk instead of reading them
+
+        Returns:
+            The index, with the added segments loaded
+        """
+        mode = "r" if mmap else None
+        index = cls(np.load(os.path.join(directory, CENTROIDS_FILE)),
+                    np.load(os.path.join(directory, VECTORS_FILE), mmap_mode=mode),
+                    np.load(os.path.join(directory, IDS_FILE), mmap_mode=mode),
+                    np.load(os.path.join(directory, OFFSETS_FILE)),
+                    directory=directory)
+        index.refresh()
+        return index
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Check whether a directory holds a saved index."""
+        return os.path.exists(os.path.join(directory, VECTORS_FILE))
+
+    def segment_count(self) -> int:
+        """Number of added segments not merged yet."""
+        return len(self._segments)
+
+    def list_sizes(self) -> List[int]:
+        """Number of main vectors in each list."""
+        return np.diff(self.offsets).tolist()
@@ -0,0 +1,542 @@
+"""
+Workspace Store - Server-side session state for the web app.
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+from .document_schema import DocumentLayout, validate_document
+from .snippets import Passage, iter_passages
+
+# Sections searched when a query is not restricted to one section
+SEARCH_SECTIONS = [
+    'core_principles', 'methodologies', 'frameworks', 'maturity_models',
+    'performance_metrics', 'implementation_best_practices',
+    'common_challenges', 'technology_enablers'
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workspaces (
+    id TEXT PRIMARY KEY,
+    active_file TEXT,
+    current_industry TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Seconds between removals of expired workspaces
+EXPIRE_INTERVAL = 3600
+
+
+class SearchIndex:
+    """
+    Items of a BPM document with their search text serialized once.
+
+    Searching used to serialize every item of every searched section on
+    each query; the index keeps the lowercased JSON of each item so a query
+    is a substring scan over prepared strings.
+
+    The strings of each item are also kept as passages with their token
+    offsets (built per section on first use), so matches can be returned
+    as highlighted snippets instead of whole items.
+    """
+
+    def __init__(self, data: Dict[str, Any], layout: Optional[DocumentLayout] = None,
+                 previous: Optional["SearchIndex"] = None, changed_sections: Iterable[str] = ()):
+        """
+        Build the index.
+
+        Args:
+            data: Parsed BPM document
+            layout: Layout of the validated document (the document is
+                validated here if it is not given)
+            previous: Index of an earlier version of the document whose
+                entries are reused for unchanged sections
+            changed_sections: Sections that differ from the earlier version
+        """
+        if layout is None:
+            data, layout = validate_document(data)
+
+        changed_sections = set(changed_sections)
+        self.sections = {}
+        self._passages = {}
+        for section in layout.sections:
+            if previous is not None and section not in changed_sections and section in previous.sections:
+                self.sections[section] = previous.sections[section]
+                if section in previous._passages:
+                    self._passages[section] = previous._passages[section]
+            else:
+                self.sections[section] = self._entries(section, data[section])
+
+    @staticmethod
+    def _entries(section: str, value: Any) -> List[Tuple[Any, str]]:
+        """Build the (item, search text) entries of a section."""
+        # Validation guarantees the listed sections are collections and metrics are nested
+        if isinstance(value, dict):
+            # Object sections (as in industry documents) are matched member by member
+            return [({key: item}, json.dumps({key: item}).lower()) for key, item in value.items()]
+        if section != 'performance_metrics':
+            return [(item, json.dumps(item).lower()) for item in value]
+
+        # Metrics are matched on their own fields and returned with their category
+        entries = []
+        for category in value:
+            for metric in category['metrics']:
+                result = metric.copy()
+                result['category'] = category['category']
+                entries.append((result, json.dumps(metric).lower()))
+        return entries
+
+    def search(self, search_term: str, query_type: str = 'all', snippets: bool = False) -> Dict[str, List[Any]]:
+        """
+        Find the items containing a search term.
+
+        Args:
+            search_term: Case-insensitive text to look for
+            query_type: Section to search, or 'all' for the standard sections
+            snippets: Add the path, snippet and highlight spans of the
+                matching string (see snippet) to a copy of each item; items
+                that are not objects are returned as {"description": item}
+
+        Returns:
+            Dictionary of matching items per section (sections without
+            matches are left out)
+        """
+        search_term = search_term.lower()
+        sections = SEARCH_SECTIONS if query_type == 'all' else [query_type]
+
+        results = {}
+        for section in sections:
+            entries = self.sections.get(section, ())
+            if snippets:
+                matches = [dict(item if isinstance(item, dict) else {"description": item},
+                                **self.snippet(section, position, search_term))
+                           for position, (item, text) in enumerate(entries) if search_term in text]
+            else:
+                matches = [item for item, text in entries if search_term in text]
+            if matches:
+                results[section] = matches
+        return results
+
+    def passages(self, section: str) -> List[List[Tuple[str, Passage]]]:
+        """
+        Get the passages of every item of a section, building them on first use.
+
+        Args:
+            section: Section name
+
+        Returns:
+            For each entry of the section, its (path, passage) pairs
+        """
+        passages = self._passages.get(section)
+        if passages is None:
+            passages = self._passages[section] = [list(iter_passages(item))
+                                                  for item, _ in self.sections.get(section, ())]
+        return passages
+
+    def snippet(self, section: str, position: int, search_term: str) -> Dict[str, Any]:
+        """
+        Cut a highlighted snippet of an item for a search term.
+
+        Args:
+            section: Section of the item
+            position: Position of the item in the section's entries
+            search_term: Lowercased search term
+
+        Returns:
+            Dictionary with the path of the first string of the item
+            containing the term (or of its first string if the term only
+            matched a key), the snippet and its highlight spans
+        """
+        passages = self.passages(section)[position]
+        for path, passage in passages:
+            spans = passage.find(search_term)
+            if spans:
+                return dict(path=path, **passage.snippet(spans))
+        if passages:
+            path, passage = passages[0]
+            return dict(path=path, **passage.snippet([]))
+        return {"path": "", "snippet": "", "highlights": []}
+
+
+class CachedDocument:
+    """A validated JSON document, its layout, the file version it was read from, and its search index."""
+
+    __slots__ = ("path", "version", "data", "layout", "_search_index")
+
+    def __init__(self, path: str, version: Tuple[int, int, int, int], data: Any, layout: DocumentLayout):
+        self.path = path
+        self.version = version
+        self.data = data
+        self.layout = layout
+        self._search_index = None
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Search index of the document, built on first use."""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.data, self.layout)
+        return self._search_index
+
+
+def file_version(path: str) -> Tuple[int, int, int, int]:
+    """Return the (device, inode, size, modification time) tuple that identifies a file version."""
+    stat = os.stat(path)
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class DocumentCache:
+    """
+    LRU cache of parsed JSON documents shared by all workspaces.
+
+    Documents are validated and normalized once when they are read, so
+    code serving them can rely on their layout.
+
+    Documents are keyed by file identity (device and inode), so file names
+    that are hard links to the same stored upload share one entry. A
+    document is revalidated with a stat call on every access, so files
+    replaced by another worker process are picked up on the next request
+    without re-reading unchanged files.
+    """
+
+    def __init__(self, capacity: int = 64):
+        """
+        Initialize the cache.
+
+        Args:
+            capacity: Maximum number of documents kept in memory
+        """
+        self.capacity = capacity
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, path: str) -> CachedDocument:
+        """
+        Get the current version of a document, parsing it if needed.
+
+        Args:
+            path: Path of the JSON file
+
+        Returns:
+            The cached document
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not valid JSON
+            SchemaError: If the document does not match its schema
+        """
+        version = file_version(path)
+        key = version[:2]
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None and document.version == version:
+                self._documents.move_to_end(key)
+                return document
+
+        with open(path, 'r') as f:
+            data, layout = validate_document(json.load(f))
+        document = CachedDocument(path, version, data, layout)
+
+        with self._lock:
+            self.loads += 1
+            self._store(key, document)
+        return document
+
+    def put(self, path: str, data: Any, layout: DocumentLayout, previous: Optional[CachedDocument] = None,
+            changed_sections: Iterable[str] = ()) -> CachedDocument:
+        """
+        Cache a document just written to a file, without reading it back.
+
+        If the earlier version of the document had a search index, the new
+        index reuses the entries of the unchanged sections.
+
+        Args:
+            path: Path the document was written to
+            data: The validated document
+            layout: Its layout
+            previous: Cached earlier version of the document
+            changed_sections: Sections that differ from the earlier version
+
+        Returns:
+            The cached document
+        """
+        version = file_version(path)
+        document = CachedDocument(path, version, data, layout)
+        if previous is not None and previous._search_index is not None:
+            document._search_index = SearchIndex(data, layout, previous._search_index, changed_sections)
+
+        with self._lock:
+            self._store(version[:2], document)
+        return document
+
+    def _store(self, key: Tuple[int, int], document: CachedDocument) -> None:
+        """Insert a document as the most recently used one (with the lock held)."""
+        self._documents[key] = document
+        self._documents.move_to_end(key)
+        while len(self._documents) > self.capacity:
+            self._documents.popitem(last=False)
+
+    def revalidate(self, document: Optional[CachedDocument], path: str) -> Optional[CachedDocument]:
+        """Return a document if the file at path is still the one it was read from, else None."""
+        if document is None:
+            return None
+        try:
+            return document if file_version(path) == document.version else None
+        except OSError:
+            return None
+
+    def invalidate(self, path: str) -> None:
+        """Drop the document read from a file from the cache."""
+        try:
+            key = file_version(path)[:2]
+        except OSError:
+            return
+        with self._lock:
+            self._documents.pop(key, None)
+
+
+class Workspace:
+    """
+    Server-side state of one browser session.
+
+    Holds the active file, the resolved path and parsed document of that
+    file, and the selected industry. The document reference is pinned on
+    the workspace so requests skip the cache lookup while the file is
+    unchanged.
+    """
+
+    __slots__ = ("workspace_id", "active_file", "current_industry", "path", "document", "is_new", "modified")
+
+    def __init__(self, workspace_id: str, active_file: str, current_industry: Optional[str] = None,
+                 is_new: bool = False):
+        self.workspace_id = workspace_id
+        self.active_file = active_file
+        self.current_industry = current_industry
+        self.path = None
+        self.document = None
+        self.is_new = is_new
+        self.modified = False
+
+    def set_active_file(self, filename: str) -> None:
+        """Switch the active file, dropping the resolved document."""
+        if filename != self.active_file:
+            self.active_file = filename
+            self.path = None
+            self.document = None
+            self.modified = True
+
+    def set_current_industry(self, industry_name: Optional[str]) -> None:
+        """Select an industry (None clears the selection)."""
+        if industry_name != self.current_industry:
+            self.current_industry = industry_name
+            self.modified = True
+
+
+class MemoryWorkspaceStore:
+    """
+    In-process LRU store of workspaces.
+
+    Workspaces are kept as objects, so their resolved documents survive
+    between requests. State is not shared between worker processes.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize the store.
+
+        Args:
+            capacity: Maximum number of workspaces kept
+        """
+        self.capacity = capacity
+        self._workspaces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, workspace_id: str) -> Optional[Workspace]:
+        """Return a stored workspace, or None if it is unknown or was evicted."""
+        with self._lock:
+            workspace = self._workspaces.get(workspace_id)
+            if workspace is not None:
+                self._workspaces.move_to_end(workspace_id)
+            return workspace
+
+    def save(self, workspace: Workspace) -> None:
+        """Store a workspace."""
+        with self._lock:
+            self._workspaces[workspace.workspace_id] = workspace
+            self._workspaces.move_to_end(workspace.workspace_id)
+            while len(self._workspaces) > self.capacity:
+                self._workspaces.popitem(last=False)
+
+    def delete(self, workspace_id: str) -> None:
+        """Remove a workspace."""
+        with self._lock:
+            self._workspaces.pop(workspace_id, None)
+
+    def expire(self, max_age: float) -> int:
+        """Nothing to remove: the store is bounded by its capacity instead of by age."""
+        return 0
+
+
+class SQLiteWorkspaceStore:
+    """
+    SQLite store of workspaces, shared by every worker process.
+
+    Only the active file and industry are persisted; each process resolves
+    the documents through its own DocumentCache.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        Open (and if needed create) the store.
+
+        Args:
+            db_path: Path of the SQLite database file, or ":memory:"
+        """
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def load(self, workspace_id: str) -> Optional[Workspace]:
+        """Return a stored workspace, or None if it is unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT active_file, current_industry FROM workspaces WHERE id = ?",
+                                     (workspace_id,)).fetchone()
+        if row is None:
+            return None
+        return Workspace(workspace_id, row[0], row[1])
+
+    def save(self, workspace: Workspace) -> None:
+        """Store a workspace."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO workspaces (id, active_file, current_industry, updated_at) "
+                               "VALUES (?, ?, ?, ?)",
+                               (workspace.workspace_id, workspace.active_file, workspace.current_industry,
+                                time.time()))
+
+    def delete(self, workspace_id: str) -> None:
+        """Remove a workspace."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM workspaces WHERE id = ?", (workspace_id,))
+
+    def expire(self, max_age: float) -> int:
+        """
+        Remove workspaces that have not been saved for a while.
+
+        Args:
+            max_age: Age in seconds after which a workspace is removed
+
+        Returns:
+            Number of removed workspaces
+        """
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM workspaces WHERE updated_at < ?",
+                                      (time.time() - max_age,)).rowcount
+
+
+def create_workspace_store(backend: str, db_path: Optional[str] = None, capacity: int = 10000):
+    """
+    Create a workspace store.
+
+    Args:
+        backend: "memory" or "sqlite"
+        db_path: Database path for the SQLite backend
+        capacity: Maximum number of workspaces of the memory backend
+
+    Returns:
+        The workspace store
+    """
+    if backend == "memory":
+        return MemoryWorkspaceStore(capacity)
+    if backend == "sqlite":
+        return SQLiteWorkspaceStore(db_path or ":memory:")
+    raise ValueError(f"Unknown workspace store backend: {backend}")
+
+
+class WorkspaceManager:
+    """
+    Resolves workspaces and their active documents for incoming requests.
+    """
+
+    def __init__(self, store, documents: DocumentCache, resolve_path: Callable[[str], str], default_file: str,
+                 max_age: Optional[float] = None, expire_interval: float = EXPIRE_INTERVAL):
+        """
+        Initialize the manager.
+
+        Args:
+            store: MemoryWorkspaceStore or SQLiteWorkspaceStore
+            documents: Cache of parsed documents
+            resolve_path: Callable mapping a file name to its path on disk
+            default_file: File that new workspaces start with
+            max_age: Age in seconds after which unsaved workspaces are removed,
+                or None to keep them
+            expire_interval: Minimum number of seconds between removals
+        """
+        self.store = store
+        self.documents = documents
+        self.resolve_path = resolve_path
+        self.default_file = default_file
+        self.max_age = max_age
+        self.expire_interval = expire_interval
+        self._next_expiry = 0.0
+
+    def get(self, workspace_id: Optional[str]) -> Workspace:
+        """
+        Load a workspace, or start a new one if the id is missing or unknown.
+
+        New workspaces are only stored once they are modified.
+        """
+        if workspace_id:
+            workspace = self.store.load(workspace_id)
+            if workspace is not None:
+                return workspace
+        return Workspace(secrets.token_urlsafe(24), self.default_file, is_new=True)
+
+    def save(self, workspace: Workspace) -> None:
+        """Store a workspace if the request modified it."""
+        if workspace.modified:
+            self.store.save(workspace)
+            workspace.modified = False
+            workspace.is_new = False
+            self.expire()
+
+    def expire(self) -> int:
+        """
+        Remove expired workspaces if the last removal is old enough.
+
+        Returns:
+            Number of removed workspaces
+        """
+        now = time.time()
+        if self.max_age is None or now < self._next_expiry:
+            return 0
+        self._next_expiry = now + self.expire_interval
+        return self.store.expire(self.max_age)
+
+    def document(self, workspace: Workspace) -> CachedDocument:
+        """
+        Return the parsed active document of a workspace.
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not valid JSON
+        """
+        document = self.documents.revalidate(workspace.document, workspace.path)
+        if document is None:
+            if workspace.path is None:
+                workspace.path = self.resolve_path(workspace.active_file)
+            document = self.documents.get(workspace.path)
+            workspace.document = document
+        return document
@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.analysis_cache import AnalysisBundleCache, BUNDLE_SECTIONS, compute_data_version
+
+class TestAnalysisBundleCache(unittest.TestCase):
+    """Test cases for the precomputed industry analysis bundles."""
+
+    def setUp(self):
+        """Copy the data files to a scratch directory for each test."""
+        source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.tmp_dir, 'data')
+        os.makedirs(self.data_dir)
+        for filename in ('bpm_principles.json', 'electric_vehicle_industry.json'):
+            shutil.copy(os.path.join(source_dir, filename), self.data_dir)
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_bundle_contains_all_sections(self):
+        """Test that a bundle holds the result of every analysis method."""
+        cache = AnalysisBundleCache(self.data_dir)
+        bundle = cache.get('electric vehicle')
+
+        self.assertIsNotNone(bundle)
+        for section in BUNDLE_SECTIONS:
+            self.assertIn(section, bundle, f"Bundle missing section: {section}")
+        self.assertIn('forces', bundle['porter_five_forces'])
+        self.assertIn('perspectives', bundle['balanced_scorecard'])
+        self.assertIn('short_term', bundle['optimization_recommendations'])
+
+    def test_bundle_built_once_per_version(self):
+        """Test that repeated lookups reuse the bundle until the data changes."""
+        cache = AnalysisBundleCache(self.data_dir)
+        first = cache.get('electric_vehicle')
+        second = cache.get('Electric Vehicle')
+
+        self.assertIs(first, second)
+        self.assertEqual(cache.builds, 1)
+
+        # Touching the industry file produces a new data version
+        industry_path = os.path.join(self.data_dir, 'electric_vehicle_industry.json')
+        old_version = compute_data_version(self.data_dir, 'electric vehicle')
+        stat = os.stat(industry_path)
+        os.utime(industry_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertNotEqual(compute_data_version(self.data_dir, 'electric vehicle'), old_version)
+
+        cache.get('electric vehicle')
+        self.assertEqual(cache.builds, 2)
+
+    def test_shared_cache_directory(self):
+        """Test that a second cache instance reuses bundles written by the first."""
+        AnalysisBundleCache(self.data_dir, cache_dir=self.cache_dir).get('electric vehicle')
+
+        other = AnalysisBundleCache(self.data_dir, cache_dir=self.cache_dir)
+        bundle = other.get('electric vehicle')
+
+        self.assertIsNotNone(bundle)
+        self.assertEqual(other.builds, 0)
+
+    def test_unknown_industry(self):
+        """Test that an unknown industry yields no bundle."""
+        cache = AnalysisBundleCache(self.data_dir)
+        self.assertIsNone(cache.get('space tourism'))
+        self.assertEqual(cache.available_industries(), ['electric vehicle'])
+
+    def test_refresh_recomputes_dependent_sections(self):
+        """Test that a data edit recomputes only the analyses that read the changed sections."""
+        cache = AnalysisBundleCache(self.data_dir, cache_dir=self.cache_dir)
+        self.assertIsNone(cache.refresh('electric vehicle', {'competitive_landscape'}))
+        bundle = cache.get('electric vehicle')
+
+        industry_path = os.path.join(self.data_dir, 'electric_vehicle_industry.json')
+        with open(industry_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['competitive_landscape'] = {'market_leaders': ['New Entrant']}
+        with open(industry_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        stat = os.stat(industry_path)
+        os.utime(industry_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        self.assertEqual(cache.refresh('electric vehicle', {'competitive_landscape'}), ['competitive_landscape'])
+        refreshed = cache.get('electric vehicle')
+        self.assertEqual(cache.builds, 1)
+        self.assertEqual(cache.refreshes, 1)
+        self.assertIs(refreshed['value_chain'], bundle['value_chain'])
+        self.assertEqual(refreshed['competitive_landscape'], {'market_leaders': ['New Entrant']})
+
+        # The refreshed bundle is shared with other processes under the new data version
+        other = AnalysisBundleCache(self.data_dir, cache_dir=self.cache_dir)
+        self.assertEqual(other.get('electric vehicle')['competitive_landscape'], {'market_leaders': ['New Entrant']})
+        self.assertEqual(other.builds, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+import unittest
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+def slow_wsgi_app(calls, delay):
+    """Build a WSGI app that counts its calls and takes ``delay`` seconds per POST."""
+    lock = threading.Lock()
+
+    def wsgi_app(environ, start_response):
+        with lock:
+            calls.append(environ['REQUEST_METHOD'])
+        body = environ['wsgi.input'].read(int(environ['CONTENT_LENGTH'] or 0))
+        if environ['REQUEST_METHOD'] == 'POST':
+            time.sleep(delay)
+        else:
+            time.sleep(0.05)
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [environ['PATH_INFO'].encode('utf-8'), b':', str(len(body)).encode('utf-8')]
+
+    return wsgi_app
+
+class TestASGI(unittest.TestCase):
+    """Test cases for the ASGI serving mode."""
+
+    @classmethod
+    def setUpClass(cls):
+        # The web app creates its upload and cache folders in the working directory
+        cls.previous_dir = os.getcwd()
+        cls.work_dir = tempfile.mkdtemp()
+        os.chdir(cls.work_dir)
+
+        from enhanced_bpm.web import app as web_app
+        from enhanced_bpm.web.asgi import ASGIApp
+        from enhanced_bpm.web.asgi_load_test import LocalClient
+        cls.web_app = web_app
+        cls.ASGIApp = ASGIApp
+        cls.LocalClient = LocalClient
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.previous_dir)
+        shutil.rmtree(cls.work_dir)
+
+    def serve(self, app, coroutine_factory):
+        """Run requests against an ASGIApp and shut its executors down afterwards."""
+        async def run():
+            try:
+                return await coroutine_factory(self.LocalClient(app))
+            finally:
+                await app.shutdown()
+        return asyncio.run(run())
+
+    def test_same_responses_as_wsgi(self):
+        """Test that routes and templates behave as under the WSGI server."""
+        app = self.ASGIApp(self.web_app.app)
+        client = self.web_app.app.test_client()
+
+        async def requests(local):
+            return [await local.get(path) for path in ('/', '/api/industry/electric_vehicle', '/missing')]
+
+        (page, _, _), (status, headers, body), (missing, _, _) = self.serve(app, requests)
+        self.assertEqual(page, 200)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['content-type'], 'application/json')
+        self.assertEqual(json.loads(body), client.get('/api/industry/electric_vehicle').get_json())
+        self.assertEqual(missing, 404)
+
+    def test_upload(self):
+        """Test a multipart upload received in chunks and saved by the upload view."""
+        app = self.ASGIApp(self.web_app.app)
+        content = json.dumps({"items": list(range(200000))}).encode('utf-8')
+
+        async def upload(local):
+            local.chunk_size = 4096
+            return await local.upload('/upload', 'asgi_upload.json', content)
+
+        status, _, _ = self.serve(app, upload)
+        self.assertEqual(status, 302)
+        with open(os.path.join(self.work_dir, 'uploads', 'asgi_upload.json'), 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    def test_body_too_large(self):
+        """Test that oversized bodies are rejected before the app runs."""
+        calls = []
+        app = self.ASGIApp(slow_wsgi_app(calls, 0), max_body_size=1024)
+
+        status, _, _ = self.serve(app, lambda local: local.request('POST', '/upload', b'x' * 4096))
+        self.assertEqual(status, 413)
+        self.assertEqual(calls, [])
+
+    def test_invalid_content_length(self):
+        """Test that the server answers malformed, negative and oversized Content-Length headers with 400."""
+        from enhanced_bpm.web.asgi import handle_connection
+        calls = []
+        app = self.ASGIApp(slow_wsgi_app(calls, 0), max_body_size=1024)
+
+        async def requests():
+            server = await asyncio.start_server(lambda r, w: handle_connection(app, r, w, app.max_body_size),
+                                                '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            responses = []
+            try:
+                for length in (b'abc', b'-5', b'+5', b'4096', b'5'):
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    writer.write(b'POST /echo HTTP/1.1\r\nHost: test\r\nContent-Length: ' + length +
+                                 b'\r\nConnection: close\r\n\r\nhello')
+                    responses.append(await asyncio.wait_for(reader.read(), 10))
+                    writer.close()
+            finally:
+                server.close()
+                await server.wait_closed()
+                await app.shutdown()
+            return responses
+
+        responses = asyncio.run(requests())
+        for response in responses[:4]:
+            self.assertTrue(response.startswith(b'HTTP/1.1 400 Bad Request\r\n'))
+            self.assertIn(b'Connection: close', response)
+        self.assertTrue(responses[4].startswith(b'HTTP/1.1 200 OK\r\n'))
+        self.assertIn(b'/echo:5', responses[4])
+        self.assertEqual(calls, ['POST'])
+
+    def test_concurrent_polls_are_coalesced(self):
+        """Test that identical API polls in flight share one call and other paths do not."""
+        calls = []
+        app = self.ASGIApp(slow_wsgi_app(calls, 0))
+
+        async def polls(local):
+            return await asyncio.gather(*[local.get('/api/kpi') for _ in range(500)],
+                                        *[local.get('/dashboard') for _ in range(3)])
+
+        responses = self.serve(app, polls)
+        self.assertTrue(all(status == 200 for status, _, _ in responses))
+        self.assertEqual(responses[0][2], b'/api/kpi:0')
+        self.assertLessEqual(len(calls), 3 + 3)
+        self.assertGreaterEqual(app.stats['coalesced'], 494)
+
+    def test_slow_writes_do_not_block_reads(self):
+        """Test that polls are answered while uploads occupy the write executor."""
+        calls = []
+        app = self.ASGIApp(slow_wsgi_app(calls, 1.0), write_workers=2)
+
+        async def mixed(local):
+            uploads = [asyncio.create_task(local.request('POST', '/upload', b'data')) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            await asyncio.gather(*[local.get(f'/api/kpi/{i}') for i in range(20)])
+            poll_seconds = time.perf_counter() - start
+            await asyncio.gather(*uploads)
+            return poll_seconds
+
+        self.assertLess(self.serve(app, mixed), 0.5)
+
+    def test_lifespan(self):
+        """Test that lifespan startup runs the startup hook on an executor."""
+        started = []
+        app = self.ASGIApp(slow_wsgi_app([], 0), startup=lambda: started.append(threading.current_thread().name))
+
+        async def lifespan():
+            messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+            sent = []
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                sent.append(message["type"])
+
+            await app({"type": "lifespan"}, receive, send)
+            return sent
+
+        self.assertEqual(asyncio.run(lifespan()), ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        self.assertTrue(started[0].startswith("bpm-write"))
+
+if __name__ == '__main__':
+    unittest.main()
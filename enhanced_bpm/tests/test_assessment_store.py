@@ -0,0 +1,112 @@
+import unittest
+import json
+import os
+import sys
+import shutil
+import statistics
+import tempfile
+import threading
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.assessment_store import AssessmentStore, welford_update
+from enhanced_bpm.models.maturity_scoring import MaturityScoringEngine
+
+class TestAssessmentStore(unittest.TestCase):
+    """Test cases for the persistent assessment store and its aggregates."""
+
+    def setUp(self):
+        self.store = AssessmentStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def make_result(self, overall, design):
+        """Create a scored assessment result."""
+        return {"overall_score": overall, "level": round(overall), "dimension_scores": {"design": design}}
+
+    def test_welford_matches_statistics(self):
+        """Test the running variance against the statistics module."""
+        values = [2.5, 3.0, 4.25, 1.0, 3.75]
+        state = (0, 0.0, 0.0)
+        for value in values:
+            state = welford_update(*state, value)
+
+        count, mean, m2 = state
+        self.assertEqual(count, len(values))
+        self.assertAlmostEqual(mean, statistics.mean(values))
+        self.assertAlmostEqual(m2 / (count - 1), statistics.variance(values))
+
+    def test_incremental_aggregates(self):
+        """Test that aggregates follow single and batch inserts per scope."""
+        self.store.add(self.make_result(2.0, 1.0), "acme", "electric vehicle")
+        self.store.add_many([self.make_result(4.0, 3.0), self.make_result(3.0, 5.0)],
+                            "globex", "electric vehicle")
+        self.store.add(self.make_result(5.0, 5.0), "acme", "retail")
+
+        overall = self.store.aggregates()["overall"]
+        self.assertEqual(overall["count"], 4)
+        self.assertAlmostEqual(overall["mean"], 3.5)
+        self.assertAlmostEqual(overall["variance"], statistics.variance([2.0, 4.0, 3.0, 5.0]), places=4)
+
+        acme = self.store.aggregates(organization="acme")
+        self.assertEqual(acme["design"]["count"], 2)
+        self.assertAlmostEqual(acme["design"]["mean"], 3.0)
+
+        ev = self.store.aggregates(industry="electric vehicle")
+        self.assertEqual(ev["overall"]["count"], 3)
+        self.assertEqual(self.store.aggregates(industry="unknown"), {})
+
+    def test_unanswered_dimensions_are_not_aggregated(self):
+        """Test that dimensions without answers, and empty assessments, do not pull the means to zero."""
+        json_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'bpm_principles.json')
+        with open(json_path, 'r', encoding='utf-8') as f:
+            engine = MaturityScoringEngine(json.load(f))
+        first, second = engine.dimensions[:2]
+        partial = {"responses": {first["id"]: {question["id"]: 4 for question in first["questions"]}}}
+        results = engine.score_batch([partial, {"responses": {}}])["results"]
+        self.store.add_many(results, "acme", "electric vehicle")
+
+        aggregates = self.store.aggregates(organization="acme")
+        self.assertEqual(aggregates[first["id"]]["count"], 1)
+        self.assertEqual(aggregates[first["id"]]["mean"], 4.0)
+        self.assertNotIn(second["id"], aggregates)
+        self.assertEqual(aggregates["overall"]["count"], 1)
+        self.assertEqual(aggregates["overall"]["mean"], 4.0)
+
+    def test_list_assessments(self):
+        """Test filtering stored assessments by organization and time."""
+        self.store.add(self.make_result(2.0, 1.0), "acme", "electric vehicle", submitted_at=100.0)
+        self.store.add(self.make_result(3.0, 2.0), "acme", "electric vehicle", submitted_at=200.0)
+        self.store.add(self.make_result(4.0, 3.0), "globex", "retail", submitted_at=300.0)
+
+        acme = self.store.list_assessments(organization="acme")
+        self.assertEqual([a["submitted_at"] for a in acme], [200.0, 100.0])
+        self.assertEqual(acme[0]["result"]["overall_score"], 3.0)
+        self.assertEqual(len(self.store.list_assessments(since=200.0)), 2)
+
+    def test_concurrent_writers(self):
+        """Test that stores sharing a database file (one per worker process) never lose aggregate updates."""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        stores = [AssessmentStore(os.path.join(work_dir, "assessments.db")) for _ in range(4)]
+        for store in stores:
+            self.addCleanup(store.close)
+
+        def submit(store):
+            for i in range(25):
+                store.add(self.make_result(float(i % 5), 2.0), "acme", "electric vehicle")
+
+        threads = [threading.Thread(target=submit, args=(store,)) for store in stores]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        overall = stores[0].aggregates(organization="acme")["overall"]
+        self.assertEqual(overall["count"], 100)
+        self.assertAlmostEqual(overall["mean"], 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
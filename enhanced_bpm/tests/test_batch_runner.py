@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import io
+import json
+import shutil
+import tempfile
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.main import parse_args, run_batch
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for the headless batch analysis runner."""
+
+    def setUp(self):
+        # Two industries backed by the same sample data
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        self.data_dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(data_dir, 'bpm_principles.json'), self.data_dir)
+        for name in ('electric_vehicle', 'autonomous_vehicle'):
+            shutil.copy(os.path.join(data_dir, 'electric_vehicle_industry.json'),
+                        os.path.join(self.data_dir, f'{name}_industry.json'))
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def run_records(self, workers):
+        """Run a small batch and parse the JSON lines it writes."""
+        output = io.StringIO()
+        written = run_batch(self.data_dir, ["electric vehicle", "autonomous vehicle", "unknown"],
+                            ["What are the key challenges?"], ["porter_five_forces"], output, workers)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(written, len(records))
+        return records
+
+    def test_records_per_industry(self):
+        """Test one record per framework and question, in industry order."""
+        records = self.run_records(workers=1)
+
+        self.assertEqual([(r["industry"], r["type"]) for r in records], [
+            ("electric vehicle", "framework"), ("electric vehicle", "question"),
+            ("autonomous vehicle", "framework"), ("autonomous vehicle", "question"),
+            ("unknown", "industry")
+        ])
+        self.assertIn("forces", records[0]["result"])
+        self.assertIn("challenges", records[1]["result"].lower())
+        self.assertIn("error", records[-1])
+
+    def test_process_pool_matches_serial(self):
+        """Test that the worker pool produces the same records."""
+        strip = lambda records: [{k: v for k, v in r.items() if k != "elapsed_ms"} for r in records]
+        self.assertEqual(strip(self.run_records(workers=2)), strip(self.run_records(workers=1)))
+
+    def test_unknown_framework(self):
+        """Test that unknown frameworks are rejected before any work starts."""
+        with self.assertRaises(ValueError):
+            run_batch(self.data_dir, ["electric vehicle"], [], ["swot"], io.StringIO())
+
+    def test_parse_args(self):
+        """Test the batch command line options."""
+        args = parse_args(["--batch", "--industry", "electric vehicle", "--question", "Who are the key players?",
+                           "--framework", "value_chain", "--workers", "3", "--output", "report.jsonl"])
+
+        self.assertTrue(args.batch)
+        self.assertEqual(args.industries, ["electric vehicle"])
+        self.assertEqual(args.frameworks, ["value_chain"])
+        self.assertEqual(args.workers, 3)
+
+if __name__ == '__main__':
+    unittest.main()
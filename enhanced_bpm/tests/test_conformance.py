@@ -0,0 +1,130 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.bpm_analyzer import BPMAnalyzer
+from enhanced_bpm.models.conformance import ConformanceChecker, build_footprint, replay_trace
+from enhanced_bpm.models.process_graph import ProcessGraph
+from enhanced_bpm.tests.web_helpers import isolated_web_app
+
+class TestConformance(unittest.TestCase):
+    """Test cases for conformance checking of event logs against process models."""
+
+    def setUp(self):
+        self.bpmn = {
+            "name": "Order to Delivery",
+            "flowElements": [
+                {"id": "start", "type": "startEvent"},
+                {"id": "receive", "name": "Receive Order"},
+                {"id": "split", "type": "parallelGateway"},
+                {"id": "pick", "name": "Pick Parts"},
+                {"id": "paint", "name": "Paint Body"},
+                {"id": "join", "type": "parallelGateway"},
+                {"id": "ship", "name": "Ship"},
+                {"id": "end", "type": "endEvent"}
+            ],
+            "sequenceFlows": [
+                {"sourceRef": "start", "targetRef": "receive"},
+                {"sourceRef": "receive", "targetRef": "split"},
+                {"sourceRef": "split", "targetRef": "pick"},
+                {"sourceRef": "split", "targetRef": "paint"},
+                {"sourceRef": "pick", "targetRef": "join"},
+                {"sourceRef": "paint", "targetRef": "join"},
+                {"sourceRef": "join", "targetRef": "ship"},
+                {"sourceRef": "ship", "targetRef": "end"}
+            ]
+        }
+        self.model = ProcessGraph.from_bpmn(self.bpmn)
+        self.variants = [
+            {"activities": ["Receive Order", "Pick Parts", "Paint Body", "Ship"], "count": 6},
+            {"activities": ["Receive Order", "Paint Body", "Pick Parts", "Ship"], "count": 2},
+            {"activities": ["Receive Order", "Ship"], "count": 1},
+            {"activities": ["Receive Order", "Pick Parts", "Rework", "Paint Body", "Ship"], "count": 1}
+        ]
+
+    def test_footprint(self):
+        """Test that events and gateways are collapsed into the footprint."""
+        footprint = build_footprint(self.model)
+
+        self.assertEqual(footprint["start"], {"Receive Order"})
+        self.assertEqual(footprint["end"], {"Ship"})
+        self.assertIn(("Receive Order", "Paint Body"), footprint["transitions"])
+        self.assertIn(("Paint Body", "Pick Parts"), footprint["transitions"])
+        self.assertNotIn(("Receive Order", "Ship"), footprint["transitions"])
+
+    def test_replay_trace(self):
+        """Test fitness and deviations of single traces."""
+        footprint = build_footprint(self.model)
+
+        self.assertEqual(replay_trace(footprint, ["Receive Order", "Paint Body", "Pick Parts", "Ship"]), (1.0, []))
+        fitness, deviations = replay_trace(footprint, ["Pick Parts", "Ship", "Paint Body"])
+        self.assertAlmostEqual(fitness, 0.25)
+        self.assertEqual([d[0] for d in deviations],
+                         ["unexpected_start", "unexpected_transition", "unexpected_end"])
+
+    def test_check_weights_variants_by_cases(self):
+        """Test log-level fitness and hotspots weighted by case counts."""
+        results = ConformanceChecker(self.model).check(self.variants)
+
+        self.assertEqual(results["cases"], 10)
+        self.assertEqual(results["conforming_cases"], 8)
+        self.assertAlmostEqual(results["fitness"], (8 + 2 / 3 + 5 / 6) / 10, places=4)
+        locations = {h["location"] for h in results["hotspots"]}
+        self.assertIn("Receive Order -> Ship", locations)
+        self.assertIn("Rework", locations)
+        self.assertEqual(results["least_fitting_variants"][0]["activities"], ["Receive Order", "Ship"])
+
+    def test_parallel_check_matches_serial(self):
+        """Test that replaying in worker processes gives the same results."""
+        checker = ConformanceChecker(self.model)
+        self.assertEqual(checker.check(self.variants, workers=2), checker.check(self.variants, workers=1))
+
+    def test_answer_question(self):
+        """Test that the analyzer answers deviation questions from the results."""
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        analyzer = BPMAnalyzer(data_dir=data_dir)
+        analyzer.set_current_industry("electric vehicle")
+
+        self.assertIn("No conformance results", analyzer.answer_question("Where do we deviate?"))
+        analyzer.set_conformance_results(ConformanceChecker(self.model).check(self.variants))
+        answer = analyzer.answer_question("Where do we deviate from the process?")
+        self.assertIn("Receive Order -> Ship", answer)
+        self.assertIn("Conforming cases: 8", answer)
+
+    def test_web_results_answer_questions(self):
+        """Test that results checked in the web app answer questions there and in main.py."""
+        from enhanced_bpm.main import create_analyzer
+
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        web_app = isolated_web_app(self, work_dir, MAX_REQUEST_WORKERS=2)
+        store = web_app.get_upload_store()
+        store.add_bytes('log.json', json.dumps({"variants": self.variants}).encode('utf-8'))
+        store.add_bytes('log.csv', b'case,activity\n1,Ship\n')
+        client = web_app.app.test_client()
+
+        response = client.post('/api/conformance/check', json={"event_log": "log.csv", "model": self.bpmn})
+        self.assertEqual(response.status_code, 400)
+        response = client.post('/api/conformance/check',
+                               json={"event_log": "log.json", "model": self.bpmn, "workers": 500})
+        self.assertEqual(response.status_code, 200)
+
+        response = client.post('/api/industry/electric_vehicle/ask', json={"question": "Where do we deviate?"})
+        self.assertIn("Receive Order -> Ship", response.get_json()["answer"])
+        self.assertEqual(client.post('/api/industry/unknown/ask', json={"question": "Hi"}).status_code, 404)
+        self.assertIs(web_app.question_analyzer.anomaly_monitor, web_app.anomaly_monitor)
+        self.assertIs(web_app.question_analyzer.kpi_store, web_app.kpi_store)
+
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        analyzer = create_analyzer(data_dir, web_app.app.config['CONFORMANCE_RESULTS'])
+        analyzer.set_current_industry("electric vehicle")
+        self.assertIn("Receive Order -> Ship", analyzer.answer_question("Where do we deviate?"))
+
+if __name__ == '__main__':
+    unittest.main()
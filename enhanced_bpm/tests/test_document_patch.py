@@ -0,0 +1,139 @@
+import unittest
+import os
+import sys
+import copy
+import json
+import shutil
+import tempfile
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.document_patch import (
+    PatchConflict, PatchError, apply_json_patch, apply_merge_patch, changed_sections, parse_pointer
+)
+from enhanced_bpm.tests.web_helpers import isolated_web_app
+
+class TestDocumentPatch(unittest.TestCase):
+    """Test cases for JSON Patch and JSON Merge Patch updates of documents."""
+
+    def setUp(self):
+        self.document = {
+            "methodologies": [{"name": "Lean", "tools": ["5S"]}, {"name": "Six Sigma"}],
+            "frameworks": [{"name": "SCOR"}],
+            "title": "BPM"
+        }
+        self.original = copy.deepcopy(self.document)
+
+    def test_json_patch_operations(self):
+        """Test add, remove, replace, move, copy and test operations."""
+        patched, touched = apply_json_patch(self.document, [
+            {"op": "test", "path": "/methodologies/0/name", "value": "Lean"},
+            {"op": "add", "path": "/methodologies/0/tools/-", "value": "Kanban"},
+            {"op": "replace", "path": "/methodologies/1/name", "value": "Lean Six Sigma"},
+            {"op": "copy", "from": "/frameworks/0", "path": "/frameworks/1"},
+            {"op": "move", "from": "/title", "path": "/name"},
+            {"op": "remove", "path": "/frameworks/0"}
+        ])
+
+        self.assertEqual(patched["methodologies"][0]["tools"], ["5S", "Kanban"])
+        self.assertEqual(patched["methodologies"][1]["name"], "Lean Six Sigma")
+        self.assertEqual(patched["frameworks"], [{"name": "SCOR"}])
+        self.assertEqual(patched["name"], "BPM")
+        self.assertNotIn("title", patched)
+        self.assertEqual(touched, {"methodologies", "frameworks", "title", "name"})
+        self.assertEqual(changed_sections(self.document, patched, touched), {"methodologies", "title", "name"})
+
+    def test_original_is_not_modified(self):
+        """Test that patching copies only the sections it writes to."""
+        patched, _ = apply_json_patch(self.document, [
+            {"op": "add", "path": "/methodologies/0/tools/0", "value": "Value Stream Mapping"}])
+
+        self.assertEqual(self.document, self.original)
+        self.assertIsNot(patched["methodologies"], self.document["methodologies"])
+        self.assertIs(patched["frameworks"], self.document["frameworks"])
+
+        patched, touched = apply_merge_patch(self.document, {"frameworks": None, "methodologies": [{"name": "TQM"}]})
+        self.assertEqual(self.document, self.original)
+        self.assertEqual(patched, {"methodologies": [{"name": "TQM"}], "title": "BPM"})
+        self.assertEqual(touched, {"frameworks", "methodologies"})
+
+    def test_merge_patch_nested_objects(self):
+        """Test that merge patches merge objects member by member."""
+        document = {"industry_overview": {"description": "Old", "market_size": {"2023": 1}}, "other": {}}
+        patched, touched = apply_merge_patch(document, {"industry_overview": {"market_size": {"2024": 2}}})
+
+        self.assertEqual(patched["industry_overview"], {"description": "Old", "market_size": {"2023": 1, "2024": 2}})
+        self.assertEqual(document["industry_overview"]["market_size"], {"2023": 1})
+        self.assertIs(patched["other"], document["other"])
+        self.assertEqual(touched, {"industry_overview"})
+
+    def test_errors(self):
+        """Test that failed tests conflict and malformed patches are rejected."""
+        with self.assertRaises(PatchConflict):
+            apply_json_patch(self.document, [{"op": "test", "path": "/title", "value": "Other"}])
+        for operations in ([{"op": "remove", "path": "/missing"}],
+                           [{"op": "replace", "path": "/methodologies/5", "value": 1}],
+                           [{"op": "add", "path": "/methodologies/01", "value": 1}],
+                           [{"op": "replace", "path": "", "value": {}}],
+                           [{"op": "move", "from": "/methodologies", "path": "/methodologies/0"}],
+                           [{"op": "frobnicate", "path": "/title"}],
+                           {"op": "remove", "path": "/title"}):
+            with self.assertRaises(PatchError, msg=operations):
+                apply_json_patch(self.document, operations)
+        with self.assertRaises(PatchError):
+            apply_merge_patch(self.document, ["not", "an", "object"])
+        self.assertEqual(self.document, self.original)
+
+    def test_pointer_escapes(self):
+        """Test that JSON pointer tokens are unescaped."""
+        self.assertEqual(parse_pointer("/a~1b/c~0d/0"), ["a/b", "c~d", "0"])
+        self.assertEqual(parse_pointer(""), [])
+        with self.assertRaises(PatchError):
+            parse_pointer("title")
+    def test_industry_patch_reaches_answers_and_semantic_search(self):
+        """Test that a patched industry file is reloaded by the question analyzer and re-indexed semantically."""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        data_dir = os.path.join(work_dir, 'data')
+        shutil.copytree(os.path.join(os.path.dirname(__file__), '..', 'data'), data_dir)
+        web_app = isolated_web_app(self, work_dir, data_dir, DATA_PATCHES_ENABLED=True)
+        client = web_app.app.test_client()
+
+        def ask():
+            response = client.post('/api/industry/electric_vehicle/ask',
+                                   json={"question": "What is the threat of new entrants?"})
+            return response.get_json()["answer"]
+
+        self.assertIn("Level: Moderate to High", ask())
+        index = web_app.get_semantic_index()
+
+        old_implication = web_app.document_cache.get(
+            os.path.join(data_dir, 'electric_vehicle_industry.json')
+        ).data["porter_five_forces_analysis"]["threat_of_new_entrants"]["process_implications"][0]
+        patch = {"porter_five_forces_analysis": {"threat_of_new_entrants": {
+            "level": "Negligible", "process_implications": ["Quantum teleportation logistics replace dealer networks"]
+        }}}
+        response = client.patch('/api/industry/electric_vehicle/document', data=json.dumps(patch),
+                                content_type='application/merge-patch+json')
+        self.assertEqual(response.status_code, 200)
+
+        answer = ask()
+        self.assertIn("Level: Negligible", answer)
+        self.assertIn("Quantum teleportation logistics", answer)
+        texts = [leaf.text for _, leaf in index.search("quantum teleportation logistics dealer networks", 5)]
+        self.assertIn("Quantum teleportation logistics replace dealer networks", texts)
+        self.assertNotIn(old_implication, [leaf.text for _, leaf in index.search(old_implication, 20, min_score=0)])
+
+        # An edit written by another worker is picked up by the file's version
+        path = os.path.join(data_dir, 'electric_vehicle_industry.json')
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data["porter_five_forces_analysis"]["threat_of_new_entrants"]["level"] = "Low"
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+        self.assertIn("Level: Low", ask())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import json
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.document_schema import SchemaError, get_validator, validate_document
+from enhanced_bpm.models.workspace_store import SearchIndex
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+class TestDocumentSchema(unittest.TestCase):
+    """Test cases for compiled document validation."""
+
+    def load(self, filename):
+        """Load a document from the data directory."""
+        with open(os.path.join(DATA_DIR, filename), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_shipped_documents_are_valid(self):
+        """Test that the bundled principles and industry files match their schemas."""
+        principles, layout = validate_document(self.load('bpm_principles.json'))
+        self.assertEqual(layout.schema, 'bpm_principles')
+        self.assertIn('performance_metrics', layout.sections)
+        self.assertEqual(principles, self.load('bpm_principles.json'))
+
+        _, layout = validate_document(self.load('electric_vehicle_industry.json'))
+        self.assertEqual(layout.schema, 'industry')
+        self.assertNotIn('industry_name', layout.sections)
+
+    def test_normalization(self):
+        """Test that text lists are split and flat metric rows are nested in one pass."""
+        data, layout = validate_document({
+            "core_principles": [{"name": "Focus", "benefits": "Speed; Quality", "implementation_strategies": None}],
+            "performance_metrics": [{"category": "Efficiency", "name": "Cycle Time"},
+                                    {"name": "Rework Rate"}],
+            "items": [{"anything": 1}],
+            "title": "Uploaded"
+        })
+
+        self.assertEqual(data["core_principles"][0]["benefits"], ["Speed", "Quality"])
+        self.assertEqual(data["performance_metrics"], [
+            {"category": "Efficiency", "metrics": [{"name": "Cycle Time"}]},
+            {"category": "Uncategorized", "metrics": [{"name": "Rework Rate"}]}])
+        self.assertEqual(layout.sections, ("core_principles", "performance_metrics", "items"))
+
+        index = SearchIndex(data, layout)
+        self.assertEqual(index.search("rework")["performance_metrics"][0]["category"], "Uncategorized")
+
+    def test_errors(self):
+        """Test that invalid documents are rejected with the paths of their errors."""
+        with self.assertRaises(SchemaError) as raised:
+            validate_document({"methodologies": [{"name": "Lean", "tools": {"a": 1}}, {"description": "x"}],
+                               "frameworks": "not a list"})
+        self.assertEqual(raised.exception.errors, ["$.methodologies[0].tools: expected a list",
+                                                   "$.methodologies[1].name: is required",
+                                                   "$.frameworks: expected a list"])
+
+        with self.assertRaises(SchemaError):
+            validate_document([1, 2, 3])
+
+        industry = self.load('electric_vehicle_industry.json')
+        del industry['porter_five_forces_analysis']['industry_rivalry']['level']
+        with self.assertRaises(SchemaError) as raised:
+            validate_document(industry)
+        self.assertEqual(raised.exception.errors, ["$.porter_five_forces_analysis.industry_rivalry.level: is required"])
+
+    def test_validators_are_compiled_once(self):
+        """Test that compiled validators are cached per schema and version."""
+        self.assertIs(get_validator('industry'), get_validator('industry'))
+        self.assertIsNot(get_validator('industry'), get_validator('bpm_principles'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import os
+import sys
+import datetime
+import shutil
+import tempfile
+import zipfile
+
+import openpyxl
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.excel_ingest import (
+    Workbook, coerce_list, convert_workbook, is_date_format, read_sheet, section_for_sheet
+)
+
+class TestExcelIngest(unittest.TestCase):
+    """Test cases for streaming Excel conversion."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.work_dir, "bpm.xlsx")
+
+        workbook = openpyxl.Workbook()
+        principles = workbook.active
+        principles.title = "Core Principles"
+        principles.append(["Name", "Description", "Benefits", "Implementation Strategies"])
+        principles.append(["Customer Focus", "Start from the customer", "Loyalty\nRetention", '["Map journeys"]'])
+        principles.append([None, None, None, None])
+        principles.append(["Continuous Improvement", "Improve in small steps", "Agility; Lower cost", None])
+
+        metrics = workbook.create_sheet("Metrics")
+        metrics.append(["Category", "Name", "Improvement Strategies"])
+        metrics.append(["Efficiency", "Cycle Time", "Remove handoffs"])
+        metrics.append(["Quality", "First Pass Yield", "Standardize work"])
+        metrics.append(["Efficiency", "Process Cost", None])
+
+        custom = workbook.create_sheet("Budget")
+        custom.append(["Item", "Amount", "Due", "Amount"])
+        custom.append(["Tools", 1200, datetime.datetime(2024, 5, 1), 3.5])
+
+        workbook.create_sheet("Empty")
+        workbook.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_sections_and_list_columns(self):
+        """Test that known sheets map to BPM sections with list-valued columns split."""
+        result = convert_workbook(self.path, workers=1)
+
+        self.assertEqual(list(result), ["core_principles", "performance_metrics", "Budget"])
+        principles = result["core_principles"]
+        self.assertEqual(len(principles), 2)
+        self.assertEqual(principles[0]["benefits"], ["Loyalty", "Retention"])
+        self.assertEqual(principles[0]["implementation_strategies"], ["Map journeys"])
+        self.assertEqual(principles[1]["benefits"], ["Agility", "Lower cost"])
+        self.assertEqual(principles[1]["implementation_strategies"], [])
+
+        metrics = result["performance_metrics"]
+        self.assertEqual([category["category"] for category in metrics], ["Efficiency", "Quality"])
+        self.assertEqual([metric["name"] for metric in metrics[0]["metrics"]], ["Cycle Time", "Process Cost"])
+        self.assertEqual(metrics[0]["metrics"][0]["improvement_strategies"], ["Remove handoffs"])
+
+    def test_other_sheets_keep_their_columns(self):
+        """Test that unknown sheets keep column names and get JSON-friendly values."""
+        section, records = read_sheet(self.path, "Budget")
+
+        self.assertEqual(section, "Budget")
+        self.assertEqual(records, [{"Item": "Tools", "Amount": 1200, "Due": "2024-05-01T00:00:00", "Amount.1": 3.5}])
+        self.assertEqual(read_sheet(self.path, "Empty"), ("Empty", None))
+
+    def test_parallel_matches_sequential(self):
+        """Test that parsing sheets in worker processes gives the same document."""
+        self.assertEqual(convert_workbook(self.path, workers=2), convert_workbook(self.path, workers=1))
+
+    def test_reader_matches_openpyxl(self):
+        """Test that the streaming reader returns the cell values openpyxl reads."""
+        path = os.path.join(self.work_dir, "types.xlsx")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "Types"
+        sheet.append(["text", 42, 2.5, True, None, "=1+1"])
+        sheet["H2"] = datetime.datetime(2023, 1, 31, 12, 30)
+        sheet["H2"].number_format = "dd/mm/yyyy hh:mm"
+        sheet["A3"] = datetime.date(2020, 2, 29)
+        sheet["C3"] = 1.5
+        sheet["C3"].number_format = '0.00" days"'
+        workbook.save(path)
+
+        expected = [tuple(row) for row in openpyxl.load_workbook(path, read_only=True, data_only=True)["Types"]
+                    .iter_rows(values_only=True)]
+        with Workbook(path) as streamed:
+            self.assertEqual(streamed.sheet_names, ["Types"])
+            rows = list(streamed.rows("Types"))
+
+        self.assertEqual(rows[0], expected[0][:len(rows[0])])
+        self.assertEqual(rows[1][7], expected[1][7])
+        self.assertEqual(rows[2][:3], expected[2][:3])
+
+    def test_shared_strings(self):
+        """Test workbooks that store text as shared strings, as Excel does."""
+        path = os.path.join(self.work_dir, "excel.xlsx")
+        main = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+        with zipfile.ZipFile(path, "w") as workbook:
+            workbook.writestr("xl/workbook.xml",
+                              f'<workbook {main} xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/'
+                              f'relationships"><workbookPr date1904="1"/><sheets>'
+                              f'<sheet name="Challenges" sheetId="1" r:id="rId1"/></sheets></workbook>')
+            workbook.writestr("xl/_rels/workbook.xml.rels",
+                              '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                              '<Relationship Id="rId1" Target="/xl/worksheets/sheet1.xml"/></Relationships>')
+            workbook.writestr("xl/sharedStrings.xml",
+                              f'<sst {main}><si><t>Challenge</t></si><si><t>Mitigation Strategies</t></si>'
+                              f'<si><r><t>Silo</t></r><r><t>s</t></r><rPh><t>x</t></rPh></si>'
+                              f'<si><t>Align goals\nShare data</t></si><si><t>Since</t></si></sst>')
+            workbook.writestr("xl/styles.xml",
+                              f'<styleSheet {main}><numFmts><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+                              f'</numFmts><cellXfs><xf numFmtId="0"/><xf numFmtId="164"/></cellXfs></styleSheet>')
+            workbook.writestr("xl/worksheets/sheet1.xml",
+                              f'<worksheet {main}><sheetData>'
+                              f'<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c>'
+                              f'<c r="D1" t="s"><v>4</v></c></row>'
+                              f'<row r="3"><c r="A3" t="s"><v>2</v></c><c r="B3" t="s"><v>3</v></c>'
+                              f'<c r="D3" s="1"><v>0</v></c></row></sheetData></worksheet>')
+
+        self.assertEqual(convert_workbook(path), {"common_challenges": [{
+            "challenge": "Silos", "mitigation_strategies": ["Align goals", "Share data"],
+            "unnamed_2": None, "since": "1904-01-01T00:00:00"}]})
+
+    def test_helpers(self):
+        """Test sheet name mapping and list cell parsing."""
+        self.assertEqual(section_for_sheet("best-practices"), "implementation_best_practices")
+        self.assertEqual(section_for_sheet("Sheet1"), "Sheet1")
+        self.assertEqual(coerce_list("• Lean\n• Six Sigma"), ["Lean", "Six Sigma"])
+        self.assertEqual(coerce_list("[not json"), ["[not json"])
+        self.assertTrue(is_date_format("[$-409]d-mmm-yy"))
+        self.assertTrue(is_date_format("[h]:mm"))
+        self.assertFalse(is_date_format('[Red]0.00" days"'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.federated_search import DocumentShard, FederatedSearch
+from enhanced_bpm.models.workspace_store import DocumentCache
+from enhanced_bpm.tests.web_helpers import isolated_web_app
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+class TestFederatedSearch(unittest.TestCase):
+    """Test cases for ranked search across several documents."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.documents = [
+            ('bpm_principles.json', 'principles', os.path.join(DATA_DIR, 'bpm_principles.json')),
+            ('electric_vehicle_industry.json', 'industry', os.path.join(DATA_DIR, 'electric_vehicle_industry.json'))
+        ]
+        self.cache = DocumentCache()
+        self.search = FederatedSearch(self.cache, lambda: self.documents, workers=1)
+
+    def tearDown(self):
+        self.search.close()
+        shutil.rmtree(self.work_dir)
+
+    def add(self, filename, data):
+        """Write an uploaded document and make it searchable."""
+        path = os.path.join(self.work_dir, filename)
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        self.documents.append((filename, 'upload', path))
+        return path
+
+    def test_hits_name_their_files(self):
+        """Test that hits from every document are ranked together."""
+        self.add('lean.json', {"methodologies": [{"name": "Process Process Process", "description": "Lean process"}]})
+        hits = self.search.search("PROCESS", limit=100)
+
+        self.assertEqual(hits[0]["file"], "lean.json")
+        self.assertEqual(hits[0]["source"], "upload")
+        self.assertEqual(hits[0]["item"]["name"], "Process Process Process")
+        self.assertEqual({hit["file"] for hit in hits},
+                         {"lean.json", "bpm_principles.json", "electric_vehicle_industry.json"})
+        self.assertEqual([hit["score"] for hit in hits], sorted((hit["score"] for hit in hits), reverse=True))
+
+        limited = self.search.search("process", limit=3)
+        self.assertEqual(limited, hits[:3])
+        self.assertEqual({hit["section"] for hit in self.search.search("process", "methodologies", limit=100)},
+                         {"methodologies"})
+        self.assertEqual(self.search.search("no such text anywhere"), [])
+
+    def test_snippet_hits(self):
+        """Test that snippet hits carry the matching string cut around the term with its highlights."""
+        description = "Intro text. " * 30 + "Kaizen events remove waste. " + "Closing text. " * 30
+        self.add('kaizen.json', {"methodologies": [{"name": "Continuous improvement", "description": description}]})
+        hits = self.search.search("KAIZEN", limit=100, snippets=True)
+        hit = next(hit for hit in hits if hit["file"] == "kaizen.json")
+
+        self.assertEqual(hit["path"], "description")
+        self.assertNotIn("item", hit)
+        self.assertLess(len(hit["snippet"]), len(description))
+        self.assertEqual([hit["snippet"][start:end] for start, end in hit["highlights"]], ["Kaizen"])
+
+        with_items = self.search.search("KAIZEN", limit=100, snippets=True, with_items=True)
+        self.assertEqual(next(h for h in with_items if h["file"] == "kaizen.json"),
+                         dict(hit, item={"name": "Continuous improvement", "description": description}))
+
+    def test_parallel_matches_sequential(self):
+        """Test that searching shards in threads gives the same ranking."""
+        for i in range(4):
+            self.add(f'doc{i}.json', {"frameworks": [{"name": f"Framework {i}", "description": "process " * i}]})
+        parallel = FederatedSearch(self.cache, lambda: self.documents, workers=3)
+        try:
+            for term in ("process", "tesla", "pr"):
+                self.assertEqual(parallel.search(term, limit=25), self.search.search(term, limit=25))
+        finally:
+            parallel.close()
+
+    def test_shards_follow_file_changes(self):
+        """Test that only changed documents are re-sharded and removed ones are dropped."""
+        path = self.add('doc.json', {"core_principles": [{"name": "Original"}]})
+        self.search.search("original")
+        self.assertEqual(self.search.builds, 3)
+
+        self.search.search("original")
+        self.assertEqual(self.search.builds, 3)
+
+        with open(path, 'w') as f:
+            json.dump({"core_principles": [{"name": "Replaced text"}]}, f)
+        self.assertEqual(self.search.search("original"), [])
+        self.assertEqual(self.search.search("replaced")[0]["file"], "doc.json")
+        self.assertEqual(self.search.builds, 4)
+
+        self.documents.pop()
+        self.assertEqual(self.search.search("replaced"), [])
+
+    def test_shard_candidates_match_scan(self):
+        """Test that trigram candidates find every item a full scan finds."""
+        document = self.cache.get(os.path.join(DATA_DIR, 'electric_vehicle_industry.json'))
+        shard = DocumentShard('industry.json', 'industry', document)
+        for term in ("battery", "charging infra", "ev", "supply chain", "zzz"):
+            expected = [position for position, (_, _, text) in enumerate(shard.entries) if term in text]
+            self.assertEqual([position for position in shard.candidates(term) if term in shard.entries[position][2]],
+                             expected)
+        self.assertIn("competitive_landscape", {section for section, _, _ in shard.entries})
+
+    def test_query_route_returns_items_with_snippets(self):
+        """Test that the page's /query results keep the item fields and carry server-side highlights."""
+        web_app = isolated_web_app(self, self.work_dir)
+        client = web_app.app.test_client()
+
+        for scope in ('active', 'all'):
+            results = client.post('/query', data={"search_term": "Kaizen", "query_type": "all",
+                                                  "scope": scope}).get_json()
+            lean = next(item for item in results["methodologies"] if item.get("name") == "Lean")
+            self.assertIn("description", lean)
+            self.assertEqual([lean["snippet"][start:end] for start, end in lean["highlights"]], ["Kaizen"])
+            self.assertTrue(lean["path"])
+        self.assertEqual(lean["source_file"], "bpm_principles.json")
+
+if __name__ == '__main__':
+    unittest.main()
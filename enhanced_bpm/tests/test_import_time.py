@@ -0,0 +1,80 @@
+import unittest
+import os
+import sys
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Modules that must not be imported until a feature actually needs them
+HEAVY_MODULES = ("numpy", "pandas", "openpyxl")
+
+# Modules the CLI imports only for batch mode, command line parsing or the
+# first analysis of an industry
+CLI_DEFERRED_MODULES = ("argparse", "concurrent.futures.process", "enhanced_bpm.models.analysis_cache",
+                        "enhanced_bpm.models.excel_ingest", "enhanced_bpm.models.vector_index")
+
+# Cumulative import time budgets in microseconds (generous to absorb slow machines)
+CLI_IMPORT_BUDGET_US = 1000000
+WEB_APP_IMPORT_BUDGET_US = 2000000
+
+def import_times(statement):
+    """Run a statement under ``python -X importtime`` and return the cumulative time per module."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+class TestImportTime(unittest.TestCase):
+    """Test cases for the start-up import budget of the CLI and the web app."""
+
+    def test_cli_import_budget(self):
+        """Test that the CLI and analyzer import graph stays light."""
+        times = import_times("import enhanced_bpm.main")
+
+        for module in HEAVY_MODULES + CLI_DEFERRED_MODULES:
+            self.assertNotIn(module, times)
+        self.assertLess(times["enhanced_bpm.main"], CLI_IMPORT_BUDGET_US)
+
+    def test_cli_loads_extras_on_first_use(self):
+        """Test that the deferred CLI modules load when an industry is analyzed in batch mode."""
+        statement = "; ".join([
+            "import io, sys",
+            "from enhanced_bpm.main import parse_args, run_batch",
+            "args = parse_args(['--batch', '--framework', 'value_chain'])",
+            "output = io.StringIO()",
+            "assert run_batch(args.data_dir, ['electric vehicle'], ['semantic'], args.frameworks, output) == 2",
+            "assert 'error' not in output.getvalue()",
+            "assert all(m in sys.modules for m in ('argparse', 'enhanced_bpm.models.analysis_cache', "
+            "'enhanced_bpm.models.excel_ingest'))"
+        ])
+        import_times(statement)
+
+    def test_web_app_import_budget(self):
+        """Test that the web app defers NumPy, pandas and openpyxl."""
+        times = import_times("import enhanced_bpm.web.app")
+
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, times)
+        self.assertLess(times["enhanced_bpm.web.app"], WEB_APP_IMPORT_BUDGET_US)
+
+    def test_lazy_modules_load_on_first_use(self):
+        """Test that deferred modules load transparently when a feature uses them."""
+        statement = "; ".join([
+            "from enhanced_bpm.compat.lazy_import import is_loaded",
+            "from enhanced_bpm.models.process_graph import ProcessGraph",
+            "assert not is_loaded('numpy')",
+            "graph = ProcessGraph('p')",
+            "graph.add_node('a', duration=2.0)",
+            "assert graph.critical_path()['length'] == 2.0",
+            "assert is_loaded('numpy')"
+        ])
+        import_times(statement)
+
+if __name__ == '__main__':
+    unittest.main()
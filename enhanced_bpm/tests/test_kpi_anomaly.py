@@ -0,0 +1,136 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.bpm_analyzer import BPMAnalyzer
+from enhanced_bpm.models.kpi_anomaly import AnomalyMonitor, KPIDetector, monitor_store
+from enhanced_bpm.models.kpi_store import KPIStore
+from enhanced_bpm.tests.web_helpers import isolated_web_app
+
+class TestKPIAnomaly(unittest.TestCase):
+    """Test cases for streaming KPI anomaly detection."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.values = 100 + rng.normal(0, 2, 500)
+
+    def test_no_alarms_before_warmup(self):
+        """Test that the detector stays silent while learning its baseline."""
+        detector = KPIDetector(warmup=20)
+        self.assertEqual([detector.update(v) for v in [100.0] * 19 + [1000.0]], [[]] * 20)
+        self.assertFalse(detector.state()["warming_up"])
+
+    def test_spike_is_flagged(self):
+        """Test that a single spike is caught by the EWMA and robust detectors."""
+        detector = KPIDetector()
+        for value in self.values:
+            detector.update(value)
+
+        detectors = {d["detector"] for d in detector.update(130.0)}
+        self.assertIn("ewma", detectors)
+        self.assertIn("robust_z", detectors)
+        self.assertAlmostEqual(detector.state()["median"], 100.0, delta=1.0)
+
+    def test_level_shift_is_a_change_point(self):
+        """Test that a sustained small shift triggers the CUSUM and resets the baseline."""
+        detector = KPIDetector()
+        for value in self.values:
+            detector.update(value)
+
+        shifted = self.values[:50] + 4.0
+        change_points = [i for i, v in enumerate(shifted)
+                         if any(d["detector"] == "change_point" for d in detector.update(v))]
+        self.assertTrue(change_points)
+        self.assertLess(change_points[0], 15)
+        self.assertAlmostEqual(detector.state()["mean"], 104.0, delta=2.0)
+
+    def test_monitor_alerts_and_answer(self):
+        """Test alert handlers and citing current anomalies in answers."""
+        alerts = []
+        monitor = AnomalyMonitor({"cycle_time": {"name": "Cycle Time", "category": "Process Efficiency Metrics"}})
+        monitor.add_handler(alerts.append)
+
+        timestamps = np.arange(len(self.values)) * 3600.0
+        monitor.observe_many("cycle_time", timestamps, self.values, alert=False)
+        self.assertEqual(alerts, [])
+        monitor.observe("cycle_time", timestamps[-1] + 3600.0, 160.0)
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(monitor.current_anomalies(category="Process Efficiency Metrics")[0]["value"], 160.0)
+
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        analyzer = BPMAnalyzer(data_dir=data_dir)
+        analyzer.set_current_industry("electric vehicle")
+        analyzer.set_anomaly_monitor(monitor)
+        answer = analyzer.answer_question("Are there any anomalies in our KPIs?")
+        self.assertIn("Cycle Time (Process Efficiency Metrics)", answer)
+        self.assertIn("value 160", answer)
+
+    def test_monitor_reads_observations_of_other_processes(self):
+        """Test that a monitor catches up with the observations appended through another store instance."""
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        store = KPIStore(store_dir)
+        store.register_metric("cycle_time", "Cycle Time", "Process Efficiency Metrics")
+        timestamps = np.arange(len(self.values)) * 3600.0
+        store.append("cycle_time", timestamps, self.values)
+        monitor = monitor_store(store)
+
+        # Another worker appends, at the last timestamp read and after it, and registers a metric
+        other = KPIStore(store_dir)
+        other.append("cycle_time", [timestamps[-1], timestamps[-1] + 3600.0], [100.0, 160.0])
+        other.register_metric("lead_time", "Lead Time")
+        other.append("lead_time", [0.0], [5.0])
+
+        found = monitor.catch_up(store)
+        self.assertEqual([anomaly["value"] for anomaly in found], [160.0])
+        self.assertEqual(monitor.current_anomalies()[0]["name"], "Cycle Time")
+        self.assertEqual(monitor.detectors["cycle_time"].count, len(self.values) + 2)
+        self.assertEqual(monitor.detectors["lead_time"].count, 1)
+        self.assertEqual(monitor.catch_up(store), [])
+        self.assertEqual(monitor.detectors["cycle_time"].count, len(self.values) + 2)
+
+    def test_web_anomalies_include_other_workers(self):
+        """Test that /api/kpi/anomalies reports observations posted to another worker."""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        web_app = isolated_web_app(self, work_dir)
+        store_dir = web_app.app.config['KPI_STORE_FOLDER']
+        client = web_app.app.test_client()
+
+        timestamps = list(np.arange(len(self.values)) * 3600.0)
+        client.post('/api/kpi/cycle_time', json={"timestamps": timestamps, "values": list(self.values)})
+
+        KPIStore(store_dir).append("cycle_time", [timestamps[-1] + 3600.0], [160.0])
+        anomalies = client.get('/api/kpi/anomalies').get_json()
+        self.assertEqual(anomalies[0]["value"], 160.0)
+
+    def test_stored_history_reaches_command_line_analyzers(self):
+        """Test that main.py analyzers report the anomalies in the web app's KPI store."""
+        from enhanced_bpm.main import create_analyzer
+
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        store = KPIStore(store_dir)
+        store.register_metric("cycle_time", "Cycle Time", "Process Efficiency Metrics")
+        store.append("cycle_time", np.arange(len(self.values) + 1) * 3600.0, list(self.values) + [160.0])
+        store.flush()
+
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        analyzer = create_analyzer(data_dir, kpi_store=store_dir)
+        self.assertEqual(analyzer.kpi_store.last_timestamp("cycle_time"), len(self.values) * 3600.0)
+        analyzer.set_current_industry("electric vehicle")
+        answer = analyzer.answer_question("Are there any anomalies in our KPIs?")
+        self.assertIn("Cycle Time (Process Efficiency Metrics)", answer)
+        self.assertIn("value 160", answer)
+
+        self.assertIsNone(create_analyzer(data_dir, kpi_store=os.path.join(store_dir, "missing")).kpi_store)
+
+if __name__ == '__main__':
+    unittest.main()
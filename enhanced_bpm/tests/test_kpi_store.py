@@ -0,0 +1,128 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.bpm_analyzer import BPMAnalyzer
+from enhanced_bpm.models.kpi_store import KPIStore, kpi_catalog, metric_key
+
+DAY = 86400.0
+
+class TestKPIStore(unittest.TestCase):
+    """Test cases for the columnar KPI time-series store."""
+
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.store = KPIStore(self.root_dir, chunk_size=100)
+        self.timestamps = np.arange(365) * DAY
+        self.values = np.arange(365, dtype=float)
+        self.store.append("cycle_time", self.timestamps, self.values)
+
+    def tearDown(self):
+        shutil.rmtree(self.root_dir)
+
+    def test_query_across_chunks(self):
+        """Test range queries spanning sealed chunks and the open chunk."""
+        timestamps, values = self.store.query("cycle_time", 95 * DAY, 305 * DAY)
+
+        self.assertEqual(len(timestamps), 211)
+        self.assertEqual(values[0], 95.0)
+        self.assertEqual(values[-1], 305.0)
+        self.assertEqual(len(self.store._chunks["cycle_time"]), 3)
+
+    def test_reopen_after_flush(self):
+        """Test that sealed chunks and the flushed open chunk survive a reopen."""
+        self.store.append("cycle_time", [365 * DAY], [1000.0])
+        self.store.flush()
+
+        reopened = KPIStore(self.root_dir, chunk_size=100)
+        timestamps, values = reopened.query("cycle_time")
+        self.assertEqual(len(values), 366)
+        self.assertEqual(reopened.latest("cycle_time"), {"timestamp": 365 * DAY, "value": 1000.0})
+
+    def test_append_must_be_in_time_order(self):
+        """Test that observations predating the latest one are rejected."""
+        with self.assertRaises(ValueError):
+            self.store.append("cycle_time", [10 * DAY], [1.0])
+        with self.assertRaises(ValueError):
+            self.store.append("cycle_time", [400 * DAY, 399 * DAY], [1.0, 2.0])
+        with self.assertRaises(ValueError):
+            self.store.register_metric("../escape")
+
+    def test_downsample(self):
+        """Test weekly buckets with several aggregates."""
+        week = 7 * DAY
+        means = self.store.downsample("cycle_time", week, "mean")
+        maxima = self.store.downsample("cycle_time", week, "max")
+
+        self.assertEqual(means["timestamps"][:2], [0.0, week])
+        self.assertEqual(means["counts"][0], 7)
+        self.assertAlmostEqual(means["values"][0], 3.0)
+        self.assertEqual(maxima["values"][1], 13.0)
+        self.assertEqual(self.store.downsample("cycle_time", week, "last")["values"][-1], 364.0)
+
+    def test_rolling(self):
+        """Test trailing window aggregates against a direct computation."""
+        rolling = self.store.rolling("cycle_time", 30 * DAY, "mean", start=100 * DAY, end=120 * DAY)
+        deviation = self.store.rolling("cycle_time", 30 * DAY, "std", start=200 * DAY, end=200 * DAY)
+
+        self.assertEqual(rolling["timestamps"][0], 100 * DAY)
+        self.assertAlmostEqual(rolling["values"][0], np.mean(self.values[71:101]))
+        self.assertAlmostEqual(deviation["values"][0], np.std(self.values[171:201], ddof=1))
+
+    def test_catalog_and_scorecard_values(self):
+        """Test the KPI catalog and the latest values reported with the scorecard."""
+        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        analyzer = BPMAnalyzer(data_dir=data_dir)
+        analyzer.set_current_industry("electric vehicle")
+        bsc = analyzer.industry_data[analyzer.current_industry]["balanced_scorecard_analysis"]
+
+        catalog = kpi_catalog(analyzer.bpm_principles, bsc)
+        self.assertEqual(catalog["cycle_time"]["category"], "Process Efficiency Metrics")
+        self.assertEqual(catalog["net_promoter_score"]["category"], "customer_perspective")
+
+        self.store.append(metric_key("Net Promoter Score"), [0.0], [42.0])
+        analyzer.set_kpi_store(self.store)
+        values = analyzer.analyze_balanced_scorecard()["perspectives"]["customer_perspective"]["current_values"]
+        self.assertEqual(values["Net Promoter Score"]["value"], 42.0)
+
+    def test_processes_sharing_a_store(self):
+        """Test that stores opened on one directory (one per worker process) never lose each other's appends."""
+        other = KPIStore(self.root_dir, chunk_size=100)
+        for day in range(365, 565, 40):
+            self.store.append("cycle_time", np.arange(day, day + 20) * DAY, np.arange(day, day + 20, dtype=float))
+            other.append("cycle_time", np.arange(day + 20, day + 40) * DAY,
+                         np.arange(day + 20, day + 40, dtype=float))
+        other.register_metric("lead_time")
+
+        for store in (self.store, other, KPIStore(self.root_dir, chunk_size=100)):
+            timestamps, values = store.query("cycle_time")
+            self.assertEqual(values.tolist(), list(range(565)))
+            self.assertEqual(len(store._chunks["cycle_time"]), 5)
+            self.assertTrue(store.has_metric("lead_time"))
+        with self.assertRaises(ValueError):
+            self.store.append("cycle_time", [500 * DAY], [1.0])
+
+    def test_web_catalog_leaves_the_registry_alone(self):
+        """Test that the latest values listed by /api/kpi are not written into the metric registry."""
+        from enhanced_bpm.web import app as web_app
+
+        previous_store = web_app.kpi_store
+        self.addCleanup(setattr, web_app, 'kpi_store', previous_store)
+        web_app.kpi_store = self.store
+        self.store.register_metric("custom_metric")
+
+        catalog = web_app.app.test_client().get('/api/kpi').get_json()
+        self.assertEqual(catalog["cycle_time"]["latest"]["value"], 364.0)
+        self.assertIn("latest", catalog["custom_metric"])
+        self.assertNotIn("latest", self.store.metrics["cycle_time"])
+        self.assertNotIn("latest", self.store.metrics["custom_metric"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import json
+import os
+import sys
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.maturity_scoring import MaturityScoringEngine
+
+class TestMaturityScoringEngine(unittest.TestCase):
+    """Test cases for the server-side maturity assessment scoring."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build the scoring engine from the BPM principles data."""
+        json_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'bpm_principles.json')
+        with open(json_path, 'r', encoding='utf-8') as f:
+            cls.engine = MaturityScoringEngine(json.load(f))
+
+    def make_submission(self, value, dimension_values=None):
+        """Create a submission answering every question with the same level."""
+        dimension_values = dimension_values or {}
+        return {"responses": {
+            d["id"]: {q["id"]: dimension_values.get(d["id"], value) for q in d["questions"]}
+            for d in self.engine.dimensions
+        }}
+
+    def test_assessment_model(self):
+        """Test that the questionnaire is built from the maturity models."""
+        model = self.engine.assessment_model()
+
+        self.assertGreater(len(model["dimensions"]), 0)
+        self.assertEqual(model["total_questions"],
+                         sum(len(d["questions"]) for d in model["dimensions"]))
+        for dimension in model["dimensions"]:
+            for question in dimension["questions"]:
+                self.assertEqual(len(question["options"]), len(self.engine.levels))
+
+    def test_uniform_answers(self):
+        """Test that uniform answers score as that level."""
+        result = self.engine.score_submission(self.make_submission(4))
+
+        self.assertEqual(result["overall_score"], 4.0)
+        self.assertEqual(result["level"], 4)
+        for score in result["dimension_scores"].values():
+            self.assertEqual(score, 4.0)
+        self.assertIn("roadmap", result)
+
+    def test_unanswered_and_invalid_values(self):
+        """Test that missing and out-of-range answers are ignored."""
+        dim = self.engine.dimensions[0]
+        submission = {"responses": {dim["id"]: {dim["questions"][0]["id"]: 3,
+                                                dim["questions"][1]["id"]: 9,
+                                                "unknown": 5}}}
+        result = self.engine.score_submission(submission)
+
+        self.assertEqual(result["answered_questions"], 1)
+        self.assertEqual(result["overall_score"], 3.0)
+
+    def test_malformed_responses(self):
+        """Test that responses that are not mappings are rejected, through the web routes as well."""
+        from enhanced_bpm.web import app as web_app
+
+        for submission in ({"responses": []}, {"responses": {"x": 3}}, {"responses": None}):
+            with self.assertRaises(ValueError):
+                self.engine.score_submission(submission)
+
+        client = web_app.app.test_client()
+        for payload in ({"responses": []}, {"submissions": [{"responses": {"x": 3}}]},
+                        {"organization": "Acme", "industry": "Retail", "responses": {"x": [3]}}):
+            route = '/api/maturity/assessments' if 'organization' in payload else '/api/maturity/score'
+            response = client.post(route, json=payload)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.get_json())
+
+    def test_dimension_weights(self):
+        """Test that explicit dimension weights change the overall score."""
+        first, second = self.engine.dimensions[0]["id"], self.engine.dimensions[1]["id"]
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data',
+                               'bpm_principles.json'), 'r', encoding='utf-8') as f:
+            weighted = MaturityScoringEngine(json.load(f), weights={first: 3, second: 1})
+
+        submission = self.make_submission(1, {first: 5})
+        result = weighted.score_submission(submission)
+        self.assertEqual(result["overall_score"], 4.0)
+
+    def test_batch_benchmarks(self):
+        """Test percentile benchmarks over a batch of submissions."""
+        submissions = [self.make_submission(level) for level in (1, 2, 3, 4, 5)]
+        batch = self.engine.score_batch(submissions)
+
+        self.assertEqual(batch["benchmarks"]["count"], 5)
+        self.assertEqual(batch["benchmarks"]["overall"]["p50"], 3.0)
+        self.assertEqual([r["percentile_rank"] for r in batch["results"]],
+                         [20.0, 40.0, 60.0, 80.0, 100.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Runs in a fresh interpreter: preloading imports heavy modules and freezes the GC
+PRELOAD_CHECK = """
+import gc, json, sys
+sys.path.insert(0, {root!r})
+from enhanced_bpm.compat.lazy_import import is_loaded
+from enhanced_bpm.web import app as web_app
+
+web_app.preload_app()
+builds = web_app.analysis_cache.builds
+client = web_app.app.test_client()
+statuses = [client.get(path).status_code for path in ("/", "/industry/electric_vehicle", "/maturity-assessment")]
+print(json.dumps({{
+    "frozen": gc.get_freeze_count(),
+    "numpy": is_loaded("numpy"),
+    "pandas": is_loaded("pandas"),
+    "industries": web_app.analysis_cache.available_industries(),
+    "builds_before": builds,
+    "builds_after": web_app.analysis_cache.builds,
+    "document_loads": web_app.document_cache.loads,
+    "scoring_engine": web_app.scoring_engine is not None,
+    "statuses": statuses
+}}))
+"""
+
+# Preloads with a semantic index on disk, built by an earlier process
+PRELOAD_SEMANTIC_CHECK = """
+import json, sys
+sys.path.insert(0, {root!r})
+from enhanced_bpm.web import app as web_app
+
+web_app.get_semantic_index()
+web_app.upload_store.close()
+web_app.semantic_index = web_app.upload_store = None
+
+web_app.preload_app()
+print(json.dumps({{
+    "semantic_index": web_app.semantic_index is not None,
+    "upload_store": web_app.upload_store is not None
+}}))
+"""
+
+class TestPreload(unittest.TestCase):
+    """Test cases for warming the web app before workers are forked."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_preload_app(self):
+        """Test that preloading loads data, bundles and libraries, then freezes the GC."""
+        result = subprocess.run([sys.executable, "-c", PRELOAD_CHECK.format(root=PROJECT_ROOT)],
+                                cwd=self.work_dir, capture_output=True, text=True, check=True)
+        state = json.loads(result.stdout.splitlines()[-1])
+
+        self.assertGreater(state["frozen"], 0)
+        self.assertTrue(state["numpy"])
+        self.assertTrue(state["pandas"])
+        self.assertEqual(state["builds_before"], len(state["industries"]))
+        self.assertEqual(state["builds_after"], state["builds_before"])
+        self.assertEqual(state["document_loads"], 1)
+        self.assertTrue(state["scoring_engine"])
+        self.assertEqual(state["statuses"], [200, 200, 200])
+
+    def test_preload_closes_upload_store(self):
+        """Test that the upload store the semantic index catches up through is not inherited by workers."""
+        result = subprocess.run([sys.executable, "-c", PRELOAD_SEMANTIC_CHECK.format(root=PROJECT_ROOT)],
+                                cwd=self.work_dir, capture_output=True, text=True, check=True)
+        state = json.loads(result.stdout.splitlines()[-1])
+
+        self.assertTrue(state["semantic_index"])
+        self.assertFalse(state["upload_store"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import os
+import sys
+import json
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.process_graph import ProcessGraph
+
+class TestProcessGraph(unittest.TestCase):
+    """Test cases for the process model graph engine."""
+
+    def setUp(self):
+        self.document = {
+            "process": {
+                "name": "Order to Delivery",
+                "flowElements": [
+                    {"id": "start", "type": "startEvent"},
+                    {"id": "split", "type": "parallelGateway"},
+                    {"id": "pick", "name": "Pick Parts", "duration": 2.0},
+                    {"id": "paint", "name": "Paint Body", "duration": 5.0},
+                    {"id": "assemble", "name": "Assemble", "duration": 3.0, "capacity": 2},
+                    {"id": "end", "type": "endEvent"}
+                ],
+                "sequenceFlows": [
+                    {"sourceRef": "start", "targetRef": "split"},
+                    {"sourceRef": "split", "targetRef": "pick"},
+                    {"sourceRef": "split", "targetRef": "paint"},
+                    {"sourceRef": "pick", "targetRef": "assemble"},
+                    {"sourceRef": "paint", "targetRef": "assemble"},
+                    {"sourceRef": "assemble", "targetRef": "end"}
+                ]
+            }
+        }
+
+    def test_critical_path_and_slack(self):
+        """Test the critical path through a model with parallel branches."""
+        graph = ProcessGraph.from_bpmn(self.document)
+        critical = graph.critical_path()
+
+        self.assertEqual(critical["length"], 8.0)
+        self.assertEqual(critical["path"], ["start", "split", "paint", "assemble", "end"])
+        self.assertEqual(graph.schedule()["slack"][graph.node_ids["pick"]], 3.0)
+
+    def test_bottlenecks(self):
+        """Test that critical activities rank ahead of activities with slack."""
+        bottlenecks = ProcessGraph.from_bpmn(self.document).bottlenecks(top=3)
+
+        self.assertEqual([b["id"] for b in bottlenecks], ["paint", "assemble", "pick"])
+        self.assertTrue(bottlenecks[0]["critical"])
+        self.assertFalse(bottlenecks[2]["critical"])
+        self.assertEqual(bottlenecks[1]["incoming_flows"], 2)
+
+    def test_cycle_detection(self):
+        """Test that loops are reported instead of scheduled."""
+        self.document["process"]["sequenceFlows"].append({"sourceRef": "assemble", "targetRef": "pick"})
+        graph = ProcessGraph.from_bpmn(self.document)
+
+        self.assertIsNone(graph.topological_order())
+        self.assertEqual([sorted(c) for c in graph.find_cycles()], [["assemble", "pick"]])
+        with self.assertRaises(ValueError):
+            graph.schedule()
+
+        analysis = graph.analyze()
+        self.assertIsNone(analysis["critical_path"])
+        self.assertEqual(len(analysis["cycles"]), 1)
+
+    def test_invalid_flow(self):
+        """Test that flows to unknown elements are rejected."""
+        self.document["process"]["sequenceFlows"].append({"sourceRef": "end", "targetRef": "missing"})
+        with self.assertRaises(ValueError):
+            ProcessGraph.from_bpmn(self.document)
+
+    def test_large_chain(self):
+        """Test a long model without hitting recursion limits."""
+        n = 20000
+        graph = ProcessGraph("chain")
+        for i in range(n):
+            graph.add_node(str(i), duration=1.0)
+        for i in range(n - 1):
+            graph.add_edge(str(i), str(i + 1))
+
+        self.assertEqual(graph.critical_path()["length"], float(n))
+        graph.add_edge(str(n - 1), "0")
+        self.assertEqual(len(graph.find_cycles()[0]), n)
+
+    def test_from_value_chain(self):
+        """Test seeding a model from the industry value chain."""
+        data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'electric_vehicle_industry.json')
+        with open(data_path, 'r', encoding='utf-8') as f:
+            value_chain = json.load(f)["value_chain_analysis"]
+
+        graph = ProcessGraph.from_value_chain(value_chain)
+        names = [node.name for node in graph.nodes]
+        analysis = graph.analyze()
+
+        self.assertEqual(names[0], "Start")
+        self.assertEqual(names[-1], "End")
+        self.assertIn("Battery Pack Assembly", names)
+        self.assertEqual(analysis["critical_path"]["path"][0], "start")
+        self.assertEqual(len(analysis["critical_path"]["path"]), len(graph.nodes))
+
+        roundtrip = ProcessGraph.from_bpmn(json.loads(json.dumps(graph.to_dict())))
+        self.assertEqual(roundtrip.edge_count, graph.edge_count)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.process_mining import (
+    EventLogMiner, compare_with_challenges, detect_columns, mine_event_log
+)
+from enhanced_bpm.tests.web_helpers import isolated_web_app
+
+class TestProcessMining(unittest.TestCase):
+    """Test cases for streaming process discovery from event logs."""
+
+    def setUp(self):
+        # Two cases follow the happy path, one reworks the inspection
+        self.events = [
+            ("c1", "Receive Order", 0), ("c2", "Receive Order", 10),
+            ("c1", "Quality Inspection", 100), ("c3", "Receive Order", 20),
+            ("c2", "Quality Inspection", 310), ("c1", "Ship", 130),
+            ("c3", "Quality Inspection", 220), ("c3", "Quality Inspection", 520),
+            ("c2", "Ship", 350), ("c3", "Ship", 540)
+        ]
+
+    def mine(self, events):
+        """Feed events to a miner, one chunk per event to exercise the streaming state."""
+        miner = EventLogMiner()
+        for case, activity, timestamp in events:
+            miner.add_events([case], [activity], [float(timestamp)])
+        return miner
+
+    def test_directly_follows_graph(self):
+        """Test edge frequencies and activity durations."""
+        result = self.mine(self.events).result()
+        edges = {(e["source"], e["target"]): e for e in result["directly_follows"]}
+
+        self.assertEqual(result["summary"], {"cases": 3, "events": 10, "activities": 3, "variants": 2})
+        self.assertEqual(edges[("Receive Order", "Quality Inspection")]["frequency"], 3)
+        self.assertEqual(edges[("Quality Inspection", "Quality Inspection")]["frequency"], 1)
+        self.assertAlmostEqual(edges[("Receive Order", "Quality Inspection")]["duration"]["mean"], 200.0)
+        self.assertEqual(result["start_activities"], {"Receive Order": 3})
+        self.assertEqual(result["end_activities"], {"Ship": 3})
+
+    def test_variants(self):
+        """Test that traces are counted per variant."""
+        variants = self.mine(self.events).result()["variants"]
+
+        self.assertEqual(variants[0], {"activities": ["Receive Order", "Quality Inspection", "Ship"], "count": 2})
+        self.assertEqual(variants[1]["activities"],
+                         ["Receive Order", "Quality Inspection", "Quality Inspection", "Ship"])
+
+    def test_chunked_file_matches_single_pass(self):
+        """Test that reading the log in small chunks gives the same model."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("Case ID,Activity,Timestamp,Resource\n")
+            for case, activity, timestamp in self.events:
+                f.write(f"{case},{activity},2024-01-01T00:{timestamp // 60:02d}:{timestamp % 60:02d},clerk\n")
+            path = f.name
+
+        try:
+            chunked = mine_event_log(path, chunksize=3)
+            whole = mine_event_log(path, chunksize=1000)
+        finally:
+            os.remove(path)
+
+        self.assertEqual(chunked["columns"], {"case": "Case ID", "activity": "Activity", "timestamp": "Timestamp"})
+        self.assertEqual(chunked["directly_follows"], whole["directly_follows"])
+        self.assertEqual(chunked["variants"], whole["variants"])
+        self.assertEqual(chunked["bottlenecks"][0]["activity"], "Quality Inspection")
+
+    def test_detect_columns_requires_all_roles(self):
+        """Test that logs without a timestamp column are rejected."""
+        with self.assertRaises(ValueError):
+            detect_columns(["case_id", "activity"])
+
+    def test_compare_with_challenges(self):
+        """Test matching bottlenecks to the documented challenges."""
+        data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'electric_vehicle_industry.json')
+        with open(data_path, 'r', encoding='utf-8') as f:
+            business_processes = json.load(f)["business_process_analysis"]
+
+        bottlenecks = self.mine(self.events).bottlenecks()
+        comparison = compare_with_challenges(bottlenecks, business_processes)
+        inspection = next(c for c in comparison if c["activity"] == "Quality Inspection")
+
+        self.assertTrue(inspection["documented"])
+        self.assertEqual(inspection["matching_challenges"][0]["challenge"], "Quality Control")
+
+    def test_upload_form_offers_event_logs(self):
+        """Test that the upload form of the home page posts the event log mode."""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        web_app = isolated_web_app(self, work_dir)
+
+        page = web_app.app.test_client().get('/').get_data(as_text=True)
+        upload_form = page[page.index('action="/upload"'):]
+        upload_form = upload_form[:upload_form.index('</form>')]
+        self.assertIn('name="mode"', upload_form)
+        self.assertIn('value="process_mining"', upload_form)
+        self.assertIn('.csv', upload_form)
+
+if __name__ == '__main__':
+    unittest.main()
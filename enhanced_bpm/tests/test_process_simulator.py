@@ -0,0 +1,79 @@
+import unittest
+import json
+import os
+import sys
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.process_simulator import (ProcessSimulator, process_from_business_area,
+                                                    run_replications, validate_process)
+
+class TestProcessSimulator(unittest.TestCase):
+    """Test cases for the discrete-event process simulator."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the industry data used to seed process models."""
+        json_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data',
+                                 'electric_vehicle_industry.json')
+        with open(json_path, 'r', encoding='utf-8') as f:
+            cls.business_processes = json.load(f)['business_process_analysis']
+
+    def single_server(self, arrival_rate, capacity=1, distribution="exponential"):
+        """Create a single-activity process model."""
+        return {
+            "name": "Single Server",
+            "arrival_rate": arrival_rate,
+            "resources": {"Clerk": capacity},
+            "activities": [{"name": "Serve", "resource": "Clerk", "mean_time": 1.0,
+                            "distribution": distribution}]
+        }
+
+    def test_mm1_cycle_time(self):
+        """Test the simulated M/M/1 cycle time against queueing theory."""
+        results = run_replications(self.single_server(0.5), replications=100,
+                                   n_entities=2000, seed=7, workers=1)
+
+        # Expected time in system for M/M/1 is 1 / (mu - lambda) = 2
+        self.assertAlmostEqual(results["cycle_time"]["mean"], 2.0, delta=0.15)
+        self.assertAlmostEqual(results["utilization"]["Clerk"]["mean"], 0.5, delta=0.03)
+
+    def test_deterministic_without_queueing(self):
+        """Test that spare capacity removes all waiting."""
+        simulator = ProcessSimulator(self.single_server(0.5, capacity=50, distribution="deterministic"))
+        result = simulator.run(n_entities=200, seed=1)
+
+        self.assertAlmostEqual(result["mean_cycle_time"], 1.0)
+        self.assertEqual(result["mean_wait_time"]["Serve"], 0.0)
+
+    def test_reproducible_replications(self):
+        """Test that the same seed gives the same results."""
+        process = process_from_business_area(self.business_processes, 'supply_chain_management')
+        first = run_replications(process, replications=10, n_entities=100, seed=42, workers=1)
+        second = run_replications(process, replications=10, n_entities=100, seed=42, workers=1)
+
+        self.assertEqual(first["cycle_time"], second["cycle_time"])
+        self.assertEqual(len(process["activities"]),
+                         len(self.business_processes['supply_chain_management']['key_challenges']))
+
+    def test_invalid_models(self):
+        """Test that invalid process models are rejected."""
+        with self.assertRaises(ValueError):
+            process_from_business_area(self.business_processes, 'unknown_area')
+        with self.assertRaises(ValueError):
+            ProcessSimulator(self.single_server(0))
+
+        malformed = [[1, 2], dict(self.single_server(1), resources=["server"]),
+                     dict(self.single_server(1), activities=["serve"]), dict(self.single_server(1), activities="serve")]
+        for process in malformed:
+            with self.assertRaises(ValueError):
+                validate_process(process)
+
+        from enhanced_bpm.web import app as web_app
+        client = web_app.app.test_client()
+        for process in malformed:
+            self.assertEqual(client.post('/api/simulator/run', json={"process": process}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import json
+import os
+import sys
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.roi_calculator import ROICalculator, roi_items_from_recommendations
+
+class TestROICalculator(unittest.TestCase):
+    """Test cases for the Monte Carlo ROI calculator."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the process optimization recommendations."""
+        json_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data',
+                                 'electric_vehicle_industry.json')
+        with open(json_path, 'r', encoding='utf-8') as f:
+            recommendations = json.load(f)['process_optimization_recommendations']
+        cls.recommendations = {
+            "short_term": recommendations["short_term_improvements"],
+            "medium_term": recommendations["medium_term_transformations"],
+            "long_term": recommendations["long_term_strategic_innovations"]
+        }
+
+    def test_deterministic_cash_flows(self):
+        """Test NPV, IRR and payback against hand-computed values."""
+        calculator = ROICalculator([{"timeframe": "short_term", "cost": 100, "annual_benefit": 50}],
+                                   discount_rate=0.1, horizon_years=3)
+
+        for vectorized in (True, False):
+            results = calculator.run(draws=10, seed=1, vectorized=vectorized)
+            # -100 + 50/1.1 + 50/1.21 + 50/1.331
+            self.assertAlmostEqual(results["npv"]["p50"], 24.3426, places=4)
+            self.assertAlmostEqual(results["irr"]["p50"], 0.2338, places=4)
+            self.assertAlmostEqual(results["payback_years"]["p50"], 2.0)
+            self.assertEqual(results["probability_payback"], 1.0)
+
+    def test_vectorized_matches_python(self):
+        """Test that both code paths agree on the same model."""
+        short_term = self.recommendations["short_term"][0]["recommendation"]
+        long_term = self.recommendations["long_term"][0]["recommendation"]
+        items = roi_items_from_recommendations(self.recommendations, [
+            {"recommendation": short_term,
+             "cost": {"distribution": "triangular", "min": 80, "mode": 100, "max": 150},
+             "annual_benefit": {"distribution": "normal", "mean": 40, "std": 10}},
+            {"recommendation": long_term,
+             "cost": {"distribution": "uniform", "min": 200, "max": 300},
+             "annual_benefit": {"distribution": "fixed", "value": 90},
+             "annual_cost": 10}
+        ])
+        self.assertEqual([item["timeframe"] for item in items], ["short_term", "long_term"])
+
+        calculator = ROICalculator(items)
+        vectorized = calculator.run(draws=20000, seed=3, vectorized=True)
+        python = calculator.run(draws=20000, seed=3, vectorized=False)
+
+        self.assertAlmostEqual(vectorized["npv"]["mean"], python["npv"]["mean"], delta=3.0)
+        self.assertAlmostEqual(vectorized["irr"]["p50"], python["irr"]["p50"], delta=0.01)
+        self.assertAlmostEqual(vectorized["probability_positive_npv"],
+                               python["probability_positive_npv"], delta=0.02)
+
+    def test_losing_investment(self):
+        """Test that an investment that never pays back has no payback period."""
+        calculator = ROICalculator([{"timeframe": "short_term", "cost": 100, "annual_benefit": 10}],
+                                   horizon_years=3)
+        results = calculator.run(draws=5)
+
+        self.assertEqual(results["probability_payback"], 0.0)
+        self.assertIsNone(results["payback_years"]["p50"])
+        self.assertEqual(results["probability_positive_npv"], 0.0)
+
+    def test_invalid_assumptions(self):
+        """Test that unknown recommendations and distributions are rejected."""
+        name = self.recommendations["short_term"][0]["recommendation"]
+        with self.assertRaises(ValueError):
+            roi_items_from_recommendations(self.recommendations, [
+                {"recommendation": "Unknown", "cost": 1, "annual_benefit": 1}])
+        with self.assertRaises(ValueError):
+            roi_items_from_recommendations(self.recommendations, [
+                {"recommendation": name, "cost": {"distribution": "beta"}, "annual_benefit": 1}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models import semantic_index
+from enhanced_bpm.models.bpm_analyzer import BPMAnalyzer
+from enhanced_bpm.models.semantic_index import Leaf, SemanticIndex, iter_leaves
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+DOCUMENT = {
+    "value_chain_analysis": {
+        "battery_recycling": {"challenges": ["Recycling used batteries is costly", "Collecting old battery packs"]},
+        "sales": {"channels": ["Direct online sales to customers", "Dealer networks in rural regions"]}
+    },
+    "methodologies": [
+        {"name": "Lean", "description": "Eliminate waste and waiting in production"},
+        {"name": "Six Sigma", "description": "Reduce defects and variation with statistics"}
+    ],
+    "industry_name": "Example"
+}
+
+class TestSemanticIndex(unittest.TestCase):
+    """Test cases for offline semantic retrieval over document leaves."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.index = SemanticIndex.build(iter_leaves(DOCUMENT))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_leaves(self):
+        """Test that text leaves keep their section, path and key."""
+        leaves = list(iter_leaves(DOCUMENT))
+        self.assertEqual(len(leaves), 8)
+        self.assertEqual(leaves[0], Leaf("value_chain_analysis", "value_chain_analysis.battery_recycling.challenges[0]",
+                                         "challenges", "Recycling used batteries is costly"))
+        self.assertEqual(leaves[4], Leaf("methodologies", "methodologies[0].name", "name", "Lean"))
+
+    def test_search(self):
+        """Test that inflected and related wording finds the right leaves."""
+        score, leaf = self.index.search("how do we recycle a battery", k=1)[0]
+        self.assertEqual(leaf.text, "Recycling used batteries is costly")
+        self.assertGreater(score, 0.5)
+
+        self.assertEqual(self.index.search("fewer defects", k=1)[0][1].text,
+                         "Reduce defects and variation with statistics")
+        self.assertEqual(self.index.search("quantum chromodynamics"), [])
+        self.assertEqual(len(self.index.search("sales", k=100, min_score=-1.0)), 8)
+
+        batch = self.index.search_batch(["recycle battery", "fewer defects"], k=3)
+        self.assertEqual(batch, [self.index.search("recycle battery", k=3), self.index.search("fewer defects", k=3)])
+
+    def test_sparse_products(self):
+        """Test that sparse block products match dense ones."""
+        texts = [semantic_index.leaf_text(leaf) for leaf in iter_leaves(DOCUMENT)] + [""]
+        block = semantic_index._TermBlock(texts)
+        dense = np.zeros((len(texts), semantic_index.FEATURE_DIM), dtype=np.float32)
+        dense[block.rows, block.indices] = block.values
+
+        basis = np.random.default_rng(0).standard_normal((semantic_index.FEATURE_DIM, 3)).astype(np.float32)
+        np.testing.assert_allclose(block.dot(basis), dense @ basis, rtol=1e-5, atol=1e-5)
+        other = np.random.default_rng(1).standard_normal((len(texts), 3)).astype(np.float32)
+        np.testing.assert_allclose(block.tdot(other), dense.T @ other, rtol=1e-5, atol=1e-5)
+
+    def test_save_and_load(self):
+        """Test that a saved index is memory-mapped and answers the same way."""
+        self.index.save(self.work_dir)
+        loaded = SemanticIndex.load(self.work_dir)
+
+        self.assertIsInstance(loaded.matrix, np.memmap)
+        self.assertEqual(loaded.leaves, self.index.leaves)
+        self.assertEqual(loaded.search("recycle battery"), self.index.search("recycle battery"))
+
+    def test_question_fallback(self):
+        """Test that questions without literal matches are answered from related passages."""
+        analyzer = BPMAnalyzer(DATA_DIR)
+        analyzer.set_current_industry("electric vehicle")
+
+        answer = analyzer.answer_question("How expensive are the batteries?")
+        self.assertIn("batteries", answer)
+        self.assertNotIn("don't have specific information", answer)
+        self.assertIs(analyzer.semantic_index(), analyzer.semantic_indexes["electric vehicle"])
+
+        results = analyzer.semantic_search("recycling batteries", k=3)
+        self.assertTrue(all(result["score"] >= semantic_index.MIN_SCORE
+                            for category in results.values() for result in category))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.bpm_analyzer import BPMAnalyzer
+from enhanced_bpm.models.snippets import ELLIPSIS, Passage, iter_passages
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+LONG_TEXT = ("Business process management improves efficiency. " * 8 +
+             "The Lean methodology eliminates waste in production lines. " +
+             "Further reading covers governance. " * 8)
+
+class TestSnippets(unittest.TestCase):
+    """Test cases for highlighted snippets cut from token offsets."""
+
+    def test_token_offsets(self):
+        """Test that passages store the character offsets of their tokens."""
+        passage = Passage("Lean, Six-Sigma")
+        self.assertEqual(list(zip(passage.starts, passage.ends)), [(0, 4), (6, 9), (10, 15)])
+        self.assertEqual(passage.find("sigma"), [(10, 15)])
+        self.assertEqual(Passage("İstanbul lean").find("lean"), [(9, 13)])
+
+    def test_short_text_is_returned_whole(self):
+        """Test that texts within the snippet length are returned whole with every match."""
+        passage = Passage("Lean thinking, lean tools")
+        self.assertEqual(passage.snippet(passage.find("lean")),
+                         {"snippet": "Lean thinking, lean tools", "highlights": [[0, 4], [15, 19]]})
+
+    def test_window_around_match(self):
+        """Test that long texts are cut at word boundaries around the first match."""
+        passage = Passage(LONG_TEXT)
+        result = passage.snippet(passage.find("waste"), max_chars=60)
+
+        snippet = result["snippet"]
+        self.assertTrue(snippet.startswith(ELLIPSIS) and snippet.endswith(ELLIPSIS))
+        self.assertLessEqual(len(snippet), 60 + 2 * len(ELLIPSIS))
+        self.assertIn(snippet.strip(ELLIPSIS), LONG_TEXT)
+        self.assertEqual([snippet[start:end] for start, end in result["highlights"]], ["waste"])
+        # Windows start and end on whole words
+        self.assertTrue(snippet[len(ELLIPSIS)].isalnum() and snippet[-len(ELLIPSIS) - 1].isalnum())
+
+    def test_passage_paths(self):
+        """Test that passages are yielded for every string with its path."""
+        paths = [path for path, _ in iter_passages({"name": "Lean", "tools": ["5S", "Kanban"], "level": 3})]
+        self.assertEqual(paths, ["name", "tools[0]", "tools[1]"])
+
+    def test_industry_search_snippets(self):
+        """Test that industry search returns snippets with highlights instead of whole strings."""
+        analyzer = BPMAnalyzer(DATA_DIR)
+        analyzer.set_current_industry("electric vehicle")
+        results = analyzer.search_across_data("Battery")
+
+        self.assertTrue(results)
+        for category in results.values():
+            for result in category:
+                self.assertNotIn("content", result)
+                self.assertTrue(all(result["snippet"][start:end].lower() == "battery"
+                                    for start, end in result["highlights"]))
+                self.assertTrue(result["highlights"])
+        self.assertIs(analyzer._search_passages(), analyzer.search_passages["electric vehicle"])
+
+if __name__ == '__main__':
+    unittest.main()
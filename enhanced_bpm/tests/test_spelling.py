@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.bpm_analyzer import BPMAnalyzer
+from enhanced_bpm.models.spelling import SpellingIndex, collect_words, edit_distance
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+class TestSpelling(unittest.TestCase):
+    """Test cases for typo-tolerant question matching."""
+
+    def test_edit_distance(self):
+        """Test edits, adjacent transpositions and the distance limit."""
+        self.assertEqual(edit_distance("porter", "porter", 2), 0)
+        self.assertEqual(edit_distance("portr", "porter", 2), 1)
+        self.assertEqual(edit_distance("scorecrad", "scorecard", 2), 1)
+        self.assertEqual(edit_distance("lean", "clean", 2), 1)
+        self.assertEqual(edit_distance("kaizen", "lean", 2), 3)
+        self.assertEqual(edit_distance("ab", "ba", 0), 1)
+
+    def test_lookup(self):
+        """Test that the closest and then most frequent word is suggested."""
+        index = SpellingIndex()
+        index.add_words(["process", "progress", "porter", "sporter"])
+        index.add("process", 10)
+
+        self.assertEqual(index.lookup("procss"), ("process", 1))
+        self.assertEqual(index.lookup("proceess"), ("process", 1))
+        self.assertEqual(index.lookup("prgress"), ("progress", 1))
+        self.assertEqual(index.lookup("proges"), ("process", 2))
+        self.assertEqual(index.lookup("reengineering"), None)
+        self.assertEqual(index.lookup("porter"), ("porter", 0))
+        # Words longer than the indexed prefix are matched on their whole length
+        index.add("reengineering")
+        self.assertEqual(index.lookup("reengineerng"), ("reengineering", 1))
+        self.assertEqual(index.lookup("reengeneering", max_distance=1), ("reengineering", 1))
+
+        self.assertEqual(index.correct("the procss and portr"),
+                         ("the process and porter", {"procss": "process", "portr": "porter"}))
+        self.assertEqual(index.correct("the unknown xyz"), ("the unknown xyz", {}))
+        # Only corrections to the target words are made when they are given
+        self.assertEqual(index.correct("the procss and portr", targets={"porter"}),
+                         ("the procss and porter", {"portr": "porter"}))
+
+    def test_collect_words(self):
+        """Test that words are gathered from keys and nested values."""
+        self.assertEqual(sorted(collect_words({"Key_Name": ["Lean-Six Sigma", {"x": "Cycle time"}], "n": 3})),
+                         ["cycle", "key", "lean", "n", "name", "sigma", "six", "time", "x"])
+
+    def test_misspelled_questions(self):
+        """Test that misspelled intent keywords reach their answers."""
+        analyzer = BPMAnalyzer(DATA_DIR)
+        analyzer.set_current_industry("electric vehicle")
+
+        self.assertIn("Five Forces", analyzer.answer_question("What does the portr analysis say?"))
+        self.assertIn("Balanced Scorecard", analyzer.answer_question("Show me the balanced scorcard"))
+        self.assertIn("Methodologies", analyzer.answer_question("Explain business process reengeneering"))
+        self.assertIn("reengineering", analyzer.spelling_index)
+        self.assertIn("tesla", analyzer.spelling_index)
+
+    def test_valid_words_are_not_corrected(self):
+        """Test that valid words close to intent keywords keep their meaning in routing and search."""
+        analyzer = BPMAnalyzer(DATA_DIR)
+        analyzer.set_current_industry("electric vehicle")
+
+        self.assertNotIn("Methodologies", analyzer.answer_question("What is the mean time to repair?"))
+        for question in ("Who is leasing cars?", "What about recalls?", "Tell me about rivals"):
+            self.assertTrue(analyzer.answer_question(question).startswith("I don't have specific information"))
+        self.assertNotIn("mean", analyzer.spelling_index.correct("mean time", analyzer._intent_words)[1])
+
+if __name__ == '__main__':
+    unittest.main()
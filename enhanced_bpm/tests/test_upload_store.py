@@ -0,0 +1,185 @@
+import unittest
+import os
+import sys
+import io
+import json
+import shutil
+import sqlite3
+import tempfile
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.upload_store import UploadStore, section_counts
+
+class TestUploadStore(unittest.TestCase):
+    """Test cases for content-addressed upload storage."""
+
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.store = UploadStore(self.upload_dir, chunk_size=7)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.upload_dir)
+
+    def read(self, name):
+        """Read a stored file through its name."""
+        with open(self.store.path(name), 'rb') as f:
+            return f.read()
+
+    def test_identical_uploads_share_content(self):
+        """Test that identical uploads are stored once under several names."""
+        first, first_new = self.store.add("a.csv", io.BytesIO(b"name,value\nx,1\n"))
+        second, second_new = self.store.add("b.csv", io.BytesIO(b"name,value\nx,1\n"))
+
+        self.assertEqual(first, second)
+        self.assertTrue(first_new)
+        self.assertFalse(second_new)
+        self.assertEqual(self.store.refcount(first), 2)
+        self.assertEqual(os.stat(self.store.path("a.csv")).st_ino, os.stat(self.store.path("b.csv")).st_ino)
+        self.assertEqual(self.store.stats(), {"files": 2, "objects": 1, "bytes_stored": 15, "bytes_saved": 15})
+
+    def test_remove_is_reference_counted(self):
+        """Test that content is deleted with its last name only."""
+        digest, _ = self.store.add("a.json", io.BytesIO(b"{}"))
+        self.store.add("b.json", io.BytesIO(b"{}"))
+
+        self.assertTrue(self.store.remove("a.json"))
+        self.assertFalse(os.path.exists(self.store.path("a.json")))
+        self.assertEqual(self.read("b.json"), b"{}")
+        self.assertTrue(os.path.exists(self.store.object_path(digest)))
+
+        self.assertTrue(self.store.remove("b.json"))
+        self.assertFalse(os.path.exists(self.store.object_path(digest)))
+        self.assertEqual(self.store.refcount(digest), 0)
+        self.assertFalse(self.store.remove("b.json"))
+
+    def test_overwrite_releases_previous_content(self):
+        """Test that re-uploading a name with new content releases the old content."""
+        old, _ = self.store.add("a.json", io.BytesIO(b'{"v": 1}'))
+        new, _ = self.store.add("a.json", io.BytesIO(b'{"v": 2}'))
+
+        self.assertNotEqual(old, new)
+        self.assertEqual(self.read("a.json"), b'{"v": 2}')
+        self.assertFalse(os.path.exists(self.store.object_path(old)))
+        self.assertEqual(self.store.digest("a.json"), new)
+
+    def test_conversions(self):
+        """Test that converted artifacts are found again until they are deleted."""
+        source, _ = self.store.add("sheet.xlsx", io.BytesIO(b"workbook bytes"))
+        artifact, _ = self.store.add_bytes("sheet.json", b'{"Sheet1": []}')
+        self.store.record_conversion(source, "excel", artifact)
+
+        self.assertEqual(self.store.conversion(source, "excel"), artifact)
+        self.assertIsNone(self.store.conversion(source, "csv"))
+        self.assertTrue(self.store.link("copy.json", artifact))
+        self.assertEqual(self.read("copy.json"), b'{"Sheet1": []}')
+
+        self.store.remove("sheet.json")
+        self.store.remove("copy.json")
+        self.assertIsNone(self.store.conversion(source, "excel"))
+        self.assertFalse(self.store.link("again.json", artifact))
+
+    def test_index_persists(self):
+        """Test that names and reference counts survive reopening the store."""
+        digest, _ = self.store.add("a.csv", io.BytesIO(b"a,b\n"))
+        self.store.add("b.csv", io.BytesIO(b"a,b\n"))
+        self.store.close()
+
+        self.store = UploadStore(self.upload_dir)
+        self.assertEqual(self.store.digest("b.csv"), digest)
+        self.assertEqual(self.store.refcount(digest), 2)
+
+    def test_legacy_files_can_be_removed(self):
+        """Test that files stored before content addressing are still deletable."""
+        with open(self.store.path("old.json"), 'w') as f:
+            f.write("{}")
+
+        self.assertTrue(self.store.remove("old.json"))
+        self.assertFalse(os.path.exists(self.store.path("old.json")))
+
+    def test_catalog_filters(self):
+        """Test listing and counting uploads by format, section and name prefix."""
+        self.store.add("events.csv", io.BytesIO(b"case,activity\n1,a\n"))
+        for name, data in [("events.json", {"summary": {"cases": 1}, "variants": [1, 2]}),
+                           ("principles.json", {"core_principles": [1, 2, 3]}),
+                           ("principles_copy.json", {"core_principles": [1, 2, 3]})]:
+            source = "events.csv" if name == "events.json" else None
+            self.store.add_bytes(name, json.dumps(data).encode(), converted_from=source)
+            self.store.describe(name, data)
+
+        self.assertEqual(self.store.list_files(), ["events.csv", "events.json", "principles.json",
+                                                   "principles_copy.json"])
+        self.assertEqual(self.store.list_files(file_format="json", limit=2, offset=1),
+                         ["principles.json", "principles_copy.json"])
+        self.assertEqual(self.store.list_files(section="core_principles"), ["principles.json", "principles_copy.json"])
+        self.assertEqual(self.store.list_files(prefix="events"), ["events.csv", "events.json"])
+        self.assertEqual(self.store.count_files(file_format="csv"), 1)
+        self.assertTrue(self.store.exists("events.json"))
+        self.assertFalse(self.store.exists("missing.json"))
+
+        info = self.store.list_files(prefix="events.j", details=True)[0]
+        self.assertEqual(info["converted_from"], "events.csv")
+        self.assertEqual(info["sections"], {"summary": 1, "variants": 2})
+        self.assertEqual(info["item_count"], 3)
+        self.assertEqual(section_counts([1, 2]), {})
+
+    def test_sync_adopts_legacy_files(self):
+        """Test that files placed in the folder are cataloged and vanished files are dropped."""
+        with open(self.store.path("old.json"), 'w') as f:
+            json.dump({"methodologies": [1]}, f)
+        self.store.add("gone.csv", io.BytesIO(b"a\n"))
+        os.remove(self.store.path("gone.csv"))
+
+        self.assertEqual(self.store.sync(), {"adopted": 1, "dropped": 1})
+        self.assertEqual(self.store.list_files(section="methodologies", details=True)[0]["name"], "old.json")
+        self.assertEqual(self.store.list_files(), ["old.json"])
+        self.assertEqual(self.store.sync(), {"adopted": 0, "dropped": 0})
+
+    def test_index_migration(self):
+        """Test that an index created before the catalog columns existed is upgraded."""
+        self.store.close()
+        index_path = os.path.join(self.upload_dir, ".objects", "index.db")
+        os.remove(index_path)
+        conn = sqlite3.connect(index_path)
+        conn.executescript("""
+            CREATE TABLE objects (digest TEXT PRIMARY KEY, size INTEGER NOT NULL, refcount INTEGER NOT NULL);
+            CREATE TABLE files (name TEXT PRIMARY KEY, digest TEXT NOT NULL, created_at REAL NOT NULL);
+        """)
+        conn.close()
+
+        self.store = UploadStore(self.upload_dir)
+        self.store.add_bytes("a.json", b'{"frameworks": []}')
+        self.assertEqual(self.store.list_files(file_format="json"), ["a.json"])
+
+    def test_section_versions(self):
+        """Test that edits bump the versions of the changed sections only."""
+        digest, _ = self.store.add_bytes("doc.json", b'{"methodologies": [], "frameworks": []}', converted_from="doc.csv")
+        self.store.describe("doc.json", {"methodologies": [], "frameworks": []})
+        initial = self.store.section_versions("doc.json")
+        self.assertEqual(initial["methodologies"], initial["frameworks"])
+
+        edited = {"methodologies": [{"name": "Lean"}], "frameworks": []}
+        new_digest = self.store.update("doc.json", edited, {"methodologies"}, digest)
+        versions = self.store.section_versions("doc.json")
+        self.assertGreater(versions["methodologies"], initial["methodologies"])
+        self.assertEqual(versions["frameworks"], initial["frameworks"])
+        self.assertEqual(json.loads(self.read("doc.json")), edited)
+        self.assertEqual(self.store.list_files(details=True)[0]["converted_from"], "doc.csv")
+        self.assertEqual(self.store.refcount(digest), 0)
+
+        # An edit made to an older version is refused
+        self.assertIsNone(self.store.update("doc.json", {"frameworks": []}, {"methodologies"}, digest))
+        self.assertEqual(self.store.digest("doc.json"), new_digest)
+
+        # Replacing the whole file moves every section past the edited one
+        self.store.add_bytes("doc.json", b'{"methodologies": [], "frameworks": [1]}')
+        self.store.describe("doc.json", {"methodologies": [], "frameworks": [1]})
+        replaced = self.store.section_versions("doc.json")
+        self.assertGreater(replaced["frameworks"], versions["methodologies"])
+        self.assertEqual(replaced["methodologies"], replaced["frameworks"])
+        self.assertIsNone(self.store.section_versions("missing.json"))
+
+if __name__ == '__main__':
+    unittest.main()
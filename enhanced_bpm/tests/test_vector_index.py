@@ -0,0 +1,202 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.semantic_index import Leaf, SemanticIndex
+from enhanced_bpm.models.vector_index import IVFIndex, kmeans
+from enhanced_bpm.tests.web_helpers import isolated_web_app
+
+def clustered_vectors(count, dim=16, clusters=8, seed=0):
+    """Return unit-length vectors drawn around random cluster directions."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    vectors = centers[rng.integers(clusters, size=count)] + 0.5 * rng.standard_normal((count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+class TestVectorIndex(unittest.TestCase):
+    """Test cases for the IVF approximate nearest-neighbor index."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.vectors = clustered_vectors(2000)
+        self.queries = clustered_vectors(50, seed=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_kmeans_centroids(self):
+        """Test that k-means returns unit-length centroids close to the clusters."""
+        centroids = kmeans(self.vectors, 8)
+        self.assertEqual(centroids.shape, (8, 16))
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-5)
+        # Every vector is closer to its centroid than to a random direction
+        self.assertGreater(np.mean(np.max(self.vectors @ centroids.T, axis=1)), 0.7)
+
+    def test_recall_against_exact_search(self):
+        """Test that probing a few lists finds nearly all exact neighbors and all lists finds them all."""
+        index = IVFIndex.train(self.vectors, nlist=32)
+        self.assertEqual(sum(index.list_sizes()), len(self.vectors))
+
+        exact_scores, exact_ids = index.exact_search(self.queries, 10)
+        brute = np.argsort(-(self.queries @ self.vectors.T), axis=1)[:, :10]
+        self.assertEqual(exact_ids.tolist(), brute.tolist())
+
+        _, ids = index.search(self.queries, 10, nprobe=8)
+        recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(ids, exact_ids)])
+        self.assertGreater(recall, 0.9)
+
+        scores, ids = index.search(self.queries, 10, nprobe=32)
+        np.testing.assert_allclose(scores, exact_scores, rtol=1e-5)
+
+    def test_persisted_index_is_memory_mapped(self):
+        """Test that a saved index is memory-mapped and answers the same way."""
+        index = IVFIndex.train(self.vectors, nlist=16, directory=self.work_dir)
+        loaded = IVFIndex.load(self.work_dir)
+
+        self.assertIsInstance(loaded.vectors, np.memmap)
+        self.assertEqual(loaded.search(self.queries, 5)[1].tolist(), index.search(self.queries, 5)[1].tolist())
+
+    def test_incremental_inserts(self):
+        """Test that added vectors are searchable, shared through the directory and compacted."""
+        index = IVFIndex.train(self.vectors, nlist=16, directory=self.work_dir)
+        other = IVFIndex.load(self.work_dir)
+
+        added = clustered_vectors(10, seed=2)
+        index.add(added, np.arange(5000, 5010))
+        self.assertEqual(len(index), 2010)
+        self.assertEqual(index.search(added[:1], 1)[1][0, 0], 5000)
+
+        # Another process sharing the directory picks the segment up
+        self.assertTrue(other.refresh())
+        self.assertEqual(other.search(added[:1], 1)[1][0, 0], 5000)
+
+        self.assertEqual(index.compact(), 10)
+        self.assertEqual(index.segment_count(), 0)
+        self.assertTrue(other.refresh())
+        self.assertEqual(len(other), 2010)
+        self.assertEqual(other.search(added[:1], 1)[1][0, 0], 5000)
+
+    def test_removed_vectors(self):
+        """Test that removed vectors leave the results without taking places and are dropped when compacted."""
+        index = IVFIndex.train(self.vectors, nlist=16, directory=self.work_dir)
+        _, before = index.search(self.queries[:1], 10, nprobe=16)
+        index.remove(before[0, :5])
+
+        _, after = index.search(self.queries[:1], 10, nprobe=16)
+        self.assertEqual(after[0, :5].tolist(), before[0, 5:].tolist())
+        self.assertFalse(set(after[0]) & set(before[0, :5]))
+        self.assertEqual(index.exact_search(self.queries[:1], 5)[1][0].tolist(), before[0, 5:].tolist())
+
+        index.compact()
+        self.assertEqual(sum(index.list_sizes()), len(self.vectors) - 5)
+        self.assertEqual(IVFIndex.load(self.work_dir).search(self.queries[:1], 10, nprobe=16)[1][0].tolist(),
+                         after[0].tolist())
+
+    def test_semantic_index_inserts(self):
+        """Test that leaves added to a saved semantic index are found by other loaders."""
+        leaves = [Leaf("methodologies", f"methodologies[{i}]", "description", text)
+                  for i, text in enumerate(["Eliminate waste in production", "Reduce defects with statistics",
+                                            "Map the customer journey", "Automate invoice approval"] * 5)]
+        index = SemanticIndex.build(leaves)
+        index.save(self.work_dir)
+        index.build_ann(nlist=4)
+        other = SemanticIndex.load(self.work_dir)
+
+        index.add([Leaf("uploads", "uploads[0]", "description", "Automate invoice statistics", "abc")])
+        self.assertEqual(index.search("automate invoice statistics", 1)[0][1].source, "abc")
+
+        self.assertTrue(other.refresh())
+        self.assertEqual(other.sources, {"abc"})
+        self.assertEqual(other.search("automate invoice statistics", 1)[0][1].source, "abc")
+
+    def test_semantic_index_removals(self):
+        """Test that removing a source's leaves reaches other loaders and survives a save."""
+        leaves = [Leaf("methodologies", f"methodologies[{i}]", "description", text)
+                  for i, text in enumerate(["Eliminate waste in production", "Reduce defects with statistics",
+                                            "Map the customer journey", "Automate invoice approval"] * 5)]
+        index = SemanticIndex.build(leaves)
+        index.save(self.work_dir)
+        index.build_ann(nlist=4)
+        other = SemanticIndex.load(self.work_dir)
+
+        index.add([Leaf("uploads", "uploads[0]", "description", "Automate invoice statistics", "abc"),
+                   Leaf("uploads", "uploads[0]", "description", "Automate invoice statistics", "def")])
+        self.assertEqual(index.remove("abc"), 1)
+        self.assertEqual(index.sources, {"def"})
+        self.assertEqual([leaf.source for _, leaf in index.search("automate invoice statistics", 2)][0], "def")
+
+        self.assertTrue(other.refresh())
+        self.assertEqual(other.sources, {"def"})
+        self.assertNotIn("abc", [leaf.source for _, leaf in other.search("automate invoice statistics", 5)])
+
+        index.save(self.work_dir)
+        reloaded = SemanticIndex.load(self.work_dir)
+        self.assertEqual(len(reloaded), len(leaves) + 1)
+        self.assertEqual(len(reloaded.ann), len(leaves) + 1)
+
+    def test_concurrent_adds_of_one_source(self):
+        """Test that a source added by two loaders at once is indexed once after a refresh."""
+        leaves = [Leaf("methodologies", f"methodologies[{i}]", "description", text)
+                  for i, text in enumerate(["Eliminate waste in production", "Reduce defects with statistics",
+                                            "Map the customer journey", "Automate invoice approval"] * 5)]
+        index = SemanticIndex.build(leaves)
+        index.save(self.work_dir)
+        index.build_ann(nlist=4)
+        first, second = SemanticIndex.load(self.work_dir), SemanticIndex.load(self.work_dir)
+
+        upload = [Leaf("uploads", "uploads[0]", "description", "Automate invoice statistics", "abc"),
+                  Leaf("uploads", "uploads[1]", "description", "Reconcile supplier payments", "abc")]
+        first.add(upload)
+        second.add(upload)
+        for loader in (first, second, SemanticIndex.load(self.work_dir)):
+            loader.refresh()
+            self.assertEqual(len(loader.added), 2)
+            hits = [leaf for _, leaf in loader.search("automate invoice statistics", 5)]
+            self.assertEqual(hits.count(upload[0]), 1)
+
+    def test_web_uploads_follow_their_content(self):
+        """Test that converted and patched uploads are indexed and content without names is removed."""
+        web_app = isolated_web_app(self, self.work_dir)
+        store = web_app.get_upload_store()
+
+        # A small saved index stands in for the one built from the bundled documents
+        leaves = [Leaf("methodologies", f"methodologies[{i}]", "description", text, "bpm_principles.json")
+                  for i, text in enumerate(["Eliminate waste in production", "Reduce defects with statistics",
+                                            "Map the customer journey", "Automate invoice approval"] * 5)]
+        index = SemanticIndex.build(leaves)
+        index.save(web_app.app.config['SEMANTIC_INDEX_FOLDER'])
+        index.build_ann(nlist=4)
+        web_app.semantic_index = index
+
+        def search(term):
+            return [(hit["file"], hit["item"]) for hit in web_app.semantic_search_hits(term, 'all', 5)
+                    if hit["source"] == 'upload']
+
+        document = {"methodologies": [{"name": "Invoices", "description": "Automate invoice statistics"}]}
+        self.assertEqual(web_app.save_as_json(document, 'invoices.csv'), 'invoices.json')
+        self.assertEqual(search("automate invoice statistics"),
+                         [("invoices.json", "Automate invoice statistics")])
+        old_digest = store.digest('invoices.json')
+
+        client = web_app.app.test_client()
+        response = client.patch('/api/documents/invoices.json', data=json.dumps(
+            {"methodologies": [{"name": "Invoices", "description": "Reduce invoice defects"}]}),
+            content_type='application/merge-patch+json')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(old_digest, index.sources)
+        self.assertEqual(search("reduce invoice defects"), [("invoices.json", "Reduce invoice defects")])
+
+        client.post('/delete/invoices.json')
+        self.assertEqual(index.sources, set())
+        self.assertEqual(len(index.ann), len(leaves))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import time
+
+# Add the project root to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from enhanced_bpm.models.workspace_store import (
+    DocumentCache, MemoryWorkspaceStore, SQLiteWorkspaceStore, SearchIndex, WorkspaceManager,
+    create_workspace_store
+)
+
+class TestWorkspaceStore(unittest.TestCase):
+    """Test cases for server-side workspaces and the document cache."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.data_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'bpm_principles.json')
+        with open(self.data_file, 'r') as f:
+            self.data = json.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def write(self, filename, data):
+        """Write a JSON document to the work directory."""
+        path = os.path.join(self.work_dir, filename)
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        return path
+
+    def test_search_index(self):
+        """Test section filtering and metric categories in search results."""
+        index = SearchIndex(self.data)
+
+        results = index.search("CYCLE TIME")
+        self.assertIn("performance_metrics", results)
+        self.assertTrue(all("category" in metric for metric in results["performance_metrics"]))
+        self.assertNotIn("category", self.data["performance_metrics"][0]["metrics"][0])
+
+        only_methodologies = index.search("lean", "methodologies")
+        self.assertEqual(list(only_methodologies), ["methodologies"])
+        self.assertEqual(index.search("no such text anywhere"), {})
+
+        # Snippets are added to copies of the items
+        with_snippets = index.search("CYCLE TIME", snippets=True)
+        metric = with_snippets["performance_metrics"][0]
+        self.assertEqual({key: value for key, value in metric.items() if key not in ("path", "snippet", "highlights")},
+                         results["performance_metrics"][0])
+        self.assertEqual([metric["snippet"][start:end].lower() for start, end in metric["highlights"]],
+                         ["cycle time"])
+        self.assertNotIn("snippet", results["performance_metrics"][0])
+
+    def test_document_cache_reloads_changed_files(self):
+        """Test that unchanged files are parsed once and changed files are reloaded."""
+        path = self.write("doc.json", {"core_principles": [{"name": "First"}]})
+        cache = DocumentCache()
+
+        first = cache.get(path)
+        self.assertIs(cache.get(path), first)
+        self.assertEqual(cache.loads, 1)
+
+        self.write("doc.json", {"core_principles": [{"name": "Second version"}]})
+        second = cache.get(path)
+        self.assertEqual(cache.loads, 2)
+        self.assertIsNone(cache.revalidate(first, path))
+        self.assertEqual(second.search_index.search("second"), {"core_principles": [{"name": "Second version"}]})
+
+    def test_document_cache_eviction(self):
+        """Test that the least recently used document is evicted."""
+        cache = DocumentCache(capacity=2)
+        paths = [self.write(f"doc{i}.json", {"i": i}) for i in range(3)]
+
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+        cache.get(paths[0])
+        self.assertEqual(cache.loads, 3)
+        cache.get(paths[1])
+        self.assertEqual(cache.loads, 4)
+
+    def test_patched_document_reuses_index(self):
+        """Test that a patched document re-indexes only its changed sections."""
+        path = self.write("doc.json", {"core_principles": [{"name": "First"}], "frameworks": [{"name": "SCOR"}]})
+        cache = DocumentCache()
+        base = cache.get(path)
+        base.search_index
+
+        data = {"core_principles": [{"name": "Edited"}], "frameworks": base.data["frameworks"]}
+        self.write("doc.json", data)
+        patched = cache.put(path, data, base.layout, previous=base, changed_sections={"core_principles"})
+
+        self.assertIs(cache.get(path), patched)
+        self.assertEqual(cache.loads, 1)
+        index = patched.search_index
+        self.assertIs(index.sections["frameworks"], base.search_index.sections["frameworks"])
+        self.assertEqual(index.search("edited"), {"core_principles": [{"name": "Edited"}]})
+        self.assertEqual(index.search("first"), {})
+
+    def test_memory_store_lru(self):
+        """Test that the memory store keeps workspace objects and evicts old ones."""
+        manager = WorkspaceManager(MemoryWorkspaceStore(capacity=2), DocumentCache(),
+                                   lambda name: os.path.join(self.work_dir, name), "default.json")
+        workspaces = []
+        for _ in range(3):
+            workspace = manager.get(None)
+            workspace.set_current_industry("electric vehicle")
+            manager.save(workspace)
+            workspaces.append(workspace)
+
+        self.assertIsNone(manager.store.load(workspaces[0].workspace_id))
+        self.assertIs(manager.get(workspaces[2].workspace_id), workspaces[2])
+
+    def test_sqlite_store(self):
+        """Test that workspaces persist across store instances."""
+        db_path = os.path.join(self.work_dir, "workspaces.db")
+        store = create_workspace_store("sqlite", db_path)
+        manager = WorkspaceManager(store, DocumentCache(), lambda name: os.path.join(self.work_dir, name),
+                                   "default.json")
+
+        workspace = manager.get("unknown id")
+        self.assertTrue(workspace.is_new)
+        workspace.set_active_file("upload.json")
+        manager.save(workspace)
+        store.close()
+
+        reopened = SQLiteWorkspaceStore(db_path)
+        loaded = reopened.load(workspace.workspace_id)
+        self.assertEqual(loaded.active_file, "upload.json")
+        self.assertIsNone(loaded.current_industry)
+        self.assertEqual(reopened.expire(-1), 1)
+        reopened.close()
+
+        with self.assertRaises(ValueError):
+            create_workspace_store("redis")
+
+    def test_manager_expires_stale_workspaces(self):
+        """Test that saving removes workspaces older than the maximum age, at most once per interval."""
+        store = SQLiteWorkspaceStore(os.path.join(self.work_dir, "workspaces.db"))
+        self.addCleanup(store.close)
+        manager = WorkspaceManager(store, DocumentCache(), lambda name: os.path.join(self.work_dir, name),
+                                   "default.json", max_age=3600, expire_interval=3600)
+
+        def add(updated_at):
+            workspace = manager.get(None)
+            workspace.set_current_industry("electric vehicle")
+            store.save(workspace)
+            with store._conn:
+                store._conn.execute("UPDATE workspaces SET updated_at = ? WHERE id = ?",
+                                    (updated_at, workspace.workspace_id))
+            return workspace.workspace_id
+
+        stale = add(0)
+        recent = add(time.time() - 60)
+        workspace = manager.get(None)
+        workspace.set_active_file("upload.json")
+        manager.save(workspace)
+
+        self.assertIsNone(store.load(stale))
+        self.assertIsNotNone(store.load(recent))
+        self.assertIsNotNone(store.load(workspace.workspace_id))
+
+        # The next removal waits for the interval to pass
+        stale = add(0)
+        workspace.set_active_file("other.json")
+        manager.save(workspace)
+        self.assertIsNotNone(store.load(stale))
+        manager._next_expiry = 0
+        self.assertEqual(manager.expire(), 1)
+        self.assertIsNone(store.load(stale))
+
+    def test_manager_pins_documents(self):
+        """Test that a workspace resolves its active document once and follows file changes."""
+        documents = DocumentCache()
+        resolved = []
+
+        def resolve(name):
+            resolved.append(name)
+            return os.path.join(self.work_dir, name)
+
+        self.write("default.json", {"core_principles": []})
+        manager = WorkspaceManager(MemoryWorkspaceStore(), documents, resolve, "default.json")
+        workspace = manager.get(None)
+
+        self.assertIs(manager.document(workspace), manager.document(workspace))
+        self.assertEqual(resolved, ["default.json"])
+
+        self.write("other.json", {"core_principles": [{"name": "Other"}]})
+        workspace.set_active_file("other.json")
+        self.assertTrue(workspace.modified)
+        self.assertEqual(manager.document(workspace).data["core_principles"][0]["name"], "Other")
+        self.assertEqual(resolved, ["default.json", "other.json"])
+        self.assertEqual(documents.loads, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+
+# Module globals of the web app that are created on first use
+LAZY_GLOBALS = ('upload_store', 'federated_search', 'semantic_index', 'assessment_store', 'kpi_store',
+                'anomaly_monitor', 'question_analyzer', 'conformance_version', 'workspace_manager')
+
+# Globals of the web app that read the data folder
+DATA_GLOBALS = ('DATA_FOLDER', 'analysis_cache', 'document_cache')
+
+def isolated_web_app(test, work_dir, data_dir=None, **config):
+    """
+    Point the web app at a test's work directory until the test finishes.
+
+    Every folder and database the app writes to is placed in work_dir (config
+    entries override them), and the stores, indexes and analyzers it creates
+    on first use are reset, so they are opened there. When the test finishes,
+    the ones it opened are closed and the app is restored.
+
+    Args:
+        test: The running TestCase
+        work_dir: Temporary directory of the test
+        data_dir: Copy of the data folder to read (and patch) instead of the bundled one
+        config: App configuration overrides
+
+    Returns:
+        The web app module
+    """
+    from enhanced_bpm.models.analysis_cache import AnalysisBundleCache
+    from enhanced_bpm.web import app as web_app
+
+    config = dict({
+        'UPLOAD_FOLDER': os.path.join(work_dir, 'uploads'),
+        'SEMANTIC_INDEX_FOLDER': os.path.join(work_dir, 'semantic_index'),
+        'WORKSPACE_DB': os.path.join(work_dir, 'workspaces.db'),
+        'KPI_STORE_FOLDER': os.path.join(work_dir, 'kpi_store'),
+        'ASSESSMENT_DB': os.path.join(work_dir, 'assessments.db'),
+        'CONFORMANCE_RESULTS': os.path.join(work_dir, 'conformance_results.json')
+    }, **config)
+    previous_config = {key: web_app.app.config[key] for key in config}
+    names = LAZY_GLOBALS + ('analyzer_industry_versions',) + (DATA_GLOBALS if data_dir else ())
+    previous_globals = {name: getattr(web_app, name) for name in names}
+
+    def restore():
+        for name in ('upload_store', 'federated_search', 'assessment_store'):
+            opened = getattr(web_app, name)
+            if opened is not None and opened is not previous_globals[name]:
+                opened.close()
+        manager = web_app.workspace_manager
+        if manager is not None and manager is not previous_globals['workspace_manager']:
+            getattr(manager.store, 'close', lambda: None)()
+        for name, value in previous_globals.items():
+            setattr(web_app, name, value)
+        web_app.app.config.update(previous_config)
+
+    test.addCleanup(restore)
+    web_app.app.config.update(config)
+    for name in LAZY_GLOBALS:
+        setattr(web_app, name, None)
+    web_app.analyzer_industry_versions = {}
+    if data_dir:
+        web_app.DATA_FOLDER = data_dir
+        web_app.analysis_cache = AnalysisBundleCache(data_dir, cache_dir=os.path.join(work_dir, 'analysis_cache'))
+        web_app.document_cache = web_app.DocumentCache()
+    return web_app
@@ -1,15 +1,69 @@
+import gc
 import os
+import sys
 import json
 import re
-import pandas as pd
 import tempfile
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+import threading
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g
 from werkzeug.utils import secure_filename
 
+# Add the project root to the path to import the models
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from enhanced_bpm.compat.lazy_import import lazy_module
+from enhanced_bpm.models.analysis_cache import AnalysisBundleCache, compute_data_version, industry_file_name
+from enhanced_bpm.models.maturity_scoring import MaturityScoringEngine
+from enhanced_bpm.models.assessment_store import AssessmentStore
+from enhanced_bpm.models.process_simulator import process_from_business_area, run_replications
+from enhanced_bpm.models.roi_calculator import ROICalculator, roi_items_from_recommendations
+from enhanced_bpm.models.process_graph import ProcessGraph
+from enhanced_bpm.models.process_mining import mine_event_log
+from enhanced_bpm.models.bpm_analyzer import BPMAnalyzer
+from enhanced_bpm.models.conformance import (
+    ConformanceChecker, load_results as load_conformance_results, save_results as save_conformance_results
+)
+from enhanced_bpm.models.kpi_store import KPIStore, kpi_catalog
+from enhanced_bpm.models.kpi_anomaly import monitor_store
+from enhanced_bpm.models.workspace_store import DocumentCache, WorkspaceManager, create_workspace_store
+from enhanced_bpm.models.document_schema import SchemaError, validate_document
+from enhanced_bpm.models.upload_store import UploadStore
+from enhanced_bpm.models.excel_ingest import CONVERTER_VERSION as EXCEL_CONVERTER_VERSION, convert_workbook
+from enhanced_bpm.models.federated_search import FederatedSearch
+from enhanced_bpm.models.semantic_index import SemanticIndex, iter_leaves
+from enhanced_bpm.models.document_patch import (
+    JSON_PATCH, MERGE_PATCH, PatchConflict, PatchError, apply_json_patch, apply_merge_patch, changed_sections
+)
+
+# pandas is only needed by the CSV/Excel converters, so it is imported on first use
+pd = lazy_module("pandas")
+
 # Configuration
 UPLOAD_FOLDER = 'uploads'
+ANALYSIS_CACHE_FOLDER = 'analysis_cache'
+ASSESSMENT_DB = 'assessments.db'
+KPI_STORE_FOLDER = 'kpi_store'
+CONFORMANCE_RESULTS = 'conformance_results.json'
+SEMANTIC_INDEX_FOLDER = 'semantic_index'
+WORKSPACE_STORE = 'sqlite'  # or 'memory' for a single-process server
+WORKSPACE_DB = 'workspaces.db'
+WORKSPACE_COOKIE = 'bpm_workspace'
+WORKSPACE_MAX_AGE = 30 * 24 * 3600
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
 ALLOWED_EXTENSIONS = {'json', 'csv', 'xlsx', 'xls'}
+MAX_SIMULATION_REPLICATIONS = 10000
+MAX_SIMULATION_ENTITIES = 10000
+MAX_ROI_DRAWS = 1000000
+MAX_PROCESS_BOTTLENECKS = 100
+EVENT_LOG_CHUNK_SIZE = 100000
+MAX_EVENT_LOG_VARIANTS = 100000
+ANOMALY_WARMUP_OBSERVATIONS = 10000
 DEFAULT_BPM_FILE = 'bpm_principles.json'
+UPLOAD_MENU_LIMIT = 100
+MAX_UPLOAD_PAGE_SIZE = 1000
+SEARCH_RESULT_LIMIT = 50
+MAX_SEARCH_RESULTS = 500
+SEMANTIC_SEARCH_OVERFETCH = 4
+PATCH_MIMETYPES = {JSON_PATCH, MERGE_PATCH, 'application/json'}
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -17,9 +71,213 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 app.secret_key = 'bpm_principles_explorer_secret_key'  # For session and flash messages
 
+app.config['ANALYSIS_CACHE_FOLDER'] = ANALYSIS_CACHE_FOLDER
+app.config['ASSESSMENT_DB'] = ASSESSMENT_DB
+app.config['KPI_STORE_FOLDER'] = KPI_STORE_FOLDER
+app.config['CONFORMANCE_RESULTS'] = CONFORMANCE_RESULTS
+app.config['SEMANTIC_INDEX_FOLDER'] = SEMANTIC_INDEX_FOLDER
+app.config['WORKSPACE_STORE'] = WORKSPACE_STORE
+app.config['WORKSPACE_DB'] = WORKSPACE_DB
+app.config['DATA_PATCHES_ENABLED'] = False  # Allow PATCH requests to edit the bundled industry files
+app.config['MAX_REQUEST_WORKERS'] = os.cpu_count() or 1  # Most processes a single request may start
+
 # Create uploads directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Analysis bundles are built once per data version and shared by all workers
+analysis_cache = AnalysisBundleCache(DATA_FOLDER, cache_dir=app.config['ANALYSIS_CACHE_FOLDER'])
+
+# Parsed JSON documents (with search indexes) shared by all workspaces
+document_cache = DocumentCache()
+
+# Maturity scoring engine, built on first use from the BPM principles data
+scoring_engine = None
+
+def get_scoring_engine():
+    global scoring_engine
+    if scoring_engine is None:
+        with open(os.path.join(DATA_FOLDER, DEFAULT_BPM_FILE), 'r', encoding='utf-8') as f:
+            scoring_engine = MaturityScoringEngine(json.load(f))
+    return scoring_engine
+
+# Content-addressed upload storage, opened on first use
+upload_store = None
+
+def get_upload_store():
+    global upload_store
+    if upload_store is None:
+        upload_store = UploadStore(app.config['UPLOAD_FOLDER'])
+        # Catalog files that were placed in the folder directly
+        upload_store.sync(allowed_file)
+    return upload_store
+
+# Search across all documents, with its shards built on first use
+federated_search = None
+
+def get_federated_search():
+    global federated_search
+    if federated_search is None:
+        federated_search = FederatedSearch(document_cache, searchable_documents)
+    return federated_search
+
+# Semantic index of the bundled and uploaded documents, memory-mapped from disk
+# (or built from the bundled documents) on first use
+semantic_index = None
+
+def get_semantic_index():
+    global semantic_index
+    if semantic_index is None:
+        folder = app.config['SEMANTIC_INDEX_FOLDER']
+        if SemanticIndex.exists(folder):
+            index = SemanticIndex.load(folder)
+        else:
+            # The latent space is learned from the bundled documents; uploads are added to it
+            leaves = []
+            for name, source, path in searchable_documents():
+                if source != 'upload':
+                    leaves.extend(leaf._replace(source=name) for leaf in iter_leaves(document_cache.get(path).data))
+            index = SemanticIndex.build(leaves)
+            index.save(folder)
+            index.build_ann()
+        
+        # Catch up with the uploads cataloged while the index was not loaded
+        store = get_upload_store()
+        for name in store.list_files(file_format='json'):
+            digest = store.digest(name)
+            if name != DEFAULT_BPM_FILE and digest not in index.sources:
+                try:
+                    add_semantic_leaves(index, digest, document_cache.get(store.path(name)).data)
+                except (OSError, ValueError):
+                    continue
+        # Sources named after a bundled file are re-indexed industry documents, not uploads
+        for digest in [source for source in index.sources
+                       if not source.endswith('.json') and store.refcount(source) == 0]:
+            index.remove(digest)
+        semantic_index = index
+    return semantic_index
+
+# Assessment store, opened on first use
+assessment_store = None
+
+def get_assessment_store():
+    global assessment_store
+    if assessment_store is None:
+        assessment_store = AssessmentStore(app.config['ASSESSMENT_DB'])
+    return assessment_store
+
+# KPI time-series store, opened on first use
+kpi_store = None
+
+def get_kpi_store():
+    global kpi_store
+    if kpi_store is None:
+        kpi_store = KPIStore(app.config['KPI_STORE_FOLDER'])
+    return kpi_store
+
+# KPI anomaly monitor, primed with the recent history of every stored metric
+anomaly_monitor = None
+
+def get_anomaly_monitor():
+    global anomaly_monitor
+    if anomaly_monitor is None:
+        with open(os.path.join(DATA_FOLDER, DEFAULT_BPM_FILE), 'r', encoding='utf-8') as f:
+            catalog = kpi_catalog(json.load(f))
+        anomaly_monitor = monitor_store(get_kpi_store(), catalog, ANOMALY_WARMUP_OBSERVATIONS)
+    return anomaly_monitor
+
+# Analyzer answering questions, with the KPI store, the anomaly monitor and the latest
+# conformance results attached (results saved by other workers are picked up when their file changes)
+question_analyzer = None
+question_lock = threading.Lock()
+conformance_version = None
+analyzer_industry_versions = {}
+
+def get_question_analyzer():
+    global question_analyzer, conformance_version
+    if question_analyzer is None:
+        question_analyzer = BPMAnalyzer(data_dir=DATA_FOLDER)
+        question_analyzer.set_kpi_store(get_kpi_store())
+        question_analyzer.set_anomaly_monitor(get_anomaly_monitor())
+    
+    try:
+        stat = os.stat(app.config['CONFORMANCE_RESULTS'])
+        version = (stat.st_ino, stat.st_mtime_ns)
+    except OSError:
+        version = None
+    if version != conformance_version:
+        question_analyzer.set_conformance_results(load_conformance_results(app.config['CONFORMANCE_RESULTS']))
+        conformance_version = version
+    return question_analyzer
+
+# Server-side session state (active file, selected industry), opened on first use
+workspace_manager = None
+
+def get_workspace_manager():
+    global workspace_manager
+    if workspace_manager is None:
+        store = create_workspace_store(app.config['WORKSPACE_STORE'], app.config['WORKSPACE_DB'])
+        workspace_manager = WorkspaceManager(store, document_cache, resolve_data_file, DEFAULT_BPM_FILE,
+                                             max_age=WORKSPACE_MAX_AGE)
+    return workspace_manager
+
+# Workspace of the current request, identified by an opaque cookie
+def current_workspace():
+    if 'workspace' not in g:
+        g.workspace = get_workspace_manager().get(request.cookies.get(WORKSPACE_COOKIE))
+    return g.workspace
+
+@app.after_request
+def save_workspace(response):
+    workspace = g.get('workspace')
+    if workspace is not None and workspace.modified:
+        is_new = workspace.is_new
+        get_workspace_manager().save(workspace)
+        if is_new:
+            response.set_cookie(WORKSPACE_COOKIE, workspace.workspace_id, max_age=WORKSPACE_MAX_AGE,
+                                httponly=True, samesite='Lax')
+    return response
+
+def preload_app():
+    """
+    Load and freeze everything workers would otherwise load on first request.
+    
+    Call this in the master process of a pre-fork server (see gunicorn.conf.py)
+    before workers are forked: the libraries, data files, analysis bundles,
+    scoring model and compiled templates are then inherited by every worker,
+    and gc.freeze() moves them out of the collector's reach so their pages
+    stay shared copy-on-write instead of being touched by each worker's GC.
+    """
+    global upload_store
+    # Heavy libraries imported on first use otherwise
+    lazy_module("numpy").ndarray
+    pd.DataFrame
+    
+    document_cache.get(resolve_data_file(DEFAULT_BPM_FILE)).search_index
+    
+    for industry_name in analysis_cache.available_industries():
+        analysis_cache.get(industry_name)
+    get_scoring_engine()
+    
+    if SemanticIndex.exists(app.config['SEMANTIC_INDEX_FOLDER']):
+        get_semantic_index()
+        # The index caught up through the upload store; its SQLite connection must not be shared by workers
+        upload_store.close()
+        upload_store = None
+    
+    for template_name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template_name)
+    
+    gc.collect()
+    gc.freeze()
+
+# Resolve links to views that are not implemented yet to a placeholder
+def handle_missing_endpoint(error, endpoint, values):
+    if endpoint in app.view_functions:
+        raise error
+    return '#'
+
+app.url_build_error_handlers.append(handle_missing_endpoint)
+
 # Helper function to check if file extension is allowed
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -35,6 +293,81 @@ def is_valid_json(file_path):
     except Exception:
         return False
 
+# Helper function to validate an uploaded JSON file and record its sections in the catalog
+# (returns an error message if the file is not a valid document)
+def catalog_json_upload(filename):
+    store = get_upload_store()
+    try:
+        # Parsed and validated through the document cache, so viewing the file does not parse it again
+        document = document_cache.get(store.path(filename))
+    except SchemaError as e:
+        return f"document does not match the BPM schema ({str(e)})"
+    except (OSError, ValueError):
+        return "not valid JSON"
+    store.describe(filename, document.data)
+    index_upload(filename, document.data)
+    return None
+
+# Helper function to add the text leaves of an uploaded document to the semantic index
+# (content is indexed once, by digest, whatever the number of names referring to it)
+def add_semantic_leaves(index, digest, data):
+    if digest is not None and digest not in index.sources:
+        index.add(leaf._replace(source=digest) for leaf in iter_leaves(data))
+
+# Helper function to index an uploaded document semantically
+# (uploads are inserted once the index exists; it catches up with earlier ones when created)
+# (data is read from the file when not given and the content is not indexed yet, here or by another worker)
+def index_upload(filename, data=None):
+    if semantic_index is not None or SemanticIndex.exists(app.config['SEMANTIC_INDEX_FOLDER']):
+        index = get_semantic_index()
+        store = get_upload_store()
+        digest = store.digest(filename)
+        index.refresh()
+        if digest is not None and digest not in index.sources:
+            if data is None:
+                data = document_cache.get(store.path(filename)).data
+            add_semantic_leaves(index, digest, data)
+
+# Helper function to replace the semantic leaves of a bundled document after it was edited
+def reindex_semantic_leaves(filename, data):
+    if semantic_index is not None or SemanticIndex.exists(app.config['SEMANTIC_INDEX_FOLDER']):
+        index = get_semantic_index()
+        index.refresh()
+        index.remove(filename)
+        index.add(leaf._replace(source=filename) for leaf in iter_leaves(data))
+
+# Helper function to remove the semantic leaves of upload content no name refers to any more
+# (so deleted content does not take the places of live passages in searches)
+def release_semantic_leaves(digest):
+    if digest is None or get_upload_store().refcount(digest) > 0:
+        return
+    if semantic_index is not None or SemanticIndex.exists(app.config['SEMANTIC_INDEX_FOLDER']):
+        index = get_semantic_index()
+        index.refresh()
+        if digest in index.sources:
+            index.remove(digest)
+
+# Helper function to get the number of worker processes a request asked for
+# (capped by the server, since each one is a new process)
+def request_workers(payload):
+    workers = payload.get('workers')
+    workers = int(workers) if workers is not None else 1
+    return min(max(workers, 1), app.config['MAX_REQUEST_WORKERS'])
+
+# Helper function to apply the PATCH request body to a document
+# (returns the patched document and the sections that changed)
+def apply_request_patch(document):
+    payload = request.get_json(force=True, silent=True)
+    if payload is None:
+        raise PatchError("Request body must be JSON")
+    
+    # Plain JSON bodies are taken as a patch document (a list) or a merge patch (an object)
+    if request.mimetype == JSON_PATCH or (request.mimetype == 'application/json' and isinstance(payload, list)):
+        patched, touched = apply_json_patch(document, payload)
+    else:
+        patched, touched = apply_merge_patch(document, payload)
+    return patched, changed_sections(document, patched, touched)
+
 # Helper function to convert CSV to JSON
 def convert_csv_to_json(file_path):
     try:
@@ -73,19 +406,8 @@ def convert_csv_to_json(file_path):
 # Helper function to convert Excel to JSON
 def convert_excel_to_json(file_path):
     try:
-        # Read all sheets from Excel file
-        excel_data = pd.read_excel(file_path, sheet_name=None)
-        
-        # Convert each sheet to a section in the JSON
-        result = {}
-        for sheet_name, df in excel_data.items():
-            if df.empty:
-                continue
-                
-            # Convert sheet to list of records
-            result[sheet_name] = df.to_dict(orient='records')
-        
-        return result
+        # Stream each sheet into the BPM section it maps to (large workbooks in parallel)
+        return convert_workbook(file_path)
     except Exception as e:
         print(f"Error converting Excel to JSON: {str(e)}")
         return None
@@ -110,124 +432,149 @@ def process_uploaded_file(file_path):
         return None
 
 # Helper function to save processed data as JSON
-def save_as_json(data, original_filename):
+def save_as_json(data, original_filename, conversion=None):
     try:
         # Create a JSON filename based on the original filename
         base_name = os.path.splitext(original_filename)[0]
         json_filename = f"{base_name}.json"
-        json_path = os.path.join(app.config['UPLOAD_FOLDER'], json_filename)
         
-        # Save the data as JSON
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        # Validate and normalize the converted document before storing it
+        data, _ = validate_document(data)
         
+        # Save the data as JSON, remembering which upload it was converted from
+        store = get_upload_store()
+        previous = store.digest(json_filename)
+        digest, _ = store.add_bytes(json_filename, json.dumps(data, indent=2).encode('utf-8'),
+                                    converted_from=original_filename)
+        store.describe(json_filename, data)
+        if conversion is not None:
+            store.record_conversion(conversion[0], conversion[1], digest)
+        
+        index_upload(json_filename, data)
+        if previous != digest:
+            release_semantic_leaves(previous)
         return json_filename
     except Exception as e:
         print(f"Error saving JSON: {str(e)}")
         return None
 
-# Helper function to load JSON data
-def load_json_data(filename):
+# Helper function to describe a conversion and the options its output depends on
+def conversion_kind(filename, mode=None, **options):
+    file_ext = os.path.splitext(filename)[1].lower()
+    if mode is not None:
+        return json.dumps([mode, file_ext, options], sort_keys=True)
+    if file_ext == '.csv':
+        # CSV sections can be named after the file
+        return json.dumps(['csv', os.path.splitext(filename)[0]])
+    if file_ext in ('.xlsx', '.xls'):
+        return json.dumps([file_ext, EXCEL_CONVERTER_VERSION])
+    return json.dumps([file_ext])
+
+# Helper function to reuse the output of an earlier conversion of identical content
+def reuse_conversion(digest, kind, original_filename):
+    store = get_upload_store()
+    artifact = store.conversion(digest, kind)
+    json_filename = f"{os.path.splitext(original_filename)[0]}.json"
+    previous = store.digest(json_filename)
+    if artifact is not None and store.link(json_filename, artifact, converted_from=original_filename):
+        # The artifact was indexed when it was converted, unless the semantic index did not exist yet
+        index_upload(json_filename)
+        if previous != artifact:
+            release_semantic_leaves(previous)
+        return json_filename
+    return None
+
+# Helper function to resolve a data file name to its path
+def resolve_data_file(filename):
     if filename == DEFAULT_BPM_FILE:
-        file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', filename)
-    else:
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    
+        return os.path.join(DATA_FOLDER, filename)
+    return os.path.join(app.config['UPLOAD_FOLDER'], filename)
+
+# Helper function to load the active document of the current workspace
+def load_active_document():
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        return get_workspace_manager().document(current_workspace())
     except Exception as e:
         flash(f"Error loading file: {str(e)}", "error")
         return None
 
-# Helper function to get list of uploaded files
-def get_uploaded_files():
-    files = []
-    for filename in os.listdir(app.config['UPLOAD_FOLDER']):
-        if allowed_file(filename):
-            files.append(filename)
-    return sorted(files)
-
-# Helper function to search in JSON data
-def search_in_json(data, search_term, query_type='all'):
-    results = {}
-    search_term = search_term.lower()
-    
-    # Define sections to search based on query_type
-    if query_type == 'all':
-        sections = [
-            'core_principles', 'methodologies', 'frameworks', 'maturity_models',
-            'performance_metrics', 'implementation_best_practices', 
-            'common_challenges', 'technology_enablers'
-        ]
-    else:
-        sections = [query_type]
-    
-    # Search in each section
-    for section in sections:
-        if section in data:
-            section_results = []
-            
-            # Handle different data structures
-            if section == 'performance_metrics':
-                # Performance metrics have categories
-                for category in data[section]:
-                    for metric in category['metrics']:
-                        if search_in_item(metric, search_term):
-                            # Include category information
-                            metric_copy = metric.copy()
-                            metric_copy['category'] = category['category']
-                            section_results.append(metric_copy)
-            else:
-                # Other sections have direct lists
-                for item in data[section]:
-                    if search_in_item(item, search_term):
-                        section_results.append(item)
-            
-            # Add results to the output if any found
-            if section_results:
-                results[section] = section_results
+# Helper function to list every searchable document as (name, source, path)
+def searchable_documents():
+    documents = [(DEFAULT_BPM_FILE, 'principles', os.path.join(DATA_FOLDER, DEFAULT_BPM_FILE))]
+    store = get_upload_store()
+    documents.extend((name, 'upload', store.path(name))
+                     for name in store.list_files(file_format='json') if name != DEFAULT_BPM_FILE)
+    for industry_name in analysis_cache.available_industries():
+        filename = industry_file_name(industry_name)
+        documents.append((filename, 'industry', os.path.join(DATA_FOLDER, filename)))
+    return documents
+
+# Helper function to search the semantic index, naming the file of each passage
+# (passages of uploads that no longer have a name are skipped)
+def semantic_search_hits(search_term, query_type, limit):
+    index = get_semantic_index()
+    index.refresh()
+    store = get_upload_store()
     
-    return results
+    hits = []
+    for score, leaf in index.search(search_term, limit * SEMANTIC_SEARCH_OVERFETCH):
+        if query_type != 'all' and leaf.section != query_type:
+            continue
+        if leaf.source.endswith('.json'):
+            name, source = leaf.source, 'principles' if leaf.source == DEFAULT_BPM_FILE else 'industry'
+        else:
+            names = store.names(leaf.source)
+            if not names:
+                # Replaced by an upload under the same name; dropped so it stops taking places
+                release_semantic_leaves(leaf.source)
+                continue
+            name, source = names[0], 'upload'
+        hits.append({
+            "file": name,
+            "source": source,
+            "section": leaf.section,
+            "score": round(score, 3),
+            "path": leaf.path,
+            "item": leaf.text
+        })
+        if len(hits) >= limit:
+            break
+    return hits
 
-# Helper function to search within an item
-def search_in_item(item, search_term):
-    # Convert item to string for simple search
-    item_str = json.dumps(item).lower()
-    return search_term in item_str
+# Helper function to get list of uploaded files (from the catalog, in name order)
+def get_uploaded_files(limit=None):
+    return get_upload_store().list_files(limit=limit)
 
 # Routes
 @app.route('/')
 def index():
-    # Get active file from session or use default
-    active_file = session.get('active_file', DEFAULT_BPM_FILE)
-    
-    # Load data from active file
-    data = load_json_data(active_file)
+    # Load the active file of the workspace
+    workspace = current_workspace()
+    document = load_active_document()
     
     # If data loading failed, use default file
-    if data is None:
-        active_file = DEFAULT_BPM_FILE
-        data = load_json_data(active_file)
-        session['active_file'] = active_file
+    if document is None:
+        workspace.set_active_file(DEFAULT_BPM_FILE)
+        document = load_active_document()
     
-    # Get list of uploaded files
-    uploaded_files = get_uploaded_files()
+    # Get the first page of uploaded files for the menu
+    uploaded_files = get_uploaded_files(limit=UPLOAD_MENU_LIMIT)
     
     return render_template('index.html', 
-                          data=data, 
-                          active_file=active_file, 
-                          uploaded_files=uploaded_files)
+                          data=document.data if document else None, 
+                          active_file=workspace.active_file, 
+                          uploaded_files=uploaded_files,
+                          uploaded_total=get_upload_store().count_files())
 
 @app.route('/view/<filename>')
 def view_file(filename):
     # Validate filename
-    if filename != DEFAULT_BPM_FILE and filename not in get_uploaded_files():
+    if filename != DEFAULT_BPM_FILE and not get_upload_store().exists(filename):
         flash(f"File {filename} not found.", "error")
         return redirect(url_for('index'))
     
-    # Set active file in session
-    session['active_file'] = filename
+    # Set active file in the workspace
+    current_workspace().set_active_file(filename)
     
     return redirect(url_for('index'))
 
@@ -250,42 +597,88 @@ def upload_file():
         filename = secure_filename(file.filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         
-        # Save file
-        file.save(file_path)
+        # Save file (identical content is stored once)
+        store = get_upload_store()
+        digest, _ = store.add(filename, file.stream)
         
         # Process file based on its type
         file_ext = os.path.splitext(filename)[1].lower()
         
         if file_ext == '.json':
             # Validate JSON
-            if not is_valid_json(file_path):
-                os.remove(file_path)
-                flash('Invalid JSON file', 'error')
+            error = catalog_json_upload(filename)
+            if error is not None:
+                store.remove(filename)
+                flash(f'Invalid JSON file: {error}', 'error')
                 return redirect(url_for('index'))
             
             # Set as active file
-            session['active_file'] = filename
+            current_workspace().set_active_file(filename)
             flash(f'JSON file {filename} uploaded successfully', 'success')
         
-        elif file_ext in ['.csv', '.xlsx', '.xls']:
-            # Process CSV or Excel file
-            processed_data = process_uploaded_file(file_path)
+        elif file_ext == '.csv' and request.form.get('mode') == 'process_mining':
+            # Mine the event log in chunks and compare with the industry's challenges
+            industry_name = request.form.get('industry') or current_workspace().current_industry
+            columns = {column: request.form.get(column) or None
+                       for column in ('case_column', 'activity_column', 'timestamp_column')}
+            kind = conversion_kind(filename, 'process_mining', industry=industry_name,
+                                   data_version=compute_data_version(DATA_FOLDER, industry_name) if industry_name else None,
+                                   **columns)
+            
+            # The same log mined with the same options is not mined again
+            json_filename = reuse_conversion(digest, kind, filename)
+            if json_filename is not None:
+                processed_data = document_cache.get(store.path(json_filename)).data
+            else:
+                bundle = analysis_cache.get(industry_name) if industry_name else None
+                
+                try:
+                    processed_data = mine_event_log(file_path,
+                                                    chunksize=EVENT_LOG_CHUNK_SIZE,
+                                                    business_processes=bundle['business_processes'] if bundle else None,
+                                                    max_variants=MAX_EVENT_LOG_VARIANTS,
+                                                    **columns)
+                except (KeyError, ValueError, pd.errors.ParserError) as e:
+                    store.remove(filename)
+                    flash(f'Invalid event log: {str(e)}', 'error')
+                    return redirect(url_for('index'))
+                
+                json_filename = save_as_json(processed_data, filename, (digest, kind))
             
-            if processed_data is None:
-                os.remove(file_path)
-                flash(f'Invalid {file_ext[1:].upper()} file or conversion failed', 'error')
+            if json_filename is None:
+                store.remove(filename)
+                flash('Failed to save processed data', 'error')
                 return redirect(url_for('index'))
             
-            # Save processed data as JSON
-            json_filename = save_as_json(processed_data, filename)
+            current_workspace().set_active_file(json_filename)
+            summary = processed_data['summary']
+            flash(f"Event log {filename} mined: {summary['cases']} cases, {summary['events']} events, "
+                  f"{summary['variants']} variants", 'success')
+        
+        elif file_ext in ['.csv', '.xlsx', '.xls']:
+            # Identical files converted before are not converted again
+            kind = conversion_kind(filename)
+            json_filename = reuse_conversion(digest, kind, filename)
             
             if json_filename is None:
-                os.remove(file_path)
+                # Process CSV or Excel file
+                processed_data = process_uploaded_file(file_path)
+                
+                if processed_data is None:
+                    store.remove(filename)
+                    flash(f'Invalid {file_ext[1:].upper()} file or conversion failed', 'error')
+                    return redirect(url_for('index'))
+                
+                # Save processed data as JSON
+                json_filename = save_as_json(processed_data, filename, (digest, kind))
+            
+            if json_filename is None:
+                store.remove(filename)
                 flash('Failed to save processed data', 'error')
                 return redirect(url_for('index'))
             
             # Set the JSON file as active
-            session['active_file'] = json_filename
+            current_workspace().set_active_file(json_filename)
             flash(f'{file_ext[1:].upper()} file {filename} converted and uploaded successfully as {json_filename}', 'success')
     else:
         allowed_ext_str = ', '.join(ALLOWED_EXTENSIONS)
@@ -319,46 +712,54 @@ def upload_batch():
             filename = secure_filename(file.filename)
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
             
-            # Save file
-            file.save(file_path)
+            # Save file (identical content is stored once)
+            store = get_upload_store()
+            digest, _ = store.add(filename, file.stream)
             
             # Process file based on its type
             file_ext = os.path.splitext(filename)[1].lower()
             
             if file_ext == '.json':
                 # Validate JSON
-                if is_valid_json(file_path):
+                error = catalog_json_upload(filename)
+                if error is None:
                     success_count += 1
                     last_valid_file = filename
                 else:
-                    os.remove(file_path)
-                    flash(f'File {filename} is not a valid JSON file', 'warning')
+                    store.remove(filename)
+                    flash(f'File {filename} is not a valid JSON file: {error}', 'warning')
             
             elif file_ext in ['.csv', '.xlsx', '.xls']:
-                # Process CSV or Excel file
-                processed_data = process_uploaded_file(file_path)
+                # Identical files converted before are not converted again
+                kind = conversion_kind(filename)
+                json_filename = reuse_conversion(digest, kind, filename)
                 
-                if processed_data is not None:
-                    # Save processed data as JSON
-                    json_filename = save_as_json(processed_data, filename)
+                if json_filename is None:
+                    # Process CSV or Excel file
+                    processed_data = process_uploaded_file(file_path)
                     
-                    if json_filename is not None:
-                        success_count += 1
-                        last_valid_file = json_filename
-                        flash(f'{file_ext[1:].upper()} file {filename} converted to {json_filename}', 'info')
-                    else:
-                        os.remove(file_path)
-                        flash(f'Failed to save processed data from {filename}', 'warning')
+                    if processed_data is None:
+                        store.remove(filename)
+                        flash(f'Failed to process {filename}', 'warning')
+                        continue
+                    
+                    # Save processed data as JSON
+                    json_filename = save_as_json(processed_data, filename, (digest, kind))
+                
+                if json_filename is not None:
+                    success_count += 1
+                    last_valid_file = json_filename
+                    flash(f'{file_ext[1:].upper()} file {filename} converted to {json_filename}', 'info')
                 else:
-                    os.remove(file_path)
-                    flash(f'Failed to process {filename}', 'warning')
+                    store.remove(filename)
+                    flash(f'Failed to save processed data from {filename}', 'warning')
         else:
             allowed_ext_str = ', '.join(ALLOWED_EXTENSIONS)
             flash(f'File {file.filename} is not allowed (only {allowed_ext_str.upper()} files are accepted)', 'warning')
     
     # Set last valid file as active if any
     if last_valid_file:
-        session['active_file'] = last_valid_file
+        current_workspace().set_active_file(last_valid_file)
     
     # Show summary message
     if success_count > 0:
@@ -376,24 +777,113 @@ def delete_file(filename):
         return redirect(url_for('index'))
     
     # Check if file exists
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    if not os.path.exists(file_path):
+    store = get_upload_store()
+    digest = store.digest(filename)
+    if digest is None:
         flash(f'File {filename} not found', 'error')
         return redirect(url_for('index'))
     
-    # Delete file
+    # Delete file (its content is kept while other names refer to it)
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
     try:
-        os.remove(file_path)
+        if store.refcount(digest) <= 1:
+            document_cache.invalidate(file_path)
+        store.remove(filename)
+        release_semantic_leaves(digest)
         flash(f'File {filename} deleted successfully', 'success')
         
         # If active file was deleted, switch to default
-        if session.get('active_file') == filename:
-            session['active_file'] = DEFAULT_BPM_FILE
+        workspace = current_workspace()
+        if workspace.active_file == filename:
+            workspace.set_active_file(DEFAULT_BPM_FILE)
     except Exception as e:
         flash(f'Error deleting file: {str(e)}', 'error')
     
     return redirect(url_for('index'))
 
+@app.route('/api/uploads')
+def list_uploads():
+    # Filters and paging are answered from the catalog indexes
+    try:
+        limit = min(max(int(request.args.get('limit', UPLOAD_MENU_LIMIT)), 0), MAX_UPLOAD_PAGE_SIZE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({"error": "'limit' and 'offset' must be integers"}), 400
+    
+    filters = {
+        'file_format': request.args.get('format') or None,
+        'section': request.args.get('section') or None,
+        'prefix': request.args.get('prefix') or None
+    }
+    store = get_upload_store()
+    return jsonify({
+        "total": store.count_files(**filters),
+        "limit": limit,
+        "offset": offset,
+        "files": store.list_files(limit=limit, offset=offset, details=True, **filters)
+    })
+
+@app.route('/api/documents/<filename>')
+def get_document(filename):
+    store = get_upload_store()
+    if not filename.lower().endswith('.json') or not store.exists(filename):
+        return jsonify({"error": f"File {filename} not found"}), 404
+    
+    try:
+        document = document_cache.get(store.path(filename))
+    except (OSError, ValueError) as e:
+        return jsonify({"error": f"Error loading file: {str(e)}"}), 400
+    
+    return jsonify({
+        "file": filename,
+        "versions": store.section_versions(filename),
+        "document": document.data
+    })
+
+@app.route('/api/documents/<filename>', methods=['PATCH'])
+def patch_document(filename):
+    if filename == DEFAULT_BPM_FILE:
+        return jsonify({"error": "The default file cannot be modified"}), 403
+    
+    store = get_upload_store()
+    if not store.exists(filename):
+        return jsonify({"error": f"File {filename} not found"}), 404
+    if not filename.lower().endswith('.json'):
+        return jsonify({"error": "Only JSON files can be patched"}), 400
+    if request.mimetype not in PATCH_MIMETYPES:
+        return jsonify({"error": f"Unsupported patch format; use {JSON_PATCH} or {MERGE_PATCH}"}), 415
+    
+    # The stored digest is read before the document, so a concurrent edit makes the update fail
+    base_digest = store.digest(filename)
+    try:
+        base = document_cache.get(store.path(filename))
+        document, changed = apply_request_patch(base.data)
+        if not changed:
+            return jsonify({"file": filename, "changed": [], "versions": store.section_versions(filename)})
+        document, layout = validate_document(document)
+    except PatchConflict as e:
+        return jsonify({"error": str(e)}), 409
+    except SchemaError as e:
+        return jsonify({"error": "Patched document does not match the BPM schema", "errors": e.errors}), 422
+    except PatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except (OSError, ValueError) as e:
+        return jsonify({"error": f"Error loading file: {str(e)}"}), 400
+    
+    if store.update(filename, document, changed, base_digest) is None:
+        return jsonify({"error": f"File {filename} was modified by another request"}), 409
+    
+    # Only the changed sections are re-indexed
+    document_cache.put(store.path(filename), document, layout, previous=base, changed_sections=changed)
+    index_upload(filename, document)
+    release_semantic_leaves(base_digest)
+    
+    return jsonify({
+        "file": filename,
+        "changed": sorted(changed),
+        "versions": store.section_versions(filename)
+    })
+
 @app.route('/query', methods=['POST'])
 def query():
     # Get query parameters
@@ -404,19 +894,430 @@ def query():
     if not search_term:
         return jsonify({})
     
-    # Get active file
-    active_file = session.get('active_file', DEFAULT_BPM_FILE)
+    # Search every document, grouping the ranked hits by section and naming their files
+    # (items carry the highlighted snippet of their matching string, which the page renders)
+    if request.form.get('scope') == 'all':
+        results = {}
+        for hit in get_federated_search().search(search_term, query_type, SEARCH_RESULT_LIMIT,
+                                                 snippets=True, with_items=True):
+            item = hit['item'] if isinstance(hit['item'], dict) else {'description': hit['item']}
+            results.setdefault(hit['section'], []).append(dict(
+                item, source_file=hit['file'], path=hit['path'], snippet=hit['snippet'], highlights=hit['highlights']))
+        return jsonify(results)
     
-    # Load data
-    data = load_json_data(active_file)
-    if data is None:
+    # Load the active document
+    document = load_active_document()
+    if document is None:
         return jsonify({})
     
-    # Perform search
-    results = search_in_json(data, search_term, query_type)
+    # Search the document's prebuilt index, with the same snippets
+    results = document.search_index.search(search_term, query_type, snippets=True)
     
     return jsonify(results)
 
+@app.route('/api/search')
+def search_all_documents():
+    search_term = request.args.get('q', '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', SEARCH_RESULT_LIMIT)), 0), MAX_SEARCH_RESULTS)
+    except ValueError:
+        return jsonify({"error": "'limit' must be an integer"}), 400
+    
+    query_type = request.args.get('type', 'all')
+    mode = request.args.get('mode', 'text')
+    if mode not in ('text', 'semantic'):
+        return jsonify({"error": "'mode' must be 'text' or 'semantic'"}), 400
+    
+    if not search_term:
+        hits = []
+    elif mode == 'semantic':
+        hits = semantic_search_hits(search_term, query_type, limit)
+    else:
+        # Hits carry a highlighted snippet of the matching string rather than the whole item
+        hits = get_federated_search().search(search_term, query_type, limit, snippets=True)
+    return jsonify({"query": search_term, "mode": mode, "limit": limit, "hits": hits})
+
+@app.route('/industry')
+@app.route('/industry/<industry_name>')
+def industry_analyzer(industry_name=None):
+    # Fall back to the industry selected earlier in the session
+    if industry_name is None:
+        industry_name = current_workspace().current_industry
+    
+    available_industries = analysis_cache.available_industries()
+    
+    if industry_name is None:
+        return render_template('industry_analyzer.html',
+                              available_industries=available_industries,
+                              current_industry=None)
+    
+    # Serve the precomputed analysis bundle
+    bundle = analysis_cache.get(industry_name)
+    if bundle is None:
+        flash(f"Industry {industry_name} not found.", "error")
+        current_workspace().set_current_industry(None)
+        return redirect(url_for('industry_analyzer'))
+    
+    current_workspace().set_current_industry(bundle['industry_name'])
+    
+    return render_template('industry_analyzer.html',
+                          available_industries=available_industries,
+                          current_industry=bundle['industry_name'],
+                          **{k: v for k, v in bundle.items() if k != 'industry_name'})
+
+@app.route('/industry/select/<industry_name>')
+def set_industry(industry_name):
+    return redirect(url_for('industry_analyzer', industry_name=industry_name))
+
+@app.route('/api/industry/<industry_name>')
+def industry_bundle(industry_name):
+    bundle = analysis_cache.get(industry_name)
+    if bundle is None:
+        return jsonify({"error": f"Industry {industry_name} not found"}), 404
+    
+    return jsonify(bundle)
+
+# Helper function to reload an industry in the question analyzer when its file was edited
+# (by a PATCH served in this or another worker)
+def refresh_analyzer_industry(analyzer, industry_name):
+    filename = industry_file_name(industry_name)
+    try:
+        stat = os.stat(os.path.join(DATA_FOLDER, filename))
+    except OSError:
+        return
+    version = (stat.st_ino, stat.st_mtime_ns)
+    if analyzer_industry_versions.setdefault(filename, version) != version:
+        analyzer.invalidate_industry(industry_name)
+        analyzer_industry_versions[filename] = version
+
+@app.route('/api/industry/<industry_name>/ask', methods=['POST'])
+def ask_question(industry_name):
+    payload = request.get_json(silent=True)
+    question = payload.get('question') if isinstance(payload, dict) else None
+    if not isinstance(question, str) or not question.strip():
+        return jsonify({"error": "Expected a JSON object with a 'question'"}), 400
+    
+    # The analyzer's current industry is shared, so questions are answered one at a time
+    with question_lock:
+        analyzer = get_question_analyzer()
+        refresh_analyzer_industry(analyzer, industry_name)
+        if not analyzer.set_current_industry(industry_name):
+            return jsonify({"error": f"Industry {industry_name} not found"}), 404
+        answer = analyzer.answer_question(question.strip())
+    
+    return jsonify({"industry": industry_name, "question": question.strip(), "answer": answer})
+
+@app.route('/api/industry/<industry_name>/document', methods=['PATCH'])
+def patch_industry_document(industry_name):
+    if not app.config['DATA_PATCHES_ENABLED']:
+        return jsonify({"error": "Editing industry data is disabled"}), 403
+    
+    file_path = os.path.join(DATA_FOLDER, industry_file_name(industry_name))
+    if not os.path.exists(file_path):
+        return jsonify({"error": f"Industry {industry_name} not found"}), 404
+    if request.mimetype not in PATCH_MIMETYPES:
+        return jsonify({"error": f"Unsupported patch format; use {JSON_PATCH} or {MERGE_PATCH}"}), 415
+    
+    try:
+        base = document_cache.get(file_path)
+        document, changed = apply_request_patch(base.data)
+        if not changed:
+            return jsonify({"industry": industry_name, "changed": [], "rebuilt": []})
+        document, layout = validate_document(document, "industry")
+    except PatchConflict as e:
+        return jsonify({"error": str(e)}), 409
+    except SchemaError as e:
+        return jsonify({"error": "Patched document does not match the industry schema", "errors": e.errors}), 422
+    except PatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except (OSError, ValueError) as e:
+        return jsonify({"error": f"Error loading file: {str(e)}"}), 400
+    
+    # Replace the file atomically, then recompute only the analyses that read the changed sections
+    fd, tmp_path = tempfile.mkstemp(dir=DATA_FOLDER, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    os.replace(tmp_path, file_path)
+    
+    document_cache.put(file_path, document, layout, previous=base, changed_sections=changed)
+    rebuilt = analysis_cache.refresh(industry_name, changed)
+    reindex_semantic_leaves(industry_file_name(industry_name), document)
+    with question_lock:
+        if question_analyzer is not None:
+            question_analyzer.invalidate_industry(industry_name)
+            analyzer_industry_versions.pop(industry_file_name(industry_name), None)
+    
+    return jsonify({
+        "industry": industry_name,
+        "changed": sorted(changed),
+        "rebuilt": rebuilt or []
+    })
+
+@app.route('/maturity-assessment')
+def maturity_assessment():
+    return render_template('maturity_assessment.html',
+                          assessment_model=get_scoring_engine().assessment_model())
+
+@app.route('/api/maturity/score', methods=['POST'])
+def score_maturity():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    
+    engine = get_scoring_engine()
+    
+    # A single assessment gets its roadmap, a batch gets benchmarks
+    try:
+        if 'submissions' not in payload:
+            return jsonify(engine.score_submission(payload))
+        
+        submissions = payload['submissions']
+        if not isinstance(submissions, list) or not all(isinstance(s, dict) for s in submissions):
+            return jsonify({"error": "'submissions' must be a list of objects"}), 400
+        
+        return jsonify(engine.score_batch(submissions,
+                                          include_roadmap=bool(payload.get('include_roadmap'))))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/maturity/assessments', methods=['POST'])
+def store_assessments():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    
+    organization = payload.get('organization')
+    industry = payload.get('industry')
+    if not organization or not industry:
+        return jsonify({"error": "'organization' and 'industry' are required"}), 400
+    
+    submissions = payload.get('submissions', [payload])
+    if not isinstance(submissions, list) or not all(isinstance(s, dict) for s in submissions):
+        return jsonify({"error": "'submissions' must be a list of objects"}), 400
+    
+    # Score the batch and update the running aggregates in one transaction
+    try:
+        results = get_scoring_engine().score_batch(submissions)['results']
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    ids = get_assessment_store().add_many(results, organization, industry)
+    
+    return jsonify({"ids": ids, "results": results})
+
+@app.route('/api/maturity/aggregates')
+def maturity_aggregates():
+    organization = request.args.get('organization')
+    industry = request.args.get('industry')
+    
+    return jsonify(get_assessment_store().aggregates(organization=organization, industry=industry))
+
+@app.route('/api/simulator/processes/<industry_name>')
+def simulator_processes(industry_name):
+    bundle = analysis_cache.get(industry_name)
+    if bundle is None:
+        return jsonify({"error": f"Industry {industry_name} not found"}), 404
+    
+    return jsonify(sorted(bundle['business_processes']))
+
+@app.route('/api/simulator/run', methods=['POST'])
+def simulate_process():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    
+    try:
+        replications = min(int(payload.get('replications', 100)), MAX_SIMULATION_REPLICATIONS)
+        n_entities = min(int(payload.get('entities', 500)), MAX_SIMULATION_ENTITIES)
+        workers = request_workers(payload)
+        
+        # Either simulate a custom model or seed one from the industry data
+        process = payload.get('process')
+        if process is None:
+            bundle = analysis_cache.get(payload.get('industry', ''))
+            if bundle is None:
+                return jsonify({"error": "Unknown industry"}), 404
+            process = process_from_business_area(bundle['business_processes'],
+                                                 payload.get('process_area', ''),
+                                                 mean_time=float(payload.get('mean_time', 1.0)),
+                                                 capacity=int(payload.get('capacity', 1)),
+                                                 utilization=float(payload.get('utilization', 0.8)))
+        
+        results = run_replications(process, replications, n_entities,
+                                   seed=payload.get('seed'), workers=workers)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    results['model'] = process
+    return jsonify(results)
+
+@app.route('/api/roi/calculate', methods=['POST'])
+def calculate_roi():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    
+    bundle = analysis_cache.get(payload.get('industry', ''))
+    if bundle is None:
+        return jsonify({"error": "Unknown industry"}), 404
+    
+    try:
+        items = roi_items_from_recommendations(bundle['optimization_recommendations'],
+                                               payload.get('assumptions', []))
+        calculator = ROICalculator(items,
+                                   discount_rate=float(payload.get('discount_rate', 0.08)),
+                                   horizon_years=int(payload.get('horizon_years', 5)))
+        results = calculator.run(draws=min(int(payload.get('draws', 100000)), MAX_ROI_DRAWS),
+                                 seed=payload.get('seed'))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(results)
+
+@app.route('/process-modeler')
+@app.route('/process-modeler/<industry_name>')
+def process_modeler(industry_name=None):
+    if industry_name is None:
+        industry_name = current_workspace().current_industry
+    
+    bundle = analysis_cache.get(industry_name) if industry_name else None
+    if bundle is None:
+        return jsonify({"available_industries": analysis_cache.available_industries()})
+    
+    # Seed the model from the industry's value chain
+    graph = ProcessGraph.from_value_chain(bundle['value_chain']['activities'],
+                                          name=f"{bundle['industry_name']} Value Chain")
+    
+    return jsonify({"model": graph.to_dict(), "analysis": graph.analyze()})
+
+@app.route('/api/process-model/analyze', methods=['POST'])
+def analyze_process_model():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    
+    try:
+        graph = ProcessGraph.from_bpmn(payload)
+        top = min(int(request.args.get('top', 5)), MAX_PROCESS_BOTTLENECKS)
+    except (AttributeError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(graph.analyze(top))
+
+@app.route('/api/conformance/check', methods=['POST'])
+def check_conformance():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    
+    # The event log must have been mined on upload
+    filename = secure_filename(payload.get('event_log', ''))
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    if not filename or not get_upload_store().exists(filename):
+        return jsonify({"error": "Unknown event log"}), 404
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            event_log = json.load(f)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return jsonify({"error": f"{filename} is not a mined event log"}), 400
+    if not isinstance(event_log, dict) or 'variants' not in event_log:
+        return jsonify({"error": f"{filename} is not a mined event log"}), 400
+    
+    try:
+        # Check against a posted model or the industry's value chain
+        if 'model' in payload:
+            model = ProcessGraph.from_bpmn(payload['model'])
+        else:
+            bundle = analysis_cache.get(payload.get('industry', ''))
+            if bundle is None:
+                return jsonify({"error": "Unknown industry"}), 404
+            model = ProcessGraph.from_value_chain(bundle['value_chain']['activities'],
+                                                  name=f"{bundle['industry_name']} Value Chain")
+        
+        results = ConformanceChecker(model).check(event_log['variants'],
+                                                  top=int(payload.get('top', 10)),
+                                                  workers=request_workers(payload))
+    except (AttributeError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # The latest results answer deviation questions (see ask_question and main.py)
+    save_conformance_results(app.config['CONFORMANCE_RESULTS'], results)
+    
+    return jsonify(results)
+
+@app.route('/api/kpi')
+def kpi_metrics():
+    store = get_kpi_store()
+    with open(os.path.join(DATA_FOLDER, DEFAULT_BPM_FILE), 'r', encoding='utf-8') as f:
+        bpm_principles = json.load(f)
+    
+    # Scorecard KPIs of the requested industry are listed alongside the BPM metrics
+    bundle = analysis_cache.get(request.args.get('industry', ''))
+    scorecard = {perspective: {"key_metrics": details["metrics"]}
+                 for perspective, details in bundle['balanced_scorecard']['perspectives'].items()} if bundle else None
+    catalog = kpi_catalog(bpm_principles, scorecard)
+    
+    for key, metric in store.metrics.items():
+        catalog.setdefault(key, metric)
+    
+    # The store's registry entries are copied, not annotated
+    return jsonify({key: dict(metric, latest=store.latest(key)) for key, metric in catalog.items()})
+
+@app.route('/api/kpi/anomalies')
+def kpi_anomalies():
+    # Observations posted to other workers are read from the store
+    monitor = get_anomaly_monitor()
+    monitor.catch_up(get_kpi_store())
+    return jsonify(monitor.current_anomalies(since=request.args.get('since', type=float),
+                                                           category=request.args.get('category'),
+                                                           limit=request.args.get('limit', 20, type=int)))
+
+@app.route('/api/kpi/<metric>', methods=['GET', 'POST'])
+def kpi_series(metric):
+    store = get_kpi_store()
+    
+    if request.method == 'POST':
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+        
+        try:
+            store.register_metric(metric, name=payload.get('name'), category=payload.get('category'),
+                                  unit=payload.get('unit'))
+            monitor = get_anomaly_monitor()
+            appended = store.append(metric, payload.get('timestamps', []), payload.get('values', []))
+            store.flush()
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Check the new observations (and any another worker appended before them) for anomalies
+        anomalies = monitor.catch_up(store, [metric], alert=True) if appended else []
+        
+        return jsonify({"metric": metric, "appended": appended, "latest": store.latest(metric),
+                        "anomalies": anomalies})
+    
+    if not store.has_metric(metric):
+        return jsonify({"error": f"Unknown metric {metric}"}), 404
+    
+    try:
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        aggregate = request.args.get('aggregate', 'mean')
+        
+        # Downsample to buckets, compute a rolling window, or return raw observations
+        if 'interval' in request.args:
+            series = store.downsample(metric, float(request.args['interval']), aggregate, start, end)
+        elif 'window' in request.args:
+            series = store.rolling(metric, float(request.args['window']), aggregate, start, end)
+        else:
+            timestamps, values = store.query(metric, start, end)
+            series = {"timestamps": timestamps.tolist(), "values": values.tolist()}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    series['metric'] = metric
+    return jsonify(series)
+
 # Error handlers
 @app.errorhandler(404)
 def page_not_found(e):
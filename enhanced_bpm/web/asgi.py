@@ -0,0 +1,518 @@
+"""
+ASGI serving mode for the Enhanced BPM web app.
+
+Wraps the Flask app (same routes and templates) in an ASGI application.
+Request bodies are received on the event loop and spooled to a temporary
+file, and every request is then handed to the WSGI app on an executor
+thread, so file I/O, conversions and analysis never block the loop.
+Reads (GET/HEAD) and writes run on separate executors so that long uploads
+cannot starve dashboard polls, and identical concurrent GET requests to the
+JSON API share a single handler call.
+
+Serve it with any ASGI server:
+
+    uvicorn enhanced_bpm.web.asgi:application
+
+or with the built-in asyncio HTTP/1.1 server:
+
+    python enhanced_bpm/web/asgi.py --port 8000
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from enhanced_bpm.web import app as web_app
+
+# Request bodies larger than this are spooled to disk
+SPOOL_MAX_SIZE = 1024 * 1024
+# Response bytes collected on the handler thread before the rest is streamed
+RESPONSE_BUFFER_SIZE = 1024 * 1024
+# Identical in-flight GET requests under these paths share one handler call
+COALESCED_PREFIXES = ("/api/",)
+# Request headers that make two otherwise identical requests different
+COALESCE_KEY_HEADERS = (b"cookie", b"authorization", b"accept")
+READ_METHODS = ("GET", "HEAD")
+# Largest request head accepted by the built-in server
+MAX_HEADER_SIZE = 64 * 1024
+SERVER_CHUNK_SIZE = 64 * 1024
+
+
+def build_environ(scope: Dict[str, Any], body, content_length: int) -> Dict[str, Any]:
+    """
+    Build the WSGI environ for an ASGI HTTP scope.
+
+    Args:
+        scope: ASGI HTTP connection scope
+        body: File object holding the complete request body
+        content_length: Size of the request body in bytes
+
+    Returns:
+        WSGI environ dictionary
+    """
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]) if server[1] is not None else "80",
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "CONTENT_LENGTH": str(content_length),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = str(scope["client"][0])
+        environ["REMOTE_PORT"] = str(scope["client"][1])
+
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_LENGTH", "TRANSFER_ENCODING"):
+            # The body is fully received, so its length is known
+            continue
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_wsgi(wsgi_app: Callable, environ: Dict[str, Any], buffer_size: Optional[int]) -> Tuple:
+    """
+    Call a WSGI app and collect the start of its response.
+
+    Runs on an executor thread. The response body is read until
+    ``buffer_size`` bytes are collected (all of it when None); the caller
+    streams whatever is left from the returned iterator.
+
+    Args:
+        wsgi_app: The WSGI application
+        environ: WSGI environ of the request
+        buffer_size: Number of body bytes to collect, or None for all
+
+    Returns:
+        Tuple of (status code, ASGI headers, collected chunks, remaining
+        iterator or None, the app's iterable to close when done)
+    """
+    started = {}
+    written = []
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and started.get("sent"):
+            raise exc_info[1].with_traceback(exc_info[2])
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                              for name, value in headers]
+        return written.append
+
+    iterable = wsgi_app(environ, start_response)
+    chunks = written
+    size = sum(len(chunk) for chunk in written)
+    iterator = iter(iterable)
+    try:
+        for chunk in iterator:
+            if chunk:
+                chunks.append(chunk)
+                size += len(chunk)
+            if buffer_size is not None and size >= buffer_size:
+                break
+        else:
+            close_iterable(iterable)
+            iterator = None
+    except BaseException:
+        close_iterable(iterable)
+        raise
+
+    started["sent"] = True
+    return started["status"], started["headers"], chunks, iterator, iterable
+
+
+def close_iterable(iterable) -> None:
+    """Close a WSGI response iterable if it supports it."""
+    close = getattr(iterable, "close", None)
+    if close is not None:
+        close()
+
+
+class ASGIApp:
+    """
+    ASGI application that serves a WSGI app from executor threads.
+
+    The event loop only receives request bodies and sends responses; the
+    WSGI app runs on the read executor for GET/HEAD requests and on the
+    write executor for everything else.
+    """
+
+    def __init__(self, wsgi_app: Callable, read_workers: int = 32, write_workers: int = 8,
+                 max_body_size: Optional[int] = None, coalesce: bool = True,
+                 startup: Optional[Callable[[], None]] = None):
+        """
+        Initialize the application.
+
+        Args:
+            wsgi_app: The WSGI application to serve
+            read_workers: Threads serving GET and HEAD requests
+            write_workers: Threads serving uploads and other writes
+            max_body_size: Largest accepted request body in bytes, or None
+            coalesce: Whether identical concurrent API GETs share one call
+            startup: Optional blocking callable run once at lifespan startup
+        """
+        self.wsgi_app = wsgi_app
+        self.read_workers = read_workers
+        self.write_workers = write_workers
+        self.max_body_size = max_body_size
+        self.coalesce = coalesce
+        self.startup_hook = startup
+        self.read_executor = None
+        self.write_executor = None
+        self._in_flight = {}
+        self.stats = {"requests": 0, "coalesced": 0, "rejected": 0}
+
+    def _executors(self) -> Tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+        """Create the executors on first use (they do not survive a fork)."""
+        if self.read_executor is None:
+            self.read_executor = ThreadPoolExecutor(self.read_workers, thread_name_prefix="bpm-read")
+            self.write_executor = ThreadPoolExecutor(self.write_workers, thread_name_prefix="bpm-write")
+        return self.read_executor, self.write_executor
+
+    async def startup(self) -> None:
+        """Run the startup hook without blocking the event loop."""
+        if self.startup_hook is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executors()[1], self.startup_hook)
+
+    async def shutdown(self) -> None:
+        """Stop the executors once the running requests have finished."""
+        if self.read_executor is None:
+            return
+        read_executor, write_executor = self.read_executor, self.write_executor
+        self.read_executor = self.write_executor = None
+
+        def close():
+            read_executor.shutdown(wait=True)
+            write_executor.shutdown(wait=True)
+
+        await asyncio.get_running_loop().run_in_executor(None, close)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        """Handle the ASGI lifespan protocol."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        """Serve one HTTP request."""
+        loop = asyncio.get_running_loop()
+        read_executor, write_executor = self._executors()
+        executor = read_executor if scope["method"] in READ_METHODS else write_executor
+        self.stats["requests"] += 1
+
+        # Receive the whole body on the loop; only large bodies touch the disk
+        body = None
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                if body is not None:
+                    body.close()
+                return
+            chunk = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            size += len(chunk)
+            if self.max_body_size is not None and size > self.max_body_size:
+                if body is not None:
+                    body.close()
+                self.stats["rejected"] += 1
+                await send_status(send, HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+                return
+            if body is None and not more_body:
+                # Bodies sent in one message (every GET) need no spool file
+                body = io.BytesIO(chunk)
+                break
+            if body is None:
+                body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+            if size > SPOOL_MAX_SIZE:
+                await loop.run_in_executor(executor, body.write, chunk)
+            else:
+                body.write(chunk)
+        body.seek(0)
+
+        environ = build_environ(scope, body, size)
+        try:
+            key = self._coalesce_key(scope)
+            if key is not None:
+                response = await self._coalesced(key, executor, environ)
+            else:
+                response = await loop.run_in_executor(executor, call_wsgi, self.wsgi_app, environ,
+                                                      RESPONSE_BUFFER_SIZE)
+        except Exception:
+            await send_status(send, HTTPStatus.INTERNAL_SERVER_ERROR)
+            return
+        finally:
+            body.close()
+
+        status, headers, chunks, iterator, iterable = response
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if iterator is None:
+            await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": False})
+            return
+
+        # Stream the rest of a large response one chunk per executor hop
+        try:
+            await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+            while True:
+                chunk = await loop.run_in_executor(executor, next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await loop.run_in_executor(executor, close_iterable, iterable)
+
+    def _coalesce_key(self, scope: Dict[str, Any]) -> Optional[Tuple]:
+        """Return the key identical API GETs share, or None if the request must run alone."""
+        if not self.coalesce or scope["method"] != "GET" or not scope["path"].startswith(COALESCED_PREFIXES):
+            return None
+        headers = tuple(value for name, value in scope.get("headers", []) if name in COALESCE_KEY_HEADERS)
+        return scope["path"], scope.get("query_string", b""), headers
+
+    async def _coalesced(self, key: Tuple, executor: ThreadPoolExecutor, environ: Dict[str, Any]) -> Tuple:
+        """Run a GET once for all identical requests that arrive while it is in flight."""
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        pending = loop.run_in_executor(executor, call_wsgi, self.wsgi_app, environ, None)
+        self._in_flight[key] = pending
+        try:
+            return await asyncio.shield(pending)
+        finally:
+            if self._in_flight.get(key) is pending:
+                del self._in_flight[key]
+
+
+async def send_status(send: Callable, status: HTTPStatus) -> None:
+    """Send a plain-text response consisting only of a status line."""
+    body = f"{status.value} {status.phrase}".encode("utf-8")
+    await send({"type": "http.response.start", "status": status.value,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8"),
+                            (b"content-length", str(len(body)).encode("latin-1"))]})
+    await send({"type": "http.response.body", "body": body, "more_body": False})
+
+
+async def read_chunked(reader: asyncio.StreamReader):
+    """Yield the chunks of a request body sent with chunked transfer encoding."""
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        size = int(size_line.split(b";", 1)[0], 16)
+        if size == 0:
+            # Skip trailers up to the terminating empty line
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            return
+        chunk = await reader.readexactly(size)
+        await reader.readexactly(2)
+        yield chunk
+
+
+async def handle_connection(app: Callable, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                            max_body_size: Optional[int] = None) -> None:
+    """
+    Serve HTTP/1.1 requests on one connection until it is closed.
+
+    Requests whose Content-Length is not a number or is larger than
+    max_body_size (if given) are answered with 400 and the connection is closed.
+    """
+    server = writer.get_extra_info("sockname")
+    client = writer.get_extra_info("peername")
+    disconnected = asyncio.Event()
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+
+            try:
+                request_line, *header_lines = head[:-4].decode("latin-1").split("\r\n")
+                method, target, version = request_line.split(" ")
+                headers = []
+                for line in header_lines:
+                    name, value = line.split(":", 1)
+                    headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+            except ValueError:
+                writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+
+            header_map = {name: value.lower() for name, value in headers}
+            chunked = b"chunked" in header_map.get(b"transfer-encoding", b"")
+            # Only plain digits are accepted ("-1", "+1" and "1_000" are not lengths)
+            content_length = header_map.get(b"content-length", b"0") or b"0"
+            if not content_length.isdigit() or (max_body_size is not None and int(content_length) > max_body_size):
+                writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+            remaining = int(content_length)
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0", "spec_version": "2.3"},
+                "http_version": version[5:],
+                "method": method.upper(),
+                "scheme": "http",
+                "path": unquote(path, errors="replace"),
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "server": server[:2] if server else None,
+                "client": client[:2] if client else None,
+            }
+
+            body_chunks = read_chunked(reader) if chunked else None
+            body_complete = False
+
+            async def receive():
+                nonlocal remaining, body_complete
+                if body_complete:
+                    await disconnected.wait()
+                    return {"type": "http.disconnect"}
+                if body_chunks is not None:
+                    try:
+                        chunk = await body_chunks.__anext__()
+                    except StopAsyncIteration:
+                        body_complete = True
+                        return {"type": "http.request", "body": b"", "more_body": False}
+                    return {"type": "http.request", "body": chunk, "more_body": True}
+                chunk = await reader.readexactly(min(remaining, SERVER_CHUNK_SIZE)) if remaining else b""
+                remaining -= len(chunk)
+                body_complete = remaining == 0
+                return {"type": "http.request", "body": chunk, "more_body": not body_complete}
+
+            keep_alive = (header_map.get(b"connection") != b"close"
+                          if version == "HTTP/1.1" else header_map.get(b"connection") == b"keep-alive")
+            response = {"chunked": False}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    response_headers = message.get("headers", [])
+                    response["chunked"] = not any(name.lower() == b"content-length" for name, _ in response_headers)
+                    lines = [f"HTTP/1.1 {message['status']} {status_phrase(message['status'])}".encode("latin-1")]
+                    lines += [name + b": " + value for name, value in response_headers]
+                    if response["chunked"]:
+                        lines.append(b"Transfer-Encoding: chunked")
+                    if not keep_alive:
+                        lines.append(b"Connection: close")
+                    writer.write(b"\r\n".join(lines) + b"\r\n\r\n")
+                elif message["type"] == "http.response.body":
+                    data = message.get("body", b"")
+                    if response["chunked"]:
+                        if data:
+                            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                        if not message.get("more_body", False):
+                            writer.write(b"0\r\n\r\n")
+                    elif data:
+                        writer.write(data)
+                    await writer.drain()
+
+            await app(scope, receive, send)
+            await writer.drain()
+
+            # A body the app did not read leaves the connection unusable
+            if not keep_alive or not (body_complete or (body_chunks is None and remaining == 0)):
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
+    finally:
+        disconnected.set()
+        writer.close()
+
+
+def status_phrase(status: int) -> str:
+    """Return the reason phrase of an HTTP status code."""
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+
+async def serve(app: ASGIApp, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """
+    Serve an ASGIApp with the built-in asyncio HTTP/1.1 server.
+
+    Args:
+        app: The application to serve
+        host: Interface to bind
+        port: Port to bind
+    """
+    await app.startup()
+    server = await asyncio.start_server(lambda r, w: handle_connection(app, r, w, app.max_body_size), host, port,
+                                        limit=MAX_HEADER_SIZE, backlog=4096)
+    print(f"Serving Enhanced BPM on http://{host}:{port}/ (ASGI)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await app.shutdown()
+
+
+application = ASGIApp(web_app.app, max_body_size=web_app.app.config['MAX_CONTENT_LENGTH'],
+                      startup=web_app.preload_app)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the Enhanced BPM web app over ASGI")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument("--read-workers", type=int, default=32, help="Threads serving GET requests")
+    parser.add_argument("--write-workers", type=int, default=8, help="Threads serving uploads and writes")
+    args = parser.parse_args(argv)
+
+    application.read_workers = args.read_workers
+    application.write_workers = args.write_workers
+    try:
+        asyncio.run(serve(application, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
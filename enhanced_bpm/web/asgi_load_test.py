@@ -0,0 +1,234 @@
+"""
+ASGI load test - Concurrent dashboard polls against the ASGI serving mode.
+
+Drives the ASGI app in-process through LocalClient, a stand-in for an HTTP
+client that speaks ASGI directly, so the harness measures the app and its
+executors rather than a network stack. While thousands of dashboard polls
+are in flight, a large CSV upload is converted on the write executor and a
+probe task measures how late the event loop wakes up.
+
+    python enhanced_bpm/web/asgi_load_test.py --polls 5000 --concurrency 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+POLL_PATHS = ("/api/industry/electric_vehicle", "/api/kpi/anomalies", "/api/maturity/aggregates")
+
+
+class LocalClient:
+    """
+    Minimal in-process HTTP client for an ASGI application.
+
+    Requests are delivered as ASGI messages, with bodies split into chunks
+    as a server would, and responses are collected into
+    (status, headers, body) tuples.
+    """
+
+    def __init__(self, app: Callable, chunk_size: int = 64 * 1024):
+        """
+        Initialize the client.
+
+        Args:
+            app: The ASGI application
+            chunk_size: Size of the request body chunks sent to the app
+        """
+        self.app = app
+        self.chunk_size = chunk_size
+
+    async def request(self, method: str, path: str, body: bytes = b"",
+                      headers: Optional[List[Tuple[str, str]]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Send one request and wait for the complete response.
+
+        Args:
+            method: HTTP method
+            path: Request path, optionally with a query string
+            body: Request body
+            headers: Additional request headers
+
+        Returns:
+            Tuple of (status code, response headers, response body)
+        """
+        path, _, query = path.partition("?")
+        raw_headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers or []]
+        if body:
+            raw_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": raw_headers,
+            "server": ("localhost", 80),
+            "client": ("127.0.0.1", 0),
+        }
+
+        chunks = [body[i:i + self.chunk_size] for i in range(0, len(body), self.chunk_size)] or [b""]
+        messages = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+                    for i, chunk in enumerate(chunks)]
+        response = {"status": None, "headers": {}, "body": []}
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = {name.decode("latin-1"): value.decode("latin-1")
+                                       for name, value in message.get("headers", [])}
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return response["status"], response["headers"], b"".join(response["body"])
+
+    async def get(self, path: str, headers: Optional[List[Tuple[str, str]]] = None):
+        """Send a GET request."""
+        return await self.request("GET", path, headers=headers)
+
+    async def upload(self, path: str, filename: str, content: bytes, fields: Optional[Dict[str, str]] = None):
+        """Send a multipart/form-data file upload."""
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in (fields or {}).items():
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+                         .encode("utf-8"))
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode("utf-8") + content + b"\r\n")
+        parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+        return await self.request("POST", path, b"".join(parts),
+                                  [("content-type", f"multipart/form-data; boundary={boundary}")])
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Return a percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def csv_upload(rows: int) -> bytes:
+    """Generate a CSV file that the upload view converts to JSON."""
+    lines = ["process,activity,duration,cost,owner"]
+    lines += [f"Process {i % 50},Activity {i % 400},{i % 17 + 1},{(i * 37) % 1000},Team {i % 9}"
+              for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def run_load(app: Any, polls: int, concurrency: int, upload_rows: int) -> Dict[str, Any]:
+    """
+    Run concurrent dashboard polls next to a large upload.
+
+    Args:
+        app: The ASGI application
+        polls: Total number of poll requests
+        concurrency: Number of polls in flight at once
+        upload_rows: Rows of the CSV uploaded during the test (0 for none)
+
+    Returns:
+        Dictionary with latency percentiles, throughput and event loop lag
+    """
+    client = LocalClient(app)
+    loop = asyncio.get_running_loop()
+    lag = {"max_ms": 0.0, "samples": 0}
+    running = True
+
+    async def probe():
+        # The loop is blocked whenever this wakes up late
+        while running:
+            start = loop.time()
+            await asyncio.sleep(0.005)
+            lag["max_ms"] = max(lag["max_ms"], (loop.time() - start - 0.005) * 1000.0)
+            lag["samples"] += 1
+
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def poll(i):
+        async with semaphore:
+            start = time.perf_counter()
+            status, _, _ = await client.get(POLL_PATHS[i % len(POLL_PATHS)])
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    async def upload():
+        start = time.perf_counter()
+        status, _, _ = await client.upload("/upload", "load_test.csv", csv_upload(upload_rows))
+        return {"status": status, "ms": round((time.perf_counter() - start) * 1000.0, 1)}
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    tasks = [poll(i) for i in range(polls)]
+    if upload_rows:
+        tasks.append(upload())
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    running = False
+    await probe_task
+
+    latencies.sort()
+    return {
+        "polls": polls,
+        "concurrency": concurrency,
+        "statuses": statuses,
+        "throughput_rps": round(polls / elapsed, 1),
+        "latency_ms": {"p50": round(percentile(latencies, 0.50), 1),
+                       "p95": round(percentile(latencies, 0.95), 1),
+                       "p99": round(percentile(latencies, 0.99), 1)},
+        "upload": results[-1] if upload_rows else None,
+        "max_loop_lag_ms": round(lag["max_ms"], 1),
+        "app_stats": dict(getattr(app, "stats", {}))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the ASGI serving mode with a local client")
+    parser.add_argument("--polls", type=int, default=5000, help="Total dashboard poll requests")
+    parser.add_argument("--concurrency", type=int, default=2000, help="Polls in flight at once")
+    parser.add_argument("--upload-rows", type=int, default=200000, help="Rows of the concurrent CSV upload")
+    parser.add_argument("--no-coalesce", action="store_true", help="Run every poll on its own thread")
+    args = parser.parse_args(argv)
+
+    # Uploads and caches go to a scratch directory
+    scratch_dir = tempfile.mkdtemp()
+    os.chdir(scratch_dir)
+    try:
+        from enhanced_bpm.web import app as web_app
+        from enhanced_bpm.web.asgi import ASGIApp
+
+        app = ASGIApp(web_app.app, max_body_size=web_app.app.config['MAX_CONTENT_LENGTH'],
+                      coalesce=not args.no_coalesce, startup=web_app.preload_app)
+
+        async def run():
+            await app.startup()
+            try:
+                return await run_load(app, args.polls, args.concurrency, args.upload_rows)
+            finally:
+                await app.shutdown()
+
+        print(json.dumps(asyncio.run(run()), indent=2))
+    finally:
+        os.chdir(os.path.dirname(scratch_dir))
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
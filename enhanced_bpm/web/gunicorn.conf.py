@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration for the Enhanced BPM web app.
+
+Run from the directory that should hold uploads and caches:
+
+    gunicorn -c enhanced_bpm/web/gunicorn.conf.py enhanced_bpm.web.app:app
+
+The app is imported once in the master process and preload_app() loads the
+data files, analysis bundles, scoring model and templates before workers
+are forked, so every worker starts warm and shares those pages copy-on-write.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("BPM_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("BPM_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+
+
+def when_ready(server):
+    """Warm and freeze the app in the master process before workers are forked."""
+    from enhanced_bpm.web import app as web_app
+
+    web_app.preload_app()
+    server.log.info("Preloaded BPM data, analysis bundles and templates")
@@ -0,0 +1,144 @@
+"""
+Preload benchmark - Per-worker memory and first-request latency of the web app.
+
+Forks worker processes the way a pre-fork server does, once from a cold
+master and once after preload_app(), and reports for each worker the time
+of its first requests and its resident (RSS), proportional (PSS) and
+private memory after serving them. Linux only (uses os.fork and
+/proc/self/smaps_rollup).
+
+    python enhanced_bpm/web/preload_benchmark.py --workers 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+REQUEST_PATHS = ("/", "/industry/electric_vehicle", "/maturity-assessment")
+
+
+def memory_usage():
+    """Return RSS, PSS and private memory of the current process in MB."""
+    usage = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                usage[parts[0][:-1]] = int(parts[1]) / 1024.0
+    return {
+        "rss_mb": round(usage["Rss"], 1),
+        "pss_mb": round(usage["Pss"], 1),
+        "private_mb": round(usage["Private_Clean"] + usage["Private_Dirty"], 1)
+    }
+
+
+def serve_first_requests(app):
+    """Issue the first requests a fresh worker would serve and time each of them."""
+    client = app.test_client()
+    latencies = {}
+    for path in REQUEST_PATHS:
+        start = time.perf_counter()
+        response = client.get(path)
+        latencies[path] = round((time.perf_counter() - start) * 1000.0, 1)
+        if response.status_code >= 500:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+    return latencies
+
+
+def fork_workers(app, workers, settle):
+    """
+    Fork workers that each serve their first requests, then report back.
+
+    Workers stay alive until every one of them has measured its memory, so
+    that PSS reflects pages shared by the whole group.
+    """
+    read_fd, write_fd = os.pipe()
+    release_r, release_w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            os.close(release_w)
+            try:
+                result = {"latency_ms": serve_first_requests(app)}
+                time.sleep(settle)
+                result.update(memory_usage())
+                os.write(write_fd, (json.dumps(result) + "\n").encode("utf-8"))
+                os.read(release_r, 1)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+
+    os.close(write_fd)
+    os.close(release_r)
+    results = []
+    with os.fdopen(read_fd, "r") as reader:
+        for _ in range(workers):
+            results.append(json.loads(reader.readline()))
+    os.close(release_w)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return results
+
+
+def summarize(label, master_seconds, results):
+    """Average the per-worker measurements of one run."""
+    count = len(results)
+    summary = {
+        "mode": label,
+        "master_setup_s": round(master_seconds, 2),
+        "workers": count,
+        "first_request_ms": {path: round(sum(r["latency_ms"][path] for r in results) / count, 1)
+                             for path in REQUEST_PATHS}
+    }
+    for key in ("rss_mb", "pss_mb", "private_mb"):
+        summary[key] = round(sum(r[key] for r in results) / count, 1)
+    return summary
+
+
+def run(preload, workers, settle):
+    """Import the app (optionally preloading it) and fork the workers."""
+    start = time.perf_counter()
+    from enhanced_bpm.web import app as web_app
+    if preload:
+        web_app.preload_app()
+    master_seconds = time.perf_counter() - start
+    return summarize("preload" if preload else "cold", master_seconds,
+                     fork_workers(web_app.app, workers, settle))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the effect of preload_app on forked workers")
+    parser.add_argument("--workers", type=int, default=4, help="Number of workers to fork")
+    parser.add_argument("--settle", type=float, default=0.5,
+                        help="Seconds a worker waits before measuring memory")
+    args = parser.parse_args(argv)
+
+    # Each mode runs in its own interpreter and scratch directory so that
+    # neither inherits the other's imports or on-disk analysis cache
+    if os.environ.get("BPM_PRELOAD_MODE"):
+        scratch_dir = tempfile.mkdtemp()
+        os.chdir(scratch_dir)
+        try:
+            print(json.dumps(run(os.environ["BPM_PRELOAD_MODE"] == "preload", args.workers, args.settle)))
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+        return
+
+    for mode in ("cold", "preload"):
+        env = dict(os.environ, BPM_PRELOAD_MODE=mode)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__)] + (argv or sys.argv[1:]),
+                                env=env, capture_output=True, text=True, check=True).stdout
+        print(json.dumps(json.loads(output.splitlines()[-1]), indent=2))
+
+
+if __name__ == "__main__":
+    main()
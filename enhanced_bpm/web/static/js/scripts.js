@@ -64,9 +64,6 @@ document.addEventListener('DOMContentLoaded', function() {
                     
                     resultsContent.appendChild(sectionDiv);
                 }
-                
-                // Highlight search terms
-                highlightSearchTerms(formData.get('search_term').trim());
             })
             .catch(error => {
                 console.error('Error:', error);
@@ -146,6 +143,11 @@ document.addEventListener('DOMContentLoaded', function() {
         // Create card body based on item type
         let cardBody = '';
         
+        // Show where the search term matched, highlighted by the server
+        if (item.snippet) {
+            cardBody += `<p class="small text-muted mb-2"><i class="bi bi-search"></i> ${escapeHtml(item.path)}: ${renderSnippet(item.snippet, item.highlights)}</p>`;
+        }
+        
         // Add description if available
         if (item.description) {
             cardBody += `<p>${item.description}</p>`;
@@ -186,6 +188,12 @@ document.addEventListener('DOMContentLoaded', function() {
             cardBody += `<h5>BPM Application:</h5><p>${item.bpm_application}</p>`;
         }
         
+        // Name the file of results from a search across all files
+        let cardFooter = '';
+        if (item.source_file) {
+            cardFooter = `<div class="card-footer text-muted small"><i class="bi bi-file-earmark"></i> ${item.source_file}</div>`;
+        }
+        
         // Create the complete card
         colDiv.innerHTML = `
             <div class="card h-100">
@@ -195,64 +203,31 @@ document.addEventListener('DOMContentLoaded', function() {
                 <div class="card-body">
                     ${cardBody}
                 </div>
+                ${cardFooter}
             </div>
         `;
         
         return colDiv;
     }
     
-    // Highlight search terms in the results
-    function highlightSearchTerms(searchTerm) {
-        if (!searchTerm) return;
-        
-        const searchTerms = searchTerm.toLowerCase().split(' ').filter(term => term.length > 2);
-        if (searchTerms.length === 0) return;
-        
-        const resultsContainer = document.getElementById('resultsContent');
-        const textNodes = getTextNodes(resultsContainer);
-        
-        textNodes.forEach(node => {
-            const text = node.nodeValue;
-            let highlightedText = text;
-            let replaced = false;
-            
-            searchTerms.forEach(term => {
-                const regex = new RegExp(`(${escapeRegExp(term)})`, 'gi');
-                if (regex.test(highlightedText)) {
-                    highlightedText = highlightedText.replace(regex, '<span class="highlight">$1</span>');
-                    replaced = true;
-                }
-            });
-            
-            if (replaced) {
-                const span = document.createElement('span');
-                span.innerHTML = highlightedText;
-                node.parentNode.replaceChild(span, node);
-            }
+    // Render a snippet with its [start, end] highlight spans
+    // (offsets count code points, as in Python, so the snippet is split into code points)
+    function renderSnippet(snippet, highlights) {
+        const chars = Array.from(snippet);
+        const text = (start, end) => escapeHtml(chars.slice(start, end).join(''));
+        let html = '';
+        let position = 0;
+        (highlights || []).forEach(([start, end]) => {
+            html += text(position, start) + `<span class="highlight">${text(start, end)}</span>`;
+            position = end;
         });
+        return html + text(position);
     }
     
-    // Get all text nodes in an element
-    function getTextNodes(node) {
-        const textNodes = [];
-        
-        function getNodes(node) {
-            if (node.nodeType === 3) {
-                textNodes.push(node);
-            } else {
-                const children = node.childNodes;
-                for (let i = 0; i < children.length; i++) {
-                    getNodes(children[i]);
-                }
-            }
-        }
-        
-        getNodes(node);
-        return textNodes;
-    }
-    
-    // Escape special characters for regex
-    function escapeRegExp(string) {
-        return string.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    // Escape text for use in HTML
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text || '';
+        return div.innerHTML;
     }
-});
\ No newline at end of file
+});
@@ -0,0 +1,112 @@
+"""
+Vector index benchmark - Recall and latency of IVF search against exact search.
+
+Builds a synthetic collection of clustered unit-length vectors (the shape of
+the semantic index's leaf vectors), trains an IVF index over it, saves and
+memory-maps it back, and reports for several nprobe values the recall@k
+against an exact scan and the per-query latency of both.
+
+    python enhanced_bpm/web/vector_index_benchmark.py --vectors 1000000 --dim 96
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from enhanced_bpm.models.vector_index import IVFIndex
+
+import numpy as np
+
+# Topics of the synthetic collection and how far vectors stray from them
+CLUSTERS = 64
+SPREAD = 1.0
+
+
+def clustered_vectors(count, dim, clusters, spread, seed):
+    """Return unit-length vectors drawn around random cluster directions."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=count)]
+    vectors += spread * rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def timed_search(search, queries, k):
+    """Run one query at a time and return the ids found and the mean latency in ms."""
+    ids = []
+    start = time.perf_counter()
+    for query in queries:
+        ids.append(search(query[None, :], k)[1][0])
+    return np.array(ids), (time.perf_counter() - start) * 1000.0 / len(queries)
+
+
+def run(count, dim, queries, k, nlist, nprobes, seed):
+    """Build, reload and query an index and return the measurements."""
+    vectors = clustered_vectors(count + queries, dim, clusters=CLUSTERS, spread=SPREAD, seed=seed)
+    vectors, query_vectors = vectors[:count], vectors[count:]
+
+    directory = tempfile.mkdtemp(prefix="ivf_benchmark_")
+    try:
+        start = time.perf_counter()
+        IVFIndex.train(vectors, nlist=nlist, directory=directory, seed=seed)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = IVFIndex.load(directory)
+        load_ms = (time.perf_counter() - start) * 1000.0
+
+        exact_ids, exact_ms = timed_search(lambda q, k: index.exact_search(q, k), query_vectors, k)
+        report = {
+            "vectors": count,
+            "dim": dim,
+            "nlist": index.nlist,
+            "k": k,
+            "build_s": round(build_seconds, 2),
+            "load_ms": round(load_ms, 2),
+            "exact_ms": round(exact_ms, 2),
+            "ivf": []
+        }
+        for nprobe in nprobes:
+            ids, ivf_ms = timed_search(lambda q, k: index.search(q, k, nprobe), query_vectors, k)
+            recall = np.mean([len(set(found) & set(exact)) / k for found, exact in zip(ids, exact_ids)])
+            report["ivf"].append({
+                "nprobe": nprobe,
+                "recall": round(float(recall), 4),
+                "latency_ms": round(ivf_ms, 2),
+                "speedup": round(exact_ms / ivf_ms, 1)
+            })
+
+        # Inserts land in segment files and are searched without retraining
+        added = clustered_vectors(max(1, count // 100), dim, clusters=CLUSTERS, spread=SPREAD, seed=seed)
+        start = time.perf_counter()
+        index.add(added, np.arange(count, count + len(added)))
+        report["insert_ms_per_1000"] = round((time.perf_counter() - start) * 1000.0 * 1000 / len(added), 2)
+        return report
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure IVF recall and latency against exact search")
+    parser.add_argument("--vectors", type=int, default=200000, help="Number of indexed vectors")
+    parser.add_argument("--dim", type=int, default=96, help="Vector dimensions")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("-k", type=int, default=10, help="Neighbors per query")
+    parser.add_argument("--nlist", type=int, default=None, help="Number of IVF lists (default: sqrt of vectors)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32], help="nprobe values to try")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    report = run(args.vectors, args.dim, args.queries, args.k, args.nlist, args.nprobe, args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()